@@ -0,0 +1,39 @@
+# flake8: noqa
+
+"""add_text_search_to_info_blob_chunks
+Revision ID: 8c3f1d2e7a90
+Revises: 1e58cb567f44
+Create Date: 2025-05-12 10:15:42.118273
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# revision identifiers, used by Alembic
+revision = "8c3f1d2e7a90"
+down_revision = "1e58cb567f44"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "info_blob_chunks",
+        sa.Column(
+            "text_search",
+            TSVECTOR,
+            sa.Computed("to_tsvector('simple', text)", persisted=True),
+        ),
+    )
+    op.create_index(
+        "ix_info_blob_chunks_text_search",
+        "info_blob_chunks",
+        ["text_search"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_info_blob_chunks_text_search", table_name="info_blob_chunks")
+    op.drop_column("info_blob_chunks", "text_search")
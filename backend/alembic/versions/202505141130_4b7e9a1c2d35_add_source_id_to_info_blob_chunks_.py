@@ -0,0 +1,46 @@
+# flake8: noqa
+
+"""add_source_id_to_info_blob_chunks
+Revision ID: 4b7e9a1c2d35
+Revises: 8c3f1d2e7a90
+Create Date: 2025-05-14 11:30:08.402516
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "4b7e9a1c2d35"
+down_revision = "8c3f1d2e7a90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "info_blob_chunks", sa.Column("source_id", sa.UUID(), nullable=True)
+    )
+
+    op.execute(
+        """
+        UPDATE info_blob_chunks
+        SET source_id = COALESCE(
+            info_blobs.group_id,
+            info_blobs.website_id,
+            info_blobs.integration_knowledge_id
+        )
+        FROM info_blobs
+        WHERE info_blobs.id = info_blob_chunks.info_blob_id
+        """
+    )
+
+    op.create_index(
+        op.f("ix_info_blob_chunks_source_id"),
+        "info_blob_chunks",
+        ["source_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_info_blob_chunks_source_id"), table_name="info_blob_chunks")
+    op.drop_column("info_blob_chunks", "source_id")
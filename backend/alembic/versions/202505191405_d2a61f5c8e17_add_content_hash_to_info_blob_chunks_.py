@@ -0,0 +1,38 @@
+# flake8: noqa
+
+"""add_content_hash_to_info_blob_chunks
+Revision ID: d2a61f5c8e17
+Revises: 4b7e9a1c2d35
+Create Date: 2025-05-19 14:05:51.730214
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "d2a61f5c8e17"
+down_revision = "4b7e9a1c2d35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("info_blob_chunks", sa.Column("content_hash", sa.String(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE info_blob_chunks
+        SET content_hash = encode(sha256(convert_to(text, 'UTF8')), 'hex')
+        """
+    )
+
+    op.create_index(
+        op.f("ix_info_blob_chunks_content_hash"),
+        "info_blob_chunks",
+        ["content_hash"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_info_blob_chunks_content_hash"), table_name="info_blob_chunks")
+    op.drop_column("info_blob_chunks", "content_hash")
@@ -0,0 +1,28 @@
+# flake8: noqa
+
+"""add_crawl_validators_to_info_blobs
+Revision ID: 7f0c3b9d4e62
+Revises: d2a61f5c8e17
+Create Date: 2025-05-22 10:20:13.581946
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "7f0c3b9d4e62"
+down_revision = "d2a61f5c8e17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("info_blobs", sa.Column("content_hash", sa.String(), nullable=True))
+    op.add_column("info_blobs", sa.Column("etag", sa.String(), nullable=True))
+    op.add_column("info_blobs", sa.Column("last_modified", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("info_blobs", "last_modified")
+    op.drop_column("info_blobs", "etag")
+    op.drop_column("info_blobs", "content_hash")
@@ -0,0 +1,28 @@
+# flake8: noqa
+
+"""add_session_history_index_to_questions
+Revision ID: 5e8d2b7c1a43
+Revises: 7f0c3b9d4e62
+Create Date: 2025-05-26 14:15:42.118305
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "5e8d2b7c1a43"
+down_revision = "7f0c3b9d4e62"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_questions_session_id_created_at",
+        "questions",
+        ["session_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_questions_session_id_created_at", table_name="questions")
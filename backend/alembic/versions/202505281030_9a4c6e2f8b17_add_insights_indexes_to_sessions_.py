@@ -0,0 +1,34 @@
+# flake8: noqa
+
+"""add_insights_indexes_to_sessions
+Revision ID: 9a4c6e2f8b17
+Revises: 5e8d2b7c1a43
+Create Date: 2025-05-28 10:30:18.402917
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "9a4c6e2f8b17"
+down_revision = "5e8d2b7c1a43"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_sessions_assistant_id_created_at",
+        "sessions",
+        ["assistant_id", "created_at"],
+    )
+    op.create_index(
+        "ix_sessions_group_chat_id_created_at",
+        "sessions",
+        ["group_chat_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sessions_group_chat_id_created_at", table_name="sessions")
+    op.drop_index("ix_sessions_assistant_id_created_at", table_name="sessions")
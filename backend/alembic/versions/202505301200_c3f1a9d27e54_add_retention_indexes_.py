@@ -0,0 +1,34 @@
+# flake8: noqa
+
+"""add_retention_indexes
+Revision ID: c3f1a9d27e54
+Revises: 9a4c6e2f8b17
+Create Date: 2025-05-30 12:00:42.118305
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic
+revision = "c3f1a9d27e54"
+down_revision = "9a4c6e2f8b17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_questions_created_at_id",
+        "questions",
+        ["created_at", "id"],
+    )
+    op.create_index(
+        "ix_app_runs_created_at_id",
+        "app_runs",
+        ["created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_app_runs_created_at_id", table_name="app_runs")
+    op.drop_index("ix_questions_created_at_id", table_name="questions")
@@ -0,0 +1,27 @@
+# flake8: noqa
+
+"""add_crawl_links_to_info_blobs
+Revision ID: 5e8d2b7c41a9
+Revises: c3f1a9d27e54
+Create Date: 2025-06-02 10:00:27.604913
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic
+revision = "5e8d2b7c41a9"
+down_revision = "c3f1a9d27e54"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "info_blobs", sa.Column("links", postgresql.JSONB(astext_type=sa.Text()), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("info_blobs", "links")
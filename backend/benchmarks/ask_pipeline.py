@@ -0,0 +1,140 @@
+"""Time until the completion starts when asking an assistant, with web search enabled.
+
+Stands in for the remote calls and the database with fixed latencies, and
+asks in a new and in an existing session through `AssistantService.ask`,
+which searches the web and embeds the question while the files and the
+session are loaded. Compares with the sum of the latencies, which is what
+awaiting the stages one after the other, as before, took. The completion
+itself is not started.
+
+    poetry run python -m benchmarks.ask_pipeline --web-search-ms 800 --embedding-ms 150
+"""
+
+import argparse
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from benchmarks.common import print_table
+from intric.assistants.assistant_service import AssistantService
+from tests.fixtures import TEST_MODEL_GPT4
+
+
+class _CompletionStarted(Exception):
+    pass
+
+
+def _after(ms: float, result=None):
+    async def wait(*args, **kwargs):
+        await asyncio.sleep(ms / 1000)
+        return result
+
+    return wait
+
+
+def _service(latencies: dict[str, float]) -> AssistantService:
+    assistant = MagicMock(completion_model=TEST_MODEL_GPT4)
+    assistant.ask = AsyncMock(side_effect=_CompletionStarted)
+    space = MagicMock()
+    space.get_assistant.return_value = assistant
+
+    session_service = AsyncMock()
+    session_service.create_session.side_effect = _after(
+        latencies["session"], MagicMock(questions=[])
+    )
+    session_service.get_session_with_history_window.side_effect = _after(
+        latencies["session"], MagicMock(questions=[])
+    )
+    file_service = AsyncMock()
+    file_service.get_files_by_ids.side_effect = _after(latencies["files"], [])
+    references_service = AsyncMock()
+    references_service.embed_query.side_effect = _after(latencies["embedding"], [0.0])
+
+    service = AssistantService(
+        **{
+            name: AsyncMock()
+            for name in [
+                "repo",
+                "user",
+                "auth_service",
+                "service_repo",
+                "step_repo",
+                "completion_model_crud_service",
+                "space_service",
+                "factory",
+                "prompt_service",
+                "assistant_template_service",
+                "integration_knowledge_repo",
+                "completion_service",
+            ]
+        },
+        space_repo=AsyncMock(get_space_by_assistant=AsyncMock(return_value=space)),
+        actor_manager=MagicMock(),
+        session_service=session_service,
+        file_service=file_service,
+        references_service=references_service,
+    )
+
+    return service
+
+
+async def _measure(latencies: dict[str, float], session: str, requests: int):
+    session_id = uuid4() if session == "existing" else None
+    times = []
+    for _ in range(requests):
+        service = _service(latencies)
+
+        start = time.perf_counter()
+        try:
+            await service.ask(
+                question="What is new?",
+                assistant_id=uuid4(),
+                session_id=session_id,
+                use_web_search=True,
+                version=2,
+            )
+        except _CompletionStarted:
+            pass
+        times.append((time.perf_counter() - start) * 1000)
+
+    return sum(times) / len(times)
+
+
+async def main(latencies: dict[str, float], requests: int):
+    web_search = MagicMock()
+    web_search.search.side_effect = _after(latencies["web_search"], [])
+    AssistantService.web_search = web_search
+
+    rows = []
+    for session in ["new", "existing"]:
+        ms = await _measure(latencies, session, requests)
+        rows.append([session, sum(latencies.values()), ms])
+
+    print(
+        "Latencies (ms): "
+        + ", ".join(f"{stage} {latency:.0f}" for stage, latency in latencies.items())
+    )
+    print_table(["session", "one after the other (ms)", "concurrent (ms)"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--web-search-ms", type=float, default=800)
+    parser.add_argument("--embedding-ms", type=float, default=150)
+    parser.add_argument("--files-ms", type=float, default=5)
+    parser.add_argument("--session-ms", type=float, default=20)
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(
+        main(
+            dict(
+                files=args.files_ms,
+                session=args.session_ms,
+                web_search=args.web_search_ms,
+                embedding=args.embedding_ms,
+            ),
+            args.requests,
+        )
+    )
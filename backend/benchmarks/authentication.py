@@ -0,0 +1,118 @@
+"""Statements and latency per authenticated request, with and without the principal cache.
+
+Seeds a tenant with a user that has a role and an api key, and runs
+`UserService.authenticate` with a bearer token and with the api key, the way
+`get_container(with_user=True)` does on every request. The cache is
+in-process only, unless `--redis` is given, in which case the configured
+Redis is used as the shared tier.
+
+    poetry run python -m benchmarks.authentication --requests 1000 --redis
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import StatementCounter, Timer, print_table, scratch_database
+from intric.authentication.api_key_repo import ApiKeysRepository
+from intric.authentication.auth_service import AuthService
+from intric.authentication.principal_cache import PrincipalCache
+from intric.info_blobs.info_blob_repo import InfoBlobRepository
+from intric.main.models import ModelId
+from intric.roles.role import RoleCreate
+from intric.roles.roles_repo import RolesRepository
+from intric.settings.settings_repo import SettingsRepository
+from intric.tenants.tenant import TenantBase
+from intric.tenants.tenant_repo import TenantRepository
+from intric.users.user import UserAdd, UserState
+from intric.users.user_repo import UsersRepository
+from intric.users.user_service import UserService
+from intric.worker.redis import r
+
+
+def _user_service(session: AsyncSession, principal_cache: PrincipalCache | None) -> UserService:
+    return UserService(
+        user_repo=UsersRepository(session),
+        auth_service=AuthService(ApiKeysRepository(session)),
+        settings_repo=SettingsRepository(session),
+        tenant_repo=TenantRepository(session),
+        info_blob_repo=InfoBlobRepository(session),
+        principal_cache=principal_cache,
+    )
+
+
+async def _seed(engine: AsyncEngine) -> tuple[str, str]:
+    async with AsyncSession(engine) as session, session.begin():
+        tenant = await TenantRepository(session).add(TenantBase(name="benchmark"))
+        role = await RolesRepository(session).create_role(
+            RoleCreate(name="benchmark", permissions=[], tenant_id=tenant.id)
+        )
+        user = await UsersRepository(session).add(
+            UserAdd(
+                email="benchmark@example.com",
+                username="benchmark",
+                tenant_id=tenant.id,
+                state=UserState.ACTIVE,
+                roles=[ModelId(id=role.id)],
+            )
+        )
+
+        user_service = _user_service(session, principal_cache=None)
+        api_key = await user_service.generate_api_key(user.id)
+        token = user_service.auth_service.create_access_token_for_user(user)
+
+    return token, api_key.key
+
+
+async def _measure(engine: AsyncEngine, counter: StatementCounter, authenticate, requests: int):
+    timer = Timer()
+    counter.reset()
+    for _ in range(requests):
+        async with AsyncSession(engine) as session, session.begin():
+            with timer.time():
+                await authenticate(session)
+
+    return counter.statements / requests, timer
+
+
+async def main(requests: int, use_redis: bool):
+    rows = []
+    async with scratch_database() as engine:
+        token, api_key = await _seed(engine)
+
+        if use_redis:
+            await r.delete(
+                PrincipalCache.token_key("benchmark"),
+                PrincipalCache.api_key_key(AuthService.hash_api_key(api_key)),
+            )
+
+        with StatementCounter().listen(engine) as counter:
+            for name, principal_cache in [
+                ("no cache", None),
+                ("cache", PrincipalCache(redis=r if use_redis else None)),
+            ]:
+                for credential, kwargs in [
+                    ("token", dict(token=token)),
+                    ("api key", dict(api_key=api_key)),
+                ]:
+
+                    async def authenticate(session):
+                        await _user_service(session, principal_cache).authenticate(**kwargs)
+
+                    statements, timer = await _measure(engine, counter, authenticate, requests)
+                    rows.append([name, credential, statements, timer.p50, timer.p95])
+
+    print(f"{requests} requests per row")
+    print_table(
+        ["principal cache", "credential", "statements/request", "p50 (ms)", "p95 (ms)"], rows
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--redis", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.redis))
@@ -0,0 +1,164 @@
+"""Throughput of inserting embedded chunks into `info_blob_chunks`.
+
+Compares the previous insert (a multi-row INSERT with RETURNING in batches
+of 100 pydantic models) with the binary COPY of
+`InfoBlobChunkRepo.add_chunk_embeddings`, with and without returning ids.
+
+    poetry run python -m benchmarks.chunk_ingestion --rows 100000 --dimensions 1536
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import StatementCounter, print_table, scratch_database, without_foreign_keys
+from intric.database import binary_copy
+from intric.database.tables.info_blob_chunk_table import InfoBlobChunks
+from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from intric.info_blobs.info_blob import (
+    InfoBlobChunk,
+    InfoBlobChunkInDB,
+    InfoBlobChunkWithEmbedding,
+)
+from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo
+
+LEGACY_BATCH_SIZE = 100
+
+
+def _chunk_embedding_list(num_rows: int, dimensions: int) -> ChunkEmbeddingList:
+    info_blob_id = tenant_id = source_id = uuid4()
+    rng = np.random.default_rng(0)
+
+    chunk_embedding_list = ChunkEmbeddingList()
+    chunk_embedding_list.add(
+        [
+            InfoBlobChunk(
+                text=f"Chunk number {i} of a large document. " * 20,
+                chunk_no=i,
+                info_blob_id=info_blob_id,
+                tenant_id=tenant_id,
+                source_id=source_id,
+            )
+            for i in range(num_rows)
+        ],
+        rng.random((num_rows, dimensions), dtype=np.float32) - 0.5,
+    )
+
+    return chunk_embedding_list
+
+
+async def _insert_returning(
+    session: AsyncSession, chunks: list[InfoBlobChunkWithEmbedding]
+) -> list[InfoBlobChunkInDB]:
+    stmt = (
+        sa.insert(InfoBlobChunks)
+        .values([chunk.model_dump() for chunk in chunks])
+        .returning(InfoBlobChunks)
+    )
+    records = await session.scalars(stmt)
+
+    return [InfoBlobChunkInDB.model_validate(record) for record in records]
+
+
+async def _legacy_add(session: AsyncSession, chunk_embedding_list: ChunkEmbeddingList) -> int:
+    bytes_received = 0
+
+    chunks = []
+    for chunk, embedding in chunk_embedding_list:
+        chunks.append(
+            InfoBlobChunkWithEmbedding(
+                **chunk.model_dump(exclude_none=True), embedding=embedding.tolist()
+            )
+        )
+
+        if len(chunks) >= LEGACY_BATCH_SIZE:
+            added = await _insert_returning(session, chunks)
+            bytes_received += sum(len(chunk.model_dump_json()) for chunk in added)
+            chunks.clear()
+
+    if chunks:
+        added = await _insert_returning(session, chunks)
+        bytes_received += sum(len(chunk.model_dump_json()) for chunk in added)
+
+    return bytes_received
+
+
+def _copy_bytes(chunk_embedding_list: ChunkEmbeddingList, returning: bool) -> int:
+    ids = [uuid4() for _ in chunk_embedding_list.chunks] if returning else None
+    rows = InfoBlobChunkRepo._encode_copy_rows(
+        chunk_embedding_list.chunks, chunk_embedding_list.embeddings, ids
+    )
+
+    return len(binary_copy.HEADER) + len(rows) + len(binary_copy.TRAILER)
+
+
+async def _measure(engine: AsyncEngine, add, counter: StatementCounter):
+    async with AsyncSession(engine) as session, session.begin():
+        await session.execute(sa.text("TRUNCATE info_blob_chunks"))
+
+    counter.reset()
+    async with AsyncSession(engine) as session, session.begin():
+        async with without_foreign_keys(session):
+            start = time.perf_counter()
+            result = await add(session)
+            elapsed = time.perf_counter() - start
+
+    return elapsed, result
+
+
+async def main(num_rows: int, dimensions: int):
+    chunk_embedding_list = _chunk_embedding_list(num_rows, dimensions)
+
+    async def copy(session):
+        await InfoBlobChunkRepo(session).add_chunk_embeddings(chunk_embedding_list)
+
+    async def copy_returning(session):
+        await InfoBlobChunkRepo(session).add_chunk_embeddings(
+            chunk_embedding_list, returning=True
+        )
+
+    rows = []
+    async with scratch_database() as engine:
+        with StatementCounter().listen(engine) as counter:
+            elapsed, bytes_received = await _measure(
+                engine, lambda session: _legacy_add(session, chunk_embedding_list), counter
+            )
+            rows.append(
+                [
+                    "insert returning",
+                    num_rows / elapsed,
+                    counter.parameter_bytes / 2**20,
+                    bytes_received / 2**20,
+                ]
+            )
+
+            for name, add, returning in [
+                ("copy", copy, False),
+                ("copy returning ids", copy_returning, True),
+            ]:
+                elapsed, _ = await _measure(engine, add, counter)
+                rows.append(
+                    [
+                        name,
+                        num_rows / elapsed,
+                        _copy_bytes(chunk_embedding_list, returning) / 2**20,
+                        0.0,
+                    ]
+                )
+
+    print(f"{num_rows} chunks of {dimensions} dimensions")
+    print_table(["method", "rows/s", "sent (MiB)", "received (MiB)"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.dimensions))
@@ -0,0 +1,136 @@
+"""Shared helpers for the benchmarks in this directory.
+
+The benchmarks run against a scratch database, named after the configured
+database with a `_benchmark` suffix, which is dropped and recreated on
+every run. Run them from the backend directory, for example:
+
+    poetry run python -m benchmarks.vector_search
+"""
+
+import contextlib
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable
+
+import psycopg2
+import sqlalchemy as sa
+from psycopg2 import sql
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+import intric.database.tables  # noqa
+from intric.database.tables.base_class import Base
+from intric.main.config import get_settings
+
+BENCHMARK_DB_SUFFIX = "_benchmark"
+
+
+def _recreate_database(name: str):
+    settings = get_settings()
+    conn = psycopg2.connect(
+        dbname=settings.postgres_db,
+        user=settings.postgres_user,
+        password=settings.postgres_password,
+        host=settings.postgres_host,
+        port=settings.postgres_port,
+    )
+    conn.autocommit = True
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(name))
+        )
+        cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name)))
+
+    conn.close()
+
+
+@contextlib.asynccontextmanager
+async def scratch_database() -> AsyncIterator[AsyncEngine]:
+    settings = get_settings()
+    name = f"{settings.postgres_db}{BENCHMARK_DB_SUFFIX}"
+    _recreate_database(name)
+
+    engine = create_async_engine(f"{settings.database_url}{BENCHMARK_DB_SUFFIX}")
+    async with engine.begin() as conn:
+        await conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@contextlib.asynccontextmanager
+async def without_foreign_keys(session: AsyncSession):
+    """Skip foreign key triggers, so that seeding does not need a full object graph."""
+    await session.execute(sa.text("SET session_replication_role = replica"))
+    try:
+        yield
+    finally:
+        await session.execute(sa.text("SET session_replication_role = DEFAULT"))
+
+
+@dataclass
+class StatementCounter:
+    """Count the statements, and the bytes of parameters, sent over an engine."""
+
+    statements: int = 0
+    parameter_bytes: int = 0
+    log: list[str] = field(default_factory=list)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, many):
+        self.statements += 1
+        self.parameter_bytes += len(repr(parameters).encode())
+        self.log.append(statement)
+
+    @contextlib.contextmanager
+    def listen(self, engine: AsyncEngine):
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        try:
+            yield self
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def reset(self):
+        self.statements = 0
+        self.parameter_bytes = 0
+        self.log.clear()
+
+
+class Timer:
+    def __init__(self):
+        self.samples: list[float] = []
+
+    @contextlib.contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.append(time.perf_counter() - start)
+
+    @property
+    def p50(self) -> float:
+        return statistics.median(self.samples) * 1000
+
+    @property
+    def p95(self) -> float:
+        if len(self.samples) < 2:
+            return self.p50
+        return statistics.quantiles(self.samples, n=20)[-1] * 1000
+
+
+def print_table(headers: list[str], rows: Iterable[Iterable]):
+    rows = [
+        [f"{value:.2f}" if isinstance(value, float) else str(value) for value in row]
+        for row in rows
+    ]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+
+    print(" | ".join(header.ljust(width) for header, width in zip(headers, widths)))
+    print("-+-".join("-" * width for width in widths))
+    for row in rows:
+        print(" | ".join(cell.ljust(width) for cell, width in zip(row, widths)))
@@ -0,0 +1,188 @@
+"""Statements and latency of loading the spaces of the dashboard, as a user joins more spaces.
+
+Seeds N shared spaces that the user is a member of, each with a few
+assistants and apps with long prompts, and loads them with
+`SpaceRepository.get_spaces_for_member(include_applications=True)`.
+Compares loading the assistants and apps one space at a time (as before
+they were batched) with loading those of all spaces at once, in full and as
+the summaries that the dashboard uses.
+
+    poetry run python -m benchmarks.dashboard --spaces 10 80 200 --requests 20
+"""
+
+import argparse
+import asyncio
+from uuid import UUID, uuid4
+
+import sqlalchemy as sa
+from dependency_injector import providers
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import (
+    StatementCounter,
+    Timer,
+    print_table,
+    scratch_database,
+    without_foreign_keys,
+)
+from benchmarks.space_loading import _seed_user
+from intric.database.tables.app_table import Apps, AppsPrompts
+from intric.database.tables.assistant_table import Assistants
+from intric.database.tables.prompts_table import Prompts, PromptsAssistants
+from intric.database.tables.spaces_table import Spaces, SpacesUsers
+from intric.main.container.container import Container
+from intric.main.container.container_overrides import override_user
+from intric.spaces.space_repo import SpaceRepository
+from intric.users.user import UserInDB
+
+ASSISTANTS_PER_SPACE = 5
+APPS_PER_SPACE = 2
+PROMPT = "Answer in the style of the documentation. " * 200
+
+
+async def _seed_spaces(engine: AsyncEngine, user: UserInDB, num_spaces: int):
+    space_ids = [uuid4() for _ in range(num_spaces)]
+    assistant_ids = [uuid4() for _ in range(num_spaces * ASSISTANTS_PER_SPACE)]
+    app_ids = [uuid4() for _ in range(num_spaces * APPS_PER_SPACE)]
+    prompt_ids = [uuid4() for _ in range(len(assistant_ids) + len(app_ids))]
+    common = dict(tenant_id=user.tenant_id, user_id=user.id)
+
+    async with AsyncSession(engine) as session, session.begin():
+        async with without_foreign_keys(session):
+            # Start from scratch for every number of spaces
+            await session.execute(sa.delete(Spaces))
+
+            await session.execute(
+                sa.insert(Spaces),
+                [
+                    dict(id=space_id, name=f"space {i}", tenant_id=user.tenant_id)
+                    for i, space_id in enumerate(space_ids)
+                ],
+            )
+            await session.execute(
+                sa.insert(SpacesUsers),
+                [dict(space_id=space_id, user_id=user.id, role="admin") for space_id in space_ids],
+            )
+            await session.execute(
+                sa.insert(Assistants),
+                [
+                    dict(
+                        id=assistant_id,
+                        name=f"assistant {i}",
+                        completion_model_kwargs={},
+                        logging_enabled=False,
+                        is_default=False,
+                        published=True,
+                        space_id=space_ids[i // ASSISTANTS_PER_SPACE],
+                        user_id=user.id,
+                    )
+                    for i, assistant_id in enumerate(assistant_ids)
+                ],
+            )
+            await session.execute(
+                sa.insert(Apps),
+                [
+                    dict(
+                        id=app_id,
+                        name=f"app {i}",
+                        published=True,
+                        space_id=space_ids[i // APPS_PER_SPACE],
+                        completion_model_id=uuid4(),
+                        **common,
+                    )
+                    for i, app_id in enumerate(app_ids)
+                ],
+            )
+            await session.execute(
+                sa.insert(Prompts), [dict(id=id, text=PROMPT, **common) for id in prompt_ids]
+            )
+            await session.execute(
+                sa.insert(PromptsAssistants),
+                [
+                    dict(prompt_id=prompt_id, assistant_id=assistant_id, is_selected=True)
+                    for prompt_id, assistant_id in zip(prompt_ids, assistant_ids)
+                ],
+            )
+            await session.execute(
+                sa.insert(AppsPrompts),
+                [
+                    dict(prompt_id=prompt_id, app_id=app_id, is_selected=True)
+                    for prompt_id, app_id in zip(prompt_ids[len(assistant_ids) :], app_ids)
+                ],
+            )
+
+
+async def _get_spaces_one_at_a_time(space_repo: SpaceRepository, user_id: UUID):
+    query = (
+        sa.select(Spaces)
+        .join(SpacesUsers, Spaces.members)
+        .where(SpacesUsers.user_id == user_id)
+        .distinct()
+        .order_by(Spaces.created_at)
+    )
+
+    spaces = []
+    for record in await space_repo._get_records_with_options(query):
+        spaces.append(
+            space_repo.factory.create_space_from_db(
+                record,
+                user=space_repo.user,
+                assistants_in_db=await space_repo._get_assistants(space_id=record.id),
+                apps_in_db=await space_repo._get_apps(space_id=record.id),
+            )
+        )
+
+    return spaces
+
+
+async def _measure(
+    engine: AsyncEngine, counter: StatementCounter, user: UserInDB, load: str, requests: int
+):
+    timer = Timer()
+    counter.reset()
+    for _ in range(requests):
+        async with AsyncSession(engine) as session, session.begin():
+            container = override_user(Container(session=providers.Object(session)), user)
+            space_repo = container.space_repo()
+
+            with timer.time():
+                if load == "one space at a time":
+                    spaces = await _get_spaces_one_at_a_time(space_repo, user.id)
+                else:
+                    spaces = await space_repo.get_spaces_for_member(
+                        user.id, include_applications=True, summary=load == "summaries"
+                    )
+
+    applications = sum(len(space.assistants) + len(space.apps) for space in spaces)
+    return counter.statements / requests, applications, timer
+
+
+async def main(num_spaces: list[int], requests: int):
+    rows = []
+    async with scratch_database() as engine:
+        user = await _seed_user(engine)
+
+        with StatementCounter().listen(engine) as counter:
+            for n in num_spaces:
+                await _seed_spaces(engine, user, n)
+
+                for load in ["one space at a time", "all spaces at once", "summaries"]:
+                    statements, applications, timer = await _measure(
+                        engine, counter, user, load, requests
+                    )
+                    rows.append([n, load, statements, applications, timer.p50, timer.p95])
+
+    print(f"{requests} requests per row")
+    print_table(
+        ["spaces", "load", "statements/request", "applications", "p50 (ms)", "p95 (ms)"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spaces", type=int, nargs="+", default=[10, 80, 200])
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.spaces, args.requests))
@@ -0,0 +1,183 @@
+"""Duration of the transactions that delete the questions past their retention.
+
+Seeds an assistant with a retention of 30 days and N questions spread over
+90 days, each referencing an info blob, so that two thirds of them are
+expired. Compares deleting them with one unbounded statement (as
+`DataRetentionService` did before) with deleting them in batches, each in a
+transaction of its own. Locks are held, and the deleted rows are
+unreachable for vacuum, for as long as the longest transaction.
+
+    poetry run python -m benchmarks.data_retention --questions 200000 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.sql import text
+
+from benchmarks.common import StatementCounter, print_table, scratch_database, without_foreign_keys
+from intric.data_retention.infrastructure.data_retention_service import DataRetentionService
+from intric.database.tables.assistant_table import Assistants
+from intric.database.tables.questions_table import Questions
+
+RETENTION_DAYS = 30
+SPREAD_DAYS = 90
+
+
+async def _seed(engine: AsyncEngine, num_questions: int):
+    assistant_id = user_id = tenant_id = uuid4()
+    start = datetime.now(timezone.utc) - timedelta(days=SPREAD_DAYS)
+
+    async with AsyncSession(engine) as session, session.begin():
+        await session.execute(sa.text("TRUNCATE assistants, sessions, questions CASCADE"))
+        async with without_foreign_keys(session):
+            await session.execute(
+                sa.insert(Assistants),
+                [
+                    dict(
+                        id=assistant_id,
+                        name="benchmark",
+                        completion_model_kwargs={},
+                        logging_enabled=False,
+                        is_default=False,
+                        published=False,
+                        user_id=user_id,
+                        data_retention_days=RETENTION_DAYS,
+                    )
+                ],
+            )
+            session_id = await session.scalar(
+                sa.text(
+                    "INSERT INTO sessions (name, user_id, assistant_id) "
+                    "VALUES ('benchmark', :user_id, :assistant_id) RETURNING id"
+                ),
+                dict(user_id=user_id, assistant_id=assistant_id),
+            )
+            await session.execute(
+                sa.text(
+                    "INSERT INTO questions (question, answer, num_tokens_question, "
+                    "num_tokens_answer, tenant_id, session_id, assistant_id, created_at) "
+                    "SELECT 'question ' || n, repeat('answer ', 100), 0, 0, "
+                    ":tenant_id, :session_id, :assistant_id, "
+                    "CAST(:start AS timestamptz) + n * make_interval(secs => :step) "
+                    "FROM generate_series(1, :num_questions) AS n"
+                ),
+                dict(
+                    tenant_id=tenant_id,
+                    session_id=session_id,
+                    assistant_id=assistant_id,
+                    start=start,
+                    step=SPREAD_DAYS * 24 * 3600 / num_questions,
+                    num_questions=num_questions,
+                ),
+            )
+            await session.execute(
+                sa.text(
+                    "INSERT INTO info_blobs (text, size, user_id, tenant_id, embedding_model_id) "
+                    "VALUES ('blob', 4, :id, :id, :id)"
+                ),
+                dict(id=tenant_id),
+            )
+            await session.execute(
+                sa.text(
+                    "INSERT INTO info_blob_references "
+                    '(question_id, info_blob_id, similarity_score, "order") '
+                    "SELECT q.id, (SELECT id FROM info_blobs LIMIT 1), 0.5, 0 FROM questions q"
+                )
+            )
+        await session.execute(sa.text("ANALYZE"))
+
+
+async def _unbounded(session: AsyncSession):
+    subquery = (
+        sa.select(Questions.id)
+        .join(Assistants, Questions.assistant_id == Assistants.id)
+        .where(
+            sa.and_(
+                Assistants.data_retention_days.isnot(None),
+                Questions.created_at
+                < sa.func.now() - Assistants.data_retention_days * text("INTERVAL '1 day'"),
+            )
+        )
+    )
+
+    async with session.begin():
+        result = await session.execute(sa.delete(Questions).where(Questions.id.in_(subquery)))
+
+    return result.rowcount
+
+
+async def _batched(session: AsyncSession, batch_size: int):
+    service = DataRetentionService(session, batch_size=batch_size, batch_pause=0)
+    report = await service.delete_old_questions()
+
+    return report.rows
+
+
+async def main(num_questions: int, batch_size: int):
+    rows = []
+    async with scratch_database() as engine:
+        for name, delete in [
+            ("unbounded", _unbounded),
+            (f"batches of {batch_size}", lambda session: _batched(session, batch_size)),
+        ]:
+            print(f"Seeding {num_questions} questions...")
+            await _seed(engine, num_questions)
+
+            transactions = []
+
+            def after_begin(session, transaction, connection):
+                transactions.append(time.perf_counter())
+
+            def after_commit(session):
+                transactions[-1] = time.perf_counter() - transactions[-1]
+
+            with StatementCounter().listen(engine) as counter:
+                async with AsyncSession(engine) as session:
+                    event.listen(session.sync_session, "after_begin", after_begin)
+                    event.listen(session.sync_session, "after_commit", after_commit)
+
+                    start = time.perf_counter()
+                    deleted = await delete(session)
+                    seconds = time.perf_counter() - start
+
+            rows.append(
+                [
+                    name,
+                    deleted,
+                    counter.statements,
+                    len(transactions),
+                    max(transactions) * 1000,
+                    seconds * 1000,
+                    deleted / seconds,
+                ]
+            )
+
+    print(f"{num_questions} questions, {RETENTION_DAYS} of {SPREAD_DAYS} days retained")
+    print_table(
+        [
+            "delete",
+            "rows",
+            "statements",
+            "transactions",
+            "longest transaction (ms)",
+            "total (ms)",
+            "rows/s",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.questions, args.batch_size))
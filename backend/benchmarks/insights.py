@@ -0,0 +1,165 @@
+"""Statements, rows and latency of the insights of an assistant with many questions.
+
+Seeds an assistant with N questions spread over sessions of a few questions
+each, where every question references an info blob and has logging details.
+Compares loading every session of the period with all of its relationships
+(as `get_conversation_stats` and `ask_question_on_questions` did before) with
+the aggregate count and the paged question texts of `AnalysisRepository`.
+
+    poetry run python -m benchmarks.insights --questions 100000
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import (
+    StatementCounter,
+    Timer,
+    print_table,
+    scratch_database,
+    without_foreign_keys,
+)
+import intric.assistants.api.assistant_models  # noqa, defines the models of a session
+from intric.analysis.analysis_repo import AnalysisRepository
+from intric.database.tables.assistant_table import Assistants
+
+QUESTIONS_PER_SESSION = 4
+BLOB_SIZE = 5_000  # Characters
+
+
+async def _seed(engine: AsyncEngine, num_questions: int):
+    assistant_id = user_id = tenant_id = uuid4()
+    start = datetime.now(timezone.utc) - timedelta(days=80)
+    num_sessions = num_questions // QUESTIONS_PER_SESSION
+    seconds_per_session = 80 * 24 * 3600 // num_sessions
+
+    async with AsyncSession(engine) as session, session.begin():
+        async with without_foreign_keys(session):
+            await session.execute(
+                sa.insert(Assistants),
+                [
+                    dict(
+                        id=assistant_id,
+                        name="benchmark",
+                        completion_model_kwargs={},
+                        logging_enabled=False,
+                        is_default=False,
+                        published=False,
+                        user_id=user_id,
+                    )
+                ],
+            )
+            await session.execute(
+                sa.text(
+                    "INSERT INTO sessions (name, user_id, assistant_id, created_at) "
+                    "SELECT 'session ' || n, :user_id, :assistant_id, "
+                    "CAST(:start AS timestamptz) + n * make_interval(secs => :step) "
+                    "FROM generate_series(1, :num_sessions) AS n"
+                ),
+                dict(
+                    user_id=user_id,
+                    assistant_id=assistant_id,
+                    start=start,
+                    step=seconds_per_session,
+                    num_sessions=num_sessions,
+                ),
+            )
+            logging_id = await session.scalar(
+                sa.text(
+                    "INSERT INTO logging (model_kwargs, json_body) "
+                    "VALUES ('{}', '\"{}\"') RETURNING id"
+                )
+            )
+            await session.execute(
+                sa.text(
+                    "INSERT INTO questions (question, answer, num_tokens_question, "
+                    "num_tokens_answer, tenant_id, session_id, assistant_id, "
+                    "logging_details_id, created_at) "
+                    "SELECT 'What about question ' || n || '?', repeat('answer ', 200), 0, 0, "
+                    ":tenant_id, s.id, :assistant_id, :logging_id, "
+                    "s.created_at + n * interval '1 second' "
+                    "FROM sessions s CROSS JOIN generate_series(1, :per_session) AS n"
+                ),
+                dict(
+                    tenant_id=tenant_id,
+                    assistant_id=assistant_id,
+                    logging_id=logging_id,
+                    per_session=QUESTIONS_PER_SESSION,
+                ),
+            )
+            await session.execute(
+                sa.text(
+                    "INSERT INTO info_blobs (text, size, user_id, tenant_id, embedding_model_id) "
+                    "VALUES (repeat('x', :size), :size, :id, :id, :id)"
+                ),
+                dict(size=BLOB_SIZE, id=tenant_id),
+            )
+            await session.execute(
+                sa.text(
+                    "INSERT INTO info_blob_references "
+                    '(question_id, info_blob_id, similarity_score, "order") '
+                    "SELECT q.id, (SELECT id FROM info_blobs LIMIT 1), 0.5, 0 FROM questions q"
+                )
+            )
+        await session.execute(sa.text("ANALYZE"))
+
+    return assistant_id
+
+
+async def main(num_questions: int, runs: int):
+    rows = []
+    async with scratch_database() as engine:
+        print(f"Seeding {num_questions} questions...")
+        assistant_id = await _seed(engine, num_questions)
+        period = dict(
+            from_date=datetime.now(timezone.utc) - timedelta(days=90),
+            to_date=datetime.now(timezone.utc),
+        )
+
+        async def full_sessions(repo: AnalysisRepository):
+            sessions = await repo.get_assistant_sessions_since(assistant_id, **period)
+            return [question.question for session in sessions for question in session.questions]
+
+        async def counts(repo: AnalysisRepository):
+            return await repo.get_conversation_counts(assistant_id=assistant_id, **period)
+
+        async def question_texts(repo: AnalysisRepository):
+            return [
+                question
+                async for question in repo.iterate_question_texts(
+                    assistant_id=assistant_id, include_followups=True, **period
+                )
+            ]
+
+        with StatementCounter().listen(engine) as counter:
+            for name, load in [
+                ("whole sessions", full_sessions),
+                ("aggregate counts", counts),
+                ("paged question texts", question_texts),
+            ]:
+                timer = Timer()
+                for _ in range(runs):
+                    async with AsyncSession(engine) as session, session.begin():
+                        counter.reset()
+                        with timer.time():
+                            result = await load(AnalysisRepository(session))
+
+                size = len(result) if isinstance(result, list) else result
+                rows.append([name, counter.statements, size, timer.p50, timer.p95])
+
+    print(f"{num_questions} questions, {runs} runs")
+    print_table(["load", "statements", "result", "p50 (ms)", "p95 (ms)"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.questions, args.runs))
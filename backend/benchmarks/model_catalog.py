@@ -0,0 +1,111 @@
+"""Statements and latency of loading the AI models of a tenant, as every space load does.
+
+Seeds the models of `ai_models.yml`, and loads all completion, embedding
+and transcription models of a tenant N times, the way
+`SpaceRepository._get_from_query` does on every space load, once from the
+database (as before the catalog was cached) and once through the
+process-wide `AIModelCatalog`. Then changes the settings of a model and
+checks that the next load sees the change.
+
+    poetry run python -m benchmarks.model_catalog --loads 200
+"""
+
+import argparse
+import asyncio
+from uuid import uuid4
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.common import StatementCounter, Timer, print_table, scratch_database
+from intric.ai_models.ai_model_catalog import AIModelCatalog
+from intric.ai_models.completion_models.completion_model import CompletionModelCreate
+from intric.ai_models.completion_models.completion_models_repo import CompletionModelsRepository
+from intric.ai_models.embedding_models.embedding_model import EmbeddingModelCreate
+from intric.ai_models.embedding_models.embedding_models_repo import AdminEmbeddingModelsService
+from intric.completion_models.domain import CompletionModelRepository
+from intric.database.tables.tenant_table import Tenants
+from intric.embedding_models.domain.embedding_model_repo import EmbeddingModelRepository
+from intric.server.dependencies.ai_models import load_models_from_config
+from intric.tenants.tenant import TenantInDB
+from intric.transcription_models.domain.transcription_model_repo import (
+    TranscriptionModelRepository,
+)
+from intric.users.user import UserInDB
+
+TENANT = TenantInDB(id=uuid4(), name="benchmark", quota_limit=0)
+USER = UserInDB(
+    id=uuid4(),
+    username="benchmark",
+    email="benchmark@example.com",
+    used_tokens=0,
+    tenant_id=TENANT.id,
+    tenant=TENANT,
+    state="active",
+)
+
+
+async def _seed(session: AsyncSession):
+    await session.execute(sa.insert(Tenants).values(id=TENANT.id, name=TENANT.name, quota_limit=0))
+
+    config = load_models_from_config()
+
+    completion_models = CompletionModelsRepository(session=session)
+    for model in config["completion_models"]:
+        await completion_models.create_model(CompletionModelCreate(**model))
+
+    embedding_models = AdminEmbeddingModelsService(session=session)
+    for model in config["embedding_models"]:
+        await embedding_models.create_model(EmbeddingModelCreate(**model))
+
+
+async def _load_models(session: AsyncSession, catalog: AIModelCatalog | None):
+    repos = [
+        CompletionModelRepository(session=session, user=USER, ai_model_catalog=catalog),
+        EmbeddingModelRepository(session=session, user=USER, ai_model_catalog=catalog),
+        TranscriptionModelRepository(session=session, user=USER, ai_model_catalog=catalog),
+    ]
+
+    return [await repo.all(with_deprecated=True) for repo in repos]
+
+
+async def main(loads: int):
+    rows = []
+    async with scratch_database() as engine:
+        async with AsyncSession(engine) as session, session.begin():
+            await _seed(session)
+
+        catalog = AIModelCatalog(redis=None)
+        with StatementCounter().listen(engine) as counter:
+            for name, cached in [("database", None), ("catalog", catalog)]:
+                counter.reset()
+                timer = Timer()
+                for _ in range(loads):
+                    async with AsyncSession(engine) as session, session.begin():
+                        with timer.time():
+                            models = await _load_models(session, cached)
+
+                num_models = sum(len(models_of_kind) for models_of_kind in models)
+                rows.append([name, num_models, counter.statements / loads, timer.p50, timer.p95])
+
+        async with AsyncSession(engine) as session, session.begin():
+            repo = CompletionModelRepository(session=session, user=USER, ai_model_catalog=catalog)
+            model = (await repo.all())[0]
+            model.is_org_enabled = not model.is_org_enabled
+            await repo.update(model)
+
+        async with AsyncSession(engine) as session, session.begin():
+            completion_models, _, _ = await _load_models(session, catalog)
+            changed = next(m for m in completion_models if m.id == model.id)
+            assert changed.is_org_enabled == model.is_org_enabled, "The catalog is stale"
+
+    print(f"{loads} loads of the models of a tenant")
+    print_table(["models from", "models", "statements/load", "p50 (ms)", "p95 (ms)"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loads", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.loads))
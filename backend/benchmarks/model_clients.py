@@ -0,0 +1,113 @@
+"""Time to first token of streamed completions, with a client per request or a shared one.
+
+Serves an OpenAI compatible streaming endpoint on localhost, the way a
+self-hosted vLLM does, and streams N completions from it, one after the
+other and then N at a time. Compares creating an `AsyncOpenAI` client for
+every request (as the adapters did before they borrowed clients from the
+`ModelClientRegistry`) with the shared client of the registry. Localhost
+has no network latency and no TLS, so the difference to a remote endpoint
+is larger than measured here.
+
+    poetry run python -m benchmarks.model_clients --requests 200 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from aiohttp import web
+from openai import AsyncOpenAI
+
+from benchmarks.common import Timer, print_table
+from intric.ai_models.model_clients import ModelClientRegistry
+
+CHUNKS = 20
+
+
+async def _completions(request: web.Request):
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+
+    for i in range(CHUNKS):
+        chunk = {
+            "id": "benchmark",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "benchmark",
+            "choices": [{"index": 0, "delta": {"content": f"token {i} "}, "finish_reason": None}],
+        }
+        await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+    await response.write(b"data: [DONE]\n\n")
+
+    return response
+
+
+async def _stream(client: AsyncOpenAI, first_token: Timer):
+    started = time.perf_counter()
+    stream = await client.chat.completions.create(
+        model="benchmark", messages=[{"role": "user", "content": "Hi"}], stream=True
+    )
+
+    first = True
+    async for _ in stream:
+        if first:
+            first_token.samples.append(time.perf_counter() - started)
+            first = False
+
+
+async def _measure(base_url: str, clients: str, requests: int, concurrency: int):
+    registry = ModelClientRegistry()
+    first_token = Timer()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request():
+        async with semaphore:
+            if clients == "per request":
+                async with AsyncOpenAI(api_key="EMPTY", base_url=base_url) as client:
+                    await _stream(client, first_token)
+            else:
+                await _stream(registry.openai(api_key="EMPTY", base_url=base_url), first_token)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    await registry.close()
+
+    return first_token, requests / elapsed
+
+
+async def main(requests: int, concurrency: int):
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", _completions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    base_url = f"http://{host}:{port}/v1"
+
+    rows = []
+    try:
+        for n in [1, concurrency]:
+            for clients in ["per request", "shared"]:
+                first_token, throughput = await _measure(base_url, clients, requests, n)
+                rows.append([n, clients, first_token.p50, first_token.p95, throughput])
+    finally:
+        await runner.cleanup()
+
+    print(f"{requests} streamed completions of {CHUNKS} chunks per row")
+    print_table(
+        ["concurrency", "clients", "first token p50 (ms)", "first token p95 (ms)", "requests/s"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency))
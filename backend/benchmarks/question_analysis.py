@@ -0,0 +1,116 @@
+"""Wall time, completions and prompt sizes of asking about a quarter of questions.
+
+Asks a question about N questions, the way `AnalysisService` does, with a
+stub completion model that takes a fixed time per completion plus a time per
+thousand prompt tokens. Compares the single completion over every question
+(as before, which no longer fits in the context of the model beyond a few
+thousand questions) with map-reduce, with one and several completions at a time.
+
+Needs the tiktoken encodings, which are downloaded on first use.
+
+    poetry run python -m benchmarks.question_analysis --questions 5000 50000 --token-limit 128000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from unittest.mock import MagicMock
+
+from benchmarks.common import print_table
+from intric.analysis import analysis_map_reduce
+from intric.analysis.analysis_service import AnalysisService
+from intric.completion_models.infrastructure.context_builder import count_tokens
+from tests.fixtures import TEST_MODEL_GPT4
+
+TOPICS = ["parking permits", "school placement", "building permits", "waste collection"]
+SECONDS_PER_COMPLETION = 1.0
+SECONDS_PER_1K_PROMPT_TOKENS = 0.02
+
+
+class _StubModel:
+    def __init__(self, token_limit: int):
+        self.completion_model = TEST_MODEL_GPT4.model_copy(update=dict(token_limit=token_limit))
+        self.completions = 0
+        self.max_prompt_tokens = 0
+
+    async def get_response(self, question, completion_service, prompt, stream):
+        num_tokens = count_tokens(prompt)
+        self.completions += 1
+        self.max_prompt_tokens = max(self.max_prompt_tokens, num_tokens)
+        await asyncio.sleep(
+            SECONDS_PER_COMPLETION + SECONDS_PER_1K_PROMPT_TOKENS * num_tokens / 1000
+        )
+
+        return MagicMock(completion=MagicMock(text="Most questions are about permits. " * 20))
+
+
+def _questions(num_questions: int) -> list[str]:
+    random.seed(0)
+    return [
+        f"How long does it take to get an answer about {random.choice(TOPICS)}, "
+        f"case {random.randrange(num_questions // 2)}?"
+        for _ in range(num_questions)
+    ]
+
+
+async def _measure(questions: list[str], token_limit: int, concurrency: int, map_reduce: bool):
+    service = AnalysisService(*[MagicMock()] * 9)
+    model = _StubModel(token_limit)
+    analysis_map_reduce.settings.analysis_max_concurrent_completions = concurrency
+    if not map_reduce:
+        # Every question in one completion, however large
+        model.completion_model = model.completion_model.model_copy(update=dict(token_limit=10**9))
+
+    start = time.perf_counter()
+    await service._ask_about_questions(
+        model,
+        question="What are the most common topics?",
+        questions=questions,
+        days=90,
+        stream=False,
+    )
+
+    return model.completions, model.max_prompt_tokens, time.perf_counter() - start
+
+
+async def main(num_questions: list[int], token_limit: int, concurrency: int):
+    rows = []
+    for n in num_questions:
+        questions = _questions(n)
+        for name, completions_at_a_time, map_reduce in [
+            ("one completion", 1, False),
+            ("map-reduce", 1, True),
+            ("map-reduce", concurrency, True),
+        ]:
+            completions, max_prompt_tokens, seconds = await _measure(
+                questions, token_limit, completions_at_a_time, map_reduce
+            )
+            fits = "yes" if max_prompt_tokens <= token_limit else "no"
+            rows.append(
+                [n, name, completions_at_a_time, completions, max_prompt_tokens, fits, seconds]
+            )
+
+    print(f"A token limit of {token_limit}")
+    print_table(
+        [
+            "questions",
+            "analysis",
+            "completions at a time",
+            "completions",
+            "max prompt tokens",
+            "fits",
+            "wall time (s)",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, nargs="+", default=[5000, 50000])
+    parser.add_argument("--token-limit", type=int, default=128_000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.questions, args.token_limit, args.concurrency))
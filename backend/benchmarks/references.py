@@ -0,0 +1,141 @@
+"""Statements, bytes fetched and latency of finding the references of a question.
+
+Seeds a collection of info blobs with long texts, and runs
+`ReferencesService.get_references` against it, the way every ask does. The
+chunks are found with `InfoBlobChunkRepo.semantic_search` and a random query
+embedding. Compares fetching the info blob of every chunk one at a time,
+with its text (as before), with fetching them in one query without the text.
+
+    poetry run python -m benchmarks.references --num-chunks 30 --blob-kb 200
+"""
+
+import argparse
+import asyncio
+import random
+from uuid import uuid4
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import (
+    StatementCounter,
+    Timer,
+    print_table,
+    scratch_database,
+    without_foreign_keys,
+)
+from intric.assistants.references import ReferencesService
+from intric.info_blobs.info_blob import InfoBlobInDBNoText, InfoBlobInDBNoTextWithScore
+from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo
+from intric.info_blobs.info_blob_repo import InfoBlobRepository
+
+DIMENSIONS = 64
+NUM_BLOBS = 100
+CHUNKS_PER_BLOB = 10
+
+
+class _Datastore:
+    def __init__(self, session: AsyncSession):
+        self.chunk_repo = InfoBlobChunkRepo(session)
+
+    async def semantic_search(self, search_string, embedding_model, collections, num_chunks, **_):
+        embedding = [random.random() - 0.5 for _ in range(DIMENSIONS)]
+        return await self.chunk_repo.semantic_search(
+            embedding, group_ids=[collection.id for collection in collections], limit=num_chunks
+        )
+
+
+class _OneQueryPerChunk(ReferencesService):
+    async def _get_info_blobs_from_chunks(self, info_blob_chunks):
+        info_blobs = []
+        for chunk in info_blob_chunks:
+            info_blob = await self.info_blobs_repo.get(chunk.info_blob_id)
+            info_blob = InfoBlobInDBNoTextWithScore(
+                **InfoBlobInDBNoText(**info_blob.model_dump()).model_dump(), score=chunk.score
+            )
+            info_blobs.append(info_blob)
+
+        return info_blobs
+
+
+async def _seed(engine: AsyncEngine, blob_kb: int):
+    collection_id = uuid4()
+    async with AsyncSession(engine) as session, session.begin():
+        await session.execute(
+            sa.text(
+                f"ALTER TABLE info_blob_chunks ALTER COLUMN embedding TYPE vector({DIMENSIONS})"
+            )
+        )
+        async with without_foreign_keys(session):
+            await session.execute(
+                sa.text(
+                    "INSERT INTO info_blobs "
+                    "(text, size, user_id, tenant_id, group_id, embedding_model_id) "
+                    "SELECT repeat('x', :size), :size, :id, :id, :group_id, :id "
+                    "FROM generate_series(1, :num_blobs)"
+                ),
+                dict(size=blob_kb * 1024, id=uuid4(), group_id=collection_id, num_blobs=NUM_BLOBS),
+            )
+            await session.execute(
+                sa.text(
+                    "INSERT INTO info_blob_chunks "
+                    "(text, chunk_no, size, embedding, info_blob_id, tenant_id, source_id) "
+                    "SELECT 'chunk ' || c.n, c.n, 0, "
+                    "(SELECT array_agg(random() - 0.5)::vector FROM generate_series(1, :dim) "
+                    " WHERE c.n > 0), "
+                    "b.id, b.tenant_id, b.group_id "
+                    "FROM info_blobs b CROSS JOIN generate_series(1, :per_blob) AS c(n)"
+                ),
+                dict(dim=DIMENSIONS, per_blob=CHUNKS_PER_BLOB),
+            )
+
+    collection = type("Collection", (), dict(id=collection_id, embedding_model=None))
+    return collection
+
+
+async def _measure(engine: AsyncEngine, service_class, collection, num_chunks: int, runs: int):
+    timer = Timer()
+    statements = 0
+    received = 0
+    with StatementCounter().listen(engine) as counter:
+        for _ in range(runs):
+            async with AsyncSession(engine) as session, session.begin():
+                service = service_class(InfoBlobRepository(session), _Datastore(session))
+                counter.reset()
+                with timer.time():
+                    result = await service.get_references(
+                        "question", collections=[collection], num_chunks=num_chunks, version=2
+                    )
+                statements += counter.statements
+
+            received += len(result.info_blobs)
+
+    return statements / runs, received / runs, timer
+
+
+async def main(num_chunks: int, blob_kb: int, runs: int):
+    rows = []
+    async with scratch_database() as engine:
+        collection = await _seed(engine, blob_kb)
+
+        for name, service_class in [
+            ("one query per chunk", _OneQueryPerChunk),
+            ("batched", ReferencesService),
+        ]:
+            statements, info_blobs, timer = await _measure(
+                engine, service_class, collection, num_chunks, runs
+            )
+            rows.append([name, statements, info_blobs, timer.p50, timer.p95])
+
+    print(f"{num_chunks} chunks, info blobs of {blob_kb} kB, {runs} runs")
+    print_table(["info blobs fetched", "statements", "info blobs", "p50 (ms)", "p95 (ms)"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-chunks", type=int, default=30)
+    parser.add_argument("--blob-kb", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.num_chunks, args.blob_kb, args.runs))
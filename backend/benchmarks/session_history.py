@@ -0,0 +1,187 @@
+"""Statements, questions loaded and latency of loading the history of a session to ask in it.
+
+Seeds sessions of N turns, where every question references a few large info
+blobs, and compares loading the whole session (`SessionService.get_session_by_uuid`)
+with loading the window of the history that fits in the context of the model
+(`SessionService.get_session_with_history_window`). Both are followed by
+`ContextBuilder._build_messages`, as when building the context of a completion.
+
+    poetry run python -m benchmarks.session_history --turns 10 100 1000 --requests 20
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import (
+    StatementCounter,
+    Timer,
+    print_table,
+    scratch_database,
+    without_foreign_keys,
+)
+from intric.completion_models.infrastructure.context_builder import ContextBuilder
+from intric.database.tables.info_blobs_table import InfoBlobs
+from intric.database.tables.questions_table import InfoBlobReferences, Questions
+from intric.database.tables.sessions_table import Sessions
+from intric.questions.questions_repo import QuestionRepository
+from intric.sessions.session_service import SessionService
+from intric.sessions.sessions_repo import SessionRepository
+from intric.tenants.tenant import TenantBase
+from intric.tenants.tenant_repo import TenantRepository
+from intric.users.user import UserAdd, UserInDB, UserState
+from intric.users.user_repo import UsersRepository
+
+TOKEN_LIMIT = 128_000
+REFERENCES_PER_QUESTION = 3
+BLOB_SIZE = 20_000  # Characters
+
+
+async def _seed_user(engine: AsyncEngine) -> UserInDB:
+    async with AsyncSession(engine) as session, session.begin():
+        tenant = await TenantRepository(session).add(TenantBase(name="benchmark"))
+        return await UsersRepository(session).add(
+            UserAdd(
+                email="benchmark@example.com",
+                username="benchmark",
+                tenant_id=tenant.id,
+                state=UserState.ACTIVE,
+            )
+        )
+
+
+async def _seed_session(engine: AsyncEngine, user: UserInDB, turns: int) -> UUID:
+    session_id = uuid4()
+    question_ids = [uuid4() for _ in range(turns)]
+    blob_ids = [uuid4() for _ in range(turns * REFERENCES_PER_QUESTION)]
+    start = datetime.now(timezone.utc) - timedelta(days=1)
+    # The embedding model does not need to exist
+    embedding_model_id = uuid4()
+
+    async with AsyncSession(engine) as session, session.begin():
+        async with without_foreign_keys(session):
+            await session.execute(
+                sa.insert(Sessions),
+                [dict(id=session_id, name=f"{turns} turns", user_id=user.id)],
+            )
+            await session.execute(
+                sa.insert(Questions),
+                [
+                    dict(
+                        id=question_id,
+                        created_at=start + timedelta(seconds=i),
+                        question=f"Question number {i} about the documents? " * 5,
+                        answer=f"Answer number {i}, based on the documents. " * 40,
+                        num_tokens_question=0,
+                        num_tokens_answer=0,
+                        tenant_id=user.tenant_id,
+                        session_id=session_id,
+                    )
+                    for i, question_id in enumerate(question_ids)
+                ],
+            )
+            await session.execute(
+                sa.insert(InfoBlobs),
+                [
+                    dict(
+                        id=blob_id,
+                        text="x" * BLOB_SIZE,
+                        size=BLOB_SIZE,
+                        embedding_model_id=embedding_model_id,
+                        user_id=user.id,
+                        tenant_id=user.tenant_id,
+                    )
+                    for blob_id in blob_ids
+                ],
+            )
+            await session.execute(
+                sa.insert(InfoBlobReferences),
+                [
+                    dict(
+                        question_id=question_ids[i // REFERENCES_PER_QUESTION],
+                        info_blob_id=blob_id,
+                        similarity_score=0.5,
+                        order=i % REFERENCES_PER_QUESTION,
+                    )
+                    for i, blob_id in enumerate(blob_ids)
+                ],
+            )
+
+    return session_id
+
+
+async def _measure(
+    engine: AsyncEngine,
+    counter: StatementCounter,
+    user: UserInDB,
+    session_id: UUID,
+    windowed: bool,
+    requests: int,
+):
+    max_tokens_messages = ContextBuilder.get_max_tokens_of_messages(TOKEN_LIMIT)
+    timer = Timer()
+    counter.reset()
+    for _ in range(requests):
+        async with AsyncSession(engine) as db_session, db_session.begin():
+            session_service = SessionService(
+                session_repo=SessionRepository(db_session),
+                question_repo=QuestionRepository(db_session),
+                user=user,
+            )
+
+            with timer.time():
+                if windowed:
+                    session = await session_service.get_session_with_history_window(
+                        session_id, max_tokens=TOKEN_LIMIT
+                    )
+                else:
+                    session = await session_service.get_session_by_uuid(session_id)
+
+                messages, _ = ContextBuilder()._build_messages(
+                    session, max_tokens=max_tokens_messages
+                )
+
+    return counter.statements / requests, len(session.questions), len(messages), timer
+
+
+async def main(turns: list[int], requests: int):
+    rows = []
+    async with scratch_database() as engine:
+        user = await _seed_user(engine)
+
+        with StatementCounter().listen(engine) as counter:
+            for num_turns in turns:
+                session_id = await _seed_session(engine, user, num_turns)
+
+                for name, windowed in [("whole session", False), ("history window", True)]:
+                    statements, loaded, used, timer = await _measure(
+                        engine, counter, user, session_id, windowed, requests
+                    )
+                    rows.append([num_turns, name, statements, loaded, used, timer.p50, timer.p95])
+
+    print(f"{requests} requests per row, a token limit of {TOKEN_LIMIT}")
+    print_table(
+        [
+            "turns",
+            "load",
+            "statements/request",
+            "questions loaded",
+            "questions in context",
+            "p50 (ms)",
+            "p95 (ms)",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.turns, args.requests))
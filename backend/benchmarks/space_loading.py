@@ -0,0 +1,189 @@
+"""Statements, rows and latency of loading the space of an assistant, as the space grows.
+
+Seeds a shared space with N assistants, collections, websites and members
+for each size, and loads it with `SpaceRepository.get_space_by_assistant`,
+both as the full aggregate and partially, as the read paths of assistants,
+apps, collections and websites do.
+
+    poetry run python -m benchmarks.space_loading --sizes 10 100 500 --requests 50
+"""
+
+import argparse
+import asyncio
+from uuid import UUID, uuid4
+
+import sqlalchemy as sa
+from dependency_injector import providers
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import (
+    StatementCounter,
+    Timer,
+    print_table,
+    scratch_database,
+    without_foreign_keys,
+)
+from intric.database.tables.assistant_table import Assistants
+from intric.database.tables.collections_table import CollectionsTable
+from intric.database.tables.spaces_table import Spaces, SpacesUsers
+from intric.database.tables.users_table import Users
+from intric.database.tables.websites_table import Websites
+from intric.main.container.container import Container
+from intric.main.container.container_overrides import override_user
+from intric.main.models import ModelId
+from intric.roles.role import RoleCreate
+from intric.roles.roles_repo import RolesRepository
+from intric.tenants.tenant import TenantBase
+from intric.tenants.tenant_repo import TenantRepository
+from intric.users.user import UserAdd, UserInDB, UserState
+from intric.users.user_repo import UsersRepository
+from intric.websites.domain.crawl_run import CrawlType
+from intric.websites.domain.website import UpdateInterval
+
+
+async def _seed_user(engine: AsyncEngine) -> UserInDB:
+    async with AsyncSession(engine) as session, session.begin():
+        tenant = await TenantRepository(session).add(TenantBase(name="benchmark"))
+        role = await RolesRepository(session).create_role(
+            RoleCreate(name="benchmark", permissions=[], tenant_id=tenant.id)
+        )
+        return await UsersRepository(session).add(
+            UserAdd(
+                email="benchmark@example.com",
+                username="benchmark",
+                tenant_id=tenant.id,
+                state=UserState.ACTIVE,
+                roles=[ModelId(id=role.id)],
+            )
+        )
+
+
+async def _seed_space(engine: AsyncEngine, user: UserInDB, size: int) -> UUID:
+    """Seed a shared space of `size` of each resource and return one of its assistants."""
+    space_id = uuid4()
+    member_ids = [uuid4() for _ in range(size - 1)]
+    # The embedding model does not need to exist, the space has none enabled
+    common = dict(tenant_id=user.tenant_id, user_id=user.id, embedding_model_id=uuid4())
+
+    async with AsyncSession(engine) as session, session.begin():
+        async with without_foreign_keys(session):
+            await session.execute(
+                sa.insert(Spaces),
+                [dict(id=space_id, name=f"space {size}", tenant_id=user.tenant_id)],
+            )
+            if member_ids:
+                await session.execute(
+                    sa.insert(Users),
+                    [
+                        dict(
+                            id=member_id,
+                            email=f"member-{size}-{i}@example.com",
+                            state=UserState.ACTIVE,
+                            tenant_id=user.tenant_id,
+                        )
+                        for i, member_id in enumerate(member_ids)
+                    ],
+                )
+            await session.execute(
+                sa.insert(SpacesUsers),
+                [
+                    dict(space_id=space_id, user_id=member_id, role="admin")
+                    for member_id in [user.id, *member_ids]
+                ],
+            )
+            await session.execute(
+                sa.insert(CollectionsTable),
+                [
+                    dict(name=f"collection {i}", size=0, space_id=space_id, **common)
+                    for i in range(size)
+                ],
+            )
+            await session.execute(
+                sa.insert(Websites),
+                [
+                    dict(
+                        name=f"website {i}",
+                        url=f"https://example.com/{i}",
+                        download_files=False,
+                        crawl_type=CrawlType.CRAWL,
+                        update_interval=UpdateInterval.NEVER,
+                        size=0,
+                        space_id=space_id,
+                        **common,
+                    )
+                    for i in range(size)
+                ],
+            )
+
+            assistant_ids = [uuid4() for _ in range(size)]
+            await session.execute(
+                sa.insert(Assistants),
+                [
+                    dict(
+                        id=assistant_id,
+                        name=f"assistant {i}",
+                        completion_model_kwargs={},
+                        logging_enabled=False,
+                        is_default=False,
+                        published=False,
+                        space_id=space_id,
+                        user_id=user.id,
+                    )
+                    for i, assistant_id in enumerate(assistant_ids)
+                ],
+            )
+
+    return assistant_ids[0]
+
+
+async def _measure(
+    engine: AsyncEngine,
+    counter: StatementCounter,
+    user: UserInDB,
+    assistant_id: UUID,
+    partial: bool,
+    requests: int,
+):
+    timer = Timer()
+    counter.reset()
+    for _ in range(requests):
+        async with AsyncSession(engine) as session, session.begin():
+            container = override_user(Container(session=providers.Object(session)), user)
+            space_repo = container.space_repo()
+
+            with timer.time():
+                space = await space_repo.get_space_by_assistant(assistant_id, partial=partial)
+
+    resources = len(space.assistants) + len(space.collections) + len(space.websites)
+    return counter.statements / requests, resources + len(space.members), timer
+
+
+async def main(sizes: list[int], requests: int):
+    rows = []
+    async with scratch_database() as engine:
+        user = await _seed_user(engine)
+
+        with StatementCounter().listen(engine) as counter:
+            for size in sizes:
+                assistant_id = await _seed_space(engine, user, size)
+
+                for name, partial in [("full", False), ("partial", True)]:
+                    statements, loaded, timer = await _measure(
+                        engine, counter, user, assistant_id, partial, requests
+                    )
+                    rows.append([size, name, statements, loaded, timer.p50, timer.p95])
+
+    print(f"{requests} requests per row")
+    print_table(
+        ["size", "load", "statements/request", "entities loaded", "p50 (ms)", "p95 (ms)"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.sizes, args.requests))
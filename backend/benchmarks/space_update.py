@@ -0,0 +1,115 @@
+"""Statements and latency of saving a space after publishing one of its assistants.
+
+Seeds a shared space with N assistants, collections, websites and members
+for each size (see `benchmarks.space_loading`), publishes or unpublishes one
+assistant, the way `AssistantService.publish_assistant` does, and saves the
+space with `SpaceRepository.update`. Compares rewriting and reloading the
+whole space (as before spaces tracked their changes) with writing only what
+changed, with and without loading the space again.
+
+    poetry run python -m benchmarks.space_update --sizes 10 100 500 --requests 20
+"""
+
+import argparse
+import asyncio
+from uuid import UUID
+
+import sqlalchemy as sa
+from dependency_injector import providers
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import StatementCounter, Timer, print_table, scratch_database
+from benchmarks.space_loading import _seed_space, _seed_user
+from intric.ai_models.completion_models.completion_model import CompletionModelCreate
+from intric.ai_models.completion_models.completion_models_repo import CompletionModelsRepository
+from intric.ai_models.embedding_models.embedding_model import EmbeddingModelCreate
+from intric.ai_models.embedding_models.embedding_models_repo import AdminEmbeddingModelsService
+from intric.database.tables.assistant_table import Assistants
+from intric.database.tables.collections_table import CollectionsTable
+from intric.database.tables.websites_table import Websites
+from intric.main.container.container import Container
+from intric.main.container.container_overrides import override_user
+from intric.server.dependencies.ai_models import load_models_from_config
+from intric.users.user import UserInDB
+
+
+async def _seed_models(engine: AsyncEngine) -> tuple[UUID, UUID]:
+    config = load_models_from_config()
+
+    async with AsyncSession(engine) as session, session.begin():
+        completion_model = await CompletionModelsRepository(session=session).create_model(
+            CompletionModelCreate(**config["completion_models"][0])
+        )
+        embedding_model = await AdminEmbeddingModelsService(session=session).create_model(
+            EmbeddingModelCreate(**config["embedding_models"][0])
+        )
+
+    return completion_model.id, embedding_model.id
+
+
+async def _set_models(engine: AsyncEngine, completion_model_id: UUID, embedding_model_id: UUID):
+    """Give the resources of the spaces the models that they are saved with."""
+    async with AsyncSession(engine) as session, session.begin():
+        await session.execute(sa.update(Assistants).values(completion_model_id=completion_model_id))
+        for table in (CollectionsTable, Websites):
+            await session.execute(sa.update(table).values(embedding_model_id=embedding_model_id))
+
+
+async def _measure(
+    engine: AsyncEngine,
+    counter: StatementCounter,
+    user: UserInDB,
+    assistant_id: UUID,
+    save: str,
+    requests: int,
+):
+    timer = Timer()
+    statements = 0
+    for i in range(requests):
+        async with AsyncSession(engine) as session, session.begin():
+            container = override_user(Container(session=providers.Object(session)), user)
+            space_repo = container.space_repo()
+
+            space = await space_repo.get_space_by_assistant(assistant_id)
+            space.get_assistant(assistant_id).update(published=i % 2 == 0)
+
+            if save == "whole space":
+                # Forget the state it was loaded in, so that everything is written
+                space._persisted_state = None
+
+            counter.reset()
+            with timer.time():
+                await space_repo.update(space, reload=save != "changes, no reload")
+            statements += counter.statements
+
+    return statements / requests, timer
+
+
+async def main(sizes: list[int], requests: int):
+    rows = []
+    async with scratch_database() as engine:
+        user = await _seed_user(engine)
+        models = await _seed_models(engine)
+
+        with StatementCounter().listen(engine) as counter:
+            for size in sizes:
+                assistant_id = await _seed_space(engine, user, size)
+                await _set_models(engine, *models)
+
+                for save in ["whole space", "changes", "changes, no reload"]:
+                    statements, timer = await _measure(
+                        engine, counter, user, assistant_id, save, requests
+                    )
+                    rows.append([size, save, statements, timer.p50, timer.p95])
+
+    print(f"{requests} requests per row")
+    print_table(["size", "saved", "statements/request", "p50 (ms)", "p95 (ms)"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.sizes, args.requests))
@@ -0,0 +1,88 @@
+"""Time spent finding the references of a streamed answer.
+
+Streams an answer of N sentences, in chunks of a few characters, that references the info blobs of the
+datastore result, and finds the references after every chunk: once by
+searching the whole answer so far (as before), and once with
+`ReferenceTracker`, which only scans the new text of every chunk.
+
+    poetry run python -m benchmarks.streaming_references --sentences 500 2000 --blobs 30
+"""
+
+import argparse
+import random
+import re
+from uuid import uuid4
+
+from benchmarks.common import Timer, print_table
+from intric.assistants.assistant_service import REFERENCE_PATTERN, ReferenceTracker
+
+
+class _Blob:
+    def __init__(self):
+        self.id = uuid4()
+
+
+def _chunks(blobs: list[_Blob], num_sentences: int) -> list[str]:
+    random.seed(0)
+    text = "".join(
+        (
+            f'A sentence of the answer. <inref id="{str(random.choice(blobs).id)[:8]}"/> '
+            if i % 10 == 0
+            else "A sentence of the answer. "
+        )
+        for i in range(num_sentences)
+    )
+    # Chunks of a few tokens, as streamed by the model
+    return [text[i : i + 8] for i in range(0, len(text), 8)]
+
+
+def _search_whole_answer(chunks: list[str], blobs: list[_Blob]):
+    response_string = ""
+    for chunk in chunks:
+        response_string = f"{response_string}{chunk}"
+        ids = list(dict.fromkeys(re.findall(REFERENCE_PATTERN, response_string)))
+        references = [
+            next((blob for blob in blobs if str(blob.id)[:8] == blob_id), None) for blob_id in ids
+        ]
+
+    return [blob for blob in references if blob is not None]
+
+
+def _track(chunks: list[str], blobs: list[_Blob]):
+    tracker = ReferenceTracker(blobs)
+    for chunk in chunks:
+        tracker.feed(chunk)
+
+    return tracker.references
+
+
+def main(num_sentences: list[int], num_blobs: int):
+    blobs = [_Blob() for _ in range(num_blobs)]
+    rows = []
+    for n in num_sentences:
+        chunks = _chunks(blobs, n)
+        results = []
+        for name, find_references in [
+            ("whole answer", _search_whole_answer),
+            ("tracker", _track),
+        ]:
+            timer = Timer()
+            for _ in range(5):
+                with timer.time():
+                    result = find_references(chunks, blobs)
+            results.append(result)
+            rows.append([len(chunks), name, len(result), timer.p50])
+
+        assert results[0] == results[1]
+
+    print(f"{num_blobs} info blobs")
+    print_table(["chunks", "references found in", "references", "p50 (ms)"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--blobs", type=int, default=30)
+    args = parser.parse_args()
+
+    main(args.sentences, args.blobs)
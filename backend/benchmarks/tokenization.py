@@ -0,0 +1,96 @@
+"""Time spent counting tokens when building the context of every turn of a conversation.
+
+Builds the context of every turn of a conversation of N turns, with a
+prompt file attached to the assistant, the way `CompletionService` does,
+once with counts that are never reused (as before the tokenizer service
+cached them), and once with the counts cached across turns. The attached
+file and the history are then only tokenized once, instead of on every turn.
+
+Needs the tiktoken encodings, which are downloaded on first use.
+
+    poetry run python -m benchmarks.tokenization --turns 50 --attachment-kb 500
+"""
+
+import argparse
+from uuid import uuid4
+
+import intric.assistants.api.assistant_models  # noqa, defines the models of a session
+from benchmarks.common import Timer, print_table
+from intric.completion_models.infrastructure import context_builder as context_builder_module
+from intric.completion_models.infrastructure.context_builder import ContextBuilder
+from intric.completion_models.infrastructure.tokenizer import TokenizerService
+from intric.files.file_models import File, FileType
+from intric.questions.question import Question
+from intric.sessions.session import SessionInDB
+
+TOKEN_LIMIT = 128_000
+
+
+def _conversation(turns: int) -> list[Question]:
+    return [
+        Question(
+            id=uuid4(),
+            question=f"Question number {i} about the attached document? " * 10,
+            answer=f"Answer number {i}, based on the attached document. " * 80,
+            num_tokens_question=0,
+            num_tokens_answer=0,
+            tenant_id=uuid4(),
+            session_id=uuid4(),
+        )
+        for i in range(turns)
+    ]
+
+
+def _measure(tokenizer_service: TokenizerService, turns: int, attachment_kb: int) -> Timer:
+    context_builder_module.tokenizer_service = tokenizer_service
+
+    questions = _conversation(turns)
+    prompt_file = File(
+        id=uuid4(),
+        name="handbook.txt",
+        checksum="benchmark",
+        text="Section of the handbook, with rules and examples. " * (attachment_kb * 20),
+        file_type=FileType.TEXT,
+        mimetype="text/plain",
+        size=attachment_kb * 1024,
+        user_id=uuid4(),
+        tenant_id=uuid4(),
+    )
+
+    timer = Timer()
+    for turn in range(turns):
+        session = SessionInDB(id=uuid4(), name="benchmark", user_id=uuid4())
+        session.questions = questions[:turn]
+
+        with timer.time():
+            ContextBuilder().build_context(
+                input_str=questions[turn].question,
+                max_tokens=TOKEN_LIMIT,
+                prompt="You are a helpful assistant.",
+                prompt_files=[prompt_file],
+                session=session,
+            )
+
+    return timer
+
+
+def main(turns: int, attachment_kb: int):
+    rows = []
+    for name, tokenizer_service in [
+        ("not reused", TokenizerService(cache_size=0)),
+        ("cached", TokenizerService()),
+    ]:
+        timer = _measure(tokenizer_service, turns, attachment_kb)
+        rows.append([name, timer.p50, timer.p95, sum(timer.samples) * 1000])
+
+    print(f"{turns} turns, a {attachment_kb} kB prompt file")
+    print_table(["token counts", "p50 (ms)", "p95 (ms)", "total (ms)"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--attachment-kb", type=int, default=500)
+    args = parser.parse_args()
+
+    main(args.turns, args.attachment_kb)
@@ -0,0 +1,85 @@
+"""Wall time of transcribing a long recording, segment by segment.
+
+Writes a WAV recording of N minutes with pauses, and transcribes it with
+`OpenAISTTModelAdapter`, where the transcription of every segment is
+simulated with a fixed latency. Compares transcribing one segment at a time
+(as before) with transcribing several segments concurrently.
+
+    poetry run python -m benchmarks.transcription --minutes 180 --latency 2 --concurrency 1 4 8
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import wave
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from benchmarks.common import print_table
+from intric.transcription_models.infrastructure.adapters.whisper import (
+    SEGMENT_SECONDS,
+    OpenAISTTModelAdapter,
+)
+
+SAMPLERATE = 16_000
+
+
+def _write_recording(path: Path, minutes: int):
+    # A second of speech, then half a second of pause, written a minute at a time
+    t = np.arange(SAMPLERATE) / SAMPLERATE
+    speech = 0.3 * np.sin(2 * np.pi * 220 * t)
+    pause = np.zeros(SAMPLERATE // 2)
+    minute = np.tile(np.concatenate([speech, pause]), 40)
+    frames = (minute * 32767).astype("<i2").tobytes()
+
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLERATE)
+        for _ in range(minutes):
+            f.writeframes(frames)
+
+
+async def _measure(path: Path, latency: float, concurrency: int):
+    adapter = OpenAISTTModelAdapter(MagicMock(base_url=None), max_concurrent_segments=concurrency)
+
+    async def get_text_from_file(file: Path):
+        await asyncio.sleep(latency)
+        return "text"
+
+    adapter._get_text_from_file = get_text_from_file
+
+    start = time.perf_counter()
+    text = await adapter.get_text_from_file(path)
+
+    return text.count("###"), time.perf_counter() - start
+
+
+async def main(minutes: int, latency: float, concurrency: list[int]):
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "recording.wav"
+        _write_recording(path, minutes)
+
+        for max_concurrent_segments in concurrency:
+            segments, seconds = await _measure(path, latency, max_concurrent_segments)
+            rows.append([max_concurrent_segments, segments, seconds])
+
+    print(
+        f"A {minutes} minute recording, segments of {SEGMENT_SECONDS} s, "
+        f"{latency} s to transcribe a segment"
+    )
+    print_table(["concurrent segments", "segments", "wall time (s)"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, default=180)
+    parser.add_argument("--latency", type=float, default=2)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    asyncio.run(main(args.minutes, args.latency, args.concurrency))
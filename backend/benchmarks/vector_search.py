@@ -0,0 +1,148 @@
+"""p50/p95 latency of `InfoBlobChunkRepo.semantic_search` as the chunk table grows.
+
+Seeds a number of small sources and one large source with random embeddings,
+builds an hnsw index and compares the planner-aware search strategies with
+the previous query (join on `info_blobs` under `SET LOCAL enable_seqscan = off`).
+
+    poetry run python -m benchmarks.vector_search --sizes 10000 1000000 10000000
+"""
+
+import argparse
+import asyncio
+import random
+from uuid import UUID, uuid4
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from benchmarks.common import Timer, print_table, scratch_database, without_foreign_keys
+from intric.database.tables.info_blob_chunk_table import InfoBlobChunks
+from intric.database.tables.info_blobs_table import InfoBlobs
+from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo
+
+CHUNKS_PER_BLOB = 20
+NUM_SMALL_SOURCES = 10
+SMALL_SOURCE_SIZE = 200
+
+
+async def _seed_source(session: AsyncSession, source_id: UUID, num_chunks: int, dimensions: int):
+    tenant_id = user_id = uuid4()
+    num_blobs = max(num_chunks // CHUNKS_PER_BLOB, 1)
+
+    async with without_foreign_keys(session):
+        await session.execute(
+            sa.text(
+                "INSERT INTO info_blobs (text, size, user_id, tenant_id, group_id) "
+                "SELECT 'blob', 0, :user_id, :tenant_id, :source_id "
+                "FROM generate_series(1, :num_blobs)"
+            ),
+            dict(user_id=user_id, tenant_id=tenant_id, source_id=source_id, num_blobs=num_blobs),
+        )
+        await session.execute(
+            sa.text(
+                "INSERT INTO info_blob_chunks "
+                "(text, chunk_no, size, embedding, info_blob_id, tenant_id, source_id) "
+                "SELECT 'chunk ' || c.n, c.n, 0, "
+                "(SELECT array_agg(random() - 0.5)::vector FROM generate_series(1, :dim) "
+                " WHERE c.n > 0), "
+                "b.id, b.tenant_id, b.group_id "
+                "FROM info_blobs b CROSS JOIN generate_series(1, :per_blob) AS c(n) "
+                "WHERE b.group_id = :source_id "
+                "AND NOT EXISTS (SELECT 1 FROM info_blob_chunks WHERE info_blob_id = b.id)"
+            ),
+            dict(source_id=source_id, dim=dimensions, per_blob=CHUNKS_PER_BLOB),
+        )
+
+
+async def _legacy_semantic_search(
+    session: AsyncSession, embedding: list[float], group_ids: list[UUID], limit: int
+):
+    await session.execute(sa.text("SET LOCAL enable_seqscan = off;"))
+    stmt = (
+        sa.select(InfoBlobChunks.id, InfoBlobChunks.embedding.cosine_distance(embedding))
+        .join(InfoBlobs)
+        .where(InfoBlobs.group_id.in_(group_ids))
+        .order_by(InfoBlobChunks.embedding.cosine_distance(embedding))
+        .limit(limit)
+    )
+    return (await session.execute(stmt)).all()
+
+
+async def _measure(engine: AsyncEngine, search, source_ids: list[UUID], dimensions, runs):
+    timer = Timer()
+    for _ in range(runs):
+        embedding = [random.random() - 0.5 for _ in range(dimensions)]
+        async with AsyncSession(engine) as session, session.begin():
+            with timer.time():
+                await search(session, embedding, source_ids)
+
+    return timer
+
+
+async def main(sizes: list[int], dimensions: int, limit: int, runs: int):
+    async def new_search(session, embedding, source_ids):
+        return await InfoBlobChunkRepo(session).semantic_search(
+            embedding, group_ids=source_ids, limit=limit
+        )
+
+    async def legacy_search(session, embedding, source_ids):
+        return await _legacy_semantic_search(session, embedding, source_ids, limit)
+
+    rows = []
+    async with scratch_database() as engine:
+        small_sources = [uuid4() for _ in range(NUM_SMALL_SOURCES)]
+        large_source = uuid4()
+
+        async with AsyncSession(engine) as session, session.begin():
+            await session.execute(
+                sa.text(
+                    f"ALTER TABLE info_blob_chunks ALTER COLUMN embedding TYPE vector({dimensions})"
+                )
+            )
+            for source_id in small_sources:
+                await _seed_source(session, source_id, SMALL_SOURCE_SIZE, dimensions)
+
+        for size in sorted(sizes):
+            large_size = max(size - NUM_SMALL_SOURCES * SMALL_SOURCE_SIZE, CHUNKS_PER_BLOB)
+            print(f"Seeding {size} chunks...")
+
+            async with AsyncSession(engine) as session, session.begin():
+                await session.execute(sa.text("DROP INDEX IF EXISTS ix_bench_embedding_hnsw"))
+                num_blobs = await session.scalar(
+                    sa.select(sa.func.count()).where(InfoBlobs.group_id == large_source)
+                )
+                missing = large_size - num_blobs * CHUNKS_PER_BLOB
+                if missing > 0:
+                    await _seed_source(session, large_source, missing, dimensions)
+
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(
+                    sa.text(
+                        "CREATE INDEX ix_bench_embedding_hnsw ON info_blob_chunks "
+                        "USING hnsw (embedding vector_cosine_ops)"
+                    )
+                )
+                await conn.execute(sa.text("ANALYZE"))
+
+            for label, source_ids in [
+                ("small source", small_sources[:1]),
+                ("large source", [large_source]),
+                ("all sources", [large_source, *small_sources]),
+            ]:
+                for name, search in [("legacy", legacy_search), ("strategy", new_search)]:
+                    timer = await _measure(engine, search, source_ids, dimensions, runs)
+                    rows.append([size, label, name, timer.p50, timer.p95])
+
+    print_table(["chunks", "filter", "query", "p50 (ms)", "p95 (ms)"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--limit", type=int, default=30)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.sizes, args.dimensions, args.limit, args.runs))
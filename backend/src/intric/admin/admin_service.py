@@ -1,4 +1,7 @@
+from typing import Optional
+
 from intric.admin.admin_models import PrivacyPolicy
+from intric.authentication.principal_cache import PrincipalCache
 from intric.main.exceptions import BadRequestException, NotFoundException
 from intric.roles.permissions import Permission, validate_permissions
 from intric.tenants.tenant_repo import TenantRepository
@@ -19,11 +22,13 @@ class AdminService:
         user_repo: UsersRepository,
         tenant_repo: TenantRepository,
         user_service: UserService,
+        principal_cache: Optional[PrincipalCache] = None,
     ):
         self.user = user
         self.user_repo = user_repo
         self.tenant_repo = tenant_repo
         self.user_service = user_service
+        self.principal_cache = principal_cache
 
     @validate_permissions(Permission.ADMIN)
     async def get_tenant_users(self):
@@ -60,6 +65,13 @@ class AdminService:
 
     @validate_permissions(Permission.ADMIN)
     async def update_privacy_policy(self, privacy_policy: PrivacyPolicy):
-        return await self.tenant_repo.set_privacy_policy(
+        tenant = await self.tenant_repo.set_privacy_policy(
             privacy_policy.url, tenant_id=self.user.tenant_id
         )
+
+        if self.principal_cache is not None:
+            await self.principal_cache.invalidate_tenant(
+                self.user.tenant_id, session=self.tenant_repo.session
+            )
+
+        return tenant
@@ -0,0 +1,203 @@
+import asyncio
+import copy
+import time
+import weakref
+from dataclasses import dataclass
+from itertools import chain
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional, TypeVar
+from uuid import UUID
+
+import redis.asyncio as aioredis
+from pydantic_settings import BaseSettings
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from intric.main.logging import get_logger
+from intric.worker.redis import r
+
+if TYPE_CHECKING:
+    from intric.ai_models.ai_model import AIModel
+    from intric.database.database import AsyncSession
+    from intric.users.user import UserInDB
+
+logger = get_logger(__name__)
+
+
+class AIModelCatalogSettings(BaseSettings):
+    ai_model_catalog_enabled: bool = True
+    # Changes that are not made through the ORM are only picked up after this long
+    ai_model_catalog_ttl: int = 300  # Seconds
+    # Changes made by other processes are picked up after at most this long
+    ai_model_catalog_version_check_interval: float = 1.0  # Seconds
+
+
+settings = AIModelCatalogSettings()
+
+VERSION_KEY = "ai_model_catalog:version"
+CHANGED = "ai_model_catalog_changed"
+
+# The tables that the models of a tenant are read from
+CATALOG_TABLES = {
+    "completion_models",
+    "completion_model_settings",
+    "embedding_models",
+    "embedding_model_settings",
+    "transcription_models",
+    "transcription_model_settings",
+    "security_classifications",
+    "tenants",
+}
+
+T = TypeVar("T", bound="AIModel")
+
+# Every catalog of the process, to clear when a session that changed the catalog commits
+_catalogs: "weakref.WeakSet[AIModelCatalog]" = weakref.WeakSet()
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    models: list["AIModel"]
+
+
+class AIModelCatalog:
+    """Process-wide cache of the AI models of every tenant, by kind of model.
+
+    The catalog rarely changes, but is read several times per request. Every
+    commit that writes to one of the `CATALOG_TABLES` through the ORM clears
+    the catalog of the process that made it, and bumps a version counter in
+    Redis, which the other processes compare with theirs at most every
+    `version_check_interval` seconds. A session that has written to the
+    catalog reads it from the database until it commits.
+
+    Models are mutable, so every caller gets copies, bound to its user.
+    """
+
+    def __init__(
+        self,
+        redis: Optional[aioredis.Redis],
+        ttl: int = settings.ai_model_catalog_ttl,
+        version_check_interval: float = settings.ai_model_catalog_version_check_interval,
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+
+        self._entries: dict[tuple[str, UUID], _Entry] = {}
+        # Bumped on every invalidation, so that loads that were running are not cached
+        self._generation = 0
+        self._version: Optional[bytes] = None
+        self._version_checked_at = float("-inf")
+        self._tasks: set[asyncio.Task] = set()
+
+        _catalogs.add(self)
+
+    async def _check_version(self):
+        now = time.monotonic()
+        if self.redis is None or now - self._version_checked_at < self.version_check_interval:
+            return
+
+        self._version_checked_at = now
+        try:
+            version = await self.redis.get(VERSION_KEY)
+        except RedisError:
+            logger.warning("Could not read the AI model catalog version from redis", exc_info=True)
+            return
+
+        if version != self._version:
+            self._version = version
+            self.clear()
+
+    @staticmethod
+    def _bind(model: T, user: "UserInDB") -> T:
+        model = copy.copy(model)
+        model.user = user
+        model.security_classification = copy.copy(model.security_classification)
+
+        return model
+
+    async def get_models(
+        self,
+        session: "AsyncSession",
+        kind: str,
+        user: "UserInDB",
+        load: Callable[[], Awaitable[list[T]]],
+    ) -> list[T]:
+        """All models of `kind` of the tenant of `user`, loaded with `load` if not cached."""
+        if session.info.get(CHANGED):
+            return await load()
+
+        await self._check_version()
+
+        key = (kind, user.tenant_id)
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at < time.monotonic():
+            generation = self._generation
+            entry = _Entry(expires_at=time.monotonic() + self.ttl, models=await load())
+
+            if generation == self._generation:
+                self._entries[key] = entry
+
+        return [self._bind(model, user) for model in entry.models]
+
+    def clear(self):
+        self._entries.clear()
+        self._generation += 1
+
+    async def _bump_version(self):
+        try:
+            await self.redis.incr(VERSION_KEY)
+        except RedisError:
+            logger.warning("Could not bump the AI model catalog version in redis", exc_info=True)
+
+    def invalidate(self):
+        """Clear the catalog, in this process and then in every other."""
+        self.clear()
+
+        if self.redis is None:
+            return
+
+        try:
+            task = asyncio.get_running_loop().create_task(self._bump_version())
+        except RuntimeError:
+            return
+
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+ai_model_catalog = AIModelCatalog(redis=r) if settings.ai_model_catalog_enabled else None
+
+
+def _is_catalog_table(table) -> bool:
+    return getattr(table, "name", None) in CATALOG_TABLES
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement(orm_execute_state: ORMExecuteState):
+    if orm_execute_state.is_select:
+        return
+
+    if _is_catalog_table(getattr(orm_execute_state.statement, "table", None)):
+        orm_execute_state.session.info[CHANGED] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session: Session, flush_context):
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if _is_catalog_table(getattr(instance, "__table__", None)):
+            session.info[CHANGED] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session):
+    if session.info.pop(CHANGED, False):
+        for catalog in list(_catalogs):
+            catalog.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session: Session):
+    session.info.pop(CHANGED, None)
@@ -0,0 +1,218 @@
+import asyncio
+import importlib.util
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+
+import httpx
+from openai import AsyncAzureOpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ModelClientSettings(BaseSettings):
+    model_config = SettingsConfigDict(protected_namespaces=("settings_",))
+
+    # Per model endpoint
+    model_client_max_connections: int = 100
+    model_client_max_keepalive_connections: int = 20
+    # Idle connections are kept open this long, for the next request to reuse
+    model_client_keepalive_expiry: float = 120.0  # Seconds
+    # Needs the `h2` package
+    model_client_http2: bool = False
+
+
+settings = ModelClientSettings()
+
+T = TypeVar("T")
+
+
+@dataclass
+class PoolStats:
+    provider: str
+    base_url: Optional[str]
+    requests: int
+    in_flight: int
+    peak_in_flight: int
+    connections: int
+    idle_connections: int
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._release()
+
+
+class _PoolTransport(httpx.AsyncHTTPTransport):
+    """Counts the requests that use the connection pool, until their responses are closed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _release(self):
+        self.in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+
+        response.stream = _ReleasingStream(response.stream, self._release)
+        return response
+
+    @property
+    def connections(self) -> list:
+        return self._pool.connections
+
+
+@dataclass
+class _Entry:
+    provider: str
+    base_url: Optional[str]
+    client: AsyncOpenAI
+    transport: _PoolTransport
+    loop: Optional[asyncio.AbstractEventLoop]
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class ModelClientRegistry:
+    """Long-lived clients of the model endpoints, shared by every request of the process.
+
+    A client per request means a new connection pool, and a TCP and TLS
+    handshake before the first token of every request. Clients are kept by
+    provider, endpoint and credentials, and by event loop, as connections
+    can not move between loops.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = settings.model_client_max_connections,
+        max_keepalive_connections: int = settings.model_client_max_keepalive_connections,
+        keepalive_expiry: float = settings.model_client_keepalive_expiry,
+        http2: bool = settings.model_client_http2,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 to the model endpoints needs the h2 package, using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+
+        self._entries: dict[tuple, _Entry] = {}
+
+    def _get(
+        self,
+        provider: str,
+        base_url: Optional[str],
+        credentials: tuple,
+        create: Callable[[httpx.AsyncClient], T],
+    ) -> T:
+        key = (provider, base_url, *credentials)
+        loop = _running_loop()
+
+        entry = self._entries.get(key)
+        if entry is None or entry.loop is not loop:
+            transport = _PoolTransport(limits=self.limits, http2=self.http2)
+            entry = _Entry(
+                provider=provider,
+                base_url=base_url,
+                client=create(DefaultAsyncHttpxClient(transport=transport)),
+                transport=transport,
+                loop=loop,
+            )
+            self._entries[key] = entry
+
+        return entry.client
+
+    def openai(self, api_key: Optional[str], base_url: Optional[str] = None) -> AsyncOpenAI:
+        """A client of the OpenAI API, or of an OpenAI compatible one at `base_url`."""
+        return self._get(
+            "openai",
+            base_url,
+            (api_key,),
+            lambda http_client: AsyncOpenAI(
+                api_key=api_key, base_url=base_url, http_client=http_client
+            ),
+        )
+
+    def azure_openai(
+        self, api_key: Optional[str], azure_endpoint: Optional[str], api_version: Optional[str]
+    ) -> AsyncAzureOpenAI:
+        return self._get(
+            "azure",
+            azure_endpoint,
+            (api_key, api_version),
+            lambda http_client: AsyncAzureOpenAI(
+                api_key=api_key,
+                azure_endpoint=azure_endpoint,
+                api_version=api_version,
+                http_client=http_client,
+            ),
+        )
+
+    def stats(self) -> list[PoolStats]:
+        return [
+            PoolStats(
+                provider=entry.provider,
+                base_url=entry.base_url,
+                requests=entry.transport.requests,
+                in_flight=entry.transport.in_flight,
+                peak_in_flight=entry.transport.peak_in_flight,
+                connections=len(entry.transport.connections),
+                idle_connections=sum(
+                    connection.is_idle() for connection in entry.transport.connections
+                ),
+            )
+            for entry in self._entries.values()
+        ]
+
+    async def close(self):
+        for stats in self.stats():
+            logger.info(f"Model client pool: {stats}")
+
+        entries = list(self._entries.values())
+        self._entries.clear()
+
+        loop = _running_loop()
+        for entry in entries:
+            # Connections of other loops can not be closed from this one
+            if entry.loop is loop:
+                await entry.client.close()
+
+
+model_clients = ModelClientRegistry()
@@ -0,0 +1,72 @@
+# MIT License
+
+from collections import Counter
+
+from pydantic_settings import BaseSettings
+
+from intric.completion_models.infrastructure.context_builder import (
+    CONTEXT_SIZE_BUFFER,
+    count_tokens,
+)
+
+
+class AnalysisSettings(BaseSettings):
+    # Share of the context of the model that the questions of one completion may take up
+    analysis_context_share: float = 0.75
+    analysis_max_concurrent_completions: int = 4
+
+
+settings = AnalysisSettings()
+
+
+def get_max_tokens_of_questions(
+    token_limit: int, context_share: float = settings.analysis_context_share
+) -> int:
+    """The tokens of questions that fit in one completion, with room for the prompt and answer."""
+    return int((token_limit - CONTEXT_SIZE_BUFFER) * context_share)
+
+
+def format_questions(questions: list[str]) -> list[str]:
+    return [f'"""{question}"""' for question in questions]
+
+
+def format_questions_with_counts(questions: list[str]) -> list[str]:
+    """List every question once, in the order first asked, with how many times it was asked.
+
+    Questions that only differ in case and whitespace count as the same question.
+    """
+    counts = Counter()
+    first_asked = {}
+    for question in questions:
+        key = " ".join(question.split()).casefold()
+        counts[key] += 1
+        first_asked.setdefault(key, question)
+
+    return [
+        f'"""{question}"""' if counts[key] == 1 else f'"""{question}""" (asked {counts[key]} times)'
+        for key, question in first_asked.items()
+    ]
+
+
+def partition(lines: list[str], max_tokens: int, encoding_name: str) -> list[list[str]]:
+    """Split `lines` in order, in partitions of at most `max_tokens` tokens.
+
+    A line that is longer than `max_tokens` gets a partition of its own.
+    """
+    partitions = []
+    current = []
+    tokens_used = 0
+    for line in lines:
+        num_tokens = count_tokens(line, encoding_name) + 1  # The newline
+        if current and tokens_used + num_tokens > max_tokens:
+            partitions.append(current)
+            current = []
+            tokens_used = 0
+
+        current.append(line)
+        tokens_used += num_tokens
+
+    if current:
+        partitions.append(current)
+
+    return partitions
@@ -2,6 +2,7 @@
 
 
 import datetime
+from typing import AsyncIterator, Optional
 from uuid import UUID
 
 import sqlalchemy as sa
@@ -50,6 +51,106 @@ class AnalysisRepository:
     async def get_question_count(self, tenant_id: UUID = None):
         return await self._get_count(Questions, tenant_id=tenant_id)
 
+    @staticmethod
+    def _filter_sessions(
+        stmt: sa.Select,
+        assistant_id: Optional[UUID] = None,
+        group_chat_id: Optional[UUID] = None,
+        from_date: datetime = None,
+        to_date: datetime = None,
+    ):
+        if assistant_id is not None:
+            stmt = stmt.where(Sessions.assistant_id == assistant_id)
+
+        if group_chat_id is not None:
+            stmt = stmt.where(Sessions.group_chat_id == group_chat_id)
+
+        if from_date is not None:
+            stmt = stmt.where(Sessions.created_at >= from_date)
+
+        if to_date is not None:
+            stmt = stmt.where(Sessions.created_at <= to_date)
+
+        return stmt
+
+    async def get_conversation_counts(
+        self,
+        assistant_id: Optional[UUID] = None,
+        group_chat_id: Optional[UUID] = None,
+        from_date: datetime = None,
+        to_date: datetime = None,
+    ) -> tuple[int, int]:
+        """Count the sessions in the period, and all the questions in them."""
+        stmt = sa.select(
+            sa.func.count(sa.distinct(Sessions.id)), sa.func.count(Questions.id)
+        ).outerjoin(Questions, Questions.session_id == Sessions.id)
+        stmt = self._filter_sessions(
+            stmt,
+            assistant_id=assistant_id,
+            group_chat_id=group_chat_id,
+            from_date=from_date,
+            to_date=to_date,
+        )
+
+        sessions, questions = (await self.session.execute(stmt)).one()
+
+        return sessions, questions
+
+    async def iterate_question_texts(
+        self,
+        assistant_id: Optional[UUID] = None,
+        group_chat_id: Optional[UUID] = None,
+        from_date: datetime = None,
+        to_date: datetime = None,
+        include_followups: bool = False,
+        page_size: int = 500,
+    ) -> AsyncIterator[str]:
+        """The questions asked in the sessions of the period, in the order they were asked.
+
+        The sessions are paged through `page_size` at a time, on their creation
+        time, and only the text of their questions is read.
+        """
+        sessions_stmt = (
+            sa.select(Sessions.created_at, Sessions.id)
+            .order_by(Sessions.created_at, Sessions.id)
+            .limit(page_size)
+        )
+        sessions_stmt = self._filter_sessions(
+            sessions_stmt,
+            assistant_id=assistant_id,
+            group_chat_id=group_chat_id,
+            from_date=from_date,
+            to_date=to_date,
+        )
+
+        after = None
+        while True:
+            page_stmt = sessions_stmt
+            if after is not None:
+                page_stmt = page_stmt.where(sa.tuple_(Sessions.created_at, Sessions.id) > after)
+
+            sessions = (await self.session.execute(page_stmt)).all()
+            if not sessions:
+                return
+
+            session_order = (Sessions.created_at, Sessions.id)
+            questions_stmt = (
+                sa.select(Questions.question)
+                .join(Sessions, Sessions.id == Questions.session_id)
+                .where(Questions.session_id.in_([session_id for _, session_id in sessions]))
+                .order_by(*session_order, Questions.created_at, Questions.id)
+            )
+            if not include_followups:
+                questions_stmt = questions_stmt.distinct(*session_order)
+
+            for question in await self.session.scalars(questions_stmt):
+                yield question
+
+            if len(sessions) < page_size:
+                return
+
+            after = sa.tuple_(*sessions[-1])
+
     async def get_assistant_sessions_since(
         self,
         assistant_id: UUID,
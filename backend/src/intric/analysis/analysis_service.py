@@ -1,15 +1,26 @@
 # MIT License
+import asyncio
 from datetime import date, datetime, timedelta
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from uuid import UUID
 
+from intric.analysis import analysis_map_reduce
 from intric.analysis.analysis import ConversationInsightResponse, Counts
 from intric.analysis.analysis_repo import AnalysisRepository
 from intric.assistants.assistant_service import AssistantService
 from intric.completion_models.infrastructure.completion_service import CompletionService
-from intric.completion_models.infrastructure.static_prompts import ANALYSIS_PROMPT
+from intric.completion_models.infrastructure.static_prompts import (
+    ANALYSIS_MAP_PROMPT,
+    ANALYSIS_PROMPT,
+    ANALYSIS_REDUCE_PROMPT,
+)
+from intric.completion_models.infrastructure.tokenizer import get_encoding_name
 from intric.group_chat.application.group_chat_service import GroupChatService
-from intric.main.exceptions import BadRequestException, UnauthorizedException
+from intric.main.exceptions import (
+    BadRequestException,
+    NoModelSelectedException,
+    UnauthorizedException,
+)
 from intric.main.logging import get_logger
 from intric.questions.questions_repo import QuestionRepository
 from intric.roles.permissions import Permission, validate_permissions
@@ -19,6 +30,9 @@ from intric.sessions.sessions_repo import SessionRepository
 from intric.spaces.space_service import SpaceService
 from intric.users.user import UserInDB
 
+if TYPE_CHECKING:
+    from intric.assistants.assistant import Assistant
+
 logger = get_logger(__name__)
 
 
@@ -168,6 +182,111 @@ class AnalysisService:
 
         return first_questions
 
+    async def _get_questions(self, **filters) -> list[str]:
+        return [question async for question in self.repo.iterate_question_texts(**filters)]
+
+    async def _complete(
+        self, model_to_use: "Assistant", question: str, prompt: str, semaphore: asyncio.Semaphore
+    ) -> str:
+        async with semaphore:
+            response = await model_to_use.get_response(
+                question=question,
+                completion_service=self.completion_service,
+                prompt=prompt,
+                stream=False,
+            )
+
+        return response.completion.text
+
+    async def _ask_about_questions(
+        self,
+        model_to_use: "Assistant",
+        question: str,
+        questions: list[str],
+        days: int,
+        stream: bool,
+    ):
+        """Ask `question` about `questions`, in one completion if they fit in the context.
+
+        Otherwise the questions are split in partitions that fit, the question
+        is answered for every partition (map), and the answers are combined
+        (reduce), in as many rounds as it takes for them to fit.
+        """
+        completion_model = model_to_use.completion_model
+        if completion_model is None:
+            raise NoModelSelectedException()
+
+        encoding_name = get_encoding_name(completion_model)
+        max_tokens = analysis_map_reduce.get_max_tokens_of_questions(completion_model.token_limit)
+
+        async def _partition(lines: list[str]):
+            return await asyncio.to_thread(
+                analysis_map_reduce.partition, lines, max_tokens, encoding_name
+            )
+
+        lines = analysis_map_reduce.format_questions(questions)
+        partitions = await _partition(lines)
+        if len(partitions) > 1:
+            lines = analysis_map_reduce.format_questions_with_counts(questions)
+            partitions = await _partition(lines)
+
+        if len(partitions) <= 1:
+            prompt = ANALYSIS_PROMPT.format(days=days)
+            questions_string = "\n".join(lines)
+
+            return await model_to_use.get_response(
+                question=question,
+                completion_service=self.completion_service,
+                prompt=f"{prompt}\n\n{questions_string}",
+                stream=stream,
+            )
+
+        semaphore = asyncio.Semaphore(
+            analysis_map_reduce.settings.analysis_max_concurrent_completions
+        )
+        logger.debug("Analysing %d questions in %d partitions", len(questions), len(partitions))
+        answers = await asyncio.gather(
+            *[
+                self._complete(
+                    model_to_use,
+                    question=question,
+                    prompt=ANALYSIS_MAP_PROMPT.format(part=i + 1, parts=len(partitions), days=days)
+                    + "\n\n"
+                    + "\n".join(partition),
+                    semaphore=semaphore,
+                )
+                for i, partition in enumerate(partitions)
+            ]
+        )
+
+        reduce_prompt = ANALYSIS_REDUCE_PROMPT.format(days=days)
+        lines = analysis_map_reduce.format_questions(answers)
+        partitions = await _partition(lines)
+        # Stop when the answers can not be combined any further
+        while 1 < len(partitions) < len(lines):
+            answers = await asyncio.gather(
+                *[
+                    self._complete(
+                        model_to_use,
+                        question=question,
+                        prompt=f"{reduce_prompt}\n\n" + "\n".join(partition),
+                        semaphore=semaphore,
+                    )
+                    for partition in partitions
+                ]
+            )
+            lines = analysis_map_reduce.format_questions(answers)
+            partitions = await _partition(lines)
+
+        answers_string = "\n".join(lines)
+
+        return await model_to_use.get_response(
+            question=question,
+            completion_service=self.completion_service,
+            prompt=f"{reduce_prompt}\n\n{answers_string}",
+            stream=stream,
+        )
+
     async def ask_question_on_questions(
         self,
         question: str,
@@ -178,28 +297,24 @@ class AnalysisService:
         include_followup: bool = False,
     ):
         assistant, _ = await self.assistant_service.get_assistant(assistant_id)
+        if assistant.space_id is not None:
+            await self._check_space_permissions(assistant.space_id)
 
-        questions = await self.get_questions_since(
+        questions = await self._get_questions(
             assistant_id=assistant_id,
             from_date=from_date,
             to_date=to_date,
             include_followups=include_followup,
         )
 
-        days = (to_date - from_date).days
-        prompt = ANALYSIS_PROMPT.format(days=days)
-        questions_string = "\n".join(f'"""{question.question}"""' for question in questions)
-        prompt = f"{prompt}\n\n{questions_string}"
-
-        ai_response = await assistant.get_response(
+        return await self._ask_about_questions(
+            assistant,
             question=question,
-            completion_service=self.completion_service,
-            prompt=prompt,
+            questions=questions,
+            days=(to_date - from_date).days,
             stream=stream,
         )
 
-        return ai_response
-
     async def unified_ask_question_on_questions(
         self,
         question: str,
@@ -238,7 +353,10 @@ class AnalysisService:
         if assistant_id:
             await self._check_insight_access(assistant_id=assistant_id)
             assistant, _ = await self.assistant_service.get_assistant(assistant_id)
-            questions = await self.get_questions_since(
+            if assistant.space_id is not None:
+                await self._check_space_permissions(assistant.space_id)
+
+            questions = await self._get_questions(
                 assistant_id=assistant_id,
                 from_date=from_date,
                 to_date=to_date,
@@ -258,29 +376,22 @@ class AnalysisService:
             model_to_use = group_chat.assistants[0].assistant
 
             # Get questions for the group chat
-            questions = await self.get_questions_from_group_chat(
+            questions = await self._get_questions(
                 group_chat_id=group_chat_id,
                 from_date=from_date,
                 to_date=to_date,
                 include_followups=include_followup,
             )
 
-        # Format the questions to pass to the LLM
-        days = (to_date - from_date).days
-        prompt = ANALYSIS_PROMPT.format(days=days)
-        questions_string = "\n".join(f'"""{question.question}"""' for question in questions)
-        prompt = f"{prompt}\n\n{questions_string}"
-
         # Get the AI response
-        ai_response = await model_to_use.get_response(
-            completion_service=self.completion_service,
+        return await self._ask_about_questions(
+            model_to_use,
             question=question,
-            prompt=prompt,
+            questions=questions,
+            days=(to_date - from_date).days,
             stream=stream,
         )
 
-        return ai_response
-
     async def get_assistant_insight_sessions(
         self,
         assistant_id: UUID,
@@ -427,42 +538,18 @@ class AnalysisService:
         elif group_chat_id:
             await self._check_insight_access(group_chat_id=group_chat_id)
 
-        sessions = []
-        if assistant_id:
-            if start_time and end_time:
-                sessions = await self.repo.get_assistant_sessions_since(
-                    assistant_id=assistant_id,
-                    from_date=start_time,
-                    to_date=end_time,
-                )
-            else:
-                today = datetime.now()
-                last_month = today - timedelta(days=30)
-                sessions = await self.repo.get_assistant_sessions_since(
-                    assistant_id=assistant_id,
-                    from_date=last_month,
-                    to_date=today,
-                )
-        else:
-            if start_time and end_time:
-                sessions = await self.repo.get_group_chat_sessions_since(
-                    group_chat_id=group_chat_id,
-                    from_date=start_time,
-                    to_date=end_time,
-                )
-            else:
-                today = datetime.now()
-                last_month = today - timedelta(days=30)
-                sessions = await self.repo.get_group_chat_sessions_since(
-                    group_chat_id=group_chat_id,
-                    from_date=last_month,
-                    to_date=today,
-                )
+        if not (start_time and end_time):
+            end_time = datetime.now()
+            start_time = end_time - timedelta(days=30)
 
-        # count total questions
-        total_questions = sum(len(session.questions) for session in sessions)
+        total_conversations, total_questions = await self.repo.get_conversation_counts(
+            assistant_id=assistant_id,
+            group_chat_id=group_chat_id,
+            from_date=start_time,
+            to_date=end_time,
+        )
 
         return ConversationInsightResponse(
-            total_conversations=len(sessions),
+            total_conversations=total_conversations,
             total_questions=total_questions,
         )
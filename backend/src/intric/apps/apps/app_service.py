@@ -164,7 +164,7 @@ class AppService:
         return transcription_model
 
     async def get_app(self, app_id: UUID) -> tuple[App, list[str]]:
-        space = await self.space_repo.get_space_by_app(app_id=app_id)
+        space = await self.space_repo.get_space_by_app(app_id=app_id, partial=True)
         app = space.get_app(app_id=app_id)
         actor = self.actor_manager.get_space_actor_from_space(space)
 
@@ -252,7 +252,7 @@ class AppService:
         return app_in_db, permissions
 
     async def delete_app(self, app_id: UUID):
-        space = await self.space_repo.get_space_by_app(app_id=app_id)
+        space = await self.space_repo.get_space_by_app(app_id=app_id, partial=True)
         actor = self.actor_manager.get_space_actor_from_space(space)
 
         if not actor.can_delete_apps():
@@ -261,7 +261,7 @@ class AppService:
         await self.repo.delete(app_id)
 
     async def run_app(self, app_id: UUID, file_ids: list[UUID], text: str | None):
-        space = await self.space_repo.get_space_by_app(app_id=app_id)
+        space = await self.space_repo.get_space_by_app(app_id=app_id, partial=True)
         app = space.get_app(app_id=app_id)
         actor = self.actor_manager.get_space_actor_from_space(space)
 
@@ -283,7 +283,7 @@ class AppService:
         )
 
     async def get_prompts_by_app(self, app_id: UUID) -> list["Prompt"]:
-        space = await self.space_repo.get_space_by_app(app_id=app_id)
+        space = await self.space_repo.get_space_by_app(app_id=app_id, partial=True)
         actor = self.actor_manager.get_space_actor_from_space(space)
 
         if not actor.can_read_prompts_of_apps():
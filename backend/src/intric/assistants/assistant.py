@@ -305,6 +305,7 @@ class Assistant(Entity):
         stream: bool = False,
         version: int = 1,
         web_search_results: list["WebSearchResult"] = [],
+        query_embedding: Optional[list[float]] = None,
     ):
         if any([file.file_type == FileType.IMAGE for file in files]):
             if not self.completion_model.vision:
@@ -323,6 +324,7 @@ class Assistant(Entity):
             integration_knowledge_list=self.integration_knowledge_list,
             num_chunks=num_chunks,
             version=version,
+            query_embedding=query_embedding,
         )
 
         response = await completion_service.get_response(
@@ -1,3 +1,4 @@
+import asyncio
 import re
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional, Union
@@ -12,11 +13,18 @@ from intric.assistants.assistant import Assistant
 from intric.assistants.assistant_factory import AssistantFactory
 from intric.assistants.assistant_repo import AssistantRepository
 from intric.authentication.auth_service import AuthService
-from intric.completion_models.infrastructure.context_builder import count_tokens
+from intric.completion_models.infrastructure.context_builder import count_tokens_async
+from intric.completion_models.infrastructure.tokenizer import get_encoding_name
 from intric.completion_models.infrastructure.web_search import WebSearch
 from intric.files.file_service import FileService
-from intric.main.exceptions import BadRequestException, UnauthorizedException
+from intric.main.exceptions import (
+    BadRequestException,
+    NoModelSelectedException,
+    UnauthorizedException,
+)
+from intric.main.logging import get_logger
 from intric.main.models import NOT_PROVIDED, NotProvided
+from intric.main.spans import Spans
 from intric.prompts.api.prompt_models import PromptCreate
 from intric.prompts.prompt import Prompt
 from intric.prompts.prompt_service import PromptService
@@ -61,14 +69,68 @@ if TYPE_CHECKING:
     from intric.spaces.space import Space
     from intric.spaces.space_repo import SpaceRepository
 
+logger = get_logger(__name__)
+
 AT_TAG_PATTERN = r"<intric-at-tag: @[^>]+>"
 REFERENCE_PATTERN = r'<inref id="([0-9a-f]{8})"/>'  # noqa
+REFERENCE_LENGTH = len('<inref id="00000000"/>')
 
 
 def clean_intric_tag(input_string: str):
     return re.sub(AT_TAG_PATTERN, "", input_string)
 
 
+def _index_by_id_prefix(info_blobs: list, get_id_func) -> dict:
+    index = {}
+    for blob in info_blobs:
+        index.setdefault(str(get_id_func(blob))[:8], blob)
+
+    return index
+
+
+class ReferenceTracker:
+    """Finds the references of a response while it is being streamed.
+
+    Only the new text of every chunk is scanned, together with the end of
+    the text before it, where a reference could have been cut in two.
+    """
+
+    def __init__(self, info_blobs: list, get_id_func=lambda blob: blob.id):
+        self._index = _index_by_id_prefix(info_blobs, get_id_func)
+        self._tail = ""
+
+        # Every referenced id, in order, also when there is no such blob
+        self.ids: dict[str, None] = {}
+        self.references = []
+
+    def feed(self, text: str) -> list:
+        """Scan the next part of the response, and return the new references in it."""
+        text = f"{self._tail}{text}"
+        new_references = []
+        end = 0
+
+        for match in re.finditer(REFERENCE_PATTERN, text):
+            end = match.end()
+            blob_id = match.group(1)
+            if blob_id in self.ids:
+                continue
+
+            self.ids[blob_id] = None
+            blob = self._index.get(blob_id)
+            if blob is not None:
+                new_references.append(blob)
+
+        self.references.extend(new_references)
+        self._tail = text[max(end, len(text) - REFERENCE_LENGTH + 1) :]
+
+        return new_references
+
+    def resolve(self, info_blobs: list, get_id_func=lambda blob: blob.id) -> list:
+        """The blobs among `info_blobs` that were referenced so far."""
+        index = _index_by_id_prefix(info_blobs, get_id_func)
+        return [index[blob_id] for blob_id in self.ids if blob_id in index]
+
+
 def get_references(
     response_string: str,
     info_blobs: list["InfoBlobChunkInDBWithScore"],
@@ -78,15 +140,10 @@ def get_references(
     if version == 1:
         return info_blobs
 
-    # Preserve order, remove duplicates
-    info_blob_ids = list(dict.fromkeys(re.findall(REFERENCE_PATTERN, response_string)))
-
-    def _get_blob(blob_id):
-        return next((blob for blob in info_blobs if str(get_id_func(blob))[:8] == blob_id), None)
-
-    blobs = [_get_blob(blob_id) for blob_id in info_blob_ids]
+    tracker = ReferenceTracker(info_blobs, get_id_func=get_id_func)
+    tracker.feed(response_string)
 
-    return [blob for blob in blobs if blob is not None]
+    return tracker.references
 
 
 class AssistantService:
@@ -129,7 +186,7 @@ class AssistantService:
         self.references_service = references_service
 
     @property
-    async def web_search(self):
+    def web_search(self):
         return WebSearch()
 
     def validate_space_assistant(self, space: "Space", assistant: Assistant):
@@ -391,7 +448,7 @@ class AssistantService:
 
         assistant = space.get_assistant(assistant_id=assistant_id)
         space.remove_assistant(assistant)
-        await self.space_repo.update(space)
+        await self.space_repo.update(space, reload=False)
 
     @validate_permissions(Permission.ADMIN)
     async def generate_api_key(self, assistant_id: UUID):
@@ -404,7 +461,9 @@ class AssistantService:
         return await self.auth_service.create_assistant_api_key("ina", assistant_id=assistant_id)
 
     async def get_prompts_by_assistant(self, assistant_id: UUID) -> list[Prompt]:
-        space = await self.space_repo.get_space_by_assistant(assistant_id=assistant_id)
+        space = await self.space_repo.get_space_by_assistant(
+            assistant_id=assistant_id, partial=True
+        )
         actor = self.actor_manager.get_space_actor_from_space(space=space)
 
         if not actor.can_read_prompts_of_assistants():
@@ -430,19 +489,21 @@ class AssistantService:
 
             async def response_stream():
                 reasoning_token_count = 0
-                response_string = ""
+                response_parts = []
                 generated_files = []
+                tracker = ReferenceTracker(datastore_result.info_blobs)
+                references = datastore_result.info_blobs if version == 1 else []
 
                 async for chunk in response.completion:
                     reasoning_token_count = chunk.reasoning_token_count
 
                     if chunk.response_type == ResponseType.TEXT:
-                        response_string = f"{response_string}{chunk.text}"
-                        chunk.reference_chunks = get_references(
-                            response_string=response_string,
-                            info_blobs=datastore_result.info_blobs,
-                            version=version,
-                        )
+                        response_parts.append(chunk.text)
+                        # Every chunk has all the references so far, the list is
+                        # only copied when a new one is found
+                        if version != 1 and tracker.feed(chunk.text):
+                            references = list(tracker.references)
+                        chunk.reference_chunks = references
                         yield chunk
 
                     if chunk.response_type == ResponseType.FILES:
@@ -456,13 +517,17 @@ class AssistantService:
                         yield chunk
 
                 # Get the references for the whole response
-                reference_chunks = get_references(
-                    response_string=response_string,
-                    info_blobs=datastore_result.no_duplicate_chunks,
-                    version=version,
-                    get_id_func=lambda chunk: chunk.info_blob_id,
+                response_string = "".join(response_parts)
+                if version == 1:
+                    reference_chunks = datastore_result.no_duplicate_chunks
+                else:
+                    reference_chunks = tracker.resolve(
+                        datastore_result.no_duplicate_chunks,
+                        get_id_func=lambda chunk: chunk.info_blob_id,
+                    )
+                total_response_tokens = (
+                    await count_tokens_async(response_string) + reasoning_token_count
                 )
-                total_response_tokens = count_tokens(response_string) + reasoning_token_count
                 await self.session_service.add_question_to_session(
                     question=question,
                     answer=response_string,
@@ -495,7 +560,7 @@ class AssistantService:
                 version=version,
                 get_id_func=lambda chunk: chunk.info_blob_id,
             )
-            total_response_tokens = count_tokens(final_answer) + reasoning_token_count
+            total_response_tokens = await count_tokens_async(final_answer) + reasoning_token_count
             await self.session_service.add_question_to_session(
                 question=question,
                 answer=final_answer,
@@ -541,7 +606,10 @@ class AssistantService:
         use_web_search: bool = False,
         assistant_selector_tokens: int = 0,
     ):
-        space = await self.space_repo.get_space_by_assistant(assistant_id=assistant_id)
+        # Only the assistants asked are needed, not the whole space
+        space = await self.space_repo.get_space_by_assistant(
+            assistant_id=assistant_id, partial=True, tool_assistant_id=tool_assistant_id
+        )
         active_assistant = space.get_assistant(assistant_id=assistant_id)
         actor = self.actor_manager.get_space_actor_from_space(space=space)
 
@@ -565,50 +633,107 @@ class AssistantService:
         else:
             assistant_to_ask = active_assistant
 
-        cleaned_question = clean_intric_tag(question)
-        files = await self.file_service.get_files_by_ids(file_ids=file_ids)
+        if assistant_to_ask.completion_model is None:
+            raise NoModelSelectedException()
 
-        if session_id is not None:
-            if group_chat_id is not None:
-                session = await self.session_service.get_session_by_uuid(
-                    id=session_id, group_chat_id=group_chat_id
-                )
-            else:
-                session = await self.session_service.get_session_by_uuid(
-                    id=session_id, assistant_id=assistant_id
-                )
-        else:
-            # Set the name as the question or the filenames
-            name = question
-            if not name and files:
-                name = " ".join(file.name for file in files)
-            if group_chat_id is not None:
-                session = await self.session_service.create_session(
-                    name=name, group_chat_id=group_chat_id
+        cleaned_question = clean_intric_tag(question)
+        spans = Spans()
+
+        # The web search and the embedding of the question do not use the
+        # database, and run while the files and the session are loaded. The
+        # work on the database stays in order, as the session can only run
+        # one statement at a time.
+        tasks: list[asyncio.Task] = []
+
+        def embed_query(session: Optional["SessionInDB"]):
+            task = asyncio.create_task(
+                spans.timed(
+                    "embed query",
+                    self.references_service.embed_query(
+                        question=cleaned_question,
+                        session=session,
+                        collections=assistant_to_ask.collections,
+                        websites=assistant_to_ask.websites,
+                        integration_knowledge_list=assistant_to_ask.integration_knowledge_list,
+                    ),
                 )
-            else:
-                session = await self.session_service.create_session(
-                    name=name, assistant_id=active_assistant.id
+            )
+            tasks.append(task)
+            return task
+
+        try:
+            web_search = None
+            if use_web_search and version == 2:
+                web_search = asyncio.create_task(
+                    spans.timed("web search", self.web_search.search(search_query=question))
                 )
+                tasks.append(web_search)
 
-        for _question in session.questions:
-            _question.question = clean_intric_tag(_question.question)
+            # A new session has no history, so the question is all that is embedded
+            query_embedding = embed_query(session=None) if session_id is None else None
 
-        if use_web_search and version == 2:
-            web_search_results = await self.web_search.search(search_query=question)
-        else:
-            web_search_results = []
+            files = await spans.timed(
+                "files", self.file_service.get_files_by_ids(file_ids=file_ids)
+            )
 
-        response, datastore_result = await assistant_to_ask.ask(
-            question=cleaned_question,
-            completion_service=self.completion_service,
-            references_service=self.references_service,
-            session=session,
-            files=files,
-            stream=stream,
-            version=version,
-            web_search_results=web_search_results,
+            with spans.span("session"):
+                if session_id is not None:
+                    # Only the part of the history that fits in the context is loaded
+                    history_window = dict(
+                        max_tokens=assistant_to_ask.completion_model.token_limit,
+                        encoding_name=get_encoding_name(assistant_to_ask.completion_model),
+                    )
+                    if group_chat_id is not None:
+                        session = await self.session_service.get_session_with_history_window(
+                            id=session_id, group_chat_id=group_chat_id, **history_window
+                        )
+                    else:
+                        session = await self.session_service.get_session_with_history_window(
+                            id=session_id, assistant_id=assistant_id, **history_window
+                        )
+                else:
+                    # Set the name as the question or the filenames
+                    name = question
+                    if not name and files:
+                        name = " ".join(file.name for file in files)
+                    if group_chat_id is not None:
+                        session = await self.session_service.create_session(
+                            name=name, group_chat_id=group_chat_id
+                        )
+                    else:
+                        session = await self.session_service.create_session(
+                            name=name, assistant_id=active_assistant.id
+                        )
+
+            for _question in session.questions:
+                _question.question = clean_intric_tag(_question.question)
+
+            if query_embedding is None:
+                query_embedding = embed_query(session=session)
+
+            query_embedding = await query_embedding
+            web_search_results = await web_search if web_search is not None else []
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        response, datastore_result = await spans.timed(
+            "references and completion",
+            assistant_to_ask.ask(
+                question=cleaned_question,
+                completion_service=self.completion_service,
+                references_service=self.references_service,
+                session=session,
+                files=files,
+                stream=stream,
+                version=version,
+                web_search_results=web_search_results,
+                query_embedding=query_embedding,
+            ),
         )
+        logger.debug(f"Stages of asking assistant {assistant_to_ask.id}: {spans}")
 
         # TODO: Separate the response based on stream true or false
 
@@ -665,7 +790,7 @@ class AssistantService:
 
         assistant.update(published=publish)
 
-        await self.space_repo.update(space)
+        await self.space_repo.update(space, reload=False)
 
         # TODO: Review how we get the permissions to the presentation layer
         permissions = actor.get_assistant_permissions(assistant=assistant)
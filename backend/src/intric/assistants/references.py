@@ -2,11 +2,12 @@ from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
 from intric.files.file_models import FileType
-from intric.info_blobs.info_blob import InfoBlobInDBWithScore
+from intric.info_blobs.info_blob import InfoBlobInDBNoTextWithScore
 from intric.services.service import DatastoreResult
 
 if TYPE_CHECKING:
     from intric.collections.domain.collection import Collection
+    from intric.embedding_models.domain.embedding_model import EmbeddingModel
     from intric.embedding_models.infrastructure.datastore import Datastore
     from intric.files.file_models import File
     from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore, InfoBlobInDB
@@ -32,6 +33,21 @@ class ReferencesService:
         self.info_blobs_repo = info_blobs_repo
         self.datastore = datastore
 
+    @staticmethod
+    def _get_embedding_model(
+        collections: list["Collection"],
+        websites: list["Website"],
+        integration_knowledge_list: list["IntegrationKnowledge"],
+    ) -> Optional["EmbeddingModel"]:
+        if collections:
+            return collections[0].embedding_model
+        elif websites:
+            return websites[0].embedding_model
+        elif integration_knowledge_list:
+            return integration_knowledge_list[0].embedding_model
+
+        return None
+
     async def _query_datastore_if_groups_or_websites(
         self,
         input_string: str,
@@ -40,6 +56,7 @@ class ReferencesService:
         integration_knowledge_list: list["IntegrationKnowledge"] = [],
         num_chunks: Optional[int] = None,
         version: int = 1,
+        query_embedding: Optional[list[float]] = None,
     ) -> list["InfoBlobChunkInDBWithScore"]:
         if (collections or websites or integration_knowledge_list) and input_string:
             if version == 1:
@@ -47,20 +64,15 @@ class ReferencesService:
             elif version == 2:
                 search_params = dict(autocut_cutoff=None, num_chunks=num_chunks)
 
-            embedding_model = None
-            if collections:
-                embedding_model = collections[0].embedding_model
-            elif websites:
-                embedding_model = websites[0].embedding_model
-            elif integration_knowledge_list:
-                embedding_model = integration_knowledge_list[0].embedding_model
-
             return await self.datastore.semantic_search(
                 input_string,
-                embedding_model=embedding_model,
+                embedding_model=self._get_embedding_model(
+                    collections, websites, integration_knowledge_list
+                ),
                 collections=collections,
                 websites=websites,
                 integration_knowledge_list=integration_knowledge_list,
+                query_embedding=query_embedding,
                 **search_params,
             )
 
@@ -68,14 +80,22 @@ class ReferencesService:
 
     async def _get_info_blobs_from_chunks(
         self, info_blob_chunks: list["InfoBlobChunkInDBWithScore"]
-    ) -> list["InfoBlobInDBWithScore"]:
-        info_blobs = []
-        for chunk in info_blob_chunks:
-            info_blob = await self.info_blobs_repo.get(chunk.info_blob_id)
-            info_blob = InfoBlobInDBWithScore(**info_blob.model_dump(), score=chunk.score)
-            info_blobs.append(info_blob)
+    ) -> list["InfoBlobInDBNoTextWithScore"]:
+        if not info_blob_chunks:
+            return []
+
+        info_blobs = await self.info_blobs_repo.get_by_ids_without_text(
+            chunk.info_blob_id for chunk in info_blob_chunks
+        )
+        info_blobs_by_id = {info_blob.id: info_blob for info_blob in info_blobs}
 
-        return info_blobs
+        return [
+            InfoBlobInDBNoTextWithScore(
+                **info_blobs_by_id[chunk.info_blob_id].model_dump(), score=chunk.score
+            )
+            for chunk in info_blob_chunks
+            if chunk.info_blob_id in info_blobs_by_id
+        ]
 
     def _get_info_blob_chunks_without_duplicates(
         self, info_blob_chunks: list["InfoBlobChunkInDBWithScore"]
@@ -122,6 +142,44 @@ class ReferencesService:
 
         return f"{files_text}{session_text}{question}".strip()
 
+    def _get_input_string(
+        self,
+        question: str,
+        session: Optional["SessionInDB"],
+        files: list["File"],
+        embed_method: EmbedMethod,
+    ) -> str:
+        if embed_method == EmbedMethod.CONCATENATE:
+            return self._concatenate_conversation(question=question, session=session, files=files)
+        elif embed_method == EmbedMethod.LAST_QUESTION:
+            return question
+
+    async def embed_query(
+        self,
+        question: str,
+        session: Optional["SessionInDB"] = None,
+        files: list["File"] = [],
+        collections: list["Collection"] = [],
+        websites: list["Website"] = [],
+        integration_knowledge_list: list["IntegrationKnowledge"] = [],
+        embed_method: EmbedMethod = EmbedMethod.CONCATENATE,
+    ) -> Optional[list[float]]:
+        """The embedding that `get_references` searches with, for the same arguments.
+
+        Does not use the database, so it can run while the session does
+        other work. None if there is nothing to search.
+        """
+        input_string = self._get_input_string(question, session, files, embed_method)
+        if not (collections or websites or integration_knowledge_list) or not input_string:
+            return None
+
+        return await self.datastore.embed_query(
+            input_string,
+            embedding_model=self._get_embedding_model(
+                collections, websites, integration_knowledge_list
+            ),
+        )
+
     async def get_references(
         self,
         question: str,
@@ -133,13 +191,14 @@ class ReferencesService:
         embed_method: EmbedMethod = EmbedMethod.CONCATENATE,
         num_chunks: Optional[int] = None,
         version: int = 1,
+        query_embedding: Optional[list[float]] = None,
     ) -> "DatastoreResult":
-        if embed_method == EmbedMethod.CONCATENATE:
-            input_string = self._concatenate_conversation(
-                question=question, session=session, files=files
-            )
-        elif embed_method == EmbedMethod.LAST_QUESTION:
-            input_string = question
+        """The chunks and info blobs that are most relevant to the conversation.
+
+        Pass the `query_embedding` from `embed_query` with the same
+        arguments, if it was already computed.
+        """
+        input_string = self._get_input_string(question, session, files, embed_method)
 
         chunks = await self._query_datastore_if_groups_or_websites(
             input_string,
@@ -148,6 +207,7 @@ class ReferencesService:
             integration_knowledge_list=integration_knowledge_list,
             num_chunks=num_chunks,
             version=version,
+            query_embedding=query_embedding,
         )
         no_duplicate_chunks = self._get_info_blob_chunks_without_duplicates(chunks)
         info_blobs = await self._get_info_blobs_from_chunks(no_duplicate_chunks)
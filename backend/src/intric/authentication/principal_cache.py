@@ -0,0 +1,228 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+from uuid import UUID
+
+import redis.asyncio as aioredis
+from pydantic import Field
+from pydantic_settings import BaseSettings
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from intric.authentication.auth_models import ApiKeyPublic
+from intric.main.logging import get_logger
+from intric.users.user import UserInDB
+from intric.worker.redis import r
+
+if TYPE_CHECKING:
+    from intric.database.database import AsyncSession
+
+logger = get_logger(__name__)
+
+
+class PrincipalCacheSettings(BaseSettings):
+    principal_cache_enabled: bool = True
+    principal_cache_size: int = 10_000
+    principal_cache_ttl: int = 60  # Seconds
+    # Invalidations only reach the in-process tier of the process that made
+    # them, so other processes can serve a stale principal for this long
+    principal_cache_local_ttl: int = 5  # Seconds
+
+
+settings = PrincipalCacheSettings()
+
+KEY_PREFIX = "principal"
+PENDING = "principal_cache_pending"
+
+
+class CachedPrincipal(UserInDB):
+    """A user as it is cached, without credentials or token counts.
+
+    The shared tier is readable by every process, so nothing in it can be
+    used to log in as the user. Only the truncated api key is kept, for
+    showing to the user.
+    """
+
+    password: Optional[str] = Field(default=None, exclude=True)
+    salt: Optional[str] = Field(default=None, exclude=True)
+    used_tokens: int = Field(default=0, exclude=True)
+    api_key: Optional[ApiKeyPublic] = None
+
+
+@dataclass
+class _LocalEntry:
+    expires_at: float
+    user_id: UUID
+    tenant_id: UUID
+    value: bytes
+
+
+class PrincipalCache:
+    """Two-tier cache of authenticated users, keyed by token subject or api key hash.
+
+    An in-process LRU sits in front of a shared Redis tier. Every cached key
+    is also added to a set per user and per tenant in Redis, so that writes
+    that change what a user is allowed to do can drop all of that user's,
+    or tenant's, cached principals at once.
+
+    Until the write commits, another request can still read the old rows
+    and cache them again, so invalidations made with a session are repeated
+    once it commits.
+    """
+
+    def __init__(
+        self,
+        redis: Optional[aioredis.Redis],
+        max_size: int = settings.principal_cache_size,
+        ttl: int = settings.principal_cache_ttl,
+        local_ttl: int = settings.principal_cache_local_ttl,
+    ):
+        self.redis = redis
+        self.max_size = max_size
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+
+        self._local: OrderedDict[str, _LocalEntry] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def token_key(username: str) -> str:
+        return f"{KEY_PREFIX}:token:{username}"
+
+    @staticmethod
+    def api_key_key(hashed_key: str) -> str:
+        return f"{KEY_PREFIX}:api_key:{hashed_key}"
+
+    @staticmethod
+    def _user_index(user_id: UUID) -> str:
+        return f"{KEY_PREFIX}:user:{user_id}"
+
+    @staticmethod
+    def _tenant_index(tenant_id: UUID) -> str:
+        return f"{KEY_PREFIX}:tenant:{tenant_id}"
+
+    @staticmethod
+    def _decode(value: bytes) -> CachedPrincipal:
+        return CachedPrincipal.model_validate_json(value)
+
+    def _get_local(self, key: str) -> Optional[bytes]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+
+        if entry.expires_at < time.monotonic():
+            del self._local[key]
+            return None
+
+        self._local.move_to_end(key)
+        return entry.value
+
+    def _set_local(self, key: str, user_id: UUID, tenant_id: UUID, value: bytes):
+        self._local[key] = _LocalEntry(
+            expires_at=time.monotonic() + self.local_ttl,
+            user_id=user_id,
+            tenant_id=tenant_id,
+            value=value,
+        )
+        self._local.move_to_end(key)
+
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[CachedPrincipal]:
+        value = self._get_local(key)
+        if value is not None:
+            return self._decode(value)
+
+        if self.redis is None:
+            return None
+
+        try:
+            value = await self.redis.get(key)
+        except RedisError:
+            logger.warning("Could not read principal from redis", exc_info=True)
+            return None
+
+        if value is None:
+            return None
+
+        user = self._decode(value)
+        self._set_local(key, user.id, user.tenant_id, value)
+
+        return user
+
+    async def set(self, key: str, user: UserInDB):
+        principal = CachedPrincipal.model_validate(user, from_attributes=True)
+        # The quota is computed per request, and not part of the principal
+        value = principal.model_dump_json(exclude={"quota_used"}).encode()
+        self._set_local(key, user.id, user.tenant_id, value)
+
+        if self.redis is None:
+            return
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, value, ex=self.ttl)
+                for index in (self._user_index(user.id), self._tenant_index(user.tenant_id)):
+                    pipe.sadd(index, key)
+                    pipe.expire(index, self.ttl)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Could not write principal to redis", exc_info=True)
+
+    async def _invalidate(self, index: str):
+        if self.redis is None:
+            return
+
+        try:
+            keys = await self.redis.smembers(index)
+            await self.redis.delete(index, *keys)
+        except RedisError:
+            logger.warning("Could not invalidate principals in redis", exc_info=True)
+
+    def _spawn(self, invalidate: Callable[[], Awaitable[None]]):
+        try:
+            task = asyncio.get_running_loop().create_task(invalidate())
+        except RuntimeError:
+            return
+
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _after_commit(
+        self, session: Optional["AsyncSession"], invalidate: Callable[[], Awaitable[None]]
+    ):
+        if session is not None:
+            session.info.setdefault(PENDING, []).append(partial(self._spawn, invalidate))
+
+    async def invalidate_user(self, user_id: UUID, session: Optional["AsyncSession"] = None):
+        for key in [key for key, entry in self._local.items() if entry.user_id == user_id]:
+            del self._local[key]
+
+        await self._invalidate(self._user_index(user_id))
+        self._after_commit(session, partial(self.invalidate_user, user_id))
+
+    async def invalidate_tenant(self, tenant_id: UUID, session: Optional["AsyncSession"] = None):
+        for key in [key for key, entry in self._local.items() if entry.tenant_id == tenant_id]:
+            del self._local[key]
+
+        await self._invalidate(self._tenant_index(tenant_id))
+        self._after_commit(session, partial(self.invalidate_tenant, tenant_id))
+
+
+principal_cache = PrincipalCache(redis=r) if settings.principal_cache_enabled else None
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session):
+    for spawn in session.info.pop(PENDING, []):
+        spawn()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_invalidations(session: Session):
+    session.info.pop(PENDING, None)
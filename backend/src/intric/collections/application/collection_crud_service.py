@@ -56,7 +56,7 @@ class CollectionCRUDService:
         return new_collection
 
     async def get_collection(self, collection_id: "UUID") -> Collection:
-        space = await self.space_service.get_space_by_collection(collection_id)
+        space = await self.space_service.get_space_by_collection(collection_id, partial=True)
         actor = self.actor_manager.get_space_actor_from_space(space=space)
 
         if not actor.can_read_collections():
@@ -90,4 +90,4 @@ class CollectionCRUDService:
 
         collection = space.get_collection(collection_id=collection_id)
         space.remove_collection(collection)
-        await self.space_repo.update(space=space)
+        await self.space_repo.update(space=space, reload=False)
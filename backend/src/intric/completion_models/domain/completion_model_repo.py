@@ -16,16 +16,36 @@ from intric.main.exceptions import NotFoundException
 if TYPE_CHECKING:
     from uuid import UUID
 
+    from intric.ai_models.ai_model_catalog import AIModelCatalog
     from intric.database.database import AsyncSession
     from intric.users.user import UserInDB
 
 
 class CompletionModelRepository:
-    def __init__(self, session: "AsyncSession", user: "UserInDB"):
+    def __init__(
+        self,
+        session: "AsyncSession",
+        user: "UserInDB",
+        ai_model_catalog: Optional["AIModelCatalog"] = None,
+    ):
         self.session = session
         self.user = user
+        self.ai_model_catalog = ai_model_catalog
 
-    async def all(self, with_deprecated: bool = False):
+    async def all(self, with_deprecated: bool = False) -> list["CompletionModel"]:
+        if self.ai_model_catalog is None:
+            completion_models = await self._all()
+        else:
+            completion_models = await self.ai_model_catalog.get_models(
+                self.session, kind="completion_models", user=self.user, load=self._all
+            )
+
+        if not with_deprecated:
+            return [model for model in completion_models if not model.is_deprecated]
+
+        return completion_models
+
+    async def _all(self) -> list["CompletionModel"]:
         stmt = (
             sa.select(CompletionModels, CompletionModelSettings)
             .outerjoin(
@@ -48,9 +68,6 @@ class CompletionModelRepository:
             )
         )
 
-        if not with_deprecated:
-            stmt = stmt.where(CompletionModels.is_deprecated == False)  # noqa
-
         result = await self.session.execute(stmt)
         completion_models = result.all()
 
@@ -64,6 +81,10 @@ class CompletionModelRepository:
         ]
 
     async def one_or_none(self, model_id: "UUID") -> Optional["CompletionModel"]:
+        if self.ai_model_catalog is not None:
+            models = await self.all(with_deprecated=True)
+            return next((model for model in models if model.id == model_id), None)
+
         stmt = (
             sa.select(CompletionModels, CompletionModelSettings)
             .outerjoin(
@@ -5,6 +5,7 @@ from intric.ai_models.completion_models.completion_model import (
     Context,
     ModelKwargs,
 )
+from intric.ai_models.model_clients import model_clients
 from intric.completion_models.infrastructure import get_response_open_ai
 from intric.completion_models.infrastructure.adapters.openai_model_adapter import (
     OpenAIModelAdapter,
@@ -18,7 +19,7 @@ class AzureOpenAIModelAdapter(OpenAIModelAdapter):
         model: CompletionModel,
     ):
         self.model = model
-        self.client: AsyncAzureOpenAI = AsyncAzureOpenAI(
+        self.client: AsyncAzureOpenAI = model_clients.azure_openai(
             api_key=get_settings().azure_api_key,
             azure_endpoint=get_settings().azure_endpoint,
             api_version=get_settings().azure_api_version,
@@ -1,6 +1,5 @@
-from openai import AsyncOpenAI
-
 from intric.ai_models.completion_models.completion_model import CompletionModel
+from intric.ai_models.model_clients import model_clients
 from intric.completion_models.infrastructure.adapters.openai_model_adapter import (
     OpenAIModelAdapter,
 )
@@ -10,7 +9,7 @@ from intric.main.config import SETTINGS
 class OVHCloudModelAdapter(OpenAIModelAdapter):
     def __init__(self, model: CompletionModel):
         self.model = model
-        self.client = AsyncOpenAI(
+        self.client = model_clients.openai(
             api_key=SETTINGS.ovhcloud_api_key, base_url=model.base_url
         )
         self.extra_headers = None
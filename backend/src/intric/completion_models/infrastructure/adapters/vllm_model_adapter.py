@@ -1,13 +1,12 @@
 import json
 
 import jinja2
-from openai import AsyncOpenAI
-
 from intric.ai_models.completion_models.completion_model import (
     CompletionModel,
     Context,
     ModelKwargs,
 )
+from intric.ai_models.model_clients import model_clients
 from intric.completion_models.infrastructure.adapters.openai_model_adapter import (
     OpenAIModelAdapter,
 )
@@ -24,7 +23,7 @@ class VLMMModelAdapter(OpenAIModelAdapter):
         model: CompletionModel,
     ):
         self.model = model
-        self.client = AsyncOpenAI(
+        self.client = model_clients.openai(
             api_key="EMPTY", base_url=model.base_url or SETTINGS.vllm_model_url
         )
         self.extra_headers = {"X-API-Key": SETTINGS.vllm_api_key}
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import json
+from functools import partial
 from typing import TYPE_CHECKING, AsyncGenerator
 
 from intric.ai_models.completion_models.completion_model import (
@@ -20,6 +22,10 @@ from intric.completion_models.infrastructure.adapters import (
     VLMMModelAdapter,
 )
 from intric.completion_models.infrastructure.context_builder import ContextBuilder
+from intric.completion_models.infrastructure.tokenizer import (
+    get_encoding_name,
+    tokenizer_service,
+)
 from intric.files.file_models import File
 from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
 from intric.main.config import SETTINGS
@@ -138,7 +144,8 @@ class CompletionService:
         # And only if feature flag is turned on
         use_image_generation = use_image_generation and stream and SETTINGS.using_image_generation
 
-        context = self.context_builder.build_context(
+        build_context = partial(
+            self.context_builder.build_context,
             input_str=text_input,
             max_tokens=max_tokens,
             files=files,
@@ -150,8 +157,16 @@ class CompletionService:
             version=version,
             use_image_generation=use_image_generation,
             web_search_results=web_search_results,
+            encoding_name=get_encoding_name(model),
         )
 
+        # Tokenizing large attachments would hold up the event loop
+        texts = [file.text for file in [*files, *prompt_files]] + transcription_inputs
+        if any(tokenizer_service.is_large(text) for text in texts):
+            context = await asyncio.to_thread(build_context)
+        else:
+            context = build_context()
+
         if extended_logging:
             logging_details = model_adapter.get_logging_details(
                 context=context, model_kwargs=model_kwargs
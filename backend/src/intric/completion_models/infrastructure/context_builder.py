@@ -2,8 +2,6 @@ from collections import defaultdict
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Optional
 
-import tiktoken
-
 from intric.ai_models.completion_models.completion_model import (
     Context,
     FunctionDefinition,
@@ -14,6 +12,10 @@ from intric.completion_models.infrastructure.static_prompts import (
     SHOW_REFERENCES_PROMPT,
     TRANSCRIPTION_PROMPT,
 )
+from intric.completion_models.infrastructure.tokenizer import (
+    DEFAULT_ENCODING,
+    tokenizer_service,
+)
 from intric.files.file_models import File, FileType
 from intric.main.exceptions import QueryException
 from intric.sessions.session import SessionInDB
@@ -23,19 +25,21 @@ if TYPE_CHECKING:
 
     from intric.completion_models.infrastructure.web_search import WebSearchResult
     from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
+    from intric.questions.question import Question
 
 CONTEXT_SIZE_BUFFER = 1000  # Counting tokens is not an exakt science, leave some buffer
 MIN_PERCENTAGE_KNOWLEDGE = (
     0.8  # Strive towards a minimum of 80% of the context as knowledge
 )
+MIN_MESSAGES = 3  # Keep more than this many messages, even if they do not fit
+
+
+def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING):
+    return tokenizer_service.count(text, encoding_name=encoding_name)
 
 
-def count_tokens(text: str):
-    # ensure we're always passing a string to the encoder
-    if text is None:
-        return 0
-    encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text))
+async def count_tokens_async(text: str, encoding_name: str = DEFAULT_ENCODING):
+    return await tokenizer_service.count_async(text, encoding_name=encoding_name)
 
 
 def _build_files_string(files: list[File]):
@@ -67,13 +71,14 @@ class ChunkGrouping:
 
 
 class _Prompt:
-    def __init__(self, version: int = 1):
+    def __init__(self, version: int = 1, encoding_name: str = DEFAULT_ENCODING):
         self.prompt = None
         self.knowledge = None
         self.web_search_result = None
         self.attachments = None
         self._knowledge_tokens = 0
         self.version = version
+        self.encoding_name = encoding_name
 
     def __str__(self):
         components = []
@@ -160,7 +165,7 @@ class _Prompt:
         chunks_by_info_blob = {}
         used_tokens = 0
         for chunk in chunks:
-            chunk_tokens = count_tokens(chunk.text)
+            chunk_tokens = count_tokens(chunk.text, self.encoding_name)
 
             if chunks_by_info_blob.get(chunk.info_blob_id) is None:
                 chunks_by_info_blob[chunk.info_blob_id] = []
@@ -169,7 +174,8 @@ class _Prompt:
                 chunk_tokens += count_tokens(
                     '"""source_title: {}, source_id: {}\n"""'.format(
                         chunk.info_blob_title, str(chunk.info_blob_id)[:8]
-                    )
+                    ),
+                    self.encoding_name,
                 )
 
             if chunk_tokens + used_tokens > max_tokens:
@@ -257,7 +263,7 @@ class _Prompt:
 
     @property
     def num_tokens(self):
-        return count_tokens(str(self))
+        return count_tokens(str(self), self.encoding_name)
 
     def add_prompt(
         self,
@@ -315,8 +321,8 @@ class ContextBuilder:
             )
         ]
 
+    @staticmethod
     def _build_input(
-        self,
         input_str: str,
         files: list[File] = [],
         transcription_inputs: list[str] = [],
@@ -340,8 +346,30 @@ class ContextBuilder:
     def _get_files_by_type(files: list[File], file_type: FileType):
         return [file for file in files if file.file_type == file_type]
 
+    @staticmethod
+    def get_max_tokens_of_messages(max_tokens: int) -> int:
+        """Upper bound of the tokens of a session that fit in a context of `max_tokens`."""
+        return int((max_tokens - CONTEXT_SIZE_BUFFER) * (1 - MIN_PERCENTAGE_KNOWLEDGE))
+
+    @classmethod
+    def count_message_tokens(
+        cls, message: "Question", encoding_name: str = DEFAULT_ENCODING
+    ) -> int:
+        question = cls._build_input(
+            message.question,
+            cls._get_files_by_type(message.files, FileType.TEXT),
+        )
+
+        return count_tokens(question, encoding_name) + count_tokens(
+            message.answer, encoding_name
+        )
+
     def _build_messages(
-        self, session: Optional[SessionInDB], max_tokens: int, min_len: int = 3
+        self,
+        session: Optional[SessionInDB],
+        max_tokens: int,
+        min_len: int = MIN_MESSAGES,
+        encoding_name: str = DEFAULT_ENCODING,
     ):
         if session is None:
             return [], 0
@@ -360,7 +388,9 @@ class ContextBuilder:
                 message.generated_files, FileType.IMAGE
             )
 
-            message_tokens = count_tokens(question) + count_tokens(answer)
+            message_tokens = count_tokens(question, encoding_name) + count_tokens(
+                answer, encoding_name
+            )
 
             if len(messages) > min_len and total_tokens + message_tokens > max_tokens:
                 break
@@ -393,6 +423,7 @@ class ContextBuilder:
         version: int = 1,
         use_image_generation: bool = False,
         web_search_results: list["WebSearchResult"] = [],
+        encoding_name: str = DEFAULT_ENCODING,
     ):
         tokens_used = 0
         max_tokens_usable = max_tokens - CONTEXT_SIZE_BUFFER  # Leave some room.
@@ -403,12 +434,12 @@ class ContextBuilder:
             files=self._get_files_by_type(files, FileType.TEXT),
             transcription_inputs=transcription_inputs,
         )
-        tokens_used_input = count_tokens(_input_string)
+        tokens_used_input = count_tokens(_input_string, encoding_name)
         tokens_used += tokens_used_input
 
         # Create the necessary parts of the prompt.
         # Add the tokens used.
-        _prompt = _Prompt(version=version)
+        _prompt = _Prompt(version=version, encoding_name=encoding_name)
         _prompt.add_prompt(
             prompt=prompt,
             transcription=bool(transcription_inputs),
@@ -426,7 +457,10 @@ class ContextBuilder:
             int(max_tokens_usable * (1 - MIN_PERCENTAGE_KNOWLEDGE)) - tokens_used
         )
         messages, tokens_used_messages = self._build_messages(
-            session=session, max_tokens=max_tokens_messages, min_len=3
+            session=session,
+            max_tokens=max_tokens_messages,
+            min_len=MIN_MESSAGES,
+            encoding_name=encoding_name,
         )
         tokens_used += tokens_used_messages
 
@@ -21,6 +21,23 @@ ANALYSIS_PROMPT = (
     "last {days} days. Use these to answer questions."
 )
 
+ANALYSIS_MAP_PROMPT = (
+    "You are an expert in data analysis. Below, enclosed by triple quotation marks, "
+    "is part {part} of {parts} of the questions that have been asked to an AI assistant "
+    "in the last {days} days. Questions that were asked more than once are listed once, "
+    "with the number of times they were asked. Answer the question using only these "
+    "questions. Your answer will be combined with the answers for the other parts, so "
+    "include the number of questions and examples where it is relevant."
+)
+
+ANALYSIS_REDUCE_PROMPT = (
+    "You are an expert in data analysis. The questions that have been asked to an AI "
+    "assistant in the last {days} days were too many to read at once, so they were split "
+    "in parts, and the question was answered for every part. Below, enclosed by triple "
+    "quotation marks, are these answers. Combine them into one answer to the question, "
+    "as if you had read all of the questions."
+)
+
 SET_TITLE_OF_CONVERSATION_PROMPT = """
 You are an expert in summarizing conversations.
 
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+import tiktoken
+from pydantic_settings import BaseSettings
+
+from intric.ai_models.model_enums import ModelFamily
+
+if TYPE_CHECKING:
+    from intric.ai_models.completion_models.completion_model import CompletionModel
+
+
+class TokenizerSettings(BaseSettings):
+    tokenizer_cache_size: int = 20_000
+    # Texts longer than this are tokenized in a separate process, if there are any
+    tokenizer_offload_min_length: int = 200_000  # Characters
+    tokenizer_processes: int = 0
+
+
+settings = TokenizerSettings()
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Shorter texts are cheaper to tokenize than to keep track of
+MIN_CACHED_LENGTH = 256
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(encoding_name)
+
+
+def _count(encoding_name: str, text: str) -> int:
+    return len(_get_encoding(encoding_name).encode(text))
+
+
+@lru_cache(maxsize=1024)
+def _get_encoding_name(family: ModelFamily, name: str) -> str:
+    if family in (ModelFamily.OPEN_AI, ModelFamily.AZURE):
+        try:
+            return tiktoken.encoding_name_for_model(name)
+        except KeyError:
+            pass
+
+    return DEFAULT_ENCODING
+
+
+def get_encoding_name(model: Optional["CompletionModel"]) -> str:
+    """The encoding to count the tokens of `model` with.
+
+    Only OpenAI models have a tokenizer that is available locally, the
+    tokens of other families are approximated with the default encoding.
+    """
+    if model is None:
+        return DEFAULT_ENCODING
+
+    return _get_encoding_name(model.family, model.name)
+
+
+class TokenizerService:
+    """Counts tokens, remembering the counts of recent texts by their hash.
+
+    The same texts are counted over and over: the history of a session on
+    every turn, and the prompt and attachments of an assistant on every
+    question. Texts longer than `offload_min_length` are tokenized in a pool
+    of `processes` processes, when there is one, so that they do not hold
+    the GIL of the process serving requests.
+
+    `count` waits for the pool in the calling thread. Callers on the event
+    loop use `count_async`, which awaits it, or tokenizes long texts in a
+    thread when there is no pool.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = settings.tokenizer_cache_size,
+        offload_min_length: int = settings.tokenizer_offload_min_length,
+        processes: int = settings.tokenizer_processes,
+    ):
+        self.cache_size = cache_size
+        self.offload_min_length = offload_min_length
+        self.processes = processes
+
+        self._cache: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def _key(text: str, encoding_name: str) -> tuple[str, bytes]:
+        return encoding_name, hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.processes)
+
+            return self._pool
+
+    def _get_cached(self, key: tuple[str, bytes]) -> Optional[int]:
+        with self._lock:
+            num_tokens = self._cache.get(key)
+            if num_tokens is not None:
+                self._cache.move_to_end(key)
+
+            return num_tokens
+
+    def _set_cached(self, key: tuple[str, bytes], num_tokens: int):
+        with self._lock:
+            self._cache[key] = num_tokens
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _encode_and_count(self, text: str, encoding_name: str) -> int:
+        if self.processes > 0 and self.is_large(text):
+            return self._get_pool().submit(_count, encoding_name, text).result()
+
+        return _count(encoding_name, text)
+
+    async def _encode_and_count_async(self, text: str, encoding_name: str) -> int:
+        if not self.is_large(text):
+            return _count(encoding_name, text)
+
+        if self.processes > 0:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), _count, encoding_name, text)
+
+        return await asyncio.to_thread(_count, encoding_name, text)
+
+    def count(self, text: Optional[str], encoding_name: str = DEFAULT_ENCODING) -> int:
+        if not text:
+            return 0
+
+        if len(text) < MIN_CACHED_LENGTH:
+            return _count(encoding_name, text)
+
+        key = self._key(text, encoding_name)
+        num_tokens = self._get_cached(key)
+        if num_tokens is None:
+            num_tokens = self._encode_and_count(text, encoding_name)
+            self._set_cached(key, num_tokens)
+
+        return num_tokens
+
+    async def count_async(self, text: Optional[str], encoding_name: str = DEFAULT_ENCODING) -> int:
+        if not text:
+            return 0
+
+        if len(text) < MIN_CACHED_LENGTH:
+            return _count(encoding_name, text)
+
+        key = self._key(text, encoding_name)
+        num_tokens = self._get_cached(key)
+        if num_tokens is None:
+            num_tokens = await self._encode_and_count_async(text, encoding_name)
+            self._set_cached(key, num_tokens)
+
+        return num_tokens
+
+    def is_large(self, text: Optional[str]) -> bool:
+        return text is not None and len(text) >= self.offload_min_length
+
+
+tokenizer_service = TokenizerService()
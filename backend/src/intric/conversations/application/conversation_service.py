@@ -79,7 +79,9 @@ class ConversationService:
         # case 1: continuing a conversation (session_id is provided)
         if session_id:
             # get session information to determine where it belongs
-            session = await self.session_service.get_session_by_uuid(session_id)
+            session = await self.session_service.get_session_by_uuid(
+                session_id, with_questions=False
+            )
 
             if session.group_chat_id:
                 # this is a group chat conversation
@@ -1,88 +1,151 @@
 import asyncio
-import json
-import os
+import time
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from tempfile import NamedTemporaryFile, TemporaryDirectory
-from typing import Iterable, Optional
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Optional
 
 import crochet
 from scrapy.crawler import CrawlerRunner
+from twisted.internet import threads
+from twisted.internet.defer import Deferred
 
+from intric.crawler.middlewares import ConditionalRequestMiddleware
 from intric.crawler.parse_html import CrawledPage
-from intric.crawler.pipelines import FileNamePipeline
+from intric.crawler.pipelines import FileNamePipeline, PageQueue, PageQueuePipeline
 from intric.crawler.spiders.crawl_spider import CrawlSpider
 from intric.crawler.spiders.sitemap_spider import SitemapSpider
 from intric.main.config import SETTINGS
 from intric.main.exceptions import CrawlerException
+from intric.main.logging import get_logger
 from intric.websites.domain.crawl_run import CrawlType
 
+if TYPE_CHECKING:
+    from intric.websites.crawl_dependencies.crawl_models import CrawledPageValidators
+
+logger = get_logger(__name__)
+
+# Seconds to wait for a running crawl to stop
+STOP_TIMEOUT = 60
+
 
 @dataclass
 class Crawl:
-    pages: Iterable[CrawledPage]
+    pages: AsyncIterator[CrawledPage]
     files: Optional[Iterable[Path]]
 
+    # Set when the crawl was stopped at `crawl_max_length`, before it could finish
+    timed_out: bool = False
 
-def create_runner(filepath: str, files_dir: Optional[str] = None):
+
+def create_runner(files_dir: Optional[str] = None):
     settings = {
-        "FEEDS": {filepath: {"format": "jsonl", "item_classes": [CrawledPage]}},
         "CLOSESPIDER_ITEMCOUNT": SETTINGS.closespider_itemcount,
         "AUTOTHROTTLE_ENABLED": SETTINGS.autothrottle_enabled,
         "ROBOTSTXT_OBEY": SETTINGS.obey_robots,
         "DOWNLOAD_MAXSIZE": SETTINGS.upload_max_file_size,
+        "DOWNLOADER_MIDDLEWARES": {ConditionalRequestMiddleware: 100},
+        "ITEM_PIPELINES": {PageQueuePipeline: 400},
     }
 
     if files_dir is not None:
-        settings["ITEM_PIPELINES"] = {FileNamePipeline: 300}
+        settings["ITEM_PIPELINES"][FileNamePipeline] = 300
         settings["FILES_STORE"] = files_dir
 
     return CrawlerRunner(settings=settings)
 
 
+def _finish_on_completion(d: Deferred, page_queue: PageQueue):
+    def _finish(result):
+        finished = threads.deferToThread(page_queue.finish)
+        finished.addCallback(lambda _: result)
+        return finished
+
+    return d.addBoth(_finish)
+
+
 class Crawler:
-    @crochet.wait_for(SETTINGS.crawl_max_length)
+    @crochet.run_in_reactor
     @staticmethod
     def _run_crawl(
+        runner: CrawlerRunner,
         url: str,
-        download_files: bool = False,
         *,
-        filepath: Path,
-        files_dir: Optional[Path],
+        page_queue: PageQueue,
+        known_pages: Optional[dict[str, "CrawledPageValidators"]] = None,
     ):
-        files_dir = files_dir if download_files else None
-        runner = create_runner(filepath=filepath, files_dir=files_dir)
-        return runner.crawl(CrawlSpider, url=url)
+        d = runner.crawl(CrawlSpider, url=url, page_queue=page_queue, known_pages=known_pages)
+        return _finish_on_completion(d, page_queue)
 
-    @crochet.wait_for(SETTINGS.crawl_max_length)
+    @crochet.run_in_reactor
+    @staticmethod
+    def _run_sitemap_crawl(
+        runner: CrawlerRunner,
+        sitemap_url: str,
+        *,
+        page_queue: PageQueue,
+        known_pages: Optional[dict[str, "CrawledPageValidators"]] = None,
+    ):
+        d = runner.crawl(
+            SitemapSpider,
+            sitemap_url=sitemap_url,
+            page_queue=page_queue,
+            known_pages=known_pages,
+        )
+        return _finish_on_completion(d, page_queue)
+
+    @crochet.wait_for(STOP_TIMEOUT)
     @staticmethod
-    def _run_sitemap_crawl(sitemap_url: str, *, filepath: Path, files_dir: Optional[Path]):
-        runner = create_runner(filepath=filepath)
-        return runner.crawl(SitemapSpider, sitemap_url=sitemap_url)
+    def _stop_crawl(runner: CrawlerRunner):
+        return runner.stop()
 
     @asynccontextmanager
-    async def _crawl(self, func, **kwargs):
-        with NamedTemporaryFile() as tmp_file:
-            with TemporaryDirectory() as tmp_dir:
-                await asyncio.to_thread(func, filepath=tmp_file.name, files_dir=tmp_dir, **kwargs)
+    async def _crawl(self, func, download_files: bool = False, **kwargs):
+        page_queue = PageQueue(maxsize=SETTINGS.crawl_queue_size)
+
+        with TemporaryDirectory() as tmp_dir:
+            runner = create_runner(files_dir=tmp_dir if download_files else None)
+            crawl_run = func(runner, page_queue=page_queue, **kwargs)
+
+            async def _iter_pages():
+                deadline = time.monotonic() + SETTINGS.crawl_max_length
+                num_pages = 0
+
+                while True:
+                    try:
+                        page = await page_queue.get(timeout=deadline - time.monotonic())
+                    except TimeoutError:
+                        logger.warning("Crawl timed out, keeping the pages crawled so far")
+                        crawl.timed_out = True
+                        return
+
+                    if page is None:
+                        break
+
+                    num_pages += 1
+                    yield page
 
-                # If the result file is empty
                 # (This will fail if the expected result is no pages but some files)
-                if os.stat(tmp_file.name).st_size == 0:
+                if num_pages == 0:
                     raise CrawlerException("Crawl failed")
 
-                def _iter_pages():
-                    with open(tmp_file.name) as f:
-                        for line in f:
-                            jsonl = json.loads(line)
-                            yield CrawledPage(**jsonl)
+            def _iter_files():
+                p = Path(tmp_dir)
+                return p.iterdir()
 
-                def _iter_files():
-                    p = Path(tmp_dir)
-                    return p.iterdir()
+            crawl = Crawl(pages=_iter_pages(), files=_iter_files())
 
-                yield Crawl(pages=_iter_pages(), files=_iter_files())
+            try:
+                yield crawl
+            finally:
+                # Unblock the reactor thread, and stop the crawl if it is still running
+                page_queue.close()
+                try:
+                    await asyncio.to_thread(self._stop_crawl, runner)
+                    await asyncio.to_thread(crawl_run.wait, STOP_TIMEOUT)
+                except Exception:
+                    logger.exception("Exception while stopping crawl")
 
     @asynccontextmanager
     async def crawl(
@@ -90,17 +153,28 @@ class Crawler:
         url: str,
         download_files: bool = False,
         crawl_type: CrawlType = CrawlType.CRAWL,
+        known_pages: Optional[dict[str, "CrawledPageValidators"]] = None,
     ):
+        """Pages are yielded while the crawl is running, as they are scraped.
+
+        Downloaded files are available once all pages have been consumed.
+
+        `known_pages` maps the urls of previously crawled pages to their
+        validators. These are sent as conditional request headers, and pages
+        the server reports as not modified are yielded with `unchanged` set."""
         if crawl_type == CrawlType.CRAWL:
             async with self._crawl(
                 self._run_crawl,
                 url=url,
                 download_files=download_files,
+                known_pages=known_pages,
             ) as crawl_result:
                 yield crawl_result
 
         elif crawl_type == CrawlType.SITEMAP:
-            async with self._crawl(self._run_sitemap_crawl, sitemap_url=url) as crawl_result:
+            async with self._crawl(
+                self._run_sitemap_crawl, sitemap_url=url, known_pages=known_pages
+            ) as crawl_result:
                 yield crawl_result
 
         else:
@@ -0,0 +1,33 @@
+from typing import Optional
+
+import scrapy
+from scrapy import Spider
+
+from intric.websites.crawl_dependencies.crawl_models import CrawledPageValidators
+
+
+class ConditionalRequestMiddleware:
+    """Send the validators of previously crawled pages along with the requests.
+
+    Servers that support them answer with 304 Not Modified, and an empty body,
+    for pages that have not changed since the last crawl. Expects the spider to
+    have a `known_pages` attribute, mapping urls to their validators.
+    """
+
+    def process_request(self, request: scrapy.Request, spider: Spider):
+        known_pages: Optional[dict[str, CrawledPageValidators]] = getattr(
+            spider, "known_pages", None
+        )
+        if not known_pages:
+            return None
+
+        validators = known_pages.get(request.url)
+        if validators is None:
+            return None
+
+        if validators.etag is not None:
+            request.headers.setdefault("If-None-Match", validators.etag)
+        if validators.last_modified is not None:
+            request.headers.setdefault("If-Modified-Since", validators.last_modified)
+
+        return None
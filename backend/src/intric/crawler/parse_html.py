@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
@@ -11,11 +12,35 @@ from intric.files.text import TextMimeTypes
 @dataclass
 class CrawledPage:
     url: str
-    title: str
+    title: Optional[str]
     content: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Set when the server answered a conditional request with 304 Not Modified
+    unchanged: bool = False
+    # The links of the page, if the spider follows them
+    links: Optional[list[str]] = None
+
+
+def _get_header(response: Response, name: str) -> Optional[str]:
+    value = response.headers.get(name)
+    if value is None:
+        return None
+
+    return value.decode("latin-1")
 
 
 def parse_response(response: Response):
+    if response.status == 304:
+        return CrawledPage(
+            url=response.url,
+            title=None,
+            content="",
+            etag=_get_header(response, "ETag"),
+            last_modified=_get_header(response, "Last-Modified"),
+            unchanged=True,
+        )
+
     soup = BeautifulSoup(response.body, "lxml")
 
     # Replace relative links with absolute
@@ -26,7 +51,13 @@ def parse_response(response: Response):
     title = response.css("title::text").get()
     url = response.url
 
-    return CrawledPage(url=url, title=title, content=content)
+    return CrawledPage(
+        url=url,
+        title=title,
+        content=content,
+        etag=_get_header(response, "ETag"),
+        last_modified=_get_header(response, "Last-Modified"),
+    )
 
 
 def parse_file(response: Response):
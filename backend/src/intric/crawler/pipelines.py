@@ -1,10 +1,20 @@
+import asyncio
+import queue
+import threading
 from email.message import Message
 from pathlib import PurePosixPath
+from typing import Optional
 from urllib.parse import urlparse
 
 import scrapy
 import scrapy.http
 from scrapy.pipelines.files import FilesPipeline
+from twisted.internet import threads
+
+from intric.crawler.parse_html import CrawledPage
+
+# Seconds to block at a time, so that closing the queue is noticed in time
+POLL_INTERVAL = 1
 
 
 class FileNamePipeline(FilesPipeline):
@@ -24,3 +34,72 @@ class FileNamePipeline(FilesPipeline):
                 return msg.get_filename()
 
         return PurePosixPath(urlparse(request.url).path).name
+
+
+class PageQueue:
+    """Bounded, thread safe queue of crawled pages.
+
+    Pages are put on the queue from the reactor thread, and consumed on the
+    worker's event loop while the crawl is still running. Producers block
+    while the queue is full, until the queue is closed.
+    """
+
+    _FINISHED = object()
+
+    def __init__(self, maxsize: int):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._closed = threading.Event()
+
+    def put(self, item) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def finish(self):
+        self.put(self._FINISHED)
+
+    def close(self):
+        self._closed.set()
+
+    async def get(self, timeout: float) -> Optional[CrawledPage]:
+        """Returns `None` when the crawl is finished.
+
+        Raises `TimeoutError` if no page arrived within `timeout` seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError()
+
+            try:
+                item = await asyncio.to_thread(
+                    self._queue.get, timeout=min(remaining, POLL_INTERVAL)
+                )
+            except queue.Empty:
+                continue
+
+            return None if item is self._FINISHED else item
+
+
+class PageQueuePipeline:
+    """Hands crawled pages over to the `page_queue` of the spider.
+
+    The returned deferred fires when the page is on the queue, which keeps
+    Scrapy from scraping further ahead than the consumer can keep up with.
+    """
+
+    def process_item(self, item, spider: scrapy.Spider):
+        page_queue: Optional[PageQueue] = getattr(spider, "page_queue", None)
+        if page_queue is None or not isinstance(item, CrawledPage):
+            return item
+
+        d = threads.deferToThread(page_queue.put, item)
+        d.addCallback(lambda _: item)
+        return d
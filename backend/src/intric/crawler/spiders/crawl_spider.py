@@ -1,20 +1,27 @@
+import html
+from typing import TYPE_CHECKING, Optional
 from urllib.parse import urlparse
 
 import scrapy
-from scrapy.http import Response
+from scrapy.http import HtmlResponse, Response
 from scrapy.linkextractors import LinkExtractor
 from scrapy.spiders import Rule
 
-from intric.crawler.parse_html import parse_file, parse_response
+from intric.crawler.parse_html import CrawledPage, parse_file, parse_response
+
+if TYPE_CHECKING:
+    from intric.websites.crawl_dependencies.crawl_models import CrawledPageValidators
 
 
 class CrawlSpider(scrapy.spiders.CrawlSpider):
     name = "crawlspider"
+    handle_httpstatus_list = [304]
 
     def __init__(
         self,
         url: str,
         *args,
+        known_pages: Optional[dict[str, "CrawledPageValidators"]] = None,
         **kwargs,
     ):
         parsed_uri = urlparse(url)
@@ -22,10 +29,20 @@ class CrawlSpider(scrapy.spiders.CrawlSpider):
         self.allowed_domains = [parsed_uri.netloc]
         self.start_urls = [url]
 
+        # Unchanged pages come back without a body, and are followed through
+        # the links they had when they were last crawled. Pages crawled before
+        # their links were stored are requested unconditionally, once.
+        self.known_pages = {
+            page_url: validators
+            for page_url, validators in (known_pages or {}).items()
+            if validators.links is not None
+        }
+
+        self._page_links = LinkExtractor(allow_domains=self.allowed_domains, deny_extensions=[])
         self.rules = [
             Rule(
                 LinkExtractor(allow=url),
-                callback=parse_response,
+                callback=self.parse_page,
                 follow=True,
             ),
             Rule(LinkExtractor(deny_extensions=[]), callback=parse_file),
@@ -33,5 +50,34 @@ class CrawlSpider(scrapy.spiders.CrawlSpider):
 
         super().__init__(*args, **kwargs)
 
+    def parse_page(self, response: Response) -> CrawledPage:
+        page = parse_response(response)
+
+        if isinstance(response, HtmlResponse) and not page.unchanged:
+            page.links = [link.url for link in self._page_links.extract_links(response)]
+
+        return page
+
+    def start_requests(self):
+        # Unlike the default, go through the duplicate filter, so that the
+        # start page is not fetched again when other pages link back to it
+        for url in self.start_urls:
+            yield scrapy.Request(url)
+
     def parse_start_url(self, response: Response):
-        return parse_response(response)
+        return self.parse_page(response)
+
+    def _requests_to_follow(self, response: Response):
+        if response.status != 304:
+            yield from super()._requests_to_follow(response)
+            return
+
+        known_page = self.known_pages.get(response.url)
+        if known_page is None or not known_page.links:
+            return
+
+        # Apply the rules to the links of the page, as if it had been sent again
+        body = "".join(f'<a href="{html.escape(link)}"></a>' for link in known_page.links)
+        yield from super()._requests_to_follow(
+            HtmlResponse(response.url, body=body, encoding="utf-8", request=response.request)
+        )
@@ -1,14 +1,27 @@
+from typing import TYPE_CHECKING, Optional
+
 import scrapy
 from scrapy.http import Response
 
 from intric.crawler.parse_html import parse_response
 
+if TYPE_CHECKING:
+    from intric.websites.crawl_dependencies.crawl_models import CrawledPageValidators
+
 
 class SitemapSpider(scrapy.spiders.SitemapSpider):
     name = "sitemapspider"
+    handle_httpstatus_list = [304]
 
-    def __init__(self, sitemap_url: str, *args, **kwargs):
+    def __init__(
+        self,
+        sitemap_url: str,
+        *args,
+        known_pages: Optional[dict[str, "CrawledPageValidators"]] = None,
+        **kwargs,
+    ):
         self.sitemap_urls = [sitemap_url]
+        self.known_pages = known_pages or {}
 
         super().__init__(*args, **kwargs)
 
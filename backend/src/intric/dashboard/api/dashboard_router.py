@@ -17,7 +17,7 @@ async def get_dashboard(
     assembler = container.space_assembler()
 
     spaces = await space_service.get_spaces(
-        include_personal=not only_published, include_applications=True
+        include_personal=not only_published, include_applications=True, summary=True
     )
 
     space_models = [
@@ -1,6 +1,11 @@
+import asyncio
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 import sqlalchemy as sa
+from pydantic_settings import BaseSettings
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
 
@@ -8,52 +13,160 @@ from intric.database.tables.app_table import AppRuns, Apps
 from intric.database.tables.assistant_table import Assistants
 from intric.database.tables.questions_table import Questions
 from intric.database.tables.sessions_table import Sessions
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class DataRetentionSettings(BaseSettings):
+    data_retention_batch_size: int = 1000
+    # Pause between batches, to let replication and other queries catch up
+    data_retention_batch_pause: float = 0.1  # Seconds
+    # Stop after this long, and continue from the oldest rows left on the next run
+    data_retention_max_run_seconds: Optional[float] = None
+
+
+settings = DataRetentionSettings()
+
+
+@dataclass
+class DeletionReport:
+    table: str
+    rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    completed: bool = True
+    # How far behind the deletion is, when stopped before it was completed
+    lag: Optional[timedelta] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
 
 
 class DataRetentionService:
-    def __init__(self, session: AsyncSession):
+    """Deletes data that is past its retention, in batches of `batch_size` rows.
+
+    Every batch is committed on its own, so that locks are held, and WAL is
+    written, a batch at a time. The rows are deleted in the order of
+    `(created_at, id)`, continuing from the last row of the previous batch,
+    so that rows that are kept are only scanned once. A run that is stopped,
+    or crashes, loses at most the batch it was deleting: the next run
+    starts over from the oldest rows left.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        batch_size: int = settings.data_retention_batch_size,
+        batch_pause: float = settings.data_retention_batch_pause,
+        max_run_seconds: Optional[float] = settings.data_retention_max_run_seconds,
+    ):
         self.session = session
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.max_run_seconds = max_run_seconds
 
-    async def delete_old_questions(self):
-        subquery = (
-            sa.select(Questions.id)
-            .join(Assistants, Questions.assistant_id == Assistants.id)
-            .where(
-                sa.and_(
-                    Assistants.data_retention_days.isnot(None),
-                    Questions.created_at
-                    < sa.func.now() - Assistants.data_retention_days * text("INTERVAL '1 day'"),
-                )
+    async def _delete_in_batches(self, table, select_batch) -> DeletionReport:
+        """Delete the rows of `table` selected by `select_batch(after)` until there are none."""
+        report = DeletionReport(table=table.__tablename__)
+        started_at = time.monotonic()
+        after = None
+
+        while True:
+            ids = select_batch(after).limit(self.batch_size).scalar_subquery()
+            stmt = (
+                sa.delete(table)
+                .where(table.id.in_(ids))
+                .returning(table.created_at, table.id)
+                .execution_options(synchronize_session=False)
             )
+
+            async with self.session.begin():
+                deleted = (await self.session.execute(stmt)).all()
+
+            report.rows += len(deleted)
+            report.batches += 1
+            report.seconds = time.monotonic() - started_at
+
+            if len(deleted) < self.batch_size:
+                break
+
+            after = max(tuple(row) for row in deleted)
+
+            if self.max_run_seconds is not None and report.seconds >= self.max_run_seconds:
+                report.completed = False
+                report.lag = datetime.now(timezone.utc) - after[0]
+                break
+
+            await asyncio.sleep(self.batch_pause)
+
+        logger.info(
+            "Deleted %d rows from %s in %d batches, %.0f rows/s%s",
+            report.rows,
+            report.table,
+            report.batches,
+            report.rows_per_second,
+            "" if report.completed else f", stopped {report.lag} behind",
         )
 
-        query = sa.delete(Questions).where(Questions.id.in_(subquery))
-        await self.session.execute(query)
+        return report
 
-    async def delete_old_app_runs(self):
-        subquery = (
-            sa.select(AppRuns.id)
-            .join(Apps, AppRuns.app_id == Apps.id)
-            .where(
-                sa.and_(
-                    Apps.data_retention_days.isnot(None),
-                    AppRuns.created_at
-                    < sa.func.now() - Apps.data_retention_days * text("INTERVAL '1 day'"),
+    @staticmethod
+    def _after(stmt: sa.Select, table, after: Optional[tuple]):
+        if after is not None:
+            stmt = stmt.where(sa.tuple_(table.created_at, table.id) > sa.tuple_(*after))
+
+        return stmt.order_by(table.created_at, table.id)
+
+    async def delete_old_questions(self) -> DeletionReport:
+        now = datetime.now(timezone.utc)
+
+        def select_batch(after: Optional[tuple]):
+            stmt = (
+                sa.select(Questions.id)
+                .join(Assistants, Questions.assistant_id == Assistants.id)
+                .where(
+                    sa.and_(
+                        Assistants.data_retention_days.isnot(None),
+                        Questions.created_at
+                        < now - Assistants.data_retention_days * text("INTERVAL '1 day'"),
+                    )
                 )
             )
-        )
+            return self._after(stmt, Questions, after)
+
+        return await self._delete_in_batches(Questions, select_batch)
 
-        query = sa.delete(AppRuns).where(AppRuns.id.in_(subquery))
-        await self.session.execute(query)
+    async def delete_old_app_runs(self) -> DeletionReport:
+        now = datetime.now(timezone.utc)
 
-    async def delete_old_sessions(self):
+        def select_batch(after: Optional[tuple]):
+            stmt = (
+                sa.select(AppRuns.id)
+                .join(Apps, AppRuns.app_id == Apps.id)
+                .where(
+                    sa.and_(
+                        Apps.data_retention_days.isnot(None),
+                        AppRuns.created_at
+                        < now - Apps.data_retention_days * text("INTERVAL '1 day'"),
+                    )
+                )
+            )
+            return self._after(stmt, AppRuns, after)
+
+        return await self._delete_in_batches(AppRuns, select_batch)
+
+    async def delete_old_sessions(self) -> DeletionReport:
         one_day_ago = datetime.now(timezone.utc) - timedelta(days=1)
 
-        subquery = (
-            sa.select(Sessions.id)
-            .outerjoin(Questions, Sessions.id == Questions.session_id)
-            .where(sa.and_(Sessions.created_at < one_day_ago, Questions.id.is_(None)))
-        )
+        def select_batch(after: Optional[tuple]):
+            stmt = sa.select(Sessions.id).where(
+                sa.and_(
+                    Sessions.created_at < one_day_ago,
+                    ~sa.exists().where(Questions.session_id == Sessions.id),
+                )
+            )
+            return self._after(stmt, Sessions, after)
 
-        query = sa.delete(Sessions).where(Sessions.id.in_(subquery))
-        await self.session.execute(query)
+        return await self._delete_in_batches(Sessions, select_batch)
@@ -8,8 +8,9 @@ worker = Worker()
 async def cleanup_old_data(container: Container):
     data_retention_service = container.data_retention_service()
 
-    async with container.session().begin():
-        await data_retention_service.delete_old_questions()
-        await data_retention_service.delete_old_app_runs()
-        await data_retention_service.delete_old_sessions()
+    # Every batch is committed on its own
+    await data_retention_service.delete_old_questions()
+    await data_retention_service.delete_old_app_runs()
+    await data_retention_service.delete_old_sessions()
+
     return True
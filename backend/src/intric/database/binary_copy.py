@@ -0,0 +1,56 @@
+"""Encoding of rows in the binary format of `COPY ... FROM STDIN (FORMAT binary)`.
+
+Every row is a 16 bit field count followed by the fields, each a 32 bit
+length followed by the value as the type's binary receive function expects
+it. A length of -1 is NULL. All integers are big endian.
+"""
+
+import struct
+from typing import Optional
+from uuid import UUID
+
+import numpy as np
+
+HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+TRAILER = struct.pack("!h", -1)
+
+_NULL = struct.pack("!i", -1)
+
+
+def encode_field_count(num_fields: int) -> bytes:
+    return struct.pack("!h", num_fields)
+
+
+def encode_text(value: Optional[str]) -> bytes:
+    if value is None:
+        return _NULL
+
+    encoded = value.encode()
+    return struct.pack("!i", len(encoded)) + encoded
+
+
+def encode_int4(value: Optional[int]) -> bytes:
+    if value is None:
+        return _NULL
+
+    return struct.pack("!ii", 4, value)
+
+
+def encode_uuid(value: Optional[UUID]) -> bytes:
+    if value is None:
+        return _NULL
+
+    return struct.pack("!i", 16) + value.bytes
+
+
+def encode_vectors(embeddings: np.ndarray) -> list[bytes]:
+    """Encode each row of the matrix as a pgvector `vector`.
+
+    A vector is a 16 bit dimension, 16 unused bits and the float4 values.
+    """
+    num_rows, dimensions = embeddings.shape
+    prefix = struct.pack("!ihh", 4 + 4 * dimensions, dimensions, 0)
+    values = np.ascontiguousarray(embeddings, dtype=">f4").tobytes()
+
+    row_size = 4 * dimensions
+    return [prefix + values[i * row_size : (i + 1) * row_size] for i in range(num_rows)]
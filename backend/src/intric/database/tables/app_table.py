@@ -1,7 +1,7 @@
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -71,6 +71,8 @@ class AppRuns(BasePublic):
     user: Mapped[Users] = relationship()
     job: Mapped[Jobs] = relationship()
 
+    __table_args__ = (Index("ix_app_runs_created_at_id", "created_at", "id"),)
+
 
 class InputFields(BasePublic):
     type: Mapped[str] = mapped_column()
@@ -1,19 +1,31 @@
+from typing import Optional
 from uuid import UUID
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import ForeignKey
+from sqlalchemy import Computed, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from intric.database.tables.base_class import BasePublic
 from intric.database.tables.info_blobs_table import InfoBlobs
 from intric.database.tables.tenant_table import Tenants
 
+# The 'simple' configuration does no stemming and no stop-word removal,
+# which keeps case numbers, paragraph references and other exact terms
+# intact regardless of the language of the document.
+TEXT_SEARCH_CONFIG = "simple"
+
 
 class InfoBlobChunks(BasePublic):
     text: Mapped[str] = mapped_column()
     chunk_no: Mapped[int] = mapped_column()
     size: Mapped[int] = mapped_column()
     embedding: Mapped[list[float]] = mapped_column(Vector)
+    text_search: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{TEXT_SEARCH_CONFIG}', text)", persisted=True),
+        deferred=True,
+    )
 
     # Foreign keys
     info_blob_id: Mapped[UUID] = mapped_column(
@@ -22,3 +34,18 @@ class InfoBlobChunks(BasePublic):
     tenant_id: Mapped[UUID] = mapped_column(
         ForeignKey(Tenants.id, ondelete="CASCADE"), index=True
     )
+
+    # sha256 of the text, see `get_content_hash`
+    content_hash: Mapped[Optional[str]] = mapped_column(index=True)
+
+    # Denormalized from the info blob: the id of its group, website
+    # or integration knowledge
+    source_id: Mapped[Optional[UUID]] = mapped_column(index=True)
+
+    __table_args__ = (
+        Index(
+            "ix_info_blob_chunks_text_search",
+            "text_search",
+            postgresql_using="gin",
+        ),
+    )
@@ -2,6 +2,7 @@ from typing import Optional
 from uuid import UUID
 
 from sqlalchemy import ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from intric.database.tables.ai_models_table import EmbeddingModels
@@ -19,6 +20,13 @@ class InfoBlobs(BasePublic):
     url: Mapped[Optional[str]] = mapped_column()
     size: Mapped[int] = mapped_column()
 
+    # Set on crawled pages, to be able to skip them when they are unchanged
+    content_hash: Mapped[Optional[str]] = mapped_column()
+    etag: Mapped[Optional[str]] = mapped_column()
+    last_modified: Mapped[Optional[str]] = mapped_column()
+    # The links of a crawled page, followed again when it comes back unchanged
+    links: Mapped[Optional[list[str]]] = mapped_column(JSONB, deferred=True)
+
     # Foreign keys
     user_id: Mapped[UUID] = mapped_column(ForeignKey(Users.id, ondelete="CASCADE"), index=True)
     tenant_id: Mapped[UUID] = mapped_column(ForeignKey(Tenants.id, ondelete="CASCADE"))
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.ext.associationproxy import AssociationProxy, association_proxy
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -65,6 +65,11 @@ class Questions(BasePublic):
         order_by="WebSearchResult.score.desc()"
     )
 
+    __table_args__ = (
+        Index("ix_questions_session_id_created_at", "session_id", "created_at"),
+        Index("ix_questions_created_at_id", "created_at", "id"),
+    )
+
 
 class InfoBlobReferences(BaseCrossReference):
     question_id: Mapped[UUID] = mapped_column(
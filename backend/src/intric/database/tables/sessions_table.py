@@ -36,4 +36,8 @@ class Sessions(BasePublic):
     )
     group_chat: Mapped[Optional[GroupChatsTable]] = relationship(viewonly=True)
 
-    __table_args__ = (Index("created_at_idx", "created_at"),)
+    __table_args__ = (
+        Index("created_at_idx", "created_at"),
+        Index("ix_sessions_assistant_id_created_at", "assistant_id", "created_at"),
+        Index("ix_sessions_group_chat_id_created_at", "group_chat_id", "created_at"),
+    )
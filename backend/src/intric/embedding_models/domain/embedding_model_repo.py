@@ -14,16 +14,36 @@ from intric.main.exceptions import NotFoundException
 if TYPE_CHECKING:
     from uuid import UUID
 
+    from intric.ai_models.ai_model_catalog import AIModelCatalog
     from intric.database.database import AsyncSession
     from intric.users.user import UserInDB
 
 
 class EmbeddingModelRepository:
-    def __init__(self, session: "AsyncSession", user: "UserInDB"):
+    def __init__(
+        self,
+        session: "AsyncSession",
+        user: "UserInDB",
+        ai_model_catalog: Optional["AIModelCatalog"] = None,
+    ):
         self.session = session
         self.user = user
+        self.ai_model_catalog = ai_model_catalog
 
-    async def all(self, with_deprecated: bool = False):
+    async def all(self, with_deprecated: bool = False) -> list["EmbeddingModel"]:
+        if self.ai_model_catalog is None:
+            embedding_models = await self._all()
+        else:
+            embedding_models = await self.ai_model_catalog.get_models(
+                self.session, kind="embedding_models", user=self.user, load=self._all
+            )
+
+        if not with_deprecated:
+            return [model for model in embedding_models if not model.is_deprecated]
+
+        return embedding_models
+
+    async def _all(self) -> list["EmbeddingModel"]:
         stmt = (
             sa.select(EmbeddingModels, EmbeddingModelSettings)
             .outerjoin(
@@ -46,9 +66,6 @@ class EmbeddingModelRepository:
             )
         )
 
-        if not with_deprecated:
-            stmt = stmt.where(EmbeddingModels.is_deprecated == False)  # noqa
-
         result = await self.session.execute(stmt)
         embedding_models = result.all()
 
@@ -62,6 +79,10 @@ class EmbeddingModelRepository:
         ]
 
     async def one_or_none(self, model_id: "UUID") -> Optional["EmbeddingModel"]:
+        if self.ai_model_catalog is not None:
+            models = await self.all(with_deprecated=True)
+            return next((model for model in models if model.id == model_id), None)
+
         stmt = (
             sa.select(EmbeddingModels, EmbeddingModelSettings)
             .outerjoin(
@@ -2,31 +2,44 @@ import abc
 from abc import abstractmethod
 
 from intric.embedding_models.domain.embedding_model import EmbeddingModel
+from intric.embedding_models.infrastructure.embedding_batcher import pack_chunks, settings
 from intric.files.chunk_embedding_list import ChunkEmbeddingList
 from intric.info_blobs.info_blob import InfoBlobChunk
+from intric.main.logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class EmbeddingModelAdapter(abc.ABC):
     def __init__(self, model: EmbeddingModel):
         self.model = model
 
-    def _chunk_chunks(self, chunks: list["InfoBlobChunk"]):
-        cum_len = 0
-        prev_i = 0
-        for i, chunk in enumerate(chunks):
-            cum_len += len(chunk.text)
+    @property
+    def max_batch_tokens(self) -> int:
+        """Tokens per request. Self-hosted endpoints get one input of the model's size."""
+        return self.model.max_input or settings.embedding_self_hosted_batch_max_tokens
+
+    @property
+    def max_batch_size(self) -> int:
+        return settings.embedding_self_hosted_batch_max_size
 
-            if cum_len > self.model.max_input:
-                yield chunks[prev_i:i]
-                prev_i = i
-                cum_len = 0
+    async def get_embeddings(self, chunks: list[InfoBlobChunk]) -> ChunkEmbeddingList:
+        chunk_embedding_list = ChunkEmbeddingList()
+        for chunked_chunks in pack_chunks(
+            chunks, max_tokens=self.max_batch_tokens, max_size=self.max_batch_size
+        ):
+            logger.debug(f"Embedding a chunk of {len(chunked_chunks)} chunks")
 
-        yield chunks[prev_i:]
+            embeddings_for_chunks = await self.get_embeddings_for_chunks(chunked_chunks)
+            chunk_embedding_list.add(chunked_chunks, embeddings_for_chunks)
+
+        return chunk_embedding_list
 
     @abstractmethod
     async def get_embedding_for_query(self, query: str):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_embeddings(self, chunks: list[InfoBlobChunk]) -> ChunkEmbeddingList:
+    async def get_embeddings_for_chunks(self, chunks: list[InfoBlobChunk]) -> list[list[float]]:
+        """Embed the chunks in a single request to the provider."""
         raise NotImplementedError
@@ -9,9 +9,13 @@ from tenacity import (
 )
 
 from intric.embedding_models.infrastructure.adapters.base import EmbeddingModelAdapter
-from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from intric.embedding_models.infrastructure.embedding_batcher import settings as batch_settings
 from intric.main.config import get_settings
-from intric.main.exceptions import BadRequestException, OpenAIException
+from intric.main.exceptions import (
+    BadRequestException,
+    OpenAIException,
+    OpenAIRateLimitException,
+)
 from intric.main.logging import get_logger
 
 if TYPE_CHECKING:
@@ -31,17 +35,16 @@ class OpenAIEmbeddingAdapter(EmbeddingModelAdapter):
         self.client = client
         super().__init__(model)
 
-    async def get_embeddings(self, chunks: list["InfoBlobChunk"]) -> ChunkEmbeddingList:
-        chunk_embedding_list = ChunkEmbeddingList()
-        for chunked_chunks in self._chunk_chunks(chunks):
-            texts_for_chunks = [chunk.text for chunk in chunked_chunks]
-
-            logger.debug(f"Embedding a chunk of {len(chunked_chunks)} chunks")
+    @property
+    def max_batch_tokens(self) -> int:
+        return batch_settings.embedding_openai_batch_max_tokens
 
-            embeddings_for_chunks = await self._get_embeddings(texts=texts_for_chunks)
-            chunk_embedding_list.add(chunked_chunks, embeddings_for_chunks)
+    @property
+    def max_batch_size(self) -> int:
+        return batch_settings.embedding_openai_batch_max_size
 
-        return chunk_embedding_list
+    async def get_embeddings_for_chunks(self, chunks: list["InfoBlobChunk"]):
+        return await self._get_embeddings(texts=[chunk.text for chunk in chunks])
 
     async def get_embedding_for_query(self, query: str):
         truncated_query = query[: self.model.max_input]
@@ -71,7 +74,7 @@ class OpenAIEmbeddingAdapter(EmbeddingModelAdapter):
             raise BadRequestException("Invalid input") from e
         except openai.RateLimitError as e:
             logger.exception("Rate limit error:")
-            raise OpenAIException("OpenAI Ratelimit exception") from e
+            raise OpenAIRateLimitException("OpenAI Ratelimit exception") from e
         except Exception as e:
             logger.exception("Unknown OpenAI exception:")
             raise OpenAIException("Unknown OpenAI exception") from e
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from intric.ai_models.model_enums import ModelFamily
 from intric.embedding_models.infrastructure.adapters.base import EmbeddingModelAdapter
@@ -6,20 +6,34 @@ from intric.embedding_models.infrastructure.adapters.e5_embeddings import E5Adap
 from intric.embedding_models.infrastructure.adapters.openai_embeddings import (
     OpenAIEmbeddingAdapter,
 )
+from intric.embedding_models.infrastructure.embedding_batcher import EmbeddingBatcher
+from intric.embedding_models.infrastructure.query_embedding_cache import (
+    QueryEmbeddingCache,
+)
 from intric.files.chunk_embedding_list import ChunkEmbeddingList
-from intric.info_blobs.info_blob import InfoBlobChunk
+from intric.info_blobs.info_blob import InfoBlobChunk, get_content_hash
+from intric.main.logging import get_logger
 
 if TYPE_CHECKING:
     from intric.embedding_models.domain.embedding_model import EmbeddingModel
 
+logger = get_logger(__name__)
+
 
 class CreateEmbeddingsService:
-    def __init__(self):
+    def __init__(
+        self,
+        query_embedding_cache: Optional[QueryEmbeddingCache] = None,
+        embedding_batcher: Optional[EmbeddingBatcher] = None,
+    ):
         self._adapters = {
             ModelFamily.OPEN_AI: OpenAIEmbeddingAdapter,
             ModelFamily.E5: E5Adapter,
         }
 
+        self.query_embedding_cache = query_embedding_cache
+        self.embedding_batcher = embedding_batcher
+
     def _get_adapter(self, model: "EmbeddingModel") -> EmbeddingModelAdapter:
         adapter_class = self._adapters.get(model.family.value)
         if not adapter_class:
@@ -27,18 +41,71 @@ class CreateEmbeddingsService:
 
         return adapter_class(model)
 
+    async def _embed(
+        self, adapter: EmbeddingModelAdapter, chunks: list[InfoBlobChunk]
+    ) -> ChunkEmbeddingList:
+        if self.embedding_batcher is not None:
+            return await self.embedding_batcher.get_embeddings(adapter, chunks)
+
+        return await adapter.get_embeddings(chunks)
+
     async def get_embeddings(
         self,
         model: "EmbeddingModel",
         chunks: list[InfoBlobChunk],
+        known_embeddings: Optional[dict[str, list[float]]] = None,
     ) -> ChunkEmbeddingList:
+        """Embed the chunks, sending each distinct text to the provider at most once.
+
+        `known_embeddings` maps content hashes to embeddings that can be
+        reused as they are, for example those of identical chunks already
+        stored with the same embedding model.
+        """
         adapter = self._get_adapter(model)
-        return await adapter.get_embeddings(chunks)
+        known_embeddings = known_embeddings or {}
+
+        content_hashes = [get_content_hash(chunk.text) for chunk in chunks]
+        chunks_to_embed = {}
+        for content_hash, chunk in zip(content_hashes, chunks):
+            if content_hash not in known_embeddings:
+                chunks_to_embed.setdefault(content_hash, chunk)
+
+        if len(chunks_to_embed) == len(chunks):
+            return await self._embed(adapter, chunks)
+
+        logger.debug(
+            f"Reusing embeddings for {len(chunks) - len(chunks_to_embed)} of {len(chunks)} chunks"
+        )
+
+        embeddings = dict(known_embeddings)
+        if chunks_to_embed:
+            new_embeddings = await self._embed(adapter, list(chunks_to_embed.values()))
+            for chunk, embedding in new_embeddings:
+                embeddings[get_content_hash(chunk.text)] = embedding
+
+        chunk_embedding_list = ChunkEmbeddingList()
+        chunk_embedding_list.add(
+            chunks, [embeddings[content_hash] for content_hash in content_hashes]
+        )
+
+        return chunk_embedding_list
 
     async def get_embedding_for_query(
         self,
         model: "EmbeddingModel",
         query: str,
     ) -> list[float]:
+        if self.query_embedding_cache is not None:
+            embedding = await self.query_embedding_cache.get(model=model, query=query)
+
+            if embedding is not None:
+                return embedding
+
         adapter = self._get_adapter(model)
-        return await adapter.get_embedding_for_query(query)
+        embedding = await adapter.get_embedding_for_query(query)
+
+        if self.query_embedding_cache is not None:
+            await self.query_embedding_cache.set(model=model, query=query, embedding=embedding)
+            logger.debug(f"Query embedding cache: {self.query_embedding_cache.stats}")
+
+        return embedding
@@ -1,5 +1,6 @@
 import time
 from typing import TYPE_CHECKING, Optional
+from uuid import UUID
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from pydantic_settings import BaseSettings
@@ -9,13 +10,14 @@ from intric.files.chunk_embedding_list import ChunkEmbeddingList
 from intric.info_blobs.info_blob import (
     InfoBlobChunk,
     InfoBlobChunkInDBWithScore,
-    InfoBlobChunkWithEmbedding,
     InfoBlobInDB,
+    get_content_hash,
 )
 from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo
 from intric.integration.domain.entities.integration_knowledge import (
     IntegrationKnowledge,
 )
+from intric.main.config import get_settings
 from intric.main.logging import get_logger
 from intric.users.user import UserInDB
 
@@ -96,6 +98,7 @@ class Datastore:
                 text=chunk.strip(),
                 info_blob_id=info_blob.id,
                 tenant_id=self.user.tenant_id,
+                source_id=info_blob.source_id,
             )
             for i, chunk in enumerate(splitter.split_text(info_blob.text))
             if chunk.strip()
@@ -103,42 +106,91 @@ class Datastore:
 
         return info_blob_chunks
 
-    async def _add(self, chunk_embedding_list: ChunkEmbeddingList, batch_size: int = 100):
-        chunks = []
-        for chunk, embedding in chunk_embedding_list:
-            chunks.append(
-                InfoBlobChunkWithEmbedding(
-                    **chunk.model_dump(exclude_none=True), embedding=embedding
-                )
-            )
+    async def _add(self, chunk_embedding_list: ChunkEmbeddingList):
+        logger.debug(f"Adding {len(chunk_embedding_list)} chunks to datastore.")
+        await self.chunk_repo.add_chunk_embeddings(chunk_embedding_list)
 
-            if len(chunks) >= batch_size:
-                logger.debug(f"Adding {len(chunks)} chunks to datastore.")
-                await self.chunk_repo.add(chunks)
+    async def get_embeddings_by_title(
+        self,
+        title: str,
+        embedding_model: "EmbeddingModel",
+        group_id: Optional[UUID] = None,
+        website_id: Optional[UUID] = None,
+    ) -> dict[str, list[float]]:
+        """Embeddings of the info blob that a new info blob with this title will replace.
+
+        Fetch these before the replaced info blob is deleted, and pass them
+        on to `add`, so that unchanged chunks are not embedded again.
+        """
+        return await self.chunk_repo.get_embeddings_by_title(
+            title,
+            embedding_model_id=embedding_model.id,
+            group_id=group_id,
+            website_id=website_id,
+        )
 
-                chunks.clear()
+    async def add(
+        self,
+        info_blob: InfoBlobInDB,
+        embedding_model: "EmbeddingModel",
+        known_embeddings: Optional[dict[str, list[float]]] = None,
+    ):
+        await self.add_many(
+            [info_blob], embedding_model=embedding_model, known_embeddings=known_embeddings
+        )
 
-        # Last batch
-        if chunks:
-            logger.debug(f"Last batch. Adding {len(chunks)} chunks to datastore.")
-            await self.chunk_repo.add(chunks)
+    async def add_many(
+        self,
+        info_blobs: list[InfoBlobInDB],
+        embedding_model: "EmbeddingModel",
+        known_embeddings: Optional[dict[str, list[float]]] = None,
+    ):
+        """Chunk and embed several info blobs at once.
 
-    async def add(self, info_blob: InfoBlobInDB, embedding_model: "EmbeddingModel"):
+        The chunks of all the info blobs are embedded together, so that
+        small info blobs share embedding requests instead of making one each.
+        """
         logger.debug("Chunking text.")
-        info_blob_chunks = self._chunk_text(info_blob)
+        info_blob_chunks = []
+        for info_blob in info_blobs:
+            chunks = self._chunk_text(info_blob)
+
+            if not chunks:
+                logger.warning(
+                    f"Info Blob {info_blob.id} did not yield any chunks after splitting."
+                )
+
+            info_blob_chunks.extend(chunks)
 
         if not info_blob_chunks:
-            logger.warning(f"Info Blob {info_blob.id} did not yield any chunks after splitting.")
             return
 
+        known_embeddings = dict(known_embeddings or {})
+        unknown_hashes = {
+            get_content_hash(chunk.text) for chunk in info_blob_chunks
+        } - known_embeddings.keys()
+        if unknown_hashes:
+            known_embeddings |= await self.chunk_repo.get_embeddings_by_content_hash(
+                unknown_hashes,
+                embedding_model_id=embedding_model.id,
+                tenant_id=self.user.tenant_id,
+            )
+
         logger.debug(f"Embedding {len(info_blob_chunks)} info-blob chunks.")
         chunk_embedding_list = await self.create_embeddings_service.get_embeddings(
-            model=embedding_model, chunks=info_blob_chunks
+            model=embedding_model, chunks=info_blob_chunks, known_embeddings=known_embeddings
         )
 
         logger.debug(f"Adding {len(info_blob_chunks)} info-blob chunks to datastore.")
         await self._add(chunk_embedding_list)
 
+    async def embed_query(
+        self, search_string: str, embedding_model: "EmbeddingModel"
+    ) -> list[float]:
+        return await self.create_embeddings_service.get_embedding_for_query(
+            model=embedding_model, query=search_string
+        )
+
     async def semantic_search(
         self,
         search_string: str,
@@ -148,23 +200,37 @@ class Datastore:
         integration_knowledge_list: list[IntegrationKnowledge] = [],
         num_chunks: Optional[int] = 30,
         autocut_cutoff: Optional[int] = None,
+        query_embedding: Optional[list[float]] = None,
     ) -> list[InfoBlobChunkInDBWithScore]:
+        """The chunks closest to `search_string`, embedded unless `query_embedding` is given."""
         group_ids = [group.id for group in collections]
         website_ids = [website.id for website in websites]
         integration_knowledge_ids = [i.id for i in integration_knowledge_list]
 
         start = time.time()
-        search_string_embedding = await self.create_embeddings_service.get_embedding_for_query(
-            model=embedding_model, query=search_string
-        )
+        search_string_embedding = query_embedding
+        if search_string_embedding is None:
+            search_string_embedding = await self.embed_query(
+                search_string, embedding_model=embedding_model
+            )
         step_1 = time.time()
-        semantic_results = await self.chunk_repo.semantic_search(
-            search_string_embedding,
-            group_ids=group_ids,
-            website_ids=website_ids,
-            integration_knowledge_ids=integration_knowledge_ids,
-            limit=num_chunks,
-        )
+        if get_settings().using_hybrid_search:
+            semantic_results = await self.chunk_repo.hybrid_search(
+                search_string_embedding,
+                search_string,
+                group_ids=group_ids,
+                website_ids=website_ids,
+                integration_knowledge_ids=integration_knowledge_ids,
+                limit=num_chunks,
+            )
+        else:
+            semantic_results = await self.chunk_repo.semantic_search(
+                search_string_embedding,
+                group_ids=group_ids,
+                website_ids=website_ids,
+                integration_knowledge_ids=integration_knowledge_ids,
+                limit=num_chunks,
+            )
         end = time.time()
 
         logger.debug(
@@ -0,0 +1,203 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator
+from uuid import UUID
+
+from pydantic_settings import BaseSettings
+
+from intric.completion_models.infrastructure.context_builder import count_tokens
+from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from intric.info_blobs.info_blob import InfoBlobChunk
+from intric.main.exceptions import (
+    ChunkEmbeddingMisMatchException,
+    OpenAIRateLimitException,
+)
+from intric.main.logging import get_logger
+
+if TYPE_CHECKING:
+    from intric.embedding_models.infrastructure.adapters.base import (
+        EmbeddingModelAdapter,
+    )
+
+logger = get_logger(__name__)
+
+
+class EmbeddingBatchSettings(BaseSettings):
+    # Per request to OpenAI, which takes up to 300k tokens and 2048 inputs
+    embedding_openai_batch_max_tokens: int = 100_000
+    embedding_openai_batch_max_size: int = 1000
+    # Per request to self-hosted endpoints, which get at most the tokens that
+    # the model takes as a single input, as before requests were packed
+    embedding_self_hosted_batch_max_tokens: int = 8191  # If the model has no max input
+    embedding_self_hosted_batch_max_size: int = 32
+    embedding_max_requests_in_flight: int = 4
+
+
+settings = EmbeddingBatchSettings()
+
+
+def pack_chunks(
+    chunks: list[InfoBlobChunk],
+    max_tokens: int = settings.embedding_self_hosted_batch_max_tokens,
+    max_size: int = settings.embedding_self_hosted_batch_max_size,
+) -> Iterator[list[InfoBlobChunk]]:
+    """Split the chunks into batches of at most `max_tokens` tokens and `max_size` chunks."""
+    batch = []
+    num_tokens = 0
+    for chunk in chunks:
+        chunk_tokens = count_tokens(chunk.text)
+
+        if batch and (num_tokens + chunk_tokens > max_tokens or len(batch) >= max_size):
+            yield batch
+            batch = []
+            num_tokens = 0
+
+        batch.append(chunk)
+        num_tokens += chunk_tokens
+
+    if batch:
+        yield batch
+
+
+@dataclass
+class _PendingChunk:
+    chunk: InfoBlobChunk
+    num_tokens: int
+    future: asyncio.Future
+
+
+class _ModelQueue:
+    def __init__(self, adapter: "EmbeddingModelAdapter", max_in_flight: int):
+        self.adapter = adapter
+        self.pending: deque[_PendingChunk] = deque()
+        self.in_flight = 0
+        self.max_in_flight = max_in_flight
+
+
+class EmbeddingBatcher:
+    """Packs the chunks of all concurrent callers into shared embedding requests.
+
+    Chunks are queued per embedding model, and sent in batches of at most
+    the `max_batch_tokens` tokens of the model's adapter, with at most
+    `max_in_flight` requests per model at a time. Whatever queues up while all requests are in flight is packed
+    together, across info blobs and callers, as soon as one of them returns.
+
+    The number of requests in flight is halved when the provider rate limits
+    us, and grows back by one for every successful request.
+    """
+
+    def __init__(self, max_in_flight: int = settings.embedding_max_requests_in_flight):
+        self.max_in_flight = max_in_flight
+
+        self._queues: dict[UUID, _ModelQueue] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def _get_queue(self, adapter: "EmbeddingModelAdapter") -> _ModelQueue:
+        queue = self._queues.get(adapter.model.id)
+        if queue is None:
+            queue = _ModelQueue(adapter, max_in_flight=self.max_in_flight)
+            self._queues[adapter.model.id] = queue
+
+        # Send with the latest settings of the model
+        queue.adapter = adapter
+
+        return queue
+
+    def _next_batch(self, queue: _ModelQueue) -> list[_PendingChunk]:
+        max_tokens = queue.adapter.max_batch_tokens
+        max_size = queue.adapter.max_batch_size
+
+        batch = []
+        num_tokens = 0
+        while queue.pending and len(batch) < max_size:
+            pending_chunk = queue.pending[0]
+
+            # The caller is no longer waiting for this chunk
+            if pending_chunk.future.done():
+                queue.pending.popleft()
+                continue
+
+            if batch and num_tokens + pending_chunk.num_tokens > max_tokens:
+                break
+
+            batch.append(queue.pending.popleft())
+            num_tokens += pending_chunk.num_tokens
+
+        return batch
+
+    def _dispatch(self, queue: _ModelQueue):
+        while queue.in_flight < queue.max_in_flight:
+            batch = self._next_batch(queue)
+            if not batch:
+                return
+
+            queue.in_flight += 1
+            task = asyncio.create_task(self._send(queue, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, queue: _ModelQueue, batch: list[_PendingChunk]):
+        try:
+            logger.debug(f"Embedding a batch of {len(batch)} chunks")
+            embeddings = await queue.adapter.get_embeddings_for_chunks(
+                [pending_chunk.chunk for pending_chunk in batch]
+            )
+            if len(embeddings) != len(batch):
+                raise ChunkEmbeddingMisMatchException(
+                    f"Number of chunks: {len(batch)}, Number of embeddings: {len(embeddings)}"
+                )
+
+        except Exception as e:
+            if isinstance(e, OpenAIRateLimitException):
+                queue.max_in_flight = max(queue.max_in_flight // 2, 1)
+                logger.warning(
+                    f"Rate limited, lowering embedding requests in flight to {queue.max_in_flight}"
+                )
+
+            for pending_chunk in batch:
+                if not pending_chunk.future.done():
+                    pending_chunk.future.set_exception(e)
+
+        else:
+            queue.max_in_flight = min(queue.max_in_flight + 1, self.max_in_flight)
+
+            for pending_chunk, embedding in zip(batch, embeddings):
+                if not pending_chunk.future.done():
+                    pending_chunk.future.set_result(embedding)
+
+        finally:
+            queue.in_flight -= 1
+            self._dispatch(queue)
+
+    async def get_embeddings(
+        self, adapter: "EmbeddingModelAdapter", chunks: list[InfoBlobChunk]
+    ) -> ChunkEmbeddingList:
+        loop = asyncio.get_running_loop()
+        queue = self._get_queue(adapter)
+
+        pending_chunks = [
+            _PendingChunk(
+                chunk=chunk, num_tokens=count_tokens(chunk.text), future=loop.create_future()
+            )
+            for chunk in chunks
+        ]
+        queue.pending.extend(pending_chunks)
+        self._dispatch(queue)
+
+        futures = [pending_chunk.future for pending_chunk in pending_chunks]
+        try:
+            embeddings = await asyncio.gather(*futures)
+        except BaseException:
+            # Do not send the rest of the chunks if the caller will not use them
+            for future in futures:
+                future.cancel()
+            raise
+
+        chunk_embedding_list = ChunkEmbeddingList()
+        chunk_embedding_list.add(chunks, embeddings)
+
+        return chunk_embedding_list
+
+
+embedding_batcher = EmbeddingBatcher()
@@ -0,0 +1,142 @@
+import hashlib
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+import redis.asyncio as aioredis
+from pydantic_settings import BaseSettings
+from redis.exceptions import RedisError
+
+from intric.main.logging import get_logger
+from intric.worker.redis import r
+
+if TYPE_CHECKING:
+    from intric.embedding_models.domain.embedding_model import EmbeddingModel
+
+logger = get_logger(__name__)
+
+
+class QueryEmbeddingCacheSettings(BaseSettings):
+    query_embedding_cache_enabled: bool = True
+    query_embedding_cache_size: int = 10_000
+    query_embedding_cache_ttl: int = 60 * 60 * 24  # Seconds
+
+
+settings = QueryEmbeddingCacheSettings()
+
+KEY_PREFIX = "query_embedding"
+
+
+@dataclass
+class QueryEmbeddingCacheStats:
+    local_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        if lookups == 0:
+            return 0.0
+
+        return (self.local_hits + self.redis_hits) / lookups
+
+
+class QueryEmbeddingCache:
+    """Two-tier cache of query embeddings, keyed by model and normalized query.
+
+    An in-process LRU sits in front of a shared Redis tier. Vectors are
+    stored as raw float32 bytes, which is a quarter of the size of the
+    JSON the providers return them as.
+    """
+
+    def __init__(
+        self,
+        redis: Optional[aioredis.Redis],
+        max_size: int = settings.query_embedding_cache_size,
+        ttl: int = settings.query_embedding_cache_ttl,
+    ):
+        self.redis = redis
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = QueryEmbeddingCacheStats()
+
+        self._local: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", query).split())
+
+    def _get_key(self, model: "EmbeddingModel", query: str) -> str:
+        digest = hashlib.sha256(self.normalize(query).encode()).hexdigest()
+        return f"{KEY_PREFIX}:{model.id}:{digest}"
+
+    @staticmethod
+    def _encode(embedding: list[float]) -> bytes:
+        return np.asarray(embedding, dtype=np.float32).tobytes()
+
+    @staticmethod
+    def _decode(value: bytes) -> list[float]:
+        return np.frombuffer(value, dtype=np.float32).tolist()
+
+    def _get_local(self, key: str) -> Optional[bytes]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+
+        self._local.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: bytes):
+        self._local[key] = (time.monotonic() + self.ttl, value)
+        self._local.move_to_end(key)
+
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get(self, model: "EmbeddingModel", query: str) -> Optional[list[float]]:
+        key = self._get_key(model, query)
+
+        value = self._get_local(key)
+        if value is not None:
+            self.stats.local_hits += 1
+            return self._decode(value)
+
+        if self.redis is not None:
+            try:
+                value = await self.redis.get(key)
+            except RedisError:
+                logger.warning("Could not read query embedding from redis", exc_info=True)
+
+        if value is not None:
+            self.stats.redis_hits += 1
+            self._set_local(key, value)
+            return self._decode(value)
+
+        self.stats.misses += 1
+        return None
+
+    async def set(self, model: "EmbeddingModel", query: str, embedding: list[float]):
+        key = self._get_key(model, query)
+        value = self._encode(embedding)
+
+        self._set_local(key, value)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, value, ex=self.ttl)
+            except RedisError:
+                logger.warning("Could not write query embedding to redis", exc_info=True)
+
+
+query_embedding_cache = (
+    QueryEmbeddingCache(redis=r) if settings.query_embedding_cache_enabled else None
+)
@@ -2,14 +2,13 @@
 
 import asyncio
 import tempfile
-import wave
-from contextlib import asynccontextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator
+from typing import IO, AsyncIterator, Iterator, Optional
 
 import audioread
 import numpy as np
-import soundfile as sf
 from soundfile import SoundFile
 
 from intric.files.text import MimeTypesBase
@@ -17,7 +16,10 @@ from intric.main.logging import get_logger
 
 logger = get_logger(__name__)
 
-FRAMES = 32768  # Number of frames in one mebibyte
+# Segments are split at the quietest point within this many seconds of their target length
+SILENCE_SEARCH_SECONDS = 15
+# The loudness is compared between frames of this length
+SILENCE_FRAME_SECONDS = 0.05
 
 
 # TODO: When we support video, remove the video mimetypes
@@ -33,92 +35,123 @@ class AudioMimeTypes(MimeTypesBase):
     MP4A = "audio/mp4"
 
 
-def _to_wav(filepath: str):
-    logger.debug(f"Converting {filepath} to wav")
+@dataclass
+class AudioSegment:
+    """A part of a recording, encoded as mono MP3 in a temporary file."""
 
-    with audioread.audio_open(filepath) as f:
-        tmp_file = tempfile.NamedTemporaryFile(suffix=".wav")
-        with wave.open(tmp_file, "w") as of:
-            of.setframerate(f.samplerate)
-            of.setnchannels(f.channels)
-            of.setsampwidth(2)
+    file: IO[bytes]
+    start: float  # Seconds from the start of the recording
+    end: float
 
-            for buf in f:
-                of.writeframes(buf)
+    @property
+    def path(self) -> Path:
+        return Path(self.file.name)
 
-    return tmp_file
+    def close(self):
+        self.file.close()
 
 
-@asynccontextmanager
-async def to_wav(filepath: str):
-    tmp_file = await asyncio.to_thread(_to_wav, filepath)
+def _to_mono(buf: bytes, channels: int) -> np.ndarray:
+    # audioread decodes to interleaved 16-bit little-endian PCM
+    data = np.frombuffer(buf, dtype="<i2").astype(np.float32) / 32768
+    if channels > 1:
+        data = data[: len(data) - len(data) % channels].reshape(-1, channels).mean(axis=1)
+
+    return data
+
+
+def _find_split(samples: np.ndarray, samplerate: int, start: int, end: int) -> int:
+    """The middle of the quietest frame between `start` and `end`."""
+    frame = max(int(samplerate * SILENCE_FRAME_SECONDS), 1)
+    num_frames = (end - start) // frame
+    if num_frames == 0:
+        return end
+
+    frames = samples[start : start + num_frames * frame].reshape(num_frames, frame)
+    loudness = np.sqrt(np.mean(frames**2, axis=1))
+
+    return start + int(np.argmin(loudness)) * frame + frame // 2
+
+
+def _write_segment(samples: np.ndarray, samplerate: int, start_sample: int) -> AudioSegment:
+    temp_file = tempfile.NamedTemporaryFile(suffix=".mp3")
+    with SoundFile(temp_file, mode="w", samplerate=samplerate, channels=1, format="MP3") as f:
+        f.write(samples)
+    temp_file.flush()
+
+    return AudioSegment(
+        file=temp_file,
+        start=start_sample / samplerate,
+        end=(start_sample + len(samples)) / samplerate,
+    )
+
+
+def _split_on_silence(
+    filepath: Path, seconds: int, search_seconds: int = SILENCE_SEARCH_SECONDS
+) -> Iterator[AudioSegment]:
+    with audioread.audio_open(str(filepath)) as f:
+        samplerate = f.samplerate
+        target = samplerate * seconds
+        search = min(samplerate * search_seconds, target // 2)
+
+        blocks = []
+        num_samples = 0
+        start_sample = 0
+        for buf in f:
+            block = _to_mono(buf, f.channels)
+            blocks.append(block)
+            num_samples += len(block)
+
+            # Only the samples of the segment being split are ever kept in memory
+            if num_samples >= target + search:
+                samples = np.concatenate(blocks)
+                split = _find_split(samples, samplerate, target - search, target + search)
+
+                yield _write_segment(samples[:split], samplerate, start_sample)
+
+                start_sample += split
+                blocks = [samples[split:]]
+                num_samples = len(blocks[0])
+
+        if num_samples > 0:
+            yield _write_segment(np.concatenate(blocks), samplerate, start_sample)
+
+
+async def split_on_silence(
+    filepath: Path, seconds: int, search_seconds: int = SILENCE_SEARCH_SECONDS
+) -> AsyncIterator[AudioSegment]:
+    """Decode a recording as a stream, and split it in segments of about `seconds`.
+
+    Every segment is split at the quietest point within `search_seconds` of
+    its target length, so that words are not cut in half. Segments are
+    yielded as soon as they are decoded, and are closed by the caller.
+    """
+    segments = _split_on_silence(filepath, seconds=seconds, search_seconds=search_seconds)
+    # The recording is decoded, and closed, in one thread, so that it is only
+    # closed once a segment that is still being decoded is done
+    decoder = ThreadPoolExecutor(max_workers=1)
+    pending: Optional[Future] = None
 
     try:
-        yield AudioFile(tmp_file.name)
+        while True:
+            pending = decoder.submit(next, segments, None)
+            segment = await asyncio.wrap_future(pending)
+            pending = None
+            if segment is None:
+                return
+
+            logger.debug("Decoded segment %.0f-%.0f s", segment.start, segment.end)
+            yield segment
     finally:
-        tmp_file.close()
-
-
-class AudioFile:
-    def __init__(self, path_to_file: str):
-        self.path = Path(path_to_file)
-        self.info = sf.info(path_to_file)
-
-    def _gen_file(self):
-        for block in sf.blocks(self.path, blocksize=FRAMES):
-            yield block
-
-    def _write_to_file(self, gen: Iterator[np.ndarray], max_size: int):
-        frames_in_file = 0
-        temp_file = tempfile.NamedTemporaryFile(suffix=".mp3")
-        soundfile = SoundFile(
-            temp_file,
-            mode="w",
-            samplerate=self.info.samplerate,
-            channels=1,
-            format="mp3",
-        )
-        for block in gen:
-            if self.info.channels == 2:
-                # Make mono by averageing the two channels
-                data = np.sum(block, axis=1) / 2
-            else:
-                data = block
-
-            frames_in_file += len(data)
-            soundfile.write(data)
-            soundfile.flush()
-
-            if frames_in_file > max_size:
-                return temp_file, False
-
-        return temp_file, True
-
-    def _split_file(self, seconds: int):
-        max_size = self.info.samplerate * seconds
-        temp_files = []
-        gen = self._gen_file()
-        done = False
-        while not done:
-            file, done = self._write_to_file(gen, max_size)
-            temp_files.append(file)
-
-        return temp_files
-
-    @asynccontextmanager
-    async def asplit_file(self, seconds: int):
-        logger.debug("Splitting the file")
-
-        temp_files = await asyncio.to_thread(self._split_file, seconds)
-        filepaths = [Path(f.name) for f in temp_files]
-
-        logger.debug("File was split in %s parts", len(filepaths))
-
-        try:
-            yield filepaths
-        finally:
-            for f in temp_files:
-                f.close()
-
-    def delete(self):
-        self.path.unlink()
+        decoder.submit(_close, segments, pending)
+        decoder.shutdown(wait=False)
+
+
+def _close(segments: Iterator[AudioSegment], pending: Optional[Future]):
+    # A segment decoded after the caller was cancelled is never yielded
+    if pending is not None and not pending.cancelled() and pending.exception() is None:
+        segment = pending.result()
+        if segment is not None:
+            segment.close()
+
+    segments.close()
@@ -1,34 +1,98 @@
 import tempfile
 from collections.abc import Iterator
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 
 from intric.info_blobs.info_blob import InfoBlobChunk
 from intric.main.exceptions import ChunkEmbeddingMisMatchException
 
+# Embeddings beyond this size are kept in a memory mapped temporary file instead
+MAX_IN_MEMORY_BYTES = 64 * 1024 * 1024
+INITIAL_CAPACITY = 64
+
 
 class ChunkEmbeddingList:
-    def __init__(self):
-        self._file = tempfile.TemporaryFile()
-        self._chunks = []
+    """Chunks and their embeddings, with the embeddings in one float32 matrix.
+
+    The matrix grows by doubling, and moves to a memory mapped temporary file
+    once it outgrows `max_in_memory_bytes`, so that very large documents do
+    not have to fit in memory.
+    """
+
+    def __init__(self, max_in_memory_bytes: int = MAX_IN_MEMORY_BYTES):
+        self.max_in_memory_bytes = max_in_memory_bytes
+
+        self._chunks: list[InfoBlobChunk] = []
+        self._embeddings: Optional[np.ndarray] = None
+        self._file = None
+
+    def __len__(self):
+        return len(self._chunks)
+
+    @property
+    def chunks(self) -> list[InfoBlobChunk]:
+        return self._chunks
 
-    def add(self, chunks: list[InfoBlobChunk], embeddings: list[list[float]]):
+    @property
+    def embeddings(self) -> np.ndarray:
+        """A view of the embeddings, one row per chunk."""
+        if self._embeddings is None:
+            return np.empty((0, 0), dtype=np.float32)
+
+        return self._embeddings[: len(self._chunks)]
+
+    def _allocate(self, capacity: int, dimensions: int):
+        if capacity * dimensions * 4 <= self.max_in_memory_bytes:
+            return np.empty((capacity, dimensions), dtype=np.float32), None
+
+        file = tempfile.TemporaryFile()
+        embeddings = np.memmap(file, dtype=np.float32, mode="w+", shape=(capacity, dimensions))
+
+        return embeddings, file
+
+    def _reserve(self, size: int, dimensions: int):
+        if self._embeddings is None:
+            self._embeddings, self._file = self._allocate(
+                max(size, INITIAL_CAPACITY), dimensions
+            )
+            return
+
+        if self._embeddings.shape[1] != dimensions:
+            raise ChunkEmbeddingMisMatchException(
+                f"Embedding dimensions: {self._embeddings.shape[1]}, "
+                f"Added embedding dimensions: {dimensions}"
+            )
+
+        capacity = self._embeddings.shape[0]
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+
+        embeddings, file = self._allocate(capacity, dimensions)
+        embeddings[: len(self._chunks)] = self.embeddings
+
+        if self._file is not None:
+            self._file.close()
+        self._embeddings, self._file = embeddings, file
+
+    def add(self, chunks: list[InfoBlobChunk], embeddings: list[list[float]] | np.ndarray):
         if len(chunks) != len(embeddings):
             raise ChunkEmbeddingMisMatchException(
                 f"Number of chunks: {len(chunks)}, Number of embeddings: {len(embeddings)}"
             )
 
-        self._chunks.extend(chunks)
+        if not chunks:
+            return
 
-        for embedding in embeddings:
-            np.save(self._file, embedding)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        start = len(self._chunks)
 
-    def __iter__(self) -> Iterator[Tuple[InfoBlobChunk, list[float]]]:
-        self._file.seek(0)
-        for chunk in self._chunks:
-            embedding = np.load(self._file)
-
-            yield chunk, embedding
+        self._reserve(start + len(chunks), embeddings.shape[1])
+        self._embeddings[start : start + len(chunks)] = embeddings
+        self._chunks.extend(chunks)
 
-        self._file.close()
+    def __iter__(self) -> Iterator[Tuple[InfoBlobChunk, np.ndarray]]:
+        yield from zip(self._chunks, self.embeddings)
@@ -4,7 +4,6 @@ import tempfile
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from intric.files import audio
 from intric.files.audio import AudioMimeTypes
 from intric.files.file_models import File
 from intric.transcription_models.infrastructure.adapters.whisper import (
@@ -55,5 +54,4 @@ class Transcriber:
     ):
         adapter = OpenAISTTModelAdapter(model=transcription_model)
 
-        async with audio.to_wav(filepath) as wav_file:
-            return await adapter.get_text_from_file(wav_file)
+        return await adapter.get_text_from_file(filepath)
@@ -8,7 +8,8 @@ from typing import TYPE_CHECKING, Optional, Union
 
 from intric.ai_models.completion_models.completion_model import Completion, ResponseType
 from intric.assistants.api.assistant_models import AssistantResponse
-from intric.completion_models.infrastructure.context_builder import count_tokens
+from intric.completion_models.infrastructure.context_builder import count_tokens_async
+from intric.completion_models.infrastructure.tokenizer import get_encoding_name
 from intric.group_chat.domain.entities.group_chat import (
     GroupChat,
     GroupChatAssistant,
@@ -83,7 +84,7 @@ class GroupChatService:
 
         group_chat = space.get_group_chat(group_chat_id=group_chat_id)
         space.remove_group_chat(group_chat)
-        await self.space_repo.update(space=space)
+        await self.space_repo.update(space=space, reload=False)
 
     async def update_group_chat(
         self,
@@ -240,7 +241,7 @@ class GroupChatService:
 
         # create the prompt for assistant selection
         selection_prompt = self._create_assistant_selection_prompt(question, assistants)
-        assistant_selector_tokens = count_tokens(selection_prompt)
+        assistant_selector_tokens = await count_tokens_async(selection_prompt)
         # get model's response
         response = await self.completion_service.get_response(
             model=completion_model,
@@ -300,8 +301,8 @@ class GroupChatService:
                     await asyncio.sleep(0.05)
 
                 # NOTE: refactor question_token_count to include the whole contructed prompt.
-                question_token_count = count_tokens(question)
-                token_count = count_tokens(response)
+                question_token_count = await count_tokens_async(question)
+                token_count = await count_tokens_async(response)
                 await self.session_service.add_question_to_session(
                     question=question,
                     answer=response,
@@ -317,8 +318,8 @@ class GroupChatService:
             return response_stream()
         else:
             # NOTE: refactor question_token_count to include the whole contructed prompt.
-            question_token_count = count_tokens(question)
-            token_count = count_tokens(response)
+            question_token_count = await count_tokens_async(question)
+            token_count = await count_tokens_async(response)
             await self.session_service.add_question_to_session(
                 question=question,
                 answer=response,
@@ -362,7 +363,16 @@ class GroupChatService:
             )
             session_id = session.id
         else:
-            session = await self.session_service.get_session_by_uuid(id=session_id)
+            # The history is only used by the model that selects the assistant
+            completion_model = await self._find_suitable_completion_model(group_chat.assistants)
+            if completion_model is not None:
+                session = await self.session_service.get_session_with_history_window(
+                    id=session_id,
+                    max_tokens=completion_model.token_limit,
+                    encoding_name=get_encoding_name(completion_model),
+                )
+            else:
+                session = await self.session_service.get_session_by_uuid(id=session_id)
 
         selection_result = None
         if tool_assistant_id is not None:
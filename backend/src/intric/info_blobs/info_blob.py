@@ -1,3 +1,4 @@
+import hashlib
 from typing import Optional
 from uuid import UUID
 
@@ -72,12 +73,16 @@ class InfoBlobInDBNoText(InDB):
     group: Optional[GroupInDBBase] = None
     website: Optional[WebsiteInDBBase] = None
 
+    @property
+    def source_id(self) -> Optional[UUID]:
+        return self.group_id or self.website_id or self.integration_knowledge_id
+
 
 class InfoBlobInDB(InfoBlobInDBNoText):
     text: str
 
 
-class InfoBlobInDBWithScore(InfoBlobInDB):
+class InfoBlobInDBNoTextWithScore(InfoBlobInDBNoText):
     score: float
 
 
@@ -109,11 +114,16 @@ class InfoBlobMetadataFilter(InfoBlobMetadataFilterPublic):
     group_ids: Optional[list[int]] = None
 
 
+def get_content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
 class InfoBlobChunk(BaseModel):
     text: str
     chunk_no: int
     info_blob_id: UUID
     tenant_id: UUID
+    source_id: Optional[UUID] = None
 
 
 class InfoBlobChunkWithEmbedding(InfoBlobChunk):
@@ -128,6 +138,12 @@ class InfoBlobChunkWithEmbedding(InfoBlobChunk):
         # obvious as to why it provides a good estimation
         return len(self.text.encode()) + len(self.embedding) * 4
 
+    @computed_field
+    @property
+    def content_hash(self) -> str:
+        # Lets identical chunks reuse each others embeddings
+        return get_content_hash(self.text)
+
 
 class InfoBlobChunkInDB(InDB, InfoBlobChunkWithEmbedding):
     pass
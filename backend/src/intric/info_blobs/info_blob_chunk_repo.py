@@ -1,20 +1,61 @@
-from typing import Optional
-from uuid import UUID
+from enum import Enum
+from typing import Iterable, Optional
+from uuid import UUID, uuid4
 
+import numpy as np
 import sqlalchemy as sa
+from pydantic_settings import BaseSettings
 from sqlalchemy.orm import defer
 
+from intric.database import binary_copy
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
-from intric.database.tables.info_blob_chunk_table import InfoBlobChunks
+from intric.database.tables.info_blob_chunk_table import (
+    TEXT_SEARCH_CONFIG,
+    InfoBlobChunks,
+)
 from intric.database.tables.info_blobs_table import InfoBlobs
+from intric.files.chunk_embedding_list import ChunkEmbeddingList
 from intric.info_blobs.info_blob import (
+    InfoBlobChunk,
     InfoBlobChunkInDB,
     InfoBlobChunkInDBWithScore,
-    InfoBlobChunkWithEmbedding,
+    get_content_hash,
 )
 
 
+class VectorSearchSettings(BaseSettings):
+    # Sources with at most this many chunks are searched exactly
+    exact_search_max_chunks: int = 20_000
+    hnsw_min_ef_search: int = 40
+    # One of 'strict_order' and 'relaxed_order', requires pgvector >= 0.8
+    hnsw_iterative_scan: Optional[str] = None
+
+
+vector_search_settings = VectorSearchSettings()
+
+# pgvector refuses values of hnsw.ef_search above this
+HNSW_MAX_EF_SEARCH = 1000
+
+
+# In the order of `InfoBlobChunkRepo._encode_copy_rows`
+COPY_COLUMNS = (
+    "text",
+    "chunk_no",
+    "info_blob_id",
+    "tenant_id",
+    "source_id",
+    "embedding",
+    "size",
+    "content_hash",
+)
+
+
+class VectorSearchStrategy(str, Enum):
+    EXACT = "exact"
+    INDEX = "index"
+
+
 class InfoBlobChunkRepo:
     def __init__(self, session: AsyncSession):
         self.delegate = BaseRepositoryDelegate(
@@ -23,30 +64,224 @@ class InfoBlobChunkRepo:
         self.session = session
 
     @staticmethod
-    def _filter_on_sources(
-        stmt: sa.Select,
-        group_ids: list[UUID],
-        website_ids: list[UUID],
-        integration_knowledge_ids: list[UUID],
-    ):
-        return stmt.where(
-            sa.or_(
-                InfoBlobs.group_id.in_(group_ids),
-                InfoBlobs.website_id.in_(website_ids),
-                InfoBlobs.integration_knowledge_id.in_(integration_knowledge_ids),
+    def _to_chunks_with_score(rows) -> list[InfoBlobChunkInDBWithScore]:
+        return [
+            InfoBlobChunkInDBWithScore(
+                **chunk.to_dict(exclude=["embedding", "text_search"]),
+                score=score,
+                info_blob_title=title,
             )
+            for chunk, score, title in rows
+        ]
+
+    @staticmethod
+    def _get_source_ids(
+        group_ids: Optional[list[UUID]],
+        website_ids: Optional[list[UUID]],
+        integration_knowledge_ids: Optional[list[UUID]],
+    ) -> list[UUID]:
+        return [*(group_ids or []), *(website_ids or []), *(integration_knowledge_ids or [])]
+
+    @staticmethod
+    def _filter_on_sources(stmt: sa.Select, source_ids: list[UUID]):
+        # `source_id` is the denormalized group, website or integration knowledge
+        # of the info blob, so that we can filter without joining `info_blobs`
+        return stmt.where(InfoBlobChunks.source_id.in_(source_ids))
+
+    async def _get_vector_search_strategy(
+        self, source_ids: list[UUID]
+    ) -> VectorSearchStrategy:
+        # Count at most one chunk past the threshold, so that this stays cheap
+        # (an index only scan) regardless of how large the sources are
+        threshold = vector_search_settings.exact_search_max_chunks
+        capped = self._filter_on_sources(
+            sa.select(sa.literal(1)).select_from(InfoBlobChunks), source_ids
+        ).limit(threshold + 1)
+        stmt = sa.select(sa.func.count()).select_from(capped.subquery())
+
+        num_chunks = await self.session.scalar(stmt)
+
+        if num_chunks <= threshold:
+            return VectorSearchStrategy.EXACT
+
+        return VectorSearchStrategy.INDEX
+
+    async def _set_index_search_parameters(self, limit: int):
+        # These parameters only affect hnsw index scans, and are scoped
+        # to the current transaction
+        ef_search = min(
+            max(vector_search_settings.hnsw_min_ef_search, limit * 2),
+            HNSW_MAX_EF_SEARCH,
         )
+        parameters = [sa.func.set_config("hnsw.ef_search", str(ef_search), True)]
+
+        if vector_search_settings.hnsw_iterative_scan is not None:
+            parameters.append(
+                sa.func.set_config(
+                    "hnsw.iterative_scan", vector_search_settings.hnsw_iterative_scan, True
+                )
+            )
+
+        await self.session.execute(sa.select(*parameters))
+
+    async def _get_vector_candidates(
+        self,
+        embedding: list[float],
+        source_ids: list[UUID],
+        limit: int,
+    ) -> sa.Subquery:
+        """Return a subquery of the `limit` closest chunks, as (id, distance).
+
+        Small sources are searched exactly: the filtered rows are materialized
+        before ordering, so that the planner never trades recall for an
+        approximate index scan that would discard most of its results in the
+        filter. Large sources are left to the planner, with the hnsw search
+        width tuned to the limit.
+        """
+        strategy = await self._get_vector_search_strategy(source_ids)
+        distance = InfoBlobChunks.embedding.cosine_distance(embedding)
+
+        if strategy == VectorSearchStrategy.EXACT:
+            filtered = (
+                self._filter_on_sources(
+                    sa.select(InfoBlobChunks.id, distance.label("distance")), source_ids
+                )
+                .cte("filtered_chunks")
+                .prefix_with("MATERIALIZED")
+            )
+            candidates = sa.select(filtered.c.id, filtered.c.distance).order_by(
+                filtered.c.distance
+            )
+        else:
+            await self._set_index_search_parameters(limit)
+            candidates = self._filter_on_sources(
+                sa.select(InfoBlobChunks.id, distance.label("distance")), source_ids
+            ).order_by(distance)
+
+        return candidates.limit(limit).subquery("vector_candidates")
+
+    @staticmethod
+    def _encode_copy_rows(
+        chunks: list[InfoBlobChunk], embeddings: np.ndarray, ids: Optional[list[UUID]]
+    ) -> bytes:
+        # Same estimate as `InfoBlobChunkWithEmbedding.size`
+        embedding_size = embeddings.shape[1] * 4
+        vectors = binary_copy.encode_vectors(embeddings)
+        field_count = binary_copy.encode_field_count(len(COPY_COLUMNS) + (ids is not None))
+
+        rows = []
+        for i, (chunk, vector) in enumerate(zip(chunks, vectors)):
+            text = chunk.text.encode()
+            fields = [
+                field_count,
+                binary_copy.encode_text(chunk.text),
+                binary_copy.encode_int4(chunk.chunk_no),
+                binary_copy.encode_uuid(chunk.info_blob_id),
+                binary_copy.encode_uuid(chunk.tenant_id),
+                binary_copy.encode_uuid(chunk.source_id),
+                vector,
+                binary_copy.encode_int4(len(text) + embedding_size),
+                binary_copy.encode_text(get_content_hash(chunk.text)),
+            ]
+            if ids is not None:
+                fields.append(binary_copy.encode_uuid(ids[i]))
+
+            rows.append(b"".join(fields))
+
+        return b"".join(rows)
+
+    async def add_chunk_embeddings(
+        self,
+        chunk_embedding_list: ChunkEmbeddingList,
+        *,
+        returning: bool = False,
+        batch_size: int = 1000,
+    ) -> Optional[list[UUID]]:
+        """Stream the chunks into the table with a binary COPY.
+
+        The rows are encoded straight from the embedding matrix, and nothing
+        is read back. With `returning`, the ids of the chunks are generated
+        here instead of by the database, and returned in the order of the chunks.
+        """
+        if not len(chunk_embedding_list):
+            return [] if returning else None
+
+        chunks = chunk_embedding_list.chunks
+        embeddings = chunk_embedding_list.embeddings
+        ids = [uuid4() for _ in chunks] if returning else None
+        columns = COPY_COLUMNS + ("id",) if returning else COPY_COLUMNS
+
+        async def _stream():
+            yield binary_copy.HEADER
+            for i in range(0, len(chunks), batch_size):
+                yield self._encode_copy_rows(
+                    chunks[i : i + batch_size],
+                    embeddings[i : i + batch_size],
+                    ids[i : i + batch_size] if ids is not None else None,
+                )
+            yield binary_copy.TRAILER
+
+        # The savepoint makes sure the copy runs inside the transaction of the session
+        async with self.session.begin_nested():
+            connection = await self.session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_to_table(
+                InfoBlobChunks.__tablename__,
+                source=_stream(),
+                columns=columns,
+                format="binary",
+            )
+
+        return ids
+
+    async def get_embeddings_by_content_hash(
+        self,
+        content_hashes: Iterable[str],
+        *,
+        embedding_model_id: UUID,
+        tenant_id: UUID,
+        batch_size: int = 1000,
+    ) -> dict[str, list[float]]:
+        content_hashes = list(content_hashes)
+        embeddings = {}
+
+        for i in range(0, len(content_hashes), batch_size):
+            stmt = (
+                sa.select(InfoBlobChunks.content_hash, InfoBlobChunks.embedding)
+                .join(InfoBlobs)
+                .where(InfoBlobChunks.content_hash.in_(content_hashes[i : i + batch_size]))
+                .where(InfoBlobChunks.tenant_id == tenant_id)
+                .where(InfoBlobs.embedding_model_id == embedding_model_id)
+                .distinct(InfoBlobChunks.content_hash)
+            )
+            embeddings.update((await self.session.execute(stmt)).tuples())
+
+        return embeddings
 
-    async def add(
-        self, chunks: list[InfoBlobChunkWithEmbedding]
-    ) -> list[InfoBlobChunkInDB]:
+    async def get_embeddings_by_title(
+        self,
+        title: str,
+        *,
+        embedding_model_id: UUID,
+        group_id: Optional[UUID] = None,
+        website_id: Optional[UUID] = None,
+    ) -> dict[str, list[float]]:
         stmt = (
-            sa.insert(InfoBlobChunks)
-            .values([chunk.model_dump() for chunk in chunks])
-            .returning(InfoBlobChunks)
+            sa.select(InfoBlobChunks.content_hash, InfoBlobChunks.embedding)
+            .join(InfoBlobs)
+            .where(InfoBlobs.title == title)
+            .where(InfoBlobs.embedding_model_id == embedding_model_id)
+            .where(InfoBlobChunks.content_hash.is_not(None))
         )
 
-        return await self.delegate.get_models_from_query(stmt)
+        if group_id is not None:
+            stmt = stmt.where(InfoBlobs.group_id == group_id)
+        elif website_id is not None:
+            stmt = stmt.where(InfoBlobs.website_id == website_id)
+        else:
+            return {}
+
+        return dict((await self.session.execute(stmt)).tuples())
 
     async def delete_by_info_blob(self, info_blob_id: UUID):
         stmt = (
@@ -66,68 +301,123 @@ class InfoBlobChunkRepo:
         integration_knowledge_ids: Optional[list[UUID]] = [],
         limit: int = 30,
     ) -> list[InfoBlobChunkInDBWithScore]:
-        # Postgres will sometimes think that a sequential scan of the whole table is
-        # preferable to an index scan, when it is not. This is because this particular
-        # table has a lot of data in TOAST tables, which postgres apparently fails
-        # to account for when planning the query.
-        #
-        # The solution below is a crude one, and we should revisit this at some point
-        # in the future. This should also be the first place we look at if something
-        # is slow. Note the "LOCAL", ensuring that we only punish sequential scans for
-        # this particular session. This might make all future queries in this transaction
-        # not be able to run sequential, but we will see if that is an issue.
-        #
-        # Reference: https://github.com/pgvector/pgvector/issues/662
-        # TODO: Solve this issue in a more elegant way.
-
-        await self.session.execute(sa.text("SET LOCAL enable_seqscan = off;"))
+        source_ids = self._get_source_ids(group_ids, website_ids, integration_knowledge_ids)
+
+        candidates = await self._get_vector_candidates(embedding, source_ids, limit)
 
         stmt = (
-            sa.select(
-                InfoBlobChunks,
-                InfoBlobChunks.embedding.cosine_distance(embedding),
-                InfoBlobs.title,
-            )
+            sa.select(InfoBlobChunks, candidates.c.distance, InfoBlobs.title)
+            .join(candidates, candidates.c.id == InfoBlobChunks.id)
             .join(InfoBlobs)
             .options(defer(InfoBlobChunks.embedding))
-            .order_by(InfoBlobChunks.embedding.cosine_distance(embedding))
-            .limit(limit)
+            .order_by(candidates.c.distance)
         )
 
-        stmt = self._filter_on_sources(
-            stmt,
-            group_ids,
-            website_ids,
-            integration_knowledge_ids=integration_knowledge_ids,
+        chunks_in_db = await self.session.execute(stmt)
+
+        return self._to_chunks_with_score(
+            (chunk, 1 - distance, title) for chunk, distance, title in chunks_in_db
         )
 
-        chunks_in_db = await self.session.execute(stmt)
+    async def hybrid_search(
+        self,
+        embedding: list[float],
+        search_string: str,
+        *,
+        group_ids: Optional[list[UUID]] = [],
+        website_ids: Optional[list[UUID]] = [],
+        integration_knowledge_ids: Optional[list[UUID]] = [],
+        limit: int = 30,
+        num_candidates: Optional[int] = None,
+        rrf_k: int = 60,
+    ) -> list[InfoBlobChunkInDBWithScore]:
+        """Fuse vector and full-text search with reciprocal rank fusion.
 
-        chunks_with_score = [
-            InfoBlobChunkInDBWithScore(
-                **chunk[0].to_dict(exclude="embedding"),
-                score=1 - chunk[1],
-                info_blob_title=chunk[2],
+        The top `num_candidates` chunks are fetched from both the vector index
+        and the full-text index in a single query. Each chunk is scored
+        as the sum of 1 / (rrf_k + rank) over the rankings it appears in, so
+        chunks that rank well in both searches end up first. The returned
+        score is the fused score, not a cosine similarity.
+        """
+        num_candidates = num_candidates or limit * 2
+        source_ids = self._get_source_ids(group_ids, website_ids, integration_knowledge_ids)
+
+        semantic_candidates = await self._get_vector_candidates(
+            embedding, source_ids, num_candidates
+        )
+        semantic = sa.select(
+            semantic_candidates.c.id,
+            sa.func.row_number()
+            .over(order_by=semantic_candidates.c.distance)
+            .label("rank"),
+        ).cte("semantic")
+
+        ts_query = sa.func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, search_string)
+        text_rank = sa.func.ts_rank_cd(InfoBlobChunks.text_search, ts_query)
+        keyword_candidates = self._filter_on_sources(
+            sa.select(InfoBlobChunks.id, text_rank.label("text_rank"))
+            .where(InfoBlobChunks.text_search.bool_op("@@")(ts_query))
+            .order_by(text_rank.desc())
+            .limit(num_candidates),
+            source_ids,
+        ).subquery("keyword_candidates")
+        keyword = sa.select(
+            keyword_candidates.c.id,
+            sa.func.row_number()
+            .over(order_by=keyword_candidates.c.text_rank.desc())
+            .label("rank"),
+        ).cte("keyword")
+
+        def _rrf(rank):
+            return sa.func.coalesce(1.0 / sa.cast(rrf_k + rank, sa.Float), 0.0)
+
+        fused = (
+            sa.select(
+                sa.func.coalesce(semantic.c.id, keyword.c.id).label("id"),
+                (_rrf(semantic.c.rank) + _rrf(keyword.c.rank)).label("score"),
             )
-            for chunk in chunks_in_db
-        ]
+            .select_from(
+                semantic.join(keyword, semantic.c.id == keyword.c.id, full=True)
+            )
+            .subquery("fused")
+        )
 
-        return chunks_with_score
+        stmt = (
+            sa.select(InfoBlobChunks, fused.c.score, InfoBlobs.title)
+            .join(fused, fused.c.id == InfoBlobChunks.id)
+            .join(InfoBlobs)
+            .options(defer(InfoBlobChunks.embedding))
+            .order_by(fused.c.score.desc())
+            .limit(limit)
+        )
+
+        chunks_in_db = await self.session.execute(stmt)
+
+        return self._to_chunks_with_score(chunks_in_db)
 
     async def keyword_search(
         self,
         search_string: str,
         *,
-        group_ids: Optional[list[UUID]] = None,
+        group_ids: Optional[list[UUID]] = [],
+        website_ids: Optional[list[UUID]] = [],
+        integration_knowledge_ids: Optional[list[UUID]] = [],
         limit: int = 30,
-    ):
+    ) -> list[InfoBlobChunkInDBWithScore]:
+        source_ids = self._get_source_ids(group_ids, website_ids, integration_knowledge_ids)
+        ts_query = sa.func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, search_string)
+        text_rank = sa.func.ts_rank_cd(InfoBlobChunks.text_search, ts_query)
+
         stmt = (
-            sa.select(InfoBlobChunks)
-            .filter(InfoBlobChunks.text.match(search_string))
+            sa.select(InfoBlobChunks, text_rank, InfoBlobs.title)
+            .join(InfoBlobs)
+            .options(defer(InfoBlobChunks.embedding))
+            .where(InfoBlobChunks.text_search.bool_op("@@")(ts_query))
+            .order_by(text_rank.desc())
             .limit(limit)
         )
+        stmt = self._filter_on_sources(stmt, source_ids)
 
-        if group_ids is not None:
-            stmt = self._filter_on_sources(stmt, group_ids)
+        chunks_in_db = await self.session.execute(stmt)
 
-        return await self.delegate.get_models_from_query(stmt)
+        return self._to_chunks_with_score(chunks_in_db)
@@ -1,3 +1,4 @@
+from typing import Iterable
 from uuid import UUID
 
 import sqlalchemy as sa
@@ -18,6 +19,7 @@ from intric.info_blobs.info_blob import (
     InfoBlobInDBNoText,
     InfoBlobUpdate,
 )
+from intric.websites.crawl_dependencies.crawl_models import CrawledPageValidators
 
 
 class InfoBlobRepository:
@@ -118,6 +120,29 @@ class InfoBlobRepository:
     async def get(self, id: UUID) -> InfoBlobInDB:
         return await self.delegate.get(id)
 
+    async def get_by_ids_without_text(self, ids: Iterable[UUID]) -> list[InfoBlobInDBNoText]:
+        """Fetch the info blobs in one query, without their text or relationships.
+
+        Info blobs that do not exist are left out.
+        """
+        stmt = sa.select(
+            InfoBlobs.id,
+            InfoBlobs.created_at,
+            InfoBlobs.updated_at,
+            InfoBlobs.url,
+            InfoBlobs.title,
+            InfoBlobs.embedding_model_id,
+            InfoBlobs.user_id,
+            InfoBlobs.tenant_id,
+            InfoBlobs.size,
+            InfoBlobs.group_id,
+            InfoBlobs.website_id,
+            InfoBlobs.integration_knowledge_id,
+        ).where(InfoBlobs.id.in_(list(ids)))
+        rows = await self.session.execute(stmt)
+
+        return [InfoBlobInDBNoText.model_validate(row._mapping) for row in rows]
+
     async def get_by_title_and_group(self, title: str, group_id: UUID):
         return await self.delegate.get_by(
             conditions={InfoBlobs.title: title, InfoBlobs.group_id: group_id}
@@ -203,3 +228,58 @@ class InfoBlobRepository:
         stmt = sa.select(InfoBlobs.title).where(InfoBlobs.website_id == website_id)
         result = await self.session.scalars(stmt)
         return list(result)
+
+    async def get_page_validators_of_website(
+        self, website_id: UUID
+    ) -> dict[str, CrawledPageValidators]:
+        stmt = sa.select(
+            InfoBlobs.url,
+            InfoBlobs.etag,
+            InfoBlobs.last_modified,
+            InfoBlobs.content_hash,
+            InfoBlobs.links,
+        ).where(InfoBlobs.website_id == website_id, InfoBlobs.url.is_not(None))
+        result = await self.session.execute(stmt)
+
+        return {
+            url: CrawledPageValidators(
+                etag=etag, last_modified=last_modified, content_hash=content_hash, links=links
+            )
+            for url, etag, last_modified, content_hash, links in result
+        }
+
+    async def update_page_validators(
+        self, info_blob_id: UUID, validators: CrawledPageValidators
+    ):
+        stmt = (
+            sa.update(InfoBlobs)
+            .where(InfoBlobs.id == info_blob_id)
+            .values(**validators.model_dump())
+        )
+        await self.session.execute(stmt)
+
+    async def update_page_validators_by_url(
+        self, url: str, website_id: UUID, validators: CrawledPageValidators
+    ):
+        stmt = (
+            sa.update(InfoBlobs)
+            .where(InfoBlobs.url == url, InfoBlobs.website_id == website_id)
+            .values(**validators.model_dump(exclude_none=True))
+        )
+        await self.session.execute(stmt)
+
+    async def delete_by_titles_and_website(
+        self, titles: Iterable[str], website_id: UUID, batch_size: int = 1000
+    ) -> int:
+        titles = list(titles)
+        num_deleted = 0
+
+        for i in range(0, len(titles), batch_size):
+            stmt = sa.delete(InfoBlobs).where(
+                InfoBlobs.website_id == website_id,
+                InfoBlobs.title.in_(titles[i : i + batch_size]),
+            )
+            result = await self.session.execute(stmt)
+            num_deleted += result.rowcount
+
+        return num_deleted
@@ -57,14 +57,21 @@ class InfoBlobService:
         if info_blob is None and group_id is None:
             raise ValueError("One of info_blob and group_id has to exist")
 
+        # Only the permissions of the user are needed
         if group_id is not None:
-            space = await self.space_repo.get_space_by_collection(collection_id=group_id)
+            space = await self.space_repo.get_space_by_collection(
+                collection_id=group_id, partial=True
+            )
 
         else:
             if info_blob.group_id is not None:
-                space = await self.space_repo.get_space_by_collection(info_blob.group_id)
+                space = await self.space_repo.get_space_by_collection(
+                    info_blob.group_id, partial=True
+                )
             elif info_blob.website_id is not None:
-                space = await self.space_repo.get_space_by_website(info_blob.website_id)
+                space = await self.space_repo.get_space_by_website(
+                    info_blob.website_id, partial=True
+                )
             elif info_blob.integration_knowledge_id is not None:
                 space = await self.space_repo.get_space_by_integration_knowledge(
                     info_blob.integration_knowledge_id
@@ -1,10 +1,11 @@
+from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING
 from uuid import UUID
 
 from intric.embedding_models.infrastructure.datastore import Datastore
 from intric.files.text import TextExtractor
-from intric.info_blobs.info_blob import InfoBlobAdd
+from intric.info_blobs.info_blob import InfoBlobAdd, InfoBlobInDB
 from intric.info_blobs.info_blob_service import InfoBlobService
 from intric.users.user import UserInDB
 
@@ -12,6 +13,13 @@ if TYPE_CHECKING:
     from intric.embedding_models.domain.embedding_model import EmbeddingModel
 
 
+@dataclass
+class TextToProcess:
+    text: str
+    title: str
+    url: str | None = None
+
+
 class TextProcessor:
     def __init__(
         self,
@@ -55,18 +63,61 @@ class TextProcessor:
         website_id: UUID | None = None,
         url: str | None = None,
     ):
-        info_blob_add = InfoBlobAdd(
-            title=title,
-            user_id=self.user.id,
-            text=text,
+        info_blobs = await self.process_texts(
+            texts=[TextToProcess(text=text, title=title, url=url)],
+            embedding_model=embedding_model,
             group_id=group_id,
-            url=url,
             website_id=website_id,
-            tenant_id=self.user.tenant_id,
         )
 
-        info_blob = await self.info_blob_service.add_info_blob_without_validation(info_blob_add)
-        await self.datastore.add(info_blob=info_blob, embedding_model=embedding_model)
-        info_blob_updated = await self.info_blob_service.update_info_blob_size(info_blob.id)
+        return info_blobs[0]
+
+    async def process_texts(
+        self,
+        *,
+        texts: list[TextToProcess],
+        embedding_model: "EmbeddingModel",
+        group_id: UUID | None = None,
+        website_id: UUID | None = None,
+    ) -> list[InfoBlobInDB]:
+        """Add several texts at once, embedding them together.
+
+        The titles of the texts are expected to be distinct.
+        """
+        known_embeddings = {}
+        info_blobs = []
+        for text in texts:
+            info_blob_add = InfoBlobAdd(
+                title=text.title,
+                user_id=self.user.id,
+                text=text.text,
+                group_id=group_id,
+                url=text.url,
+                website_id=website_id,
+                tenant_id=self.user.tenant_id,
+            )
+
+            # Adding the info blob replaces any info blob with the same title,
+            # so look up the embeddings that can be reused before that happens
+            known_embeddings |= await self.datastore.get_embeddings_by_title(
+                text.title,
+                embedding_model=embedding_model,
+                group_id=group_id,
+                website_id=website_id,
+            )
+
+            info_blob = await self.info_blob_service.add_info_blob_without_validation(
+                info_blob_add
+            )
+            info_blobs.append(info_blob)
+
+        await self.datastore.add_many(
+            info_blobs,
+            embedding_model=embedding_model,
+            known_embeddings=known_embeddings,
+        )
 
-        return info_blob_updated
+        return [
+            await self.info_blob_service.update_info_blob_size(info_blob.id)
+            for info_blob in info_blobs
+        ]
@@ -2,6 +2,7 @@ from typing import Optional, Tuple
 
 import aiohttp
 
+from intric.main.aiohttp_client import integration_aiohttp_client
 from intric.main.exceptions import InternalHTTPException
 from intric.main.logging import get_logger
 
@@ -11,7 +12,13 @@ logger = get_logger(__name__)
 class WrappedAiohttpClient:
     def __init__(self, base_url: str):
         self.base_url = base_url
-        self.client = aiohttp.ClientSession()
+
+        # Borrow the session of the process, and its connections, once it is started
+        self.owns_client = integration_aiohttp_client.session is None
+        if self.owns_client:
+            self.client = aiohttp.ClientSession()
+        else:
+            self.client = integration_aiohttp_client()
 
     def _create_url(self, endpoint: str):
         return f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
@@ -77,5 +84,5 @@ class WrappedAiohttpClient:
             raise InternalHTTPException from err
 
     async def close(self):
-        if self.client and not self.client.closed:
+        if self.owns_client and self.client and not self.client.closed:
             await self.client.close()
@@ -4,8 +4,12 @@ import aiohttp
 class AioHttpClient:
     session: aiohttp.ClientSession = None
 
+    def __init__(self, share_cookies: bool = True):
+        self.share_cookies = share_cookies
+
     def start(self):
-        self.session = aiohttp.ClientSession()
+        cookie_jar = None if self.share_cookies else aiohttp.DummyCookieJar()
+        self.session = aiohttp.ClientSession(cookie_jar=cookie_jar)
 
     async def stop(self):
         await self.session.close()
@@ -17,3 +21,5 @@ class AioHttpClient:
 
 
 aiohttp_client = AioHttpClient()
+# Shared by the integrations of every user, so no cookies are kept between requests
+integration_aiohttp_client = AioHttpClient(share_cookies=False)
@@ -76,6 +76,7 @@ class Settings(BaseSettings):
     using_access_management: bool = True
     using_iam: bool = False
     using_image_generation: bool = False
+    using_hybrid_search: bool = False
 
     # Security
     api_prefix: str
@@ -96,6 +97,8 @@ class Settings(BaseSettings):
     # Crawl
     crawl_max_length: int = 60 * 60 * 4  # 4 hour crawls max
     closespider_itemcount: int = 20000
+    crawl_queue_size: int = 100  # Pages scraped ahead of the ingestion
+    crawl_page_batch_size: int = 20  # Pages embedded together
     obey_robots: bool = True
     autothrottle_enabled: bool = True
     using_crawl: bool = True
@@ -2,6 +2,7 @@ from dependency_injector import containers, providers
 from intric.actors import ActorFactory, ActorManager
 from intric.admin.admin_service import AdminService
 from intric.admin.quota_service import QuotaService
+from intric.ai_models.ai_model_catalog import ai_model_catalog
 from intric.ai_models.ai_models_service import AIModelsService
 from intric.ai_models.completion_models.completion_models_repo import (
     CompletionModelsRepository,
@@ -30,6 +31,7 @@ from intric.assistants.assistant_service import AssistantService
 from intric.assistants.references import ReferencesService
 from intric.authentication.api_key_repo import ApiKeysRepository
 from intric.authentication.auth_service import AuthService
+from intric.authentication.principal_cache import principal_cache
 from intric.collections.application.collection_crud_service import CollectionCRUDService
 from intric.completion_models.application import CompletionModelCRUDService
 from intric.completion_models.domain import CompletionModelRepository
@@ -53,6 +55,10 @@ from intric.embedding_models.infrastructure.create_embeddings_service import (
     CreateEmbeddingsService,
 )
 from intric.embedding_models.infrastructure.datastore import Datastore
+from intric.embedding_models.infrastructure.embedding_batcher import embedding_batcher
+from intric.embedding_models.infrastructure.query_embedding_cache import (
+    query_embedding_cache,
+)
 from intric.files.file_protocol import FileProtocol
 from intric.files.file_repo import FileRepository
 from intric.files.file_service import FileService
@@ -247,6 +253,10 @@ class Container(containers.DeclarativeContainer):
     user = providers.Dependency(instance_of=UserInDB)
     tenant = providers.Dependency(instance_of=TenantInDB)
     aiohttp_client = providers.Object(aiohttp_client)
+    query_embedding_cache = providers.Object(query_embedding_cache)
+    embedding_batcher = providers.Object(embedding_batcher)
+    principal_cache = providers.Object(principal_cache)
+    ai_model_catalog = providers.Object(ai_model_catalog)
 
     # Factories
     prompt_factory = providers.Factory(PromptFactory)
@@ -337,11 +347,22 @@ class Container(containers.DeclarativeContainer):
     completion_model_repo = providers.Factory(CompletionModelsRepository, session=session)
     # TODO: rename when the first repo is not used anymore
     completion_model_repo2 = providers.Factory(
-        CompletionModelRepository, session=session, user=user
+        CompletionModelRepository,
+        session=session,
+        user=user,
+        ai_model_catalog=ai_model_catalog,
+    )
+    embedding_model_repo2 = providers.Factory(
+        EmbeddingModelRepository,
+        session=session,
+        user=user,
+        ai_model_catalog=ai_model_catalog,
     )
-    embedding_model_repo2 = providers.Factory(EmbeddingModelRepository, session=session, user=user)
     transcription_model_repo = providers.Factory(
-        TranscriptionModelRepository, session=session, user=user
+        TranscriptionModelRepository,
+        session=session,
+        user=user,
+        ai_model_catalog=ai_model_catalog,
     )
     embedding_model_repo = providers.Factory(AdminEmbeddingModelsService, session=session)
     website_sparse_repo = providers.Factory(WebsiteSparseRepository, session=session)
@@ -433,7 +454,11 @@ class Container(containers.DeclarativeContainer):
     )
 
     # Datastore
-    create_embeddings_service = providers.Factory(CreateEmbeddingsService)
+    create_embeddings_service = providers.Factory(
+        CreateEmbeddingsService,
+        query_embedding_cache=query_embedding_cache,
+        embedding_batcher=embedding_batcher,
+    )
     datastore = providers.Factory(
         Datastore,
         user=user,
@@ -492,6 +517,7 @@ class Container(containers.DeclarativeContainer):
         completion_model_repo=completion_model_repo,
         embedding_model_repo=embedding_model_repo,
         transcription_model_enable_service=transcription_model_enable_service,
+        principal_cache=principal_cache,
     )
     user_service = providers.Factory(
         UserService,
@@ -501,12 +527,14 @@ class Container(containers.DeclarativeContainer):
         tenant_repo=tenant_repo,
         predefined_roles_repo=predefined_roles_repo,
         info_blob_repo=info_blob_repo,
+        principal_cache=principal_cache,
     )
     security_classification_service = providers.Factory(
         SecurityClassificationService,
         user=user,
         repo=security_classification_repo,
         tenant_repo=tenant_repo,
+        principal_cache=principal_cache,
     )
     space_service = providers.Factory(
         SpaceService,
@@ -563,7 +591,9 @@ class Container(containers.DeclarativeContainer):
         repo=allowed_origin_repo,
     )
     predefined_role_service = providers.Factory(PredefinedRolesService, repo=predefined_roles_repo)
-    role_service = providers.Factory(RolesService, user=user, repo=role_repo)
+    role_service = providers.Factory(
+        RolesService, user=user, repo=role_repo, principal_cache=principal_cache
+    )
     settings_service = providers.Factory(
         SettingService,
         user=user,
@@ -680,13 +710,16 @@ class Container(containers.DeclarativeContainer):
         assistant_service=assistant_service,
         space_repo=space_repo,
     )
-    user_group_service = providers.Factory(UserGroupsService, user=user, repo=user_groups_repo)
+    user_group_service = providers.Factory(
+        UserGroupsService, user=user, repo=user_groups_repo, principal_cache=principal_cache
+    )
     admin_service = providers.Factory(
         AdminService,
         user=user,
         user_repo=user_repo,
         tenant_repo=tenant_repo,
         user_service=user_service,
+        principal_cache=principal_cache,
     )
     settings_service = providers.Factory(
         SettingService,
@@ -70,6 +70,10 @@ class OpenAIException(Exception):
     pass
 
 
+class OpenAIRateLimitException(OpenAIException):
+    pass
+
+
 class ClaudeException(Exception):
     pass
 
@@ -0,0 +1,47 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Span:
+    name: str
+    # Milliseconds since the spans were started
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Spans:
+    """When each stage of one request ran. Stages may overlap."""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.spans: list[Span] = []
+
+    def _now(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    @contextmanager
+    def span(self, name: str):
+        start = self._now()
+        try:
+            yield
+        finally:
+            self.spans.append(Span(name=name, start=start, end=self._now()))
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        with self.span(name):
+            return await awaitable
+
+    def __str__(self):
+        return ", ".join(
+            f"{span.name} {span.start:.0f}-{span.end:.0f} ms"
+            for span in sorted(self.spans, key=lambda span: span.start)
+        )
@@ -1,7 +1,9 @@
 # MIT License
 
+from typing import Optional
 from uuid import UUID
 
+from intric.authentication.principal_cache import PrincipalCache
 from intric.main.exceptions import NotFoundException
 from intric.roles.permissions import Permission, validate_permissions
 from intric.roles.permissions_mapper import PERMISSIONS_WITH_DESCRIPTION
@@ -22,9 +24,11 @@ class RolesService:
         self,
         user: UserInDB,
         repo: RolesRepository,
+        principal_cache: Optional[PrincipalCache] = None,
     ):
         self.user = user
         self.repo = repo
+        self.principal_cache = principal_cache
 
     def _validate(self, role: RoleInDB, role_id: UUID):
         if role is None or self.user.tenant_id != role.tenant_id:
@@ -32,6 +36,13 @@ class RolesService:
                 f"Role {role_id} not found for tenant({self.user.tenant_id})"
             )
 
+    async def _invalidate_cached_users(self):
+        # Roles are per tenant, and their permissions part of every cached user
+        if self.principal_cache is not None:
+            await self.principal_cache.invalidate_tenant(
+                self.user.tenant_id, session=self.repo.session
+            )
+
     async def get_permissions(self) -> dict:
         return [
             PermissionPublic(name=key, description=value)
@@ -60,14 +71,20 @@ class RolesService:
         role_update = RoleUpdate(
             **role_update.model_dump(exclude_unset=True), id=role.id
         )
-        return await self.repo.update_role(role_update)
+        updated_role = await self.repo.update_role(role_update)
+        await self._invalidate_cached_users()
+
+        return updated_role
 
     @validate_permissions(Permission.ADMIN)
     async def delete_role(self, role_id: UUID):
         role = await self.get_role_by_uuid(role_id)
         self._validate(role, role_id)
 
-        return await self.repo.delete_role_by_id(role_id)
+        deleted_role = await self.repo.delete_role_by_id(role_id)
+        await self._invalidate_cached_users()
+
+        return deleted_role
 
     @validate_permissions(Permission.ADMIN)
     async def get_all_roles(self):
@@ -5,6 +5,7 @@
 from typing import TYPE_CHECKING, Optional, Union
 from uuid import UUID
 
+from intric.authentication.principal_cache import PrincipalCache
 from intric.main.exceptions import (
     BadRequestException,
     NotFoundException,
@@ -32,10 +33,12 @@ class SecurityClassificationService:
         user: UserInDB,
         repo: "SecurityClassificationRepoImpl",
         tenant_repo: TenantRepository,
+        principal_cache: Optional[PrincipalCache] = None,
     ):
         self.user = user
         self.repo = repo
         self.tenant_repo = tenant_repo
+        self.principal_cache = principal_cache
 
     @validate_permissions(Permission.ADMIN)
     async def create_security_classification(
@@ -119,7 +122,14 @@ class SecurityClassificationService:
     @validate_permissions(Permission.ADMIN)
     async def toggle_security_on_tenant(self, enabled: bool):
         tenant_update = TenantUpdate(id=self.user.tenant_id, security_enabled=enabled)
-        return await self.tenant_repo.update_tenant(tenant_update)
+        tenant = await self.tenant_repo.update_tenant(tenant_update)
+
+        if self.principal_cache is not None:
+            await self.principal_cache.invalidate_tenant(
+                self.user.tenant_id, session=self.tenant_repo.session
+            )
+
+        return tenant
 
     @validate_permissions(Permission.ADMIN)
     async def update_security_classification(
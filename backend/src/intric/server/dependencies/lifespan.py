@@ -2,9 +2,10 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from intric.ai_models.model_clients import model_clients
 from intric.database.database import sessionmanager
 from intric.jobs.job_manager import job_manager
-from intric.main.aiohttp_client import aiohttp_client
+from intric.main.aiohttp_client import aiohttp_client, integration_aiohttp_client
 from intric.main.config import SETTINGS
 from intric.server.dependencies.ai_models import init_models
 from intric.server.dependencies.modules import init_modules
@@ -21,6 +22,7 @@ async def lifespan(app: FastAPI):
 
 async def startup():
     aiohttp_client.start()
+    integration_aiohttp_client.start()
     sessionmanager.init(SETTINGS.database_url)
     await job_manager.init()
 
@@ -37,5 +39,7 @@ async def startup():
 async def shutdown():
     await sessionmanager.close()
     await aiohttp_client.stop()
+    await integration_aiohttp_client.stop()
+    await model_clients.close()
     await job_manager.close()
     await websocket_manager.shutdown()
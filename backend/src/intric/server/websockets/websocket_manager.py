@@ -1,10 +1,12 @@
 import asyncio
-import traceback
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
 from uuid import UUID
 
 import redis.asyncio as aioredis
 from fastapi import WebSocket
+from pydantic_settings import BaseSettings
 
 from intric.main.logging import get_logger
 from intric.main.models import Channel, ChannelType, RedisMessage
@@ -19,55 +21,162 @@ from intric.server.websockets.websocket_models import (
 from intric.users.user import UserInDB
 from intric.worker.redis import r
 
+logger = get_logger(__name__)
+
+
+class WebSocketSettings(BaseSettings):
+    # A websocket that does not accept a message within this time is dropped
+    websocket_send_timeout: float = 10
+    # Messages queued for a slow websocket, the oldest are dropped beyond this
+    websocket_max_queued_messages: int = 100
+    # How often the number of websockets and queued messages is logged, 0 to only log on shutdown
+    websocket_stats_log_interval: float = 300  # Seconds
+
+
+settings = WebSocketSettings()
+
+# Wait this long before retrying after losing the connection to Redis
+RETRY_INTERVAL = 1
+
 
 @dataclass
-class SubscribedChannels:
-    websockets: set[WebSocket]
-    redis_task: asyncio.Task
+class WebSocketStats:
+    websockets: int
+    channels: int
+    queued_messages: int
+    # Since the process started
+    dropped_messages: int
+    dropped_websockets: int
 
 
-logger = get_logger(__name__)
+@dataclass(eq=False)
+class _Connection:
+    websocket: WebSocket
+    channels: set[str] = field(default_factory=set)
+    outbox: deque[str] = field(default_factory=deque)
+    sender: Optional[asyncio.Task] = None
 
 
 class WebSocketManager:
+    """Fans out Redis messages to the websockets connected to this process.
+
+    All channels are subscribed to on one shared Redis connection, read by
+    one task, and each message is dispatched to the websockets of its
+    channel with a dict lookup.
+
+    Every websocket has its own queue of outgoing messages, sent by its own
+    task, so that a slow websocket never holds up the others. The queue is
+    bounded, and a websocket that does not accept a message within
+    `send_timeout` is dropped.
+    """
+
     def __init__(
         self,
         redis: aioredis.Redis,
-        channels: dict[str, SubscribedChannels] = None,
+        send_timeout: float = settings.websocket_send_timeout,
+        max_queued_messages: int = settings.websocket_max_queued_messages,
+        stats_log_interval: float = settings.websocket_stats_log_interval,
     ):
         self.redis = redis
-        self.channels = channels or {}
-        self.task_monitoring = None
+        self.send_timeout = send_timeout
+        self.max_queued_messages = max_queued_messages
+        self.stats_log_interval = stats_log_interval
 
-    @property
-    def tasks(self):
-        return [self.channels[channel].redis_task for channel in self.channels]
+        self.channels: dict[str, set[WebSocket]] = {}
+        self.connections: dict[WebSocket, _Connection] = {}
 
-    def _check_exceptions(self, task: asyncio.Task):
-        try:
-            _ = task.result()
-        except asyncio.exceptions.CancelledError:
-            logger.debug(f'Task {task.get_name()} was cancelled')
-        except Exception:
-            logger.exception(traceback.format_exc())
+        self._subscribed: set[str] = set()
+        self._channels_changed = asyncio.Event()
+        self._connected = asyncio.Event()
+        self._pubsub = None
+        self._tasks: list[asyncio.Task] = []
+        self._stats_task: Optional[asyncio.Task] = None
 
-    def _remove_websocket_if_exists(self, websocket, channel):
-        try:
-            self.channels[channel].websockets.remove(websocket)
-        except KeyError:
-            logger.debug(f"WebSocket not found in channel {channel}")
+        self.dropped_messages = 0
+        self.dropped_websockets = 0
+
+    @property
+    def num_websockets(self) -> int:
+        return len(self.connections)
+
+    @property
+    def num_channels(self) -> int:
+        return len(self.channels)
 
-    async def _listen_to_redis(self, channel: str):
-        async with self.redis.pubsub() as pubsub:
-            await pubsub.subscribe(channel)
-            logger.debug('Subscribed to Redis channel: %s', channel)
+    @property
+    def num_queued_messages(self) -> int:
+        return sum(len(connection.outbox) for connection in self.connections.values())
+
+    def stats(self) -> WebSocketStats:
+        return WebSocketStats(
+            websockets=self.num_websockets,
+            channels=self.num_channels,
+            queued_messages=self.num_queued_messages,
+            dropped_messages=self.dropped_messages,
+            dropped_websockets=self.dropped_websockets,
+        )
 
-            while True:
-                raw_message = await pubsub.get_message(
+    def _start(self):
+        if self._tasks:
+            return
+
+        self._pubsub = self.redis.pubsub()
+        self._tasks = [
+            asyncio.create_task(self._sync_subscriptions(), name="websocket-subscriptions"),
+            asyncio.create_task(self._listen_to_redis(), name="websocket-listener"),
+        ]
+        if self.stats_log_interval > 0:
+            self._stats_task = asyncio.create_task(self._log_stats(), name="websocket-stats")
+
+    async def _log_stats(self):
+        while True:
+            await asyncio.sleep(self.stats_log_interval)
+            logger.info(f"WebSockets: {self.stats()}")
+
+    async def _sync_subscriptions(self):
+        while True:
+            await self._channels_changed.wait()
+            self._channels_changed.clear()
+
+            try:
+                channels = set(self.channels)
+                subscribe = channels - self._subscribed
+                unsubscribe = self._subscribed - channels
+
+                if subscribe:
+                    await self._pubsub.subscribe(*subscribe)
+                    logger.debug("Subscribed to %s Redis channels", len(subscribe))
+                if unsubscribe:
+                    await self._pubsub.unsubscribe(*unsubscribe)
+                    logger.debug("Unsubscribed from %s Redis channels", len(unsubscribe))
+
+                self._subscribed = (self._subscribed | subscribe) - unsubscribe
+                if self._pubsub.connection is not None:
+                    self._connected.set()
+
+            except Exception:
+                logger.exception("Failed to update Redis subscriptions")
+                await asyncio.sleep(RETRY_INTERVAL)
+                self._channels_changed.set()
+
+    async def _listen_to_redis(self):
+        # The connection is made by the first subscription
+        await self._connected.wait()
+
+        while True:
+            try:
+                raw_message = await self._pubsub.get_message(
                     ignore_subscribe_messages=True, timeout=None
                 )
                 if raw_message is not None:
-                    await self._process_redis_message(channel, raw_message)
+                    await self._process_redis_message(
+                        raw_message["channel"].decode(), raw_message
+                    )
+
+            except Exception:
+                # redis-py reconnects and restores the subscriptions on the next read
+                logger.exception("Failed to read from Redis")
+                await asyncio.sleep(RETRY_INTERVAL)
 
     async def _process_redis_message(self, channel: str, raw_message: dict):
         message = RedisMessage.model_validate_json(raw_message["data"].decode())
@@ -96,12 +205,41 @@ class WebSocketManager:
             ),
         )
 
+    @staticmethod
+    def _serialize(message: WsOutgoingWebSocketMessage) -> str:
+        return message.model_dump_json(serialize_as_any=True, exclude_none=True)
+
     async def _send_message(
         self, websocket: WebSocket, message: WsOutgoingWebSocketMessage
     ):
-        await websocket.send_text(
-            message.model_dump_json(serialize_as_any=True, exclude_none=True)
-        )
+        await websocket.send_text(self._serialize(message))
+
+    def _enqueue(self, connection: _Connection, text: str):
+        if len(connection.outbox) >= self.max_queued_messages:
+            connection.outbox.popleft()
+            self.dropped_messages += 1
+            logger.warning("WebSocket is not keeping up, dropped its oldest message")
+
+        connection.outbox.append(text)
+
+        if connection.sender is None:
+            connection.sender = asyncio.create_task(self._send_queued(connection))
+
+    async def _send_queued(self, connection: _Connection):
+        try:
+            while connection.outbox:
+                text = connection.outbox.popleft()
+                await asyncio.wait_for(
+                    connection.websocket.send_text(text), timeout=self.send_timeout
+                )
+
+        except Exception:
+            logger.warning("Failed to send to websocket, dropping it", exc_info=True)
+            self.dropped_websockets += 1
+            self.unsubscribe_from_all_channels(connection.websocket)
+
+        finally:
+            connection.sender = None
 
     async def pong(self, websocket: WebSocket):
         message = WsOutgoingWebSocketMessage(type=OutGoingMessageType.PONG)
@@ -128,53 +266,91 @@ class WebSocketManager:
             case _:
                 raise ValueError(f"Unexpected message type: {websocket_message.type}")
 
+    def _remove_from_channel(self, websocket: WebSocket, channel: str):
+        websockets = self.channels.get(channel)
+        if websockets is None:
+            return
+
+        websockets.discard(websocket)
+        if not websockets:
+            # No one is listening here anymore
+            del self.channels[channel]
+            self._channels_changed.set()
+
     def subscribe(self, websocket: WebSocket, channel_type: ChannelType, user_id: UUID):
         channel = Channel(type=channel_type, user_id=user_id).channel_string
 
+        connection = self.connections.get(websocket)
+        if connection is None:
+            connection = _Connection(websocket=websocket)
+            self.connections[websocket] = connection
+        connection.channels.add(channel)
+
         if channel not in self.channels:
-            redis_task = asyncio.create_task(self._listen_to_redis(channel))
-            redis_task.add_done_callback(self._check_exceptions)
-            self.channels[channel] = SubscribedChannels(
-                websockets=set(), redis_task=redis_task
-            )
+            self.channels[channel] = set()
+            self._channels_changed.set()
+            self._start()
 
-        self.channels[channel].websockets.add(websocket)
+        self.channels[channel].add(websocket)
 
-    def unsubscribe(self, websocket: WebSocket, channel_type: Channel, user_id: UUID):
+    def unsubscribe(self, websocket: WebSocket, channel_type: ChannelType, user_id: UUID):
         channel = Channel(type=channel_type, user_id=user_id).channel_string
 
-        if channel in self.channels:
-            self._remove_websocket_if_exists(websocket, channel)
+        connection = self.connections.get(websocket)
+        if connection is None:
+            return
 
-            if not self.channels[channel].websockets:
-                # No one is listening, cancel the task
-                self.channels[channel].redis_task.cancel()
-                del self.channels[channel]
+        connection.channels.discard(channel)
+        self._remove_from_channel(websocket, channel)
+
+        if not connection.channels:
+            self._remove_connection(connection)
 
     def unsubscribe_from_all_channels(self, websocket: WebSocket):
-        channels_to_delete = []
-        for channel in self.channels:
-            self._remove_websocket_if_exists(websocket, channel)
+        connection = self.connections.get(websocket)
+        if connection is None:
+            return
 
-            if not self.channels[channel].websockets:
-                channels_to_delete.append(channel)
+        for channel in connection.channels:
+            self._remove_from_channel(websocket, channel)
 
-        for channel in channels_to_delete:
-            self.channels[channel].redis_task.cancel()
-            del self.channels[channel]
+        connection.channels.clear()
+        self._remove_connection(connection)
+
+    def _remove_connection(self, connection: _Connection):
+        del self.connections[connection.websocket]
+        connection.outbox.clear()
+
+        if connection.sender is not None and connection.sender is not asyncio.current_task():
+            connection.sender.cancel()
 
     async def publish(self, channel: str, message: WsOutgoingWebSocketMessage):
-        subscribed_channels = self.channels.get(channel, None)
+        websockets = self.channels.get(channel)
+        if not websockets:
+            return
 
-        if subscribed_channels is not None:
-            for ws in subscribed_channels.websockets:
-                await self._send_message(ws, message)
+        text = self._serialize(message)
+        for websocket in websockets:
+            self._enqueue(self.connections[websocket], text)
 
     async def shutdown(self):
-        for task in self.tasks:
+        logger.info(f"WebSockets: {self.stats()}")
+
+        senders = [
+            connection.sender
+            for connection in self.connections.values()
+            if connection.sender is not None
+        ]
+        tasks = self._tasks + senders
+        if self._stats_task is not None:
+            tasks.append(self._stats_task)
+        for task in tasks:
             task.cancel()
 
-        await asyncio.gather(*self.tasks)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
 
 
 websocket_manager = WebSocketManager(redis=r)
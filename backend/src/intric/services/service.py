@@ -20,7 +20,7 @@ from intric.files.file_models import FilePublic
 from intric.groups_legacy.api.group_models import GroupInDBBase, GroupPublicBase
 from intric.info_blobs.info_blob import (
     InfoBlobChunkInDBWithScore,
-    InfoBlobInDBWithScore,
+    InfoBlobInDBNoTextWithScore,
     InfoBlobPublic,
 )
 from intric.main.config import get_settings
@@ -121,7 +121,7 @@ class ServiceRun(BaseModel):
 class DatastoreResult(BaseModel):
     chunks: list[InfoBlobChunkInDBWithScore]
     no_duplicate_chunks: list[InfoBlobChunkInDBWithScore]
-    info_blobs: list[InfoBlobInDBWithScore]
+    info_blobs: list[InfoBlobInDBNoTextWithScore]
 
 
 class RunnerResult(BaseModel):
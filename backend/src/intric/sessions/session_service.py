@@ -4,6 +4,11 @@ from uuid import UUID
 
 from intric.ai_models.completion_models.completion_model import CompletionModel
 from intric.assistants.assistant_service import AssistantService
+from intric.completion_models.infrastructure.context_builder import (
+    MIN_MESSAGES,
+    ContextBuilder,
+)
+from intric.completion_models.infrastructure.tokenizer import DEFAULT_ENCODING
 from intric.files.file_models import File
 from intric.group_chat.application.group_chat_service import GroupChatService
 from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
@@ -64,9 +69,16 @@ class SessionService:
             raise NotFoundException("Session belongs to another group chat")
 
     async def get_session_by_uuid(
-        self, id: UUID, assistant_id: UUID = None, group_chat_id: UUID = None
+        self,
+        id: UUID,
+        assistant_id: UUID = None,
+        group_chat_id: UUID = None,
+        with_questions: bool = True,
     ):
-        session = await self.session_repo.get(id=id)
+        if with_questions:
+            session = await self.session_repo.get(id=id)
+        else:
+            session = await self.session_repo.get_without_questions(id=id)
 
         self._check_exists_and_belongs_to_user(
             session, assistant_id=assistant_id, group_chat_id=group_chat_id
@@ -74,6 +86,44 @@ class SessionService:
 
         return session
 
+    async def get_session_with_history_window(
+        self,
+        id: UUID,
+        max_tokens: int,
+        encoding_name: str = DEFAULT_ENCODING,
+        assistant_id: UUID = None,
+        group_chat_id: UUID = None,
+    ):
+        """Get a session with only the latest questions that fit in a context of `max_tokens`.
+
+        The questions are read newest first, one page at a time, until they
+        fill the share of the context that `ContextBuilder` gives the
+        history, so older questions are never loaded.
+        """
+        session = await self.session_repo.get_without_questions(id=id)
+
+        self._check_exists_and_belongs_to_user(
+            session, assistant_id=assistant_id, group_chat_id=group_chat_id
+        )
+
+        max_tokens_messages = ContextBuilder.get_max_tokens_of_messages(max_tokens)
+        questions = []
+        total_tokens = 0
+        async for question in self.session_repo.iterate_history(session_id=id):
+            message_tokens = ContextBuilder.count_message_tokens(question, encoding_name)
+            if (
+                len(questions) > MIN_MESSAGES
+                and total_tokens + message_tokens > max_tokens_messages
+            ):
+                break
+
+            questions.append(question)
+            total_tokens += message_tokens
+
+        session.questions = list(reversed(questions))
+
+        return session
+
     async def get_sessions_by_assistant(
         self,
         assistant_id: UUID,
@@ -1,13 +1,14 @@
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 from uuid import UUID
 
 import sqlalchemy as sa
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 
 from intric.database.database import AsyncSession
 from intric.database.repositories.base import BaseRepositoryDelegate
 from intric.database.tables.assistant_table import Assistants
+from intric.database.tables.files_table import Files
 from intric.database.tables.info_blobs_table import InfoBlobs
 from intric.database.tables.questions_table import (
     InfoBlobReferences,
@@ -16,6 +17,9 @@ from intric.database.tables.questions_table import (
 )
 from intric.database.tables.sessions_table import Sessions
 from intric.database.tables.users_table import Users
+from intric.files.file_models import File
+from intric.questions.question import Question
+from intric.questions.question import QuestionsFiles as QuestionFile
 from intric.sessions.session import (
     SessionAdd,
     SessionFeedback,
@@ -87,6 +91,92 @@ class SessionRepository:
 
         return await self.delegate.filter_by(conditions={Sessions.user_id: user_id})
 
+    async def get_without_questions(self, id: UUID) -> Optional[SessionInDB]:
+        query = (
+            sa.select(Sessions)
+            .where(Sessions.id == id)
+            .options(
+                noload(Sessions.questions),
+                selectinload(Sessions.assistant).selectinload(Assistants.user),
+            )
+        )
+        session = await self.session.scalar(query)
+
+        if session is None:
+            return None
+
+        return SessionInDB.model_validate(session)
+
+    async def get_history_page(
+        self,
+        session_id: UUID,
+        limit: int,
+        before: Optional[tuple[datetime, UUID]] = None,
+    ) -> list[Question]:
+        """Get up to `limit` questions of a session, newest first.
+
+        Only the columns needed to build the context of a completion are
+        loaded, together with the files of the questions. `before` is the
+        `(created_at, id)` of the last question of the previous page.
+        """
+        query = (
+            sa.select(
+                Questions.id,
+                Questions.created_at,
+                Questions.updated_at,
+                Questions.question,
+                Questions.answer,
+                Questions.num_tokens_question,
+                Questions.num_tokens_answer,
+                Questions.tenant_id,
+                Questions.session_id,
+                Questions.completion_model_id,
+                Questions.assistant_id,
+            )
+            .where(Questions.session_id == session_id)
+            .order_by(Questions.created_at.desc(), Questions.id.desc())
+            .limit(limit)
+        )
+
+        if before is not None:
+            query = query.where(sa.tuple_(Questions.created_at, Questions.id) < before)
+
+        rows = (await self.session.execute(query)).mappings().all()
+        if not rows:
+            return []
+
+        files_query = (
+            sa.select(QuestionsFiles.question_id, QuestionsFiles.type, Files)
+            .join(Files, Files.id == QuestionsFiles.file_id)
+            .where(QuestionsFiles.question_id.in_([row["id"] for row in rows]))
+            .order_by(QuestionsFiles.file_id)
+        )
+        files_by_question: dict[UUID, list[QuestionFile]] = {}
+        for question_id, type, file in await self.session.execute(files_query):
+            files_by_question.setdefault(question_id, []).append(
+                QuestionFile(type=type, file=File.model_validate(file))
+            )
+
+        return [
+            Question(**row, questions_files=files_by_question.get(row["id"], []))
+            for row in rows
+        ]
+
+    async def iterate_history(
+        self, session_id: UUID, page_size: int = 20
+    ) -> AsyncIterator[Question]:
+        """Iterate over the questions of a session, newest first, one page at a time."""
+        before = None
+        while True:
+            page = await self.get_history_page(session_id, limit=page_size, before=before)
+            for question in page:
+                yield question
+
+            if len(page) < page_size:
+                return
+
+            before = (page[-1].created_at, page[-1].id)
+
     async def _get_total_count(
         self,
         assistant_id: UUID = None,
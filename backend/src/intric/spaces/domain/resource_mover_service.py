@@ -41,8 +41,8 @@ class ResourceMoverService:
         target_space.add_website(website)
         source_space.remove_website(website)
 
-        await self.space_repo.update(space=target_space)
-        await self.space_repo.update(space=source_space)
+        await self.space_repo.update(space=target_space, reload=False)
+        await self.space_repo.update(space=source_space, reload=False)
 
     async def move_collection_to_space(self, collection_id: "UUID", space_id: "UUID"):
         source_space = await self.space_service.get_space_by_collection(collection_id)
@@ -66,8 +66,8 @@ class ResourceMoverService:
         target_space.add_collection(collection)
         source_space.remove_collection(collection)
 
-        await self.space_repo.update(space=target_space)
-        await self.space_repo.update(space=source_space)
+        await self.space_repo.update(space=target_space, reload=False)
+        await self.space_repo.update(space=source_space, reload=False)
 
     async def move_assistant_to_space(
         self, assistant_id: "UUID", space_id: "UUID", move_resources: bool = False
@@ -122,5 +122,5 @@ class ResourceMoverService:
                 target_space.add_website(website)
                 source_space.remove_website(website)
 
-        await self.space_repo.update(space=target_space)
-        await self.space_repo.update(space=source_space)
+        await self.space_repo.update(space=target_space, reload=False)
+        await self.space_repo.update(space=source_space, reload=False)
@@ -13,6 +13,7 @@ from intric.security_classifications.domain.entities.security_classification imp
     SecurityClassification,
 )
 from intric.spaces.api.space_models import SpaceMember, SpaceRoleValue
+from intric.spaces.space_changes import SpaceChanges, SpaceState
 from intric.transcription_models.domain.transcription_model import TranscriptionModel
 
 if TYPE_CHECKING:
@@ -64,6 +65,7 @@ class Space:
         updated_at: datetime = None,
         group_chats: Optional[list["GroupChat"]] = [],
         security_classification: Optional[SecurityClassification] = None,
+        partial: bool = False,
     ):
         self.id = id
         self.tenant_id = tenant_id
@@ -85,6 +87,20 @@ class Space:
         self.created_at = created_at
         self.updated_at = updated_at
         self.security_classification = security_classification
+        # Only some of the resources and members are loaded, see `SpaceRepository`
+        self.partial = partial
+        self._persisted_state: Optional[SpaceState] = None
+
+    def mark_persisted(self):
+        """Remember the space as it is in the database, so that only what changes is saved."""
+        self._persisted_state = SpaceState.of(self)
+
+    def get_changes(self) -> Optional[SpaceChanges]:
+        """What changed since the space was loaded or saved, if that is known."""
+        if self._persisted_state is None:
+            return None
+
+        return SpaceChanges.between(self._persisted_state, self)
 
     def _get_member_ids(self):
         return self.members.keys()
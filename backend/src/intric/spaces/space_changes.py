@@ -0,0 +1,208 @@
+import dataclasses
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Generic, Iterable, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from intric.spaces.space import Space
+
+T = TypeVar("T")
+
+# Kept up to date by the database, or not saved with the space
+_IGNORED_ATTRIBUTES = {"user", "_permissions", "created_at", "updated_at"}
+
+
+def _fingerprint(value: Any):
+    """A comparable copy of what of `value` is saved with the entity that holds it.
+
+    Entities, models and files that are referenced are only saved by their
+    id, so only the id is kept of anything that has one.
+    """
+    if value is None or isinstance(value, (str, int, float, bool, UUID, Enum, datetime)):
+        return value
+
+    if hasattr(value, "id"):
+        return ("id", value.id)
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_fingerprint(item) for item in value)
+
+    if isinstance(value, dict):
+        return tuple((key, _fingerprint(item)) for key, item in value.items())
+
+    if isinstance(value, BaseModel):
+        return _fingerprint(value.model_dump())
+
+    if dataclasses.is_dataclass(value):
+        return _fingerprint(dataclasses.asdict(value))
+
+    if hasattr(value, "__dict__"):
+        return _fingerprint(vars(value))
+
+    return value
+
+
+def _entity_state(entity: Any) -> tuple:
+    return tuple(
+        (key, _fingerprint(value))
+        for key, value in vars(entity).items()
+        if key not in _IGNORED_ATTRIBUTES
+    )
+
+
+def _states(entities: Iterable[Any]) -> dict[UUID, tuple]:
+    return {entity.id: _entity_state(entity) for entity in entities}
+
+
+def _attributes(space: "Space") -> tuple:
+    return (
+        space.name,
+        space.description,
+        space.security_classification.id if space.security_classification else None,
+    )
+
+
+def _ids(models: Iterable[Any]) -> frozenset[UUID]:
+    return frozenset(model.id for model in models)
+
+
+def _assistants(space: "Space") -> list:
+    # The default assistant is saved with the others
+    if space.default_assistant is None:
+        return space.assistants
+
+    return space.assistants + [space.default_assistant]
+
+
+@dataclass(frozen=True)
+class SpaceState:
+    """What of a space is saved, as it was when the space was loaded."""
+
+    attributes: tuple
+    completion_model_ids: frozenset[UUID]
+    embedding_model_ids: frozenset[UUID]
+    transcription_model_ids: frozenset[UUID]
+    member_roles: dict[UUID, Any]
+    default_assistant_id: UUID | None
+    assistants: dict[UUID, tuple]
+    collections: dict[UUID, tuple]
+    websites: dict[UUID, tuple]
+    group_chats: dict[UUID, tuple]
+
+    @classmethod
+    def of(cls, space: "Space") -> "SpaceState":
+        return cls(
+            attributes=_attributes(space),
+            completion_model_ids=_ids(space.completion_models),
+            embedding_model_ids=_ids(space.embedding_models),
+            transcription_model_ids=_ids(space.transcription_models),
+            member_roles={member.id: member.role for member in space.members.values()},
+            default_assistant_id=space.default_assistant.id if space.default_assistant else None,
+            assistants=_states(_assistants(space)),
+            collections=_states(space.collections),
+            websites=_states(space.websites),
+            group_chats=_states(space.group_chats),
+        )
+
+
+@dataclass
+class IdChanges:
+    added: set[UUID] = field(default_factory=set)
+    removed: set[UUID] = field(default_factory=set)
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+    @classmethod
+    def between(cls, old: frozenset[UUID], new: frozenset[UUID]) -> "IdChanges":
+        return cls(added=set(new - old), removed=set(old - new))
+
+
+@dataclass
+class ChildChanges(Generic[T]):
+    # Not in the database yet
+    new: list[T] = field(default_factory=list)
+    # Changed since they were loaded, or moved here from another space
+    changed: list[T] = field(default_factory=list)
+    removed: list[UUID] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.new or self.changed or self.removed)
+
+    @classmethod
+    def between(cls, old: dict[UUID, tuple], entities: Iterable[T]) -> "ChildChanges[T]":
+        changes = cls()
+        ids = set()
+
+        for entity in entities:
+            ids.add(entity.id)
+
+            if entity.is_new:
+                changes.new.append(entity)
+            elif old.get(entity.id) != _entity_state(entity):
+                changes.changed.append(entity)
+
+        changes.removed = [id for id in old if id not in ids]
+
+        return changes
+
+
+@dataclass
+class SpaceChanges:
+    """What has to be written to save a space, compared to when it was loaded."""
+
+    attributes: bool
+    completion_models: IdChanges
+    embedding_models: IdChanges
+    transcription_models: IdChanges
+    members: ChildChanges
+    default_assistant: bool
+    assistants: ChildChanges
+    collections: ChildChanges
+    websites: ChildChanges
+    group_chats: ChildChanges
+
+    def __bool__(self):
+        return any(getattr(self, f.name) for f in dataclasses.fields(self))
+
+    @property
+    def has_new(self) -> bool:
+        return any(
+            changes.new
+            for changes in (self.assistants, self.collections, self.websites, self.group_chats)
+        )
+
+    @classmethod
+    def between(cls, old: SpaceState, space: "Space") -> "SpaceChanges":
+        members = ChildChanges(
+            changed=[
+                member
+                for member in space.members.values()
+                if old.member_roles.get(member.id) != member.role
+            ],
+            removed=[id for id in old.member_roles if id not in space.members],
+        )
+        default_assistant_id = space.default_assistant.id if space.default_assistant else None
+
+        return cls(
+            attributes=old.attributes != _attributes(space),
+            completion_models=IdChanges.between(
+                old.completion_model_ids, _ids(space.completion_models)
+            ),
+            embedding_models=IdChanges.between(
+                old.embedding_model_ids, _ids(space.embedding_models)
+            ),
+            transcription_models=IdChanges.between(
+                old.transcription_model_ids, _ids(space.transcription_models)
+            ),
+            members=members,
+            default_assistant=old.default_assistant_id != default_assistant_id,
+            assistants=ChildChanges.between(old.assistants, _assistants(space)),
+            collections=ChildChanges.between(old.collections, space.collections),
+            websites=ChildChanges.between(old.websites, space.websites),
+            group_chats=ChildChanges.between(old.group_chats, space.group_chats),
+        )
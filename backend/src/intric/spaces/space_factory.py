@@ -7,7 +7,7 @@ from intric.database.tables.assistant_table import Assistants
 from intric.database.tables.collections_table import CollectionsTable
 from intric.database.tables.group_chats_table import GroupChatsTable
 from intric.database.tables.service_table import Services
-from intric.database.tables.spaces_table import Spaces
+from intric.database.tables.spaces_table import Spaces, SpacesUsers
 from intric.group_chat.domain.factories.group_chat_factory import GroupChatFactory
 from intric.integration.domain.entities.integration_knowledge import (
     IntegrationKnowledge,
@@ -80,6 +80,9 @@ class SpaceFactory:
         apps_in_db: list["Apps"] = [],
         services_in_db: list[Services] = [],
         security_classification: Optional[SecurityClassification] = None,
+        members_in_db: Optional[list[SpacesUsers]] = None,
+        integration_knowledge_in_db: Optional[list] = None,
+        partial: bool = False,
     ) -> Space:
         non_deprecated_completion_models = [
             completion_model
@@ -131,11 +134,14 @@ class SpaceFactory:
                 ]
             ]
 
+        if members_in_db is None:
+            members_in_db = space_in_db.members
+
         members = {
             space_user.user_id: SpaceMember(
                 **space_user.user.to_dict(), role=space_user.role
             )
-            for space_user in space_in_db.members
+            for space_user in members_in_db
             if space_user.user.deleted_at is None
         }
         space_collections = [
@@ -168,8 +174,11 @@ class SpaceFactory:
             for website in websites_in_db
         ]
 
+        if integration_knowledge_in_db is None:
+            integration_knowledge_in_db = space_in_db.integration_knowledge_list
+
         integration_knowledge_list = []
-        for i in space_in_db.integration_knowledge_list:
+        for i in integration_knowledge_in_db:
             integration_knowledge_list.append(
                 IntegrationKnowledge(
                     name=i.name,
@@ -279,4 +288,5 @@ class SpaceFactory:
             websites=space_websites,
             members=members,
             security_classification=security_classification,
+            partial=partial,
         )
@@ -2,8 +2,9 @@ from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm import aliased, noload, selectinload
 
 from intric.ai_models.completion_models.completion_model import CompletionModelSparse
 from intric.ai_models.embedding_models.embedding_model import EmbeddingModelSparse
@@ -50,6 +51,7 @@ from intric.database.tables.websites_table import Websites as WebsitesTable
 from intric.main.exceptions import NotFoundException, UniqueException
 from intric.spaces.api.space_models import SpaceMember
 from intric.spaces.space import Space
+from intric.spaces.space_changes import ChildChanges, IdChanges, SpaceChanges
 from intric.spaces.space_factory import SpaceFactory
 
 if TYPE_CHECKING:
@@ -112,7 +114,19 @@ class SpaceRepository:
             ),
         ]
 
-    async def _get_collections(self, space_id: UUID):
+    def _partial_options(self):
+        # Members and integration knowledge are loaded separately, and only
+        # as far as they are needed, for partially loaded spaces
+        return [
+            selectinload(Spaces.completion_models_mapping),
+            selectinload(Spaces.embedding_models_mapping),
+            selectinload(Spaces.transcription_models_mapping),
+            selectinload(Spaces.security_classification).selectinload(
+                SecurityClassificationDBModel.tenant
+            ),
+        ]
+
+    async def _get_collections(self, space_id: UUID, collection_ids: Optional[list[UUID]] = None):
         query = (
             sa.select(
                 CollectionsTable,
@@ -124,6 +138,8 @@ class SpaceRepository:
             .order_by(CollectionsTable.created_at)
             .options(selectinload(CollectionsTable.embedding_model))
         )
+        if collection_ids is not None:
+            query = query.where(CollectionsTable.id.in_(collection_ids))
 
         res = await self.session.execute(query)
         return res.all()
@@ -299,7 +315,7 @@ class SpaceRepository:
         )
         await self.session.execute(stmt)
 
-    async def _set_default_assistant(self, space_in_db: Spaces, assistant: Optional["Assistant"]):
+    async def _set_default_assistant(self, space_id: UUID, assistant: Optional["Assistant"]):
         if assistant is None:
             return
 
@@ -307,7 +323,7 @@ class SpaceRepository:
         stmt = (
             sa.update(Assistants)
             .values(is_default=False)
-            .where(Assistants.space_id == space_in_db.id)
+            .where(Assistants.space_id == space_id)
             .where(Assistants.id != assistant.id)
         )
         await self.session.execute(stmt)
@@ -316,35 +332,35 @@ class SpaceRepository:
         stmt = sa.update(Assistants).values(is_default=True).where(Assistants.id == assistant.id)
         await self.session.execute(stmt)
 
-    async def _set_group_chats(self, space_in_db: Spaces, group_chats: list["GroupChat"]):
-        new_group_chats = [group_chat for group_chat in group_chats if group_chat.is_new]
-        existing_group_chats = [group_chat for group_chat in group_chats if not group_chat.is_new]
+    async def _insert_group_chats(self, space_id: UUID, group_chats: list["GroupChat"]):
+        if not group_chats:
+            return
 
-        if new_group_chats:
-            stmt = sa.insert(GroupChatsTable).values(
-                [
-                    dict(
-                        id=group_chat.id,
-                        name=group_chat.name,
-                        space_id=space_in_db.id,
-                        user_id=group_chat.user_id,
-                        type="group-chat",
-                        allow_mentions=group_chat.allow_mentions,
-                        show_response_label=group_chat.show_response_label,
-                        published=group_chat.published,
-                        insight_enabled=group_chat.insight_enabled,
-                    )
-                    for group_chat in new_group_chats
-                ]
-            )
-            await self.session.execute(stmt)
+        stmt = sa.insert(GroupChatsTable).values(
+            [
+                dict(
+                    id=group_chat.id,
+                    name=group_chat.name,
+                    space_id=space_id,
+                    user_id=group_chat.user_id,
+                    type="group-chat",
+                    allow_mentions=group_chat.allow_mentions,
+                    show_response_label=group_chat.show_response_label,
+                    published=group_chat.published,
+                    insight_enabled=group_chat.insight_enabled,
+                )
+                for group_chat in group_chats
+            ]
+        )
+        await self.session.execute(stmt)
 
-        for group_chat in existing_group_chats:
+    async def _update_group_chats(self, space_id: UUID, group_chats: list["GroupChat"]):
+        for group_chat in group_chats:
             stmt = (
                 sa.update(GroupChatsTable)
                 .values(
                     name=group_chat.name,
-                    space_id=space_in_db.id,
+                    space_id=space_id,
                     allow_mentions=group_chat.allow_mentions,
                     show_response_label=group_chat.show_response_label,
                     published=group_chat.published,
@@ -376,6 +392,13 @@ class SpaceRepository:
                 )
                 await self.session.execute(stmt)
 
+    async def _set_group_chats(self, space_in_db: Spaces, group_chats: list["GroupChat"]):
+        new_group_chats = [group_chat for group_chat in group_chats if group_chat.is_new]
+        existing_group_chats = [group_chat for group_chat in group_chats if not group_chat.is_new]
+
+        await self._insert_group_chats(space_in_db.id, new_group_chats)
+        await self._update_group_chats(space_in_db.id, existing_group_chats)
+
         # Delete all group chats that are not in the list
         stmt = (
             sa.delete(GroupChatsTable)
@@ -384,49 +407,55 @@ class SpaceRepository:
         )
         await self.session.execute(stmt)
 
-    async def _set_collections(self, space_in_db: Spaces, collections: list["Collection"]):
-        def _set_size_subquery(collection: "Collection"):
-            stmt = (
-                sa.select(sa.func.coalesce(sa.func.sum(InfoBlobsTable.size), 0))
-                .where(InfoBlobsTable.group_id == collection.id)
-                .scalar_subquery()
-            )
-
-            return stmt
+    @staticmethod
+    def _collection_size(collection_id):
+        return (
+            sa.select(sa.func.coalesce(sa.func.sum(InfoBlobsTable.size), 0))
+            .where(InfoBlobsTable.group_id == collection_id)
+            .scalar_subquery()
+        )
 
-        new_collections = [collection for collection in collections if collection.is_new]
-        existing_collections = [collection for collection in collections if not collection.is_new]
+    async def _insert_collections(self, space_id: UUID, collections: list["Collection"]):
+        if not collections:
+            return
 
-        if new_collections:
-            stmt = sa.insert(CollectionsTable).values(
-                [
-                    dict(
-                        id=collection.id,
-                        name=collection.name,
-                        size=_set_size_subquery(collection),
-                        tenant_id=collection.tenant_id,
-                        user_id=collection.user_id,
-                        embedding_model_id=collection.embedding_model.id,
-                        space_id=space_in_db.id,
-                    )
-                    for collection in new_collections
-                ]
-            )
-            await self.session.execute(stmt)
+        stmt = sa.insert(CollectionsTable).values(
+            [
+                dict(
+                    id=collection.id,
+                    name=collection.name,
+                    size=self._collection_size(collection.id),
+                    tenant_id=collection.tenant_id,
+                    user_id=collection.user_id,
+                    embedding_model_id=collection.embedding_model.id,
+                    space_id=space_id,
+                )
+                for collection in collections
+            ]
+        )
+        await self.session.execute(stmt)
 
-        for collection in existing_collections:
+    async def _update_collections(self, space_id: UUID, collections: list["Collection"]):
+        for collection in collections:
             stmt = (
                 sa.update(CollectionsTable)
                 .values(
                     name=collection.name,
-                    size=_set_size_subquery(collection),
+                    size=self._collection_size(collection.id),
                     embedding_model_id=collection.embedding_model.id,
-                    space_id=space_in_db.id,
+                    space_id=space_id,
                 )
                 .where(CollectionsTable.id == collection.id)
             )
             await self.session.execute(stmt)
 
+    async def _set_collections(self, space_in_db: Spaces, collections: list["Collection"]):
+        new_collections = [collection for collection in collections if collection.is_new]
+        existing_collections = [collection for collection in collections if not collection.is_new]
+
+        await self._insert_collections(space_in_db.id, new_collections)
+        await self._update_collections(space_in_db.id, existing_collections)
+
         # Delete all collections that are not in the list
         stmt = (
             sa.delete(CollectionsTable)
@@ -435,41 +464,40 @@ class SpaceRepository:
         )
         await self.session.execute(stmt)
 
-    async def _set_websites(self, space_in_db: Spaces, websites: list["Website"]):
-        def _set_size_subquery(website: "Website"):
-            stmt = (
-                sa.select(sa.func.coalesce(sa.func.sum(InfoBlobsTable.size), 0))
-                .where(InfoBlobsTable.website_id == website.id)
-                .scalar_subquery()
-            )
-
-            return stmt
+    @staticmethod
+    def _website_size(website_id):
+        return (
+            sa.select(sa.func.coalesce(sa.func.sum(InfoBlobsTable.size), 0))
+            .where(InfoBlobsTable.website_id == website_id)
+            .scalar_subquery()
+        )
 
-        new_websites = [website for website in websites if website.is_new]
-        existing_websites = [website for website in websites if not website.is_new]
+    async def _insert_websites(self, space_id: UUID, websites: list["Website"]):
+        if not websites:
+            return
 
-        if new_websites:
-            stmt = sa.insert(WebsitesTable).values(
-                [
-                    dict(
-                        id=website.id,
-                        name=website.name,
-                        url=website.url,
-                        download_files=website.download_files,
-                        crawl_type=website.crawl_type,
-                        update_interval=website.update_interval,
-                        size=_set_size_subquery(website),
-                        tenant_id=website.tenant_id,
-                        user_id=website.user_id,
-                        embedding_model_id=website.embedding_model.id,
-                        space_id=space_in_db.id,
-                    )
-                    for website in new_websites
-                ]
-            )
-            await self.session.execute(stmt)
+        stmt = sa.insert(WebsitesTable).values(
+            [
+                dict(
+                    id=website.id,
+                    name=website.name,
+                    url=website.url,
+                    download_files=website.download_files,
+                    crawl_type=website.crawl_type,
+                    update_interval=website.update_interval,
+                    size=self._website_size(website.id),
+                    tenant_id=website.tenant_id,
+                    user_id=website.user_id,
+                    embedding_model_id=website.embedding_model.id,
+                    space_id=space_id,
+                )
+                for website in websites
+            ]
+        )
+        await self.session.execute(stmt)
 
-        for website in existing_websites:
+    async def _update_websites(self, space_id: UUID, websites: list["Website"]):
+        for website in websites:
             stmt = (
                 sa.update(WebsitesTable)
                 .values(
@@ -478,14 +506,21 @@ class SpaceRepository:
                     download_files=website.download_files,
                     crawl_type=website.crawl_type,
                     update_interval=website.update_interval,
-                    size=_set_size_subquery(website),
+                    size=self._website_size(website.id),
                     embedding_model_id=website.embedding_model.id,
-                    space_id=space_in_db.id,
+                    space_id=space_id,
                 )
                 .where(WebsitesTable.id == website.id)
             )
             await self.session.execute(stmt)
 
+    async def _set_websites(self, space_in_db: Spaces, websites: list["Website"]):
+        new_websites = [website for website in websites if website.is_new]
+        existing_websites = [website for website in websites if not website.is_new]
+
+        await self._insert_websites(space_in_db.id, new_websites)
+        await self._update_websites(space_in_db.id, existing_websites)
+
         # Delete all websites that are not in the list
         stmt = (
             sa.delete(WebsitesTable)
@@ -494,41 +529,75 @@ class SpaceRepository:
         )
         await self.session.execute(stmt)
 
-    async def _get_assistants(self, space_id: UUID):
-        stmt = (
-            sa.select(Assistants)
-            .where(Assistants.space_id == space_id)
-            .options(
+    async def _get_assistants_of_spaces(
+        self,
+        space_ids: list[UUID],
+        assistant_ids: Optional[list[UUID]] = None,
+        summary: bool = False,
+    ) -> dict[UUID, list[Assistants]]:
+        """The assistants of every space in `space_ids`, by space, in one query.
+
+        A summary is what lists of spaces show: the prompts, attachments,
+        templates and knowledge of the assistants are not loaded. As these
+        are then left empty in the session, only load summaries of
+        assistants that are not loaded in full later in the same session.
+        """
+        if summary:
+            options = [
+                noload(Assistants.assistant_websites),
+                noload(Assistants.assistant_groups),
+                noload(Assistants.assistant_integration_knowledge),
+                noload(Assistants.attachments),
+                noload(Assistants.template),
+            ]
+        else:
+            options = [
                 selectinload(Assistants.assistant_websites),
                 selectinload(Assistants.assistant_groups),
                 selectinload(Assistants.assistant_integration_knowledge),
                 selectinload(Assistants.attachments).selectinload(AssistantsFiles.file),
                 selectinload(Assistants.template),
-            )
+            ]
+
+        stmt = (
+            sa.select(Assistants)
+            .where(Assistants.space_id.in_(space_ids))
+            .options(*options)
             .order_by(Assistants.created_at)
         )
+        if assistant_ids is not None:
+            stmt = stmt.where(Assistants.id.in_(assistant_ids))
+
         assistant_records = await self.session.execute(stmt)
         assistants = assistant_records.scalars().all()
 
-        assistant_ids = [assistant.id for assistant in assistants]
-        stmt = (
-            sa.select(Prompts, PromptsAssistants.assistant_id)
-            .join(PromptsAssistants)
-            .where(PromptsAssistants.prompt_id == Prompts.id)
-            .where(PromptsAssistants.assistant_id.in_(assistant_ids))
-            .where(PromptsAssistants.is_selected)
-            .options(selectinload(Prompts.user))
-        )
-        prompt_records = await self.session.execute(stmt)
-        prompts = prompt_records.all()
+        prompts = {}
+        if not summary and assistants:
+            assistant_ids = [assistant.id for assistant in assistants]
+            stmt = (
+                sa.select(Prompts, PromptsAssistants.assistant_id)
+                .join(PromptsAssistants)
+                .where(PromptsAssistants.prompt_id == Prompts.id)
+                .where(PromptsAssistants.assistant_id.in_(assistant_ids))
+                .where(PromptsAssistants.is_selected)
+                .options(selectinload(Prompts.user))
+            )
+            prompt_records = await self.session.execute(stmt)
+            prompts = {assistant_id: prompt for prompt, assistant_id in prompt_records.all()}
 
+        assistants_of_spaces = {space_id: [] for space_id in space_ids}
         for assistant in assistants:
-            assistant.prompt = next(
-                (prompt for prompt, assistant_id in prompts if assistant_id == assistant.id),
-                None,
-            )
+            assistant.prompt = prompts.get(assistant.id)
+            assistants_of_spaces[assistant.space_id].append(assistant)
+
+        return assistants_of_spaces
+
+    async def _get_assistants(self, space_id: UUID, assistant_ids: Optional[list[UUID]] = None):
+        assistants_of_spaces = await self._get_assistants_of_spaces(
+            [space_id], assistant_ids=assistant_ids
+        )
 
-        return assistants
+        return assistants_of_spaces[space_id]
 
     async def _get_services(self, space_id: UUID):
         # Fetch all services for the space
@@ -559,7 +628,7 @@ class SpaceRepository:
 
         return group_chats_db
 
-    async def _get_websites(self, space_id: UUID):
+    async def _get_websites(self, space_id: UUID, website_ids: Optional[list[UUID]] = None):
         stmt = (
             sa.select(WebsitesTable)
             .where(WebsitesTable.space_id == space_id)
@@ -567,46 +636,74 @@ class SpaceRepository:
                 selectinload(WebsitesTable.latest_crawl).selectinload(CrawlRunsTable.job),
             )
         )
+        if website_ids is not None:
+            stmt = stmt.where(WebsitesTable.id.in_(website_ids))
 
         website_records = await self.session.execute(stmt)
         websites_db = website_records.scalars()
 
         return websites_db
 
-    async def _get_apps(self, space_id: UUID):
-        stmt = (
-            sa.select(Apps)
-            .where(Apps.space_id == space_id)
-            .options(
+    async def _get_apps_of_spaces(
+        self,
+        space_ids: list[UUID],
+        app_ids: Optional[list[UUID]] = None,
+        summary: bool = False,
+    ) -> dict[UUID, list[Apps]]:
+        """The apps of every space in `space_ids`, by space, in one query.
+
+        A summary leaves out the prompts, input fields, attachments and
+        templates of the apps.
+        """
+        if summary:
+            options = [
+                noload(Apps.input_fields),
+                noload(Apps.attachments),
+                noload(Apps.template),
+            ]
+        else:
+            options = [
                 selectinload(Apps.input_fields),
                 selectinload(Apps.attachments).selectinload(AppsFiles.file),
                 selectinload(Apps.template),
-            )
+            ]
+
+        stmt = (
+            sa.select(Apps)
+            .where(Apps.space_id.in_(space_ids))
+            .options(*options)
             .order_by(Apps.created_at)
         )
+        if app_ids is not None:
+            stmt = stmt.where(Apps.id.in_(app_ids))
+
         app_records = await self.session.execute(stmt)
         apps_db = app_records.scalars().all()
 
-        if not apps_db:
-            return []
+        prompts = {}
+        if not summary and apps_db:
+            app_ids = [app.id for app in apps_db]
+            stmt = (
+                sa.select(Prompts, AppsPrompts.app_id)
+                .join(AppsPrompts)
+                .where(AppsPrompts.app_id.in_(app_ids))
+                .where(AppsPrompts.is_selected)
+                .options(selectinload(Prompts.user))
+            )
+            prompt_records = await self.session.execute(stmt)
+            prompts = {app_id: prompt for prompt, app_id in prompt_records.all()}
 
-        app_ids = [app.id for app in apps_db]
+        apps_of_spaces = {space_id: [] for space_id in space_ids}
+        for app in apps_db:
+            app.prompt = prompts.get(app.id)
+            apps_of_spaces[app.space_id].append(app)
 
-        # prompt
-        stmt = (
-            sa.select(Prompts, AppsPrompts.app_id)
-            .join(AppsPrompts)
-            .where(AppsPrompts.app_id.in_(app_ids))
-            .where(AppsPrompts.is_selected)
-            .options(selectinload(Prompts.user))
-        )
-        prompt_records = await self.session.execute(stmt)
-        prompts = prompt_records.all()
+        return apps_of_spaces
 
-        for app in apps_db:
-            app.prompt = next((prompt for prompt, app_id in prompts if app_id == app.id), None)
+    async def _get_apps(self, space_id: UUID, app_ids: Optional[list[UUID]] = None):
+        apps_of_spaces = await self._get_apps_of_spaces([space_id], app_ids=app_ids)
 
-        return apps_db
+        return apps_of_spaces[space_id]
 
     async def _get_from_query(self, query: sa.Select):
         entry_in_db = await self._get_record_with_options(query)
@@ -626,7 +723,7 @@ class SpaceRepository:
         group_chats = await self._get_group_chats(space_id=entry_in_db.id)
         services = await self._get_services(space_id=entry_in_db.id)
 
-        return self.factory.create_space_from_db(
+        space = self.factory.create_space_from_db(
             entry_in_db,
             user=self.user,
             collections_in_db=collections,
@@ -640,6 +737,106 @@ class SpaceRepository:
             services_in_db=services,
             security_classification=entry_in_db.security_classification,
         )
+        space.mark_persisted()
+
+        return space
+
+    async def _get_member(self, space_id: UUID):
+        stmt = (
+            sa.select(SpacesUsers)
+            .where(SpacesUsers.space_id == space_id, SpacesUsers.user_id == self.user.id)
+            .options(selectinload(SpacesUsers.user))
+        )
+
+        return (await self.session.scalars(stmt)).all()
+
+    async def _get_integration_knowledge(self, integration_knowledge_ids: list[UUID]):
+        if not integration_knowledge_ids:
+            return []
+
+        stmt = (
+            sa.select(IntegrationKnowledge)
+            .where(IntegrationKnowledge.id.in_(integration_knowledge_ids))
+            .options(
+                selectinload(IntegrationKnowledge.embedding_model),
+                selectinload(IntegrationKnowledge.user_integration)
+                .selectinload(UserIntegrationDBModel.tenant_integration)
+                .selectinload(TenantIntegrationDBModel.integration),
+            )
+        )
+
+        return (await self.session.scalars(stmt)).all()
+
+    async def _get_partial_from_query(
+        self,
+        query: sa.Select,
+        assistant_ids: list[UUID] = [],
+        app_ids: list[UUID] = [],
+        collection_ids: list[UUID] = [],
+        website_ids: list[UUID] = [],
+    ) -> Optional[Space]:
+        """Load the space with only the given resources, and what they depend on.
+
+        Of the members, only the current user is loaded, which is all that the
+        permission checks of the actor need. Collections, websites and
+        integration knowledge are loaded as far as the given assistants use
+        them. The space is marked as partial, and can not be saved.
+        """
+        for option in self._partial_options():
+            query = query.options(option)
+
+        entry_in_db = await self.session.scalar(query)
+
+        if not entry_in_db:
+            return
+
+        assistants = await self._get_assistants(space_id=entry_in_db.id, assistant_ids=assistant_ids)
+        apps = await self._get_apps(space_id=entry_in_db.id, app_ids=app_ids)
+
+        collection_ids = [
+            *collection_ids,
+            *(group.group_id for assistant in assistants for group in assistant.assistant_groups),
+        ]
+        website_ids = [
+            *website_ids,
+            *(
+                website.website_id
+                for assistant in assistants
+                for website in assistant.assistant_websites
+            ),
+        ]
+        integration_knowledge_ids = [
+            integration_knowledge.integration_knowledge_id
+            for assistant in assistants
+            for integration_knowledge in assistant.assistant_integration_knowledge
+        ]
+
+        collections = await self._get_collections(entry_in_db.id, collection_ids=collection_ids)
+        websites = await self._get_websites(space_id=entry_in_db.id, website_ids=website_ids)
+        integration_knowledge_list = await self._get_integration_knowledge(
+            integration_knowledge_ids
+        )
+        members = await self._get_member(entry_in_db.id)
+
+        completion_models = await self.completion_model_repo.all(with_deprecated=True)
+        embedding_models = await self.embedding_model_repo.all(with_deprecated=True)
+        transcription_models = await self.transcription_model_repo.all(with_deprecated=True)
+
+        return self.factory.create_space_from_db(
+            entry_in_db,
+            user=self.user,
+            collections_in_db=collections,
+            websites_in_db=websites,
+            completion_models=completion_models,
+            embedding_models=embedding_models,
+            transcription_models=transcription_models,
+            assistants_in_db=assistants,
+            apps_in_db=apps,
+            security_classification=entry_in_db.security_classification,
+            members_in_db=members,
+            integration_knowledge_in_db=integration_knowledge_list,
+            partial=True,
+        )
 
     async def _get_record_with_options(self, query):
         for option in self._options():
@@ -674,7 +871,7 @@ class SpaceRepository:
         await self._set_embedding_models(entry_in_db, space.embedding_models)
         await self._set_transcription_models(entry_in_db, space.transcription_models)
         await self._set_members(entry_in_db, space.members)
-        await self._set_default_assistant(entry_in_db, space.default_assistant)
+        await self._set_default_assistant(entry_in_db.id, space.default_assistant)
         await self._set_collections(entry_in_db, space.collections)
         await self._set_websites(entry_in_db, space.websites)
         await self._set_group_chats(entry_in_db, space.group_chats)
@@ -693,7 +890,133 @@ class SpaceRepository:
 
         return space
 
-    async def update(self, space: Space) -> Space:
+    async def _save_model_changes(self, table, column: str, space_id: UUID, changes: IdChanges):
+        if changes.removed:
+            stmt = sa.delete(table).where(
+                table.space_id == space_id, getattr(table, column).in_(changes.removed)
+            )
+            await self.session.execute(stmt)
+
+        if changes.added:
+            stmt = sa.insert(table).values(
+                [{column: model_id, "space_id": space_id} for model_id in changes.added]
+            )
+            await self.session.execute(stmt)
+
+    async def _save_member_changes(self, space_id: UUID, changes: ChildChanges[SpaceMember]):
+        if changes.removed:
+            stmt = sa.delete(SpacesUsers).where(
+                SpacesUsers.space_id == space_id, SpacesUsers.user_id.in_(changes.removed)
+            )
+            await self.session.execute(stmt)
+
+        if changes.changed:
+            stmt = insert(SpacesUsers).values(
+                [
+                    dict(space_id=space_id, user_id=member.id, role=member.role.value)
+                    for member in changes.changed
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SpacesUsers.space_id, SpacesUsers.user_id],
+                set_=dict(role=stmt.excluded.role),
+            )
+            await self.session.execute(stmt)
+
+    async def _refresh_sizes(self, space: Space):
+        """Correct the sizes of the collections and websites whose info blobs changed."""
+        for table, size in [
+            (CollectionsTable, self._collection_size(CollectionsTable.id)),
+            (WebsitesTable, self._website_size(WebsitesTable.id)),
+        ]:
+            stmt = (
+                sa.update(table)
+                .values(size=size)
+                .where(table.space_id == space.id, table.size.is_distinct_from(size))
+            )
+            await self.session.execute(stmt)
+
+    async def _save_changes(self, space: Space, changes: SpaceChanges):
+        if changes.attributes:
+            stmt = (
+                sa.update(Spaces)
+                .values(
+                    name=space.name,
+                    description=space.description,
+                    security_classification_id=(
+                        space.security_classification.id
+                        if space.security_classification is not None
+                        else None
+                    ),
+                )
+                .where(Spaces.id == space.id)
+            )
+            await self.session.execute(stmt)
+
+        await self._save_model_changes(
+            SpacesCompletionModels, "completion_model_id", space.id, changes.completion_models
+        )
+        await self._save_model_changes(
+            SpacesEmbeddingModels, "embedding_model_id", space.id, changes.embedding_models
+        )
+        await self._save_model_changes(
+            SpacesTranscriptionModels,
+            "transcription_model_id",
+            space.id,
+            changes.transcription_models,
+        )
+        await self._save_member_changes(space.id, changes.members)
+
+        if changes.default_assistant:
+            await self._set_default_assistant(space.id, space.default_assistant)
+
+        await self._insert_collections(space.id, changes.collections.new)
+        await self._update_collections(space.id, changes.collections.changed)
+        if changes.collections.removed:
+            stmt = sa.delete(CollectionsTable).where(
+                CollectionsTable.space_id == space.id,
+                CollectionsTable.id.in_(changes.collections.removed),
+            )
+            await self.session.execute(stmt)
+
+        await self._insert_websites(space.id, changes.websites.new)
+        await self._update_websites(space.id, changes.websites.changed)
+        if changes.websites.removed:
+            stmt = sa.delete(WebsitesTable).where(
+                WebsitesTable.space_id == space.id,
+                WebsitesTable.id.in_(changes.websites.removed),
+            )
+            await self.session.execute(stmt)
+
+        await self._refresh_sizes(space)
+
+        for assistant in changes.assistants.new:
+            assistant.space_id = space.id
+            await self.assistant_repo.add(assistant)
+
+        for assistant in changes.assistants.changed:
+            assistant.space_id = space.id
+            await self.assistant_repo.update(assistant)
+
+        if changes.assistants.removed:
+            # Don't delete the default assistant
+            stmt = sa.delete(Assistants).where(
+                Assistants.space_id == space.id,
+                Assistants.id.in_(changes.assistants.removed),
+                Assistants.is_default == False,  # noqa
+            )
+            await self.session.execute(stmt)
+
+        await self._insert_group_chats(space.id, changes.group_chats.new)
+        await self._update_group_chats(space.id, changes.group_chats.changed)
+        if changes.group_chats.removed:
+            stmt = sa.delete(GroupChatsTable).where(
+                GroupChatsTable.space_id == space.id,
+                GroupChatsTable.id.in_(changes.group_chats.removed),
+            )
+            await self.session.execute(stmt)
+
+    async def _save_all(self, space: Space) -> Space:
         query = (
             sa.update(Spaces)
             .values(
@@ -714,7 +1037,7 @@ class SpaceRepository:
         await self._set_embedding_models(entry_in_db, space.embedding_models)
         await self._set_transcription_models(entry_in_db, space.transcription_models)
         await self._set_members(entry_in_db, space.members)
-        await self._set_default_assistant(entry_in_db, space.default_assistant)
+        await self._set_default_assistant(entry_in_db.id, space.default_assistant)
         await self._set_collections(entry_in_db, space.collections)
         await self._set_websites(entry_in_db, space.websites)
         await self._set_assistants(
@@ -725,6 +1048,32 @@ class SpaceRepository:
 
         return await self.one(id=entry_in_db.id)
 
+    async def update(self, space: Space, reload: bool = True) -> Space:
+        """Save the space, writing only what changed since it was loaded.
+
+        The space is loaded again if anything changed, unless `reload` is
+        false and nothing new was added, in which case the given space is
+        returned as it is.
+        """
+        if space.partial:
+            # Everything that was not loaded would be removed from the space
+            raise ValueError("A partially loaded space can not be saved")
+
+        changes = space.get_changes()
+        if changes is None:
+            return await self._save_all(space)
+
+        if not changes:
+            return space
+
+        await self._save_changes(space, changes)
+
+        if reload or changes.has_new:
+            return await self.one(id=space.id)
+
+        space.mark_persisted()
+        return space
+
     async def delete(self, id: UUID):
         query = sa.delete(Spaces).where(Spaces.id == id)
         await self.session.execute(query)
@@ -733,8 +1082,13 @@ class SpaceRepository:
         raise NotImplementedError()
 
     async def get_spaces_for_member(
-        self, user_id: UUID, include_applications: bool = False
+        self, user_id: UUID, include_applications: bool = False, summary: bool = False
     ) -> list[Space]:
+        """The spaces that `user_id` is a member of.
+
+        With `include_applications`, the assistants and apps of all the spaces
+        are loaded together, as summaries if `summary` is set.
+        """
         query = (
             sa.select(Spaces)
             .join(SpacesUsers, Spaces.members)
@@ -743,44 +1097,59 @@ class SpaceRepository:
             .order_by(Spaces.created_at)
         )
 
-        records = await self._get_records_with_options(query)
+        records = (await self._get_records_with_options(query)).all()
+        space_ids = [record.id for record in records]
 
-        spaces = []
-        for record in records:
-            if include_applications:
-                assistants = await self._get_assistants(space_id=record.id)
-                apps = await self._get_apps(space_id=record.id)
-            else:
-                assistants = []
-                apps = []
+        assistants = {}
+        apps = {}
+        if include_applications and space_ids:
+            assistants = await self._get_assistants_of_spaces(space_ids, summary=summary)
+            apps = await self._get_apps_of_spaces(space_ids, summary=summary)
 
-            spaces.append(
-                self.factory.create_space_from_db(
-                    record, user=self.user, assistants_in_db=assistants, apps_in_db=apps
-                )
+        return [
+            self.factory.create_space_from_db(
+                record,
+                user=self.user,
+                assistants_in_db=assistants.get(record.id, []),
+                apps_in_db=apps.get(record.id, []),
             )
-
-        return spaces
+            for record in records
+        ]
 
     async def get_personal_space(self, user_id: UUID) -> Space:
         query = sa.select(Spaces).where(Spaces.user_id == user_id)
 
         return await self._get_from_query(query)
 
-    async def get_space_by_assistant(self, assistant_id: UUID) -> Space:
+    async def get_space_by_assistant(
+        self,
+        assistant_id: UUID,
+        partial: bool = False,
+        tool_assistant_id: Optional[UUID] = None,
+    ) -> Space:
         query = sa.select(Spaces).join(Assistants).where(Assistants.id == assistant_id)
 
-        space = await self._get_from_query(query)
+        if partial:
+            assistant_ids = [assistant_id]
+            if tool_assistant_id is not None:
+                assistant_ids.append(tool_assistant_id)
+
+            space = await self._get_partial_from_query(query, assistant_ids=assistant_ids)
+        else:
+            space = await self._get_from_query(query)
 
         if space is None:
             raise NotFoundException()
 
         return space
 
-    async def get_space_by_app(self, app_id: UUID) -> Space:
+    async def get_space_by_app(self, app_id: UUID, partial: bool = False) -> Space:
         query = sa.select(Spaces).join(Apps).where(Apps.id == app_id)
 
-        space = await self._get_from_query(query)
+        if partial:
+            space = await self._get_partial_from_query(query, app_ids=[app_id])
+        else:
+            space = await self._get_from_query(query)
 
         if space is None:
             raise NotFoundException()
@@ -806,20 +1175,26 @@ class SpaceRepository:
 
         return space
 
-    async def get_space_by_collection(self, collection_id: UUID) -> Space:
+    async def get_space_by_collection(self, collection_id: UUID, partial: bool = False) -> Space:
         query = sa.select(Spaces).join(CollectionsTable).where(CollectionsTable.id == collection_id)
 
-        space = await self._get_from_query(query)
+        if partial:
+            space = await self._get_partial_from_query(query, collection_ids=[collection_id])
+        else:
+            space = await self._get_from_query(query)
 
         if space is None:
             raise NotFoundException()
 
         return space
 
-    async def get_space_by_website(self, website_id: UUID) -> Space:
+    async def get_space_by_website(self, website_id: UUID, partial: bool = False) -> Space:
         query = sa.select(Spaces).join(WebsitesTable).where(WebsitesTable.id == website_id)
 
-        space = await self._get_from_query(query)
+        if partial:
+            space = await self._get_partial_from_query(query, website_ids=[website_id])
+        else:
+            space = await self._get_from_query(query)
 
         if space is None:
             raise NotFoundException()
@@ -297,10 +297,14 @@ class SpaceService:
         await self.repo.delete(space.id)
 
     async def get_spaces(
-        self, *, include_personal: bool = False, include_applications: bool = False
+        self,
+        *,
+        include_personal: bool = False,
+        include_applications: bool = False,
+        summary: bool = False,
     ) -> list[Space]:
         spaces = await self.repo.get_spaces_for_member(
-            self.user.id, include_applications=include_applications
+            self.user.id, include_applications=include_applications, summary=summary
         )
 
         if include_personal:
@@ -347,7 +351,7 @@ class SpaceService:
 
         space.remove_member(user_id)
 
-        await self.repo.update(space)
+        await self.repo.update(space, reload=False)
 
     async def change_role_of_member(self, id: UUID, user_id: UUID, new_role: SpaceRoleValue):
         if user_id == self.user.id:
@@ -400,12 +404,12 @@ class SpaceService:
         space = await self.repo.get_space_by_session(session_id=session_id)
         return await self._get_space_by_resource(space)
 
-    async def get_space_by_website(self, website_id: UUID) -> Space:
-        space = await self.repo.get_space_by_website(website_id=website_id)
+    async def get_space_by_website(self, website_id: UUID, partial: bool = False) -> Space:
+        space = await self.repo.get_space_by_website(website_id=website_id, partial=partial)
         return await self._get_space_by_resource(space)
 
-    async def get_space_by_collection(self, group_id: UUID) -> Space:
-        space = await self.repo.get_space_by_collection(collection_id=group_id)
+    async def get_space_by_collection(self, group_id: UUID, partial: bool = False) -> Space:
+        space = await self.repo.get_space_by_collection(collection_id=group_id, partial=partial)
         return await self._get_space_by_resource(space)
 
     async def get_space_by_service(self, service_id: UUID) -> Space:
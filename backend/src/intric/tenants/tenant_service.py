@@ -1,6 +1,7 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
+from intric.authentication.principal_cache import PrincipalCache
 from intric.main.exceptions import NotFoundException
 from intric.main.models import ModelId
 from intric.tenants.tenant import (
@@ -30,11 +31,18 @@ class TenantService:
         completion_model_repo: "CompletionModelsRepository",
         embedding_model_repo: "AdminEmbeddingModelsService",
         transcription_model_enable_service: "TranscriptionModelEnableService",
+        principal_cache: Optional[PrincipalCache] = None,
     ):
         self.repo = repo
         self.completion_model_repo = completion_model_repo
         self.embedding_model_repo = embedding_model_repo
         self.transcription_models_enable_service = transcription_model_enable_service
+        self.principal_cache = principal_cache
+
+    async def _invalidate_cached_users(self, tenant_id: UUID):
+        # The tenant, with its state and modules, is part of every cached user
+        if self.principal_cache is not None:
+            await self.principal_cache.invalidate_tenant(tenant_id, session=self.repo.session)
 
     @staticmethod
     def _validate(tenant: TenantInDB | None, id: UUID):
@@ -90,14 +98,23 @@ class TenantService:
         tenant = await self.get_tenant_by_id(tenant_id)
         self._validate(tenant, tenant_id)
 
-        return await self.repo.delete_tenant_by_id(tenant_id)
+        deleted_tenant = await self.repo.delete_tenant_by_id(tenant_id)
+        await self._invalidate_cached_users(tenant_id)
+
+        return deleted_tenant
 
     async def update_tenant(self, tenant_update: TenantUpdatePublic, id: UUID) -> TenantInDB:
         tenant = await self.get_tenant_by_id(id)
         self._validate(tenant, id)
 
         tenant_update = TenantUpdate(**tenant_update.model_dump(exclude_unset=True), id=tenant.id)
-        return await self.repo.update_tenant(tenant_update)
+        updated_tenant = await self.repo.update_tenant(tenant_update)
+        await self._invalidate_cached_users(tenant.id)
+
+        return updated_tenant
 
     async def add_modules(self, list_of_module_ids: list[ModelId], tenant_id: UUID):
-        return await self.repo.add_modules(list_of_module_ids, tenant_id)
+        tenant = await self.repo.add_modules(list_of_module_ids, tenant_id)
+        await self._invalidate_cached_users(tenant_id)
+
+        return tenant
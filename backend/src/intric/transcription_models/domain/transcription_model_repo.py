@@ -18,16 +18,36 @@ from intric.transcription_models.domain.transcription_model import (
 if TYPE_CHECKING:
     from uuid import UUID
 
+    from intric.ai_models.ai_model_catalog import AIModelCatalog
     from intric.database.database import AsyncSession
     from intric.users.user import UserInDB
 
 
 class TranscriptionModelRepository:
-    def __init__(self, session: "AsyncSession", user: "UserInDB"):
+    def __init__(
+        self,
+        session: "AsyncSession",
+        user: "UserInDB",
+        ai_model_catalog: Optional["AIModelCatalog"] = None,
+    ):
         self.session = session
         self.user = user
+        self.ai_model_catalog = ai_model_catalog
 
-    async def all(self, with_deprecated: bool = False):
+    async def all(self, with_deprecated: bool = False) -> list["TranscriptionModel"]:
+        if self.ai_model_catalog is None:
+            transcription_models = await self._all()
+        else:
+            transcription_models = await self.ai_model_catalog.get_models(
+                self.session, kind="transcription_models", user=self.user, load=self._all
+            )
+
+        if not with_deprecated:
+            return [model for model in transcription_models if not model.is_deprecated]
+
+        return transcription_models
+
+    async def _all(self) -> list["TranscriptionModel"]:
         stmt = (
             sa.select(TranscriptionModels, TranscriptionModelSettings)
             .outerjoin(
@@ -51,9 +71,6 @@ class TranscriptionModelRepository:
             )
         )
 
-        if not with_deprecated:
-            stmt = stmt.where(TranscriptionModels.is_deprecated == False)  # noqa
-
         result = await self.session.execute(stmt)
         transcription_models = result.all()
 
@@ -67,6 +84,10 @@ class TranscriptionModelRepository:
         ]
 
     async def one_or_none(self, model_id: "UUID") -> Optional["TranscriptionModel"]:
+        if self.ai_model_catalog is not None:
+            models = await self.all(with_deprecated=True)
+            return next((model for model in models if model.id == model_id), None)
+
         stmt = (
             sa.select(TranscriptionModels, TranscriptionModelSettings)
             .outerjoin(
@@ -1,9 +1,11 @@
 # MIT License
 
+import asyncio
+import contextlib
 from pathlib import Path
 
 import openai
-from openai import AsyncOpenAI
+from pydantic_settings import BaseSettings
 from tenacity import (
     retry,
     retry_if_not_exception_type,
@@ -11,7 +13,9 @@ from tenacity import (
     wait_random_exponential,
 )
 
-from intric.files.audio import AudioFile
+from intric.ai_models.model_clients import model_clients
+from intric.files import audio
+from intric.files.audio import AudioSegment
 from intric.main.config import SETTINGS
 from intric.main.exceptions import BadRequestException, OpenAIException
 from intric.main.logging import get_logger
@@ -20,40 +24,79 @@ from intric.transcription_models.domain import TranscriptionModel
 logger = get_logger(__name__)
 
 
+class TranscriptionSettings(BaseSettings):
+    # Segments of one recording that are transcribed at the same time
+    transcription_max_concurrent_segments: int = 4
+
+
+settings = TranscriptionSettings()
+
+SEGMENT_SECONDS = 60 * 5
+
+
+def _format_time(seconds: float):
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
 class OpenAISTTModelAdapter:
-    def __init__(self, model: TranscriptionModel):
+    def __init__(
+        self,
+        model: TranscriptionModel,
+        max_concurrent_segments: int = settings.transcription_max_concurrent_segments,
+    ):
         self.model = model
-        self.client = AsyncOpenAI(api_key=SETTINGS.openai_api_key, base_url=model.base_url)
+        self.client = model_clients.openai(api_key=SETTINGS.openai_api_key, base_url=model.base_url)
+        self.max_concurrent_segments = max_concurrent_segments
 
-    async def get_text_from_file(self, audio_file: AudioFile):
-        text = ""
-        five_minutes = 60 * 5
-        chunk_index = 0
-        total_duration_seconds = int(audio_file.info.duration)
+    async def get_text_from_file(self, filepath: Path):
+        """Transcribe a recording, segment by segment, while it is still being decoded.
 
-        async with audio_file.asplit_file(seconds=five_minutes) as files:
-            total_chunks = len(files)
+        Up to `max_concurrent_segments` segments are transcribed at a time,
+        and the texts are joined in the order of the recording.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_segments)
+        failed = asyncio.Event()
 
-            for i, path in enumerate(files):
-                block_text = await self._get_text_from_file(path)
-                start_time = chunk_index * five_minutes
+        async def transcribe(segment: AudioSegment):
+            try:
+                return await self._get_text_from_file(segment.path)
+            except Exception:
+                failed.set()
+                raise
+            finally:
+                segment.close()
+                semaphore.release()
+
+        segments: list[AudioSegment] = []
+        tasks: list[asyncio.Task] = []
+        try:
+            async with contextlib.aclosing(
+                audio.split_on_silence(filepath, seconds=SEGMENT_SECONDS)
+            ) as decoded:
+                async for segment in decoded:
+                    # Do not decode further ahead than the segments being transcribed
+                    await semaphore.acquire()
 
-                # For the last chunk, calculate the correct end time based on total duration
-                if i == total_chunks - 1:
-                    end_time = total_duration_seconds
-                else:
-                    end_time = (chunk_index + 1) * five_minutes
+                    # Stop decoding once a segment has failed, its error is raised below
+                    if failed.is_set():
+                        segment.close()
+                        break
 
-                start_time_formatted = f"{start_time // 60}:{start_time % 60:02d}"
-                end_time_formatted = f"{end_time // 60}:{end_time % 60:02d}"
+                    segments.append(segment)
+                    tasks.append(asyncio.create_task(transcribe(segment)))
 
-                # Add markdown formatting with timestamp
-                if chunk_index > 0:
-                    text += "\n\n"
-                text += f"### {start_time_formatted} - {end_time_formatted}\n\n{block_text}"
-                chunk_index += 1
+            texts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
-        return text
+        return "\n\n".join(
+            f"### {_format_time(segment.start)} - {_format_time(segment.end)}\n\n{text}"
+            for segment, text in zip(segments, texts)
+        )
 
     @retry(
         wait=wait_random_exponential(min=1, max=20),
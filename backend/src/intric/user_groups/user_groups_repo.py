@@ -26,6 +26,7 @@ class UserGroupsRepository:
     UNIQUE_EXCEPTION_MSG = "User group name already exists."
 
     def __init__(self, session: AsyncSession):
+        self.session = session
         self.delegate = BaseRepositoryDelegate(
             session,
             UserGroups,
@@ -1,7 +1,9 @@
 # MIT License
 
+from typing import Optional
 from uuid import UUID
 
+from intric.authentication.principal_cache import PrincipalCache
 from intric.main.exceptions import AuthenticationException, NotFoundException
 from intric.main.models import ModelId
 from intric.roles.permissions import Permission, validate_permissions
@@ -21,9 +23,11 @@ class UserGroupsService:
         self,
         user: UserInDB,
         repo: UserGroupsRepository,
+        principal_cache: Optional[PrincipalCache] = None,
     ):
         self.user = user
         self.repo = repo
+        self.principal_cache = principal_cache
 
     def _validate(self, user_group: UserGroupInDB, user_group_uuid: UUID):
         if user_group is None or self.user.tenant_id != user_group.tenant_id:
@@ -71,6 +75,12 @@ class UserGroupsService:
         # check all the relationships and raise exceptions if needed
         self._check_relationships(user_group)
 
+        # The members of the group may have changed
+        if self.principal_cache is not None:
+            await self.principal_cache.invalidate_tenant(
+                self.user.tenant_id, session=self.repo.session
+            )
+
         return user_group
 
     @validate_permissions(Permission.ADMIN)
@@ -78,7 +88,15 @@ class UserGroupsService:
         user_group = await self.get_user_group_by_uuid(user_group_uuid)
         self._validate(user_group, user_group_uuid)
 
-        return await self.repo.delete_user_group(user_group_uuid)
+        deleted_user_group = await self.repo.delete_user_group(user_group_uuid)
+
+        # The user groups of a user are part of the cached user
+        if self.principal_cache is not None:
+            await self.principal_cache.invalidate_tenant(
+                self.user.tenant_id, session=self.repo.session
+            )
+
+        return deleted_user_group
 
     @validate_permissions(Permission.ADMIN)
     async def get_all_user_groups(self):
@@ -169,21 +187,31 @@ class UserGroupsService:
         user_group = await self.get_user_group_by_uuid(user_group_uuid)
         self._validate(user_group, user_group_uuid)
 
-        return await self.append_items(
+        user_group = await self.append_items(
             user_group=user_group,
             relationship="users",
             item_uuid=user_id,
             attr_name="id",
         )
 
+        if self.principal_cache is not None:
+            await self.principal_cache.invalidate_user(user_id, session=self.repo.session)
+
+        return user_group
+
     @validate_permissions(Permission.ADMIN)
     async def remove_user(self, user_group_uuid: UUID, user_id: UUID) -> UserGroupInDB:
         user_group = await self.get_user_group_by_uuid(user_group_uuid)
         self._validate(user_group, user_group_uuid)
 
-        return await self.pop_items(
+        user_group = await self.pop_items(
             user_group=user_group,
             relationship="users",
             item_uuid=user_id,
             attr_name="id",
         )
+
+        if self.principal_cache is not None:
+            await self.principal_cache.invalidate_user(user_id, session=self.repo.session)
+
+        return user_group
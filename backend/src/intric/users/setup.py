@@ -7,3 +7,5 @@ async def setup_user(container: Container, user: UserInDB):
 
     user_update = UserUpdate(is_active=True, id=user.id)
     await user_repo.update(user=user_update)
+
+    await container.user_service().invalidate_cached_user(user.id)
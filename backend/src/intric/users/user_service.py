@@ -5,6 +5,7 @@ import jwt
 
 from intric.authentication.auth_models import AccessToken
 from intric.authentication.auth_service import AuthService
+from intric.authentication.principal_cache import PrincipalCache
 from intric.info_blobs.info_blob_repo import InfoBlobRepository
 from intric.main.config import SETTINGS
 from intric.main.exceptions import (
@@ -49,6 +50,7 @@ class UserService:
         tenant_repo: TenantRepository,
         info_blob_repo: InfoBlobRepository,
         predefined_roles_repo: Optional[PredefinedRolesRepository] = None,
+        principal_cache: Optional[PrincipalCache] = None,
     ):
         self.repo = user_repo
         self.auth_service = auth_service
@@ -56,6 +58,7 @@ class UserService:
         self.tenant_repo = tenant_repo
         self.predefined_roles_repo = predefined_roles_repo
         self.info_blob_repo = info_blob_repo
+        self.principal_cache = principal_cache
 
     async def _validate_email(self, user: UserBase):
         if await self.repo.get_user_by_email(email=user.email, with_deleted=True) is not None:
@@ -184,17 +187,45 @@ class UserService:
 
         return user_in_db, access_token, api_key
 
+    async def _get_cached_user(self, key: str, get_user):
+        if self.principal_cache is None:
+            return await get_user()
+
+        user = await self.principal_cache.get(key)
+        if user is not None:
+            return user
+
+        user = await get_user()
+        if user is not None:
+            await self.principal_cache.set(key, user)
+
+        return user
+
     async def _get_user_from_token(self, token: str):
+        # The token is verified on every request, only the user is cached
         username = self.auth_service.get_username_from_token(token, SETTINGS.jwt_secret)
-        return await self.repo.get_user_by_username(username)
+
+        return await self._get_cached_user(
+            PrincipalCache.token_key(username),
+            lambda: self.repo.get_user_by_username(username),
+        )
 
     async def _get_user_from_api_key(self, api_key: str):
-        key = await self.auth_service.get_api_key(api_key)
+        hashed_key = self.auth_service.hash_api_key(api_key)
 
-        if key is None or key.user_id is None:
-            return
+        async def _get_user():
+            key = await self.auth_service.get_api_key(hashed_key, hash_key=False)
 
-        return await self.repo.get_user_by_id(key.user_id)
+            if key is None or key.user_id is None:
+                return
+
+            return await self.repo.get_user_by_id(key.user_id)
+
+        return await self._get_cached_user(PrincipalCache.api_key_key(hashed_key), _get_user)
+
+    async def invalidate_cached_user(self, user_id: UUID):
+        if self.principal_cache is not None:
+            await self.principal_cache.invalidate_user(user_id, session=self.repo.session)
 
     async def _get_user_from_api_key_or_assistant_api_key(
         self, api_key: str, assistant_id: UUID = None
@@ -325,6 +356,8 @@ class UserService:
         if user_in_db is None:
             raise NotFoundException("No such user")
 
+        await self.invalidate_cached_user(user_id)
+
         return user_in_db
 
     async def delete_user(self, user_id: UUID):
@@ -333,6 +366,8 @@ class UserService:
         if deleted_user is None:
             raise NotFoundException("No such user exists.")
 
+        await self.invalidate_cached_user(user_id)
+
         return True
 
     async def get_user(self, user_id: UUID):
@@ -345,4 +380,9 @@ class UserService:
         return user
 
     async def generate_api_key(self, user_id: UUID):
-        return await self.auth_service.create_user_api_key("inp", user_id=user_id)
+        api_key = await self.auth_service.create_user_api_key("inp", user_id=user_id)
+
+        # The previous key of the user is revoked
+        await self.invalidate_cached_user(user_id)
+
+        return api_key
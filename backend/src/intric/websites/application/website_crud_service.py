@@ -80,7 +80,7 @@ class WebsiteCRUDService:
         return refreshed_space.get_website(website_id=new_website.id)
 
     async def get_website(self, id: UUID) -> Website:
-        space = await self.space_service.get_space_by_website(id)
+        space = await self.space_service.get_space_by_website(id, partial=True)
         actor = self.actor_manager.get_space_actor_from_space(space=space)
 
         if not actor.can_read_websites():
@@ -113,7 +113,7 @@ class WebsiteCRUDService:
             update_interval=update_interval,
         )
 
-        await self.space_repo.update(space=space)
+        await self.space_repo.update(space=space, reload=False)
 
         return website
 
@@ -127,10 +127,10 @@ class WebsiteCRUDService:
         website = space.get_website(website_id=id)
         space.remove_website(website)
 
-        await self.space_repo.update(space=space)
+        await self.space_repo.update(space=space, reload=False)
 
     async def crawl_website(self, id: UUID) -> bool:
-        space = await self.space_service.get_space_by_website(id)
+        space = await self.space_service.get_space_by_website(id, partial=True)
         actor = self.actor_manager.get_space_actor_from_space(space=space)
 
         if not actor.can_create_websites():
@@ -145,7 +145,7 @@ class WebsiteCRUDService:
 
     async def get_crawl_run(self, id: UUID) -> "CrawlRun":
         crawl_run = await self.crawl_run_repo.one(id)
-        space = await self.space_service.get_space_by_website(crawl_run.website_id)
+        space = await self.space_service.get_space_by_website(crawl_run.website_id, partial=True)
         actor = self.actor_manager.get_space_actor_from_space(space=space)
 
         if not actor.can_read_websites():
@@ -154,7 +154,7 @@ class WebsiteCRUDService:
         return crawl_run
 
     async def get_crawl_runs(self, website_id: UUID) -> list["CrawlRun"]:
-        space = await self.space_service.get_space_by_website(website_id)
+        space = await self.space_service.get_space_by_website(website_id, partial=True)
         actor = self.actor_manager.get_space_actor_from_space(space=space)
 
         if not actor.can_read_websites():
@@ -17,6 +17,14 @@ class CrawlTask(TaskParams):
     crawl_type: CrawlType = CrawlType.CRAWL
 
 
+class CrawledPageValidators(BaseModel):
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    # The links of the page, to follow when the page has not been modified
+    links: Optional[list[str]] = None
+
+
 class CrawlRunBase(BaseModel):
     pages_crawled: Optional[int] = None
     files_downloaded: Optional[int] = None
@@ -2,9 +2,13 @@ from uuid import UUID
 
 from dependency_injector import providers
 
+from intric.info_blobs.info_blob import get_content_hash
+from intric.info_blobs.text_processor import TextToProcess
+from intric.main.config import SETTINGS
 from intric.main.container.container import Container
 from intric.main.logging import get_logger
 from intric.websites.crawl_dependencies.crawl_models import (
+    CrawledPageValidators,
     CrawlTask,
 )
 
@@ -55,37 +59,99 @@ async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
         num_failed_pages = 0
         num_failed_files = 0
         num_deleted_blobs = 0
+        num_skipped_pages = 0
 
         # Unfortunately, in this type of background task we still need to care about the session atm
         session = container.session()
 
         existing_titles = await info_blob_repo.get_titles_of_website(params.website_id)
+        known_pages = await info_blob_repo.get_page_validators_of_website(params.website_id)
 
-        crawled_titles = []
+        crawled_titles = set()
+
+        # Pages are added in batches, so that their chunks can share embedding requests
+        pages_to_add: dict[str, CrawledPageValidators] = {}
+        texts_to_add: list[TextToProcess] = []
+
+        async def add_pages(texts: list[TextToProcess]):
+            nonlocal num_failed_pages
+
+            try:
+                async with session.begin_nested():
+                    info_blobs = await uploader.process_texts(
+                        texts=texts,
+                        website_id=params.website_id,
+                        embedding_model=website.embedding_model,
+                    )
+                    for info_blob in info_blobs:
+                        await info_blob_repo.update_page_validators(
+                            info_blob_id=info_blob.id, validators=pages_to_add[info_blob.url]
+                        )
+                crawled_titles.update(text.title for text in texts)
+
+            except Exception:
+                if len(texts) == 1:
+                    logger.exception("Exception while uploading page")
+                    num_failed_pages += 1
+                    return
+
+                # Add the pages one by one, so that one failing page does not fail the rest
+                for text in texts:
+                    await add_pages([text])
+
+        async def flush_pages():
+            if texts_to_add:
+                await add_pages(texts_to_add)
+
+            pages_to_add.clear()
+            texts_to_add.clear()
 
         async with crawler.crawl(
             url=params.url,
             download_files=params.download_files,
             crawl_type=params.crawl_type,
+            known_pages=known_pages,
         ) as crawl:
-            for page in crawl.pages:
+            async for page in crawl.pages:
                 num_pages += 1
                 try:
                     title = page.url
-                    async with session.begin_nested():
-                        await uploader.process_text(
-                            text=page.content,
-                            title=title,
-                            website_id=params.website_id,
-                            url=page.url,
-                            embedding_model=website.embedding_model,
+                    known_page = known_pages.get(page.url)
+
+                    validators = CrawledPageValidators(
+                        etag=page.etag,
+                        last_modified=page.last_modified,
+                        content_hash=None if page.unchanged else get_content_hash(page.content),
+                        links=page.links,
+                    )
+
+                    if known_page is not None and (
+                        page.unchanged or known_page.content_hash == validators.content_hash
+                    ):
+                        # Keep the stored page, and its embeddings, as they are
+                        num_skipped_pages += 1
+                        crawled_titles.add(title)
+                        await info_blob_repo.update_page_validators_by_url(
+                            url=page.url, website_id=params.website_id, validators=validators
                         )
-                    crawled_titles.append(title)
+                        continue
+
+                    if page.unchanged:
+                        # Not modified, but not stored by an earlier crawl either
+                        continue
+
+                    pages_to_add[page.url] = validators
+                    texts_to_add.append(TextToProcess(text=page.content, title=title, url=page.url))
+
+                    if len(texts_to_add) >= SETTINGS.crawl_page_batch_size:
+                        await flush_pages()
 
                 except Exception:
                     logger.exception("Exception while uploading page")
                     num_failed_pages += 1
 
+            await flush_pages()
+
             for file in crawl.files:
                 num_files += 1
                 try:
@@ -98,22 +164,22 @@ async def crawl_task(*, job_id: UUID, params: CrawlTask, container: Container):
                             embedding_model=website.embedding_model,
                         )
 
-                    crawled_titles.append(filename)
+                    crawled_titles.add(filename)
                 except Exception:
                     logger.exception("Exception while uploading file")
                     num_failed_files += 1
 
-            for title in existing_titles:
-                if title not in crawled_titles:
-                    num_deleted_blobs += 1
-                    await info_blob_repo.delete_by_title_and_website(
-                        title=title, website_id=params.website_id
-                    )
+            # Pages not reached before a timeout are not known to be gone
+            if not crawl.timed_out:
+                num_deleted_blobs = await info_blob_repo.delete_by_titles_and_website(
+                    titles=set(existing_titles) - crawled_titles, website_id=params.website_id
+                )
 
             await update_website_size_service.update_website_size(website_id=website.id)
 
             logger.info(
-                f"Crawler finished. {num_pages} pages, {num_failed_pages} failed. "
+                f"Crawler finished. {num_pages} pages, {num_failed_pages} failed, "
+                f"{num_skipped_pages} unchanged. "
                 f"{num_files} files, {num_failed_files} failed. "
                 f"{num_deleted_blobs} blobs deleted."
             )
@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from intric.embedding_models.infrastructure.create_embeddings_service import (
+    CreateEmbeddingsService,
+)
+from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from intric.info_blobs.info_blob import InfoBlobChunk, get_content_hash
+from tests.fixtures import TEST_EMBEDDING_MODEL, TEST_UUID
+
+
+def _chunk(text: str, chunk_no: int = 0):
+    return InfoBlobChunk(text=text, chunk_no=chunk_no, info_blob_id=TEST_UUID, tenant_id=TEST_UUID)
+
+
+@pytest.fixture
+def adapter():
+    async def get_embeddings(chunks):
+        chunk_embedding_list = ChunkEmbeddingList()
+        chunk_embedding_list.add(chunks, [[float(len(chunk.text))] for chunk in chunks])
+        return chunk_embedding_list
+
+    adapter = MagicMock()
+    adapter.get_embeddings = AsyncMock(side_effect=get_embeddings)
+
+    return adapter
+
+
+@pytest.fixture
+def service(adapter):
+    service = CreateEmbeddingsService()
+    service._get_adapter = MagicMock(return_value=adapter)
+
+    return service
+
+
+async def test_only_unknown_chunks_are_embedded(service: CreateEmbeddingsService, adapter):
+    chunks = [_chunk("header", 0), _chunk("new text", 1), _chunk("footer", 2)]
+    known_embeddings = {get_content_hash("header"): [1.0], get_content_hash("footer"): [2.0]}
+
+    result = await service.get_embeddings(
+        model=TEST_EMBEDDING_MODEL, chunks=chunks, known_embeddings=known_embeddings
+    )
+
+    (embedded_chunks,) = adapter.get_embeddings.await_args.args
+    assert [chunk.text for chunk in embedded_chunks] == ["new text"]
+    assert [(chunk.chunk_no, list(embedding)) for chunk, embedding in result] == [
+        (0, [1.0]),
+        (1, [8.0]),
+        (2, [2.0]),
+    ]
+
+
+async def test_identical_chunks_are_embedded_once(service: CreateEmbeddingsService, adapter):
+    chunks = [_chunk("same", 0), _chunk("same", 1)]
+
+    result = await service.get_embeddings(model=TEST_EMBEDDING_MODEL, chunks=chunks)
+
+    (embedded_chunks,) = adapter.get_embeddings.await_args.args
+    assert len(embedded_chunks) == 1
+    assert [chunk.chunk_no for chunk, _ in result] == [0, 1]
+
+
+async def test_nothing_is_embedded_if_all_chunks_are_known(
+    service: CreateEmbeddingsService, adapter
+):
+    chunks = [_chunk("header")]
+
+    result = await service.get_embeddings(
+        model=TEST_EMBEDDING_MODEL,
+        chunks=chunks,
+        known_embeddings={get_content_hash("header"): [1.0]},
+    )
+
+    adapter.get_embeddings.assert_not_called()
+    assert [list(embedding) for _, embedding in result] == [[1.0]]
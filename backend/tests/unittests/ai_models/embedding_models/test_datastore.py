@@ -1,8 +1,10 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 
-from intric.embedding_models.infrastructure.datastore import autocut
-from intric.info_blobs.info_blob import InfoBlobChunkWithEmbedding
-from tests.fixtures import TEST_UUID
+from intric.embedding_models.infrastructure.datastore import Datastore, autocut
+from intric.info_blobs.info_blob import InfoBlobChunkWithEmbedding, get_content_hash
+from tests.fixtures import TEST_EMBEDDING_MODEL, TEST_UUID
 
 
 @pytest.mark.parametrize(["cutoff", "cut_point"], [(1, 3), (2, 5), (3, 6)])
@@ -29,3 +31,65 @@ def test_chunk_size_calculation():
     size_embedding = len(embedding) * 4
 
     assert chunk.size == size_text + size_embedding
+
+
+def test_content_hash_is_stored_with_chunk():
+    chunk = InfoBlobChunkWithEmbedding(
+        text="Test text",
+        chunk_no=1,
+        info_blob_id=TEST_UUID,
+        tenant_id=TEST_UUID,
+        embedding=[1.0],
+    )
+
+    assert chunk.model_dump()["content_hash"] == get_content_hash("Test text")
+
+
+async def test_add_reuses_stored_embeddings():
+    chunk_repo = AsyncMock()
+    chunk_repo.get_embeddings_by_content_hash.return_value = {}
+    create_embeddings_service = AsyncMock()
+    create_embeddings_service.get_embeddings.return_value = []
+    datastore = Datastore(
+        user=MagicMock(tenant_id=TEST_UUID),
+        info_blob_chunk_repo=chunk_repo,
+        create_embeddings_service=create_embeddings_service,
+    )
+    info_blob = MagicMock(id=TEST_UUID, text="Some text", source_id=TEST_UUID)
+    known_embeddings = {get_content_hash("Other text"): [1.0]}
+
+    with patch("intric.embedding_models.infrastructure.datastore.count_tokens", len):
+        await datastore.add(
+            info_blob=info_blob,
+            embedding_model=TEST_EMBEDDING_MODEL,
+            known_embeddings=known_embeddings,
+        )
+
+    (content_hashes,) = chunk_repo.get_embeddings_by_content_hash.await_args.args
+    assert content_hashes == {get_content_hash("Some text")}
+    assert create_embeddings_service.get_embeddings.await_args.kwargs["known_embeddings"] == (
+        known_embeddings
+    )
+
+
+async def test_add_many_embeds_all_info_blobs_together():
+    chunk_repo = AsyncMock()
+    chunk_repo.get_embeddings_by_content_hash.return_value = {}
+    create_embeddings_service = AsyncMock()
+    create_embeddings_service.get_embeddings.return_value = []
+    datastore = Datastore(
+        user=MagicMock(tenant_id=TEST_UUID),
+        info_blob_chunk_repo=chunk_repo,
+        create_embeddings_service=create_embeddings_service,
+    )
+    info_blobs = [
+        MagicMock(id=TEST_UUID, text="First text", source_id=TEST_UUID),
+        MagicMock(id=TEST_UUID, text="Second text", source_id=TEST_UUID),
+    ]
+
+    with patch("intric.embedding_models.infrastructure.datastore.count_tokens", len):
+        await datastore.add_many(info_blobs=info_blobs, embedding_model=TEST_EMBEDDING_MODEL)
+
+    create_embeddings_service.get_embeddings.assert_awaited_once()
+    chunks = create_embeddings_service.get_embeddings.await_args.kwargs["chunks"]
+    assert [chunk.text for chunk in chunks] == ["First text", "Second text"]
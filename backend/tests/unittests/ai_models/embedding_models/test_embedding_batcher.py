@@ -0,0 +1,102 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from intric.embedding_models.infrastructure.adapters.e5_embeddings import E5Adapter
+from intric.embedding_models.infrastructure.adapters.openai_embeddings import (
+    OpenAIEmbeddingAdapter,
+)
+from intric.embedding_models.infrastructure.embedding_batcher import EmbeddingBatcher
+from intric.info_blobs.info_blob import InfoBlobChunk
+from intric.main.exceptions import OpenAIRateLimitException
+from tests.fixtures import TEST_EMBEDDING_MODEL, TEST_UUID
+
+
+def _chunks(*texts: str):
+    return [
+        InfoBlobChunk(text=text, chunk_no=i, info_blob_id=TEST_UUID, tenant_id=TEST_UUID)
+        for i, text in enumerate(texts)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def count_tokens():
+    with patch("intric.embedding_models.infrastructure.embedding_batcher.count_tokens", len):
+        yield
+
+
+@pytest.fixture
+def adapter():
+    adapter = MagicMock()
+    adapter.model = TEST_EMBEDDING_MODEL
+    adapter.max_batch_tokens = 100
+    adapter.max_batch_size = 100
+    adapter.batches = []
+    adapter.release = asyncio.Event()
+    adapter.release.set()
+
+    async def get_embeddings_for_chunks(chunks):
+        adapter.batches.append([chunk.text for chunk in chunks])
+        await adapter.release.wait()
+        return [[float(len(chunk.text))] for chunk in chunks]
+
+    adapter.get_embeddings_for_chunks = get_embeddings_for_chunks
+
+    return adapter
+
+
+async def test_results_are_returned_in_order(adapter):
+    batcher = EmbeddingBatcher()
+    adapter.max_batch_tokens = 4
+
+    result = await batcher.get_embeddings(adapter, _chunks("a", "bb", "ccc", "dddd"))
+
+    assert adapter.batches == [["a", "bb"], ["ccc"], ["dddd"]]
+    assert [(chunk.text, list(embedding)) for chunk, embedding in result] == [
+        ("a", [1.0]),
+        ("bb", [2.0]),
+        ("ccc", [3.0]),
+        ("dddd", [4.0]),
+    ]
+
+
+async def test_chunks_of_concurrent_callers_share_requests(adapter):
+    batcher = EmbeddingBatcher(max_in_flight=1)
+    adapter.release.clear()
+
+    first = asyncio.create_task(batcher.get_embeddings(adapter, _chunks("a")))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(batcher.get_embeddings(adapter, _chunks("b")))
+    third = asyncio.create_task(batcher.get_embeddings(adapter, _chunks("c")))
+    await asyncio.sleep(0)
+
+    adapter.release.set()
+    results = await asyncio.gather(first, second, third)
+
+    assert adapter.batches == [["a"], ["b", "c"]]
+    assert [[chunk.text for chunk, _ in result] for result in results] == [["a"], ["b"], ["c"]]
+
+
+async def test_rate_limits_lower_requests_in_flight(adapter):
+    batcher = EmbeddingBatcher(max_in_flight=4)
+
+    async def get_embeddings_for_chunks(chunks):
+        raise OpenAIRateLimitException()
+
+    adapter.get_embeddings_for_chunks = get_embeddings_for_chunks
+
+    with pytest.raises(OpenAIRateLimitException):
+        await batcher.get_embeddings(adapter, _chunks("a"))
+
+    assert batcher._get_queue(adapter).max_in_flight == 2
+
+
+def test_self_hosted_requests_hold_one_input_of_the_model():
+    model = TEST_EMBEDDING_MODEL.model_copy(update={"max_input": 512})
+    e5_adapter = E5Adapter(model)
+    openai_adapter = OpenAIEmbeddingAdapter(model, client=MagicMock())
+
+    assert e5_adapter.max_batch_tokens == 512
+    assert openai_adapter.max_batch_tokens > e5_adapter.max_batch_tokens
+    assert openai_adapter.max_batch_size > e5_adapter.max_batch_size
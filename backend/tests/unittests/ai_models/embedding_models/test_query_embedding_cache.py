@@ -0,0 +1,117 @@
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from redis.exceptions import ConnectionError
+
+from intric.embedding_models.infrastructure.create_embeddings_service import (
+    CreateEmbeddingsService,
+)
+from intric.embedding_models.infrastructure.query_embedding_cache import (
+    QueryEmbeddingCache,
+)
+from tests.fixtures import TEST_EMBEDDING_MODEL
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def cache(redis: FakeRedis):
+    return QueryEmbeddingCache(redis=redis, max_size=2, ttl=60)
+
+
+async def test_cache_miss_then_local_hit(cache: QueryEmbeddingCache):
+    assert await cache.get(TEST_EMBEDDING_MODEL, "opening hours") is None
+
+    await cache.set(TEST_EMBEDDING_MODEL, "opening hours", [0.5, 0.25])
+
+    assert await cache.get(TEST_EMBEDDING_MODEL, "opening hours") == [0.5, 0.25]
+    assert cache.stats.misses == 1
+    assert cache.stats.local_hits == 1
+
+
+async def test_vectors_are_stored_as_float32_bytes(cache: QueryEmbeddingCache, redis: FakeRedis):
+    await cache.set(TEST_EMBEDDING_MODEL, "opening hours", [0.5, 0.25, 1.0])
+
+    (value,) = redis.data.values()
+    assert value == np.array([0.5, 0.25, 1.0], dtype=np.float32).tobytes()
+
+
+async def test_redis_tier_is_shared(redis: FakeRedis):
+    await QueryEmbeddingCache(redis=redis).set(TEST_EMBEDDING_MODEL, "opening hours", [1.0])
+    other_process = QueryEmbeddingCache(redis=redis)
+
+    assert await other_process.get(TEST_EMBEDDING_MODEL, "opening hours") == [1.0]
+    assert other_process.stats.redis_hits == 1
+
+
+async def test_queries_are_normalized(cache: QueryEmbeddingCache):
+    await cache.set(TEST_EMBEDDING_MODEL, "  opening\nhours ", [1.0])
+
+    assert await cache.get(TEST_EMBEDDING_MODEL, "opening hours") == [1.0]
+
+
+async def test_keys_are_namespaced_per_model(cache: QueryEmbeddingCache):
+    other_model = TEST_EMBEDDING_MODEL.model_copy(update={"id": uuid4()})
+    await cache.set(TEST_EMBEDDING_MODEL, "opening hours", [1.0])
+
+    assert await cache.get(other_model, "opening hours") is None
+
+
+async def test_least_recently_used_is_evicted():
+    cache = QueryEmbeddingCache(redis=None, max_size=2)
+
+    await cache.set(TEST_EMBEDDING_MODEL, "a", [1.0])
+    await cache.set(TEST_EMBEDDING_MODEL, "b", [2.0])
+    await cache.get(TEST_EMBEDDING_MODEL, "a")
+    await cache.set(TEST_EMBEDDING_MODEL, "c", [3.0])
+
+    assert await cache.get(TEST_EMBEDDING_MODEL, "a") == [1.0]
+    assert await cache.get(TEST_EMBEDDING_MODEL, "b") is None
+
+
+async def test_expired_entries_are_not_returned():
+    cache = QueryEmbeddingCache(redis=None, ttl=-1)
+    await cache.set(TEST_EMBEDDING_MODEL, "a", [1.0])
+
+    assert await cache.get(TEST_EMBEDDING_MODEL, "a") is None
+
+
+async def test_redis_errors_fall_back_to_provider():
+    redis = AsyncMock()
+    redis.get.side_effect = ConnectionError()
+    redis.set.side_effect = ConnectionError()
+    cache = QueryEmbeddingCache(redis=redis)
+
+    assert await cache.get(TEST_EMBEDDING_MODEL, "a") is None
+    await cache.set(TEST_EMBEDDING_MODEL, "a", [1.0])
+
+
+async def test_service_only_embeds_query_once(cache: QueryEmbeddingCache):
+    service = CreateEmbeddingsService(query_embedding_cache=cache)
+    adapter = AsyncMock()
+    adapter.get_embedding_for_query.return_value = [0.5]
+    service._get_adapter = MagicMock(return_value=adapter)
+
+    for _ in range(3):
+        embedding = await service.get_embedding_for_query(
+            model=TEST_EMBEDDING_MODEL, query="opening hours"
+        )
+
+    assert embedding == [0.5]
+    adapter.get_embedding_for_query.assert_awaited_once()
@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.ai_models.ai_model_catalog import CHANGED, VERSION_KEY, AIModelCatalog
+from tests.fixtures import TEST_USER
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.info = {}
+    return session
+
+
+@pytest.fixture
+def loads():
+    return []
+
+
+@pytest.fixture
+def load(loads):
+    async def load():
+        loads.append(1)
+        return [
+            SimpleNamespace(
+                id=uuid4(),
+                user=TEST_USER,
+                is_org_enabled=True,
+                security_classification=SimpleNamespace(security_level=1),
+            )
+        ]
+
+    return load
+
+
+async def test_models_are_loaded_once_per_tenant_and_kind(session, load, loads):
+    catalog = AIModelCatalog(redis=None)
+
+    first = await catalog.get_models(session, kind="completion_models", user=TEST_USER, load=load)
+    second = await catalog.get_models(session, kind="completion_models", user=TEST_USER, load=load)
+    await catalog.get_models(session, kind="embedding_models", user=TEST_USER, load=load)
+
+    assert len(loads) == 2
+    assert [model.id for model in first] == [model.id for model in second]
+
+
+async def test_callers_get_copies_bound_to_their_user(session, load):
+    catalog = AIModelCatalog(redis=None)
+    other_user = TEST_USER.model_copy(update={"id": uuid4()})
+
+    first = await catalog.get_models(session, kind="completion_models", user=TEST_USER, load=load)
+    first[0].is_org_enabled = False
+    first[0].security_classification.security_level = 0
+    second = await catalog.get_models(session, kind="completion_models", user=other_user, load=load)
+
+    assert second[0].is_org_enabled
+    assert second[0].security_classification.security_level == 1
+    assert second[0].user is other_user
+
+
+async def test_sessions_that_changed_the_catalog_read_it_from_the_database(session, load, loads):
+    catalog = AIModelCatalog(redis=None)
+    await catalog.get_models(session, kind="completion_models", user=TEST_USER, load=load)
+
+    session.info[CHANGED] = True
+    await catalog.get_models(session, kind="completion_models", user=TEST_USER, load=load)
+
+    assert len(loads) == 2
+
+
+async def test_catalog_is_reloaded_when_the_version_changes(session, load, loads):
+    redis = FakeRedis()
+    catalog = AIModelCatalog(redis=redis, version_check_interval=0)
+    await catalog.get_models(session, kind="completion_models", user=TEST_USER, load=load)
+    await catalog.get_models(session, kind="completion_models", user=TEST_USER, load=load)
+
+    # Bumped by another process
+    await redis.incr(VERSION_KEY)
+    await catalog.get_models(session, kind="completion_models", user=TEST_USER, load=load)
+
+    assert len(loads) == 2
+
+
+async def test_loads_running_while_the_catalog_is_invalidated_are_not_cached(session, loads):
+    catalog = AIModelCatalog(redis=None)
+
+    async def load():
+        loads.append(1)
+        catalog.invalidate()
+        return []
+
+    await catalog.get_models(session, kind="completion_models", user=TEST_USER, load=load)
+    await catalog.get_models(session, kind="completion_models", user=TEST_USER, load=load)
+
+    assert len(loads) == 2
@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+import pytest
+
+from intric.ai_models.model_clients import ModelClientRegistry
+
+
+@pytest.fixture
+def registry():
+    return ModelClientRegistry()
+
+
+async def test_clients_are_shared_by_endpoint_and_credentials(registry: ModelClientRegistry):
+    client = registry.openai(api_key="key", base_url="http://vllm:8000/v1")
+
+    assert registry.openai(api_key="key", base_url="http://vllm:8000/v1") is client
+    assert registry.openai(api_key="other key", base_url="http://vllm:8000/v1") is not client
+    assert registry.openai(api_key="key", base_url="http://other:8000/v1") is not client
+
+
+def test_clients_are_not_shared_between_event_loops(registry: ModelClientRegistry):
+    async def get_client():
+        return registry.openai(api_key="key", base_url="http://vllm:8000/v1")
+
+    assert asyncio.run(get_client()) is not asyncio.run(get_client())
+
+
+async def test_requests_are_in_flight_until_their_response_is_closed(
+    registry: ModelClientRegistry, monkeypatch
+):
+    async def handle_async_request(self, request):
+        return httpx.Response(200, stream=httpx.ByteStream(b"{}"))
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request)
+
+    client = registry.openai(api_key="key", base_url="http://vllm:8000/v1")
+    http_client = client._client
+
+    async with http_client.stream("GET", "http://vllm:8000/v1/models"):
+        [stats] = registry.stats()
+        assert stats.in_flight == 1
+
+    await http_client.get("http://vllm:8000/v1/models")
+
+    [stats] = registry.stats()
+    assert stats.requests == 2
+    assert stats.in_flight == 0
+    assert stats.peak_in_flight == 1
@@ -1,33 +1,18 @@
-from uuid import uuid4
-
-from intric.ai_models.embedding_models.embedding_model import (
-    EmbeddingModelFamily,
-    EmbeddingModelLegacy,
-    ModelHostingLocation,
-    ModelStability,
-)
-from intric.embedding_models.infrastructure.adapters.openai_embeddings import (
-    OpenAIEmbeddingAdapter,
-)
-from intric.info_blobs.info_blob import InfoBlobChunk
-from tests.fixtures import TEST_UUID
+from unittest.mock import patch
 
+import pytest
 
-def _get_adapter_with_max_limit(max_limit: int):
-    model = EmbeddingModelLegacy(
-        id=uuid4(),
-        name="multilingual-e5-large",
-        family=EmbeddingModelFamily.E5,
-        open_source=True,
-        max_input=max_limit,
-        stability=ModelStability.STABLE,
-        hosting=ModelHostingLocation.USA,
-        is_deprecated=False,
-    )
+from intric.embedding_models.infrastructure.embedding_batcher import pack_chunks
+from intric.info_blobs.info_blob import InfoBlobChunk
+from tests.fixtures import TEST_UUID
 
-    adapter = OpenAIEmbeddingAdapter(model=model)
 
-    return adapter
+@pytest.fixture(autouse=True)
+def count_tokens():
+    with patch(
+        "intric.embedding_models.infrastructure.embedding_batcher.count_tokens", len
+    ):
+        yield
 
 
 def _get_chunks(texts: list[str]):
@@ -45,27 +30,28 @@ def _get_chunks(texts: list[str]):
 
 
 def test_chunking_is_one_chunk_if_sum_is_less_than_limit():
-    adapter = _get_adapter_with_max_limit(8191)
-
     texts = ["c" * i for i in range(1, 10)]
     chunks = _get_chunks(texts)
 
-    assert len(list(adapter._chunk_chunks(chunks))) == 1
+    assert len(list(pack_chunks(chunks, max_tokens=8191))) == 1
 
 
 def test_chunking_is_two_chunks_if_sum_is_slightly_larger_than_limit():
-    adapter = _get_adapter_with_max_limit(8)
-
     texts = ["c" * 5, "c" * 5]
     chunks = _get_chunks(texts)
 
-    assert len(list(adapter._chunk_chunks(chunks))) == 2
+    assert len(list(pack_chunks(chunks, max_tokens=8))) == 2
 
 
 def test_chunking_with_three_chunks():
-    adapter = _get_adapter_with_max_limit(8)
-
     texts = ["c" * 7, "c" * 5, "c" * 3, "c" * 6]
     chunks = _get_chunks(texts)
 
-    assert len(list(adapter._chunk_chunks(chunks))) == 3
+    assert len(list(pack_chunks(chunks, max_tokens=8))) == 3
+
+
+def test_chunking_respects_max_size():
+    texts = ["c"] * 5
+    chunks = _get_chunks(texts)
+
+    assert len(list(pack_chunks(chunks, max_tokens=8191, max_size=2))) == 3
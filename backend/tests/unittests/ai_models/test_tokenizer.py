@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from intric.ai_models.model_enums import ModelFamily
+from intric.completion_models.infrastructure import tokenizer
+from intric.completion_models.infrastructure.tokenizer import (
+    DEFAULT_ENCODING,
+    MIN_CACHED_LENGTH,
+    TokenizerService,
+    get_encoding_name,
+)
+
+LONG_TEXT = "word " * MIN_CACHED_LENGTH
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    counted = []
+
+    def count(encoding_name: str, text: str):
+        counted.append((encoding_name, text))
+        return len(text.split())
+
+    monkeypatch.setattr(tokenizer, "_count", count)
+
+    return counted
+
+
+def test_counts_of_long_texts_are_cached(counted: list):
+    tokenizer_service = TokenizerService()
+
+    assert tokenizer_service.count(LONG_TEXT) == MIN_CACHED_LENGTH
+    assert tokenizer_service.count(LONG_TEXT) == MIN_CACHED_LENGTH
+
+    assert counted == [(DEFAULT_ENCODING, LONG_TEXT)]
+
+
+def test_counts_are_cached_per_encoding(counted: list):
+    tokenizer_service = TokenizerService()
+
+    tokenizer_service.count(LONG_TEXT)
+    tokenizer_service.count(LONG_TEXT, encoding_name="o200k_base")
+
+    assert len(counted) == 2
+
+
+def test_short_texts_are_not_cached(counted: list):
+    tokenizer_service = TokenizerService()
+
+    tokenizer_service.count("short")
+    tokenizer_service.count("short")
+
+    assert len(counted) == 2
+
+
+def test_least_recently_used_count_is_evicted(counted: list):
+    tokenizer_service = TokenizerService(cache_size=2)
+    first, second, third = (f"{i} {LONG_TEXT}" for i in range(3))
+
+    tokenizer_service.count(first)
+    tokenizer_service.count(second)
+    tokenizer_service.count(first)
+    tokenizer_service.count(third)
+    counted.clear()
+
+    tokenizer_service.count(first)
+    tokenizer_service.count(second)
+
+    assert counted == [(DEFAULT_ENCODING, second)]
+
+
+def test_empty_text_has_no_tokens(counted: list):
+    assert TokenizerService().count(None) == 0
+    assert TokenizerService().count("") == 0
+    assert counted == []
+
+
+async def test_long_texts_are_counted_in_the_pool_when_awaited(counted: list):
+    tokenizer_service = TokenizerService(offload_min_length=len(LONG_TEXT), processes=1)
+    # Stands in for the process pool, which can not run the patched count
+    tokenizer_service._pool = ThreadPoolExecutor(max_workers=1)
+
+    assert await tokenizer_service.count_async(LONG_TEXT) == MIN_CACHED_LENGTH
+    assert tokenizer_service.count(LONG_TEXT) == MIN_CACHED_LENGTH
+
+    assert counted == [(DEFAULT_ENCODING, LONG_TEXT)]
+    tokenizer_service._pool.shutdown()
+
+
+async def test_long_texts_are_counted_in_a_thread_without_a_pool(counted: list):
+    tokenizer_service = TokenizerService(offload_min_length=len(LONG_TEXT))
+
+    assert await tokenizer_service.count_async(LONG_TEXT) == MIN_CACHED_LENGTH
+    assert tokenizer_service._pool is None
+
+
+def test_one_pool_is_created_by_concurrent_threads():
+    tokenizer_service = TokenizerService(processes=1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pools = set(executor.map(lambda _: tokenizer_service._get_pool(), range(32)))
+
+    assert pools == {tokenizer_service._pool}
+    tokenizer_service._pool.shutdown()
+
+
+def test_openai_models_use_their_own_encoding():
+    model = MagicMock(family=ModelFamily.OPEN_AI)
+    model.name = "gpt-4o"
+
+    assert get_encoding_name(model) == "o200k_base"
+
+
+def test_other_models_use_the_default_encoding():
+    unknown_openai_model = MagicMock(family=ModelFamily.AZURE)
+    unknown_openai_model.name = "my-deployment"
+    claude_model = MagicMock(family=ModelFamily.CLAUDE)
+    claude_model.name = "claude-3-5-sonnet"
+
+    assert get_encoding_name(unknown_openai_model) == DEFAULT_ENCODING
+    assert get_encoding_name(claude_model) == DEFAULT_ENCODING
+    assert get_encoding_name(None) == DEFAULT_ENCODING
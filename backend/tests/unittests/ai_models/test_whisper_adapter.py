@@ -0,0 +1,142 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from intric.files.audio import AudioSegment
+from intric.transcription_models.infrastructure.adapters import whisper
+from intric.transcription_models.infrastructure.adapters.whisper import (
+    OpenAISTTModelAdapter,
+)
+
+SEGMENTS = [(0, 299.5), (299.5, 601), (601, 850), (850, 905.2)]
+
+
+@pytest.fixture
+def segments(monkeypatch):
+    segments = []
+    for i, (start, end) in enumerate(SEGMENTS):
+        file = MagicMock()
+        file.name = f"/tmp/segment_{i}.mp3"
+        segments.append(AudioSegment(file=file, start=start, end=end))
+
+    async def split_on_silence(filepath, seconds):
+        for segment in segments:
+            yield segment
+
+    monkeypatch.setattr(whisper.audio, "split_on_silence", split_on_silence)
+
+    return segments
+
+
+def _adapter(max_concurrent_segments: int):
+    model = MagicMock(base_url=None)
+    return OpenAISTTModelAdapter(model, max_concurrent_segments=max_concurrent_segments)
+
+
+async def test_segments_are_joined_in_order(segments):
+    adapter = _adapter(max_concurrent_segments=4)
+    # The first segments are transcribed last
+    delays = {segment.path: 0.01 * (len(segments) - i) for i, segment in enumerate(segments)}
+
+    async def get_text_from_file(path: Path):
+        await asyncio.sleep(delays[path])
+        return f"text of {path}"
+
+    adapter._get_text_from_file = get_text_from_file
+
+    text = await adapter.get_text_from_file(Path("recording.mp3"))
+
+    assert text == "\n\n".join(
+        [
+            f"### 0:00 - 4:59\n\ntext of {segments[0].path}",
+            f"### 4:59 - 10:01\n\ntext of {segments[1].path}",
+            f"### 10:01 - 14:10\n\ntext of {segments[2].path}",
+            f"### 14:10 - 15:05\n\ntext of {segments[3].path}",
+        ]
+    )
+    for segment in segments:
+        segment.file.close.assert_called_once()
+
+
+async def test_segments_are_transcribed_concurrently_up_to_the_limit(segments):
+    adapter = _adapter(max_concurrent_segments=2)
+    running = 0
+    max_running = 0
+
+    async def get_text_from_file(path: Path):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "text"
+
+    adapter._get_text_from_file = get_text_from_file
+
+    await adapter.get_text_from_file(Path("recording.mp3"))
+
+    assert max_running == 2
+
+
+async def test_remaining_segments_are_cancelled_on_error(segments):
+    adapter = _adapter(max_concurrent_segments=4)
+    cancelled = []
+
+    async def get_text_from_file(path: Path):
+        if path == segments[0].path:
+            raise ValueError("Failed")
+
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(path)
+            raise
+
+    adapter._get_text_from_file = get_text_from_file
+
+    with pytest.raises(ValueError, match="Failed"):
+        await adapter.get_text_from_file(Path("recording.mp3"))
+
+    assert len(cancelled) == len(segments) - 1
+    for segment in segments:
+        segment.file.close.assert_called_once()
+
+
+async def test_decoding_stops_when_a_segment_fails(segments, monkeypatch):
+    adapter = _adapter(max_concurrent_segments=4)
+    decoded = []
+    decoder_closed = False
+    transcribed = []
+
+    async def split_on_silence(filepath, seconds):
+        nonlocal decoder_closed
+        try:
+            for segment in segments:
+                # Every segment takes a while to decode
+                await asyncio.sleep(0.01)
+                decoded.append(segment)
+                yield segment
+        finally:
+            decoder_closed = True
+
+    monkeypatch.setattr(whisper.audio, "split_on_silence", split_on_silence)
+
+    async def get_text_from_file(path: Path):
+        transcribed.append(path)
+        if path == segments[0].path:
+            raise ValueError("Failed")
+
+        return "text"
+
+    adapter._get_text_from_file = get_text_from_file
+
+    with pytest.raises(ValueError, match="Failed"):
+        await adapter.get_text_from_file(Path("recording.mp3"))
+
+    assert transcribed == [segments[0].path]
+    assert decoded == segments[:2]
+    assert decoder_closed
+    for segment in decoded:
+        segment.file.close.assert_called_once()
@@ -0,0 +1,21 @@
+from intric.analysis import analysis_map_reduce
+
+
+def test_format_questions_with_counts_lists_every_question_once():
+    questions = ["How do I apply?", "Opening hours", "how do  I apply?", "How do I apply?"]
+
+    lines = analysis_map_reduce.format_questions_with_counts(questions)
+
+    assert lines == ['"""How do I apply?""" (asked 3 times)', '"""Opening hours"""']
+
+
+def test_partition_keeps_the_order_within_the_budget(monkeypatch):
+    monkeypatch.setattr(
+        analysis_map_reduce, "count_tokens", lambda text, encoding_name: len(text)
+    )
+    lines = ["a" * 4, "b" * 4, "c" * 4, "d" * 20, "e" * 4]
+
+    partitions = analysis_map_reduce.partition(lines, max_tokens=10, encoding_name="cl100k_base")
+
+    # Every line takes up one token more, for the newline
+    assert partitions == [["aaaa", "bbbb"], ["cccc"], ["d" * 20], ["eeee"]]
@@ -1,13 +1,26 @@
+import asyncio
 from datetime import date, datetime
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
 
+from intric.analysis import analysis_map_reduce
 from intric.analysis.analysis_service import AnalysisService
+from intric.completion_models.infrastructure.static_prompts import (
+    ANALYSIS_MAP_PROMPT,
+    ANALYSIS_REDUCE_PROMPT,
+)
 from intric.main.exceptions import BadRequestException, UnauthorizedException
 from intric.roles.permissions import Permission
-from tests.fixtures import TEST_UUID
+from tests.fixtures import TEST_MODEL_GPT4, TEST_UUID
+
+
+@pytest.fixture(autouse=True)
+def count_characters(monkeypatch):
+    monkeypatch.setattr(
+        analysis_map_reduce, "count_tokens", lambda text, encoding_name: len(text)
+    )
 
 
 @pytest.fixture(name="user")
@@ -59,9 +72,12 @@ def analysis_service(user, mock_space_service):
     # Configure assistant_service
     assistant_service.get_assistant.return_value = (mock_assistant, MagicMock())
 
+    repo = AsyncMock()
+    repo.iterate_question_texts = MagicMock()
+
     return AnalysisService(
         user=user,
-        repo=AsyncMock(),
+        repo=repo,
         assistant_service=assistant_service,
         question_repo=AsyncMock(),
         session_repo=AsyncMock(),
@@ -165,12 +181,8 @@ async def test_get_conversation_stats_assistant(service: AnalysisService):
         MagicMock(),
     )
 
-    # Mock repository response
-    mock_sessions = [
-        MagicMock(questions=[MagicMock(), MagicMock()]),  # 2 questions
-        MagicMock(questions=[MagicMock()]),  # 1 question
-    ]
-    service.repo.get_assistant_sessions_since.return_value = mock_sessions
+    # Mock repository response: 2 sessions with 3 questions
+    service.repo.get_conversation_counts.return_value = (2, 3)
 
     # Call the service method
     result = await service.get_conversation_stats(
@@ -180,7 +192,8 @@ async def test_get_conversation_stats_assistant(service: AnalysisService):
     # Verify results
     assert result.total_conversations == 2
     assert result.total_questions == 3
-    service.repo.get_assistant_sessions_since.assert_called_once()
+    service.repo.get_conversation_counts.assert_called_once()
+    assert service.repo.get_conversation_counts.call_args.kwargs["assistant_id"] == assistant_id
 
 
 async def test_get_conversation_stats_group_chat(service: AnalysisService):
@@ -190,13 +203,8 @@ async def test_get_conversation_stats_group_chat(service: AnalysisService):
 
     group_chat_id = uuid4()
 
-    # Mock repository response
-    mock_sessions = [
-        MagicMock(questions=[MagicMock(), MagicMock(), MagicMock()]),  # 3 questions
-        MagicMock(questions=[MagicMock()]),  # 1 question
-        MagicMock(questions=[]),  # 0 questions
-    ]
-    service.repo.get_group_chat_sessions_since.return_value = mock_sessions
+    # Mock repository response: 3 sessions with 4 questions
+    service.repo.get_conversation_counts.return_value = (3, 4)
 
     # Call the service method
     result = await service.get_conversation_stats(
@@ -206,7 +214,7 @@ async def test_get_conversation_stats_group_chat(service: AnalysisService):
     # Verify results
     assert result.total_conversations == 3
     assert result.total_questions == 4
-    service.repo.get_group_chat_sessions_since.assert_called_once()
+    service.repo.get_conversation_counts.assert_called_once()
 
 
 async def test_get_conversation_stats_with_date_range(service: AnalysisService):
@@ -219,8 +227,7 @@ async def test_get_conversation_stats_with_date_range(service: AnalysisService):
     end_time = datetime(2023, 1, 31, 23, 59)
 
     # Mock repository response
-    mock_sessions = [MagicMock(questions=[MagicMock()])]
-    service.repo.get_group_chat_sessions_since.return_value = mock_sessions
+    service.repo.get_conversation_counts.return_value = (1, 1)
 
     # Call the service method
     result = await service.get_conversation_stats(
@@ -232,8 +239,85 @@ async def test_get_conversation_stats_with_date_range(service: AnalysisService):
     # Verify results
     assert result.total_conversations == 1
     assert result.total_questions == 1
-    service.repo.get_group_chat_sessions_since.assert_called_once_with(
+    service.repo.get_conversation_counts.assert_called_once_with(
+        assistant_id=None,
         group_chat_id=group_chat_id,
         from_date=start_time,
         to_date=end_time,
     )
+
+
+async def test_ask_question_on_questions_includes_the_questions_in_the_prompt(
+    service: AnalysisService,
+):
+    assistant = AsyncMock(space_id=None, completion_model=TEST_MODEL_GPT4)
+    service.assistant_service.get_assistant.return_value = (assistant, MagicMock())
+    service.repo.iterate_question_texts.return_value.__aiter__.return_value = [
+        "First question",
+        "Second question",
+    ]
+
+    from_date = date.today()
+    await service.ask_question_on_questions(
+        question="Test",
+        stream=False,
+        assistant_id=uuid4(),
+        from_date=from_date,
+        to_date=from_date,
+    )
+
+    prompt = assistant.get_response.call_args.kwargs["prompt"]
+    assert prompt.endswith('"""First question"""\n"""Second question"""')
+
+
+async def test_ask_question_on_questions_map_reduces_questions_that_do_not_fit(
+    service: AnalysisService, monkeypatch
+):
+    monkeypatch.setattr(analysis_map_reduce.settings, "analysis_max_concurrent_completions", 2)
+    # Room for 100 characters of questions in every completion
+    completion_model = TEST_MODEL_GPT4.model_copy(update=dict(token_limit=1134))
+    questions = [f"Question number {i:02d}" for i in range(30)] + ["question  NUMBER 00"]
+    running = 0
+    max_running = 0
+
+    async def get_response(question, completion_service, prompt, stream):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return MagicMock(completion=MagicMock(text="An answer"))
+
+    assistant = MagicMock(space_id=None, completion_model=completion_model)
+    assistant.get_response = AsyncMock(side_effect=get_response)
+    service.assistant_service.get_assistant.return_value = (assistant, MagicMock())
+    service.repo.iterate_question_texts.return_value.__aiter__.return_value = questions
+
+    from_date = date.today()
+    await service.ask_question_on_questions(
+        question="Test",
+        stream=True,
+        assistant_id=uuid4(),
+        from_date=from_date,
+        to_date=from_date,
+    )
+
+    *calls, final_call = assistant.get_response.call_args_list
+    map_prompts = [
+        call.kwargs["prompt"]
+        for call in calls
+        if call.kwargs["prompt"].startswith(ANALYSIS_MAP_PROMPT.split("{")[0])
+    ]
+    assert len(map_prompts) > 1
+    assert all(not call.kwargs["stream"] for call in calls)
+    # Every question is asked about once, and duplicates are counted
+    for i in range(1, 30):
+        assert sum(f'"""Question number {i:02d}"""\n' in f"{p}\n" for p in map_prompts) == 1
+    assert sum('"""Question number 00""" (asked 2 times)' in p for p in map_prompts) == 1
+    assert max_running == 2
+
+    # The answers did not fit in one completion, and were combined in rounds
+    assert len(calls) > len(map_prompts)
+    assert final_call.kwargs["stream"]
+    assert final_call.kwargs["prompt"].startswith(ANALYSIS_REDUCE_PROMPT.split("{")[0])
+    assert '"""An answer"""' in final_call.kwargs["prompt"]
@@ -1,3 +1,4 @@
+import asyncio
 from copy import deepcopy
 from dataclasses import dataclass
 from typing import Any
@@ -11,7 +12,11 @@ from intric.assistants.api.assistant_models import (
     AssistantCreatePublic,
     AssistantUpdatePublic,
 )
-from intric.assistants.assistant_service import AssistantService
+from intric.assistants.assistant_service import (
+    AssistantService,
+    ReferenceTracker,
+    get_references,
+)
 from intric.main.config import get_settings
 from intric.main.exceptions import BadRequestException, UnauthorizedException
 from intric.main.models import ModelId
@@ -173,3 +178,123 @@ async def test_error_when_assistant_cannot_be_used_in_space(setup: Setup):
 
     with pytest.raises(UnauthorizedException):
         await setup.service.ask(question="hello", assistant_id=MagicMock())
+
+
+def _blob_with_id(id):
+    blob = MagicMock()
+    blob.id = id
+    return blob
+
+
+def test_reference_tracker_finds_references_cut_between_chunks():
+    blobs = [_blob_with_id(uuid4()) for _ in range(3)]
+    response = (
+        f'First <inref id="{str(blobs[1].id)[:8]}"/>, then '
+        f'<inref id="{str(blobs[0].id)[:8]}"/> and <inref id="{str(blobs[1].id)[:8]}"/>.'
+        ' Not a blob <inref id="00000000"/>.'
+    )
+    tracker = ReferenceTracker(blobs)
+
+    new_references = [tracker.feed(response[i : i + 5]) for i in range(0, len(response), 5)]
+
+    assert tracker.references == [blobs[1], blobs[0]]
+    assert [ref for refs in new_references for ref in refs] == [blobs[1], blobs[0]]
+    assert tracker.references == get_references(response, blobs, version=2)
+    assert list(tracker.ids) == [str(blobs[1].id)[:8], str(blobs[0].id)[:8], "00000000"]
+
+
+class AskStopped(Exception):
+    pass
+
+
+@pytest.fixture
+def assistant_to_ask(setup: Setup):
+    assistant = MagicMock(completion_model=TEST_MODEL_GPT4)
+    assistant.ask = AsyncMock(side_effect=AskStopped)
+
+    space = MagicMock()
+    space.get_assistant.return_value = assistant
+    setup.service.space_repo.get_space_by_assistant.return_value = space
+
+    return assistant
+
+
+@pytest.fixture
+def web_search(setup: Setup, monkeypatch):
+    web_search = AsyncMock()
+    monkeypatch.setattr(AssistantService, "web_search", web_search)
+
+    return web_search
+
+
+async def test_ask_searches_the_web_and_embeds_while_loading_files(
+    setup: Setup, assistant_to_ask: MagicMock, web_search: AsyncMock
+):
+    searching = asyncio.Event()
+    embedding = asyncio.Event()
+
+    async def search(search_query):
+        searching.set()
+        return ["web search result"]
+
+    async def embed_query(**kwargs):
+        embedding.set()
+        return [0.1, 0.2]
+
+    async def get_files_by_ids(file_ids):
+        await asyncio.wait_for(asyncio.gather(searching.wait(), embedding.wait()), timeout=1)
+        return []
+
+    web_search.search.side_effect = search
+    setup.service.references_service.embed_query.side_effect = embed_query
+    setup.service.file_service.get_files_by_ids.side_effect = get_files_by_ids
+
+    with pytest.raises(AskStopped):
+        await setup.service.ask(
+            question="hello", assistant_id=uuid4(), use_web_search=True, version=2
+        )
+
+    kwargs = assistant_to_ask.ask.await_args.kwargs
+    assert kwargs["web_search_results"] == ["web search result"]
+    assert kwargs["query_embedding"] == [0.1, 0.2]
+
+
+async def test_ask_embeds_the_history_of_an_existing_session(
+    setup: Setup, assistant_to_ask: MagicMock
+):
+    session = MagicMock(questions=[])
+    setup.service.session_service.get_session_with_history_window.return_value = session
+
+    with pytest.raises(AskStopped):
+        await setup.service.ask(question="hello", assistant_id=uuid4(), session_id=uuid4())
+
+    kwargs = setup.service.references_service.embed_query.await_args.kwargs
+    assert kwargs["session"] is session
+
+
+async def test_ask_cancels_the_web_search_if_loading_the_files_fails(
+    setup: Setup, assistant_to_ask: MagicMock, web_search: AsyncMock
+):
+    cancelled = asyncio.Event()
+
+    async def search(search_query):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def get_files_by_ids(file_ids):
+        await asyncio.sleep(0)
+        raise BadRequestException()
+
+    web_search.search.side_effect = search
+    setup.service.file_service.get_files_by_ids.side_effect = get_files_by_ids
+
+    with pytest.raises(BadRequestException):
+        await setup.service.ask(
+            question="hello", assistant_id=uuid4(), use_web_search=True, version=2
+        )
+
+    assert cancelled.is_set()
+    assistant_to_ask.ask.assert_not_awaited()
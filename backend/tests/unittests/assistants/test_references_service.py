@@ -4,7 +4,7 @@ from uuid import uuid4
 import pytest
 
 from intric.assistants.references import ReferencesService
-from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore
+from intric.info_blobs.info_blob import InfoBlobChunkInDBWithScore, InfoBlobInDBNoText
 from tests.fixtures import TEST_UUID
 
 
@@ -94,3 +94,29 @@ def test_concatenate_session_is_null():
     service = ReferencesService(AsyncMock(), AsyncMock())
     concatenated_session = service._concatenate_conversation("next question", None)
     assert concatenated_session == "next question"
+
+
+async def test_info_blobs_are_fetched_in_one_query_in_the_order_of_the_chunks():
+    info_blobs_repo = AsyncMock()
+    service = ReferencesService(info_blobs_repo, AsyncMock())
+    blob_ids = [uuid4() for _ in range(3)]
+    info_blobs_repo.get_by_ids_without_text.return_value = [
+        InfoBlobInDBNoText(
+            id=blob_id,
+            embedding_model_id=TEST_UUID,
+            user_id=TEST_UUID,
+            tenant_id=TEST_UUID,
+            size=1,
+        )
+        # The last blob has been deleted since the search
+        for blob_id in reversed(blob_ids[:2])
+    ]
+    chunks = [_create_chunk_with_score(1 - i / 10, blob_id) for i, blob_id in enumerate(blob_ids)]
+
+    info_blobs = await service._get_info_blobs_from_chunks(chunks)
+
+    info_blobs_repo.get_by_ids_without_text.assert_awaited_once()
+    assert [(blob.id, blob.score) for blob in info_blobs] == [
+        (blob_ids[0], 1.0),
+        (blob_ids[1], 0.9),
+    ]
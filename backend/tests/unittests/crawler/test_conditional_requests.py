@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+from intric.crawler.middlewares import ConditionalRequestMiddleware
+from intric.crawler.parse_html import parse_response
+from intric.websites.crawl_dependencies.crawl_models import CrawledPageValidators
+
+URL = "https://www.example.com/page"
+
+
+def test_validators_are_added_to_requests_for_known_pages():
+    spider = SimpleNamespace(
+        known_pages={
+            URL: CrawledPageValidators(
+                etag='"abc"', last_modified="Wed, 21 Oct 2015 07:28:00 GMT"
+            )
+        }
+    )
+    request = Request(URL)
+
+    ConditionalRequestMiddleware().process_request(request, spider)
+
+    assert request.headers["If-None-Match"] == b'"abc"'
+    assert request.headers["If-Modified-Since"] == b"Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+def test_requests_for_unknown_pages_are_not_conditional():
+    spider = SimpleNamespace(known_pages={URL: CrawledPageValidators(etag='"abc"')})
+    request = Request("https://www.example.com/other")
+
+    ConditionalRequestMiddleware().process_request(request, spider)
+
+    assert "If-None-Match" not in request.headers
+    assert "If-Modified-Since" not in request.headers
+
+
+def test_not_modified_response_is_parsed_as_unchanged():
+    response = HtmlResponse(URL, status=304, headers={"ETag": '"abc"'})
+
+    page = parse_response(response)
+
+    assert page.unchanged
+    assert page.etag == '"abc"'
+    assert page.content == ""
+
+
+def test_validators_are_parsed_from_response():
+    response = HtmlResponse(
+        URL,
+        body=b"<html><head><title>Title</title></head><body>Text</body></html>",
+        headers={"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+    )
+
+    page = parse_response(response)
+
+    assert not page.unchanged
+    assert page.title == "Title"
+    assert page.etag == '"abc"'
+    assert page.last_modified == "Wed, 21 Oct 2015 07:28:00 GMT"
@@ -0,0 +1,48 @@
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+from intric.crawler.spiders.crawl_spider import CrawlSpider
+from intric.websites.crawl_dependencies.crawl_models import CrawledPageValidators
+
+URL = "https://www.example.com/"
+
+
+def test_only_the_start_page_is_requested_at_start():
+    known_pages = {f"{URL}page": CrawledPageValidators(etag='"a"', links=[])}
+    spider = CrawlSpider(url=URL, known_pages=known_pages)
+
+    requests = list(spider.start_requests())
+
+    assert [request.url for request in requests] == [URL]
+    assert not any(request.dont_filter for request in requests)
+
+
+def test_links_of_the_site_are_stored_with_the_page():
+    spider = CrawlSpider(url=URL)
+    body = b'<a href="/page">Page</a><a href="/file.pdf">File</a><a href="https://other.com/">'
+    response = HtmlResponse(URL, body=body, request=Request(URL))
+
+    page = spider.parse_page(response)
+
+    assert page.links == [f"{URL}page", f"{URL}file.pdf"]
+
+
+def test_stored_links_are_followed_when_the_page_is_not_modified():
+    known_pages = {URL: CrawledPageValidators(etag='"a"', links=[f"{URL}page", f"{URL}a&b"])}
+    spider = CrawlSpider(url=URL, known_pages=known_pages)
+    response = HtmlResponse(URL, status=304, request=Request(URL))
+
+    requests = list(spider._requests_to_follow(response))
+
+    assert [request.url for request in requests] == [f"{URL}page", f"{URL}a&b"]
+    assert spider.parse_page(response).links is None
+
+
+def test_pages_without_stored_links_are_not_requested_conditionally():
+    known_pages = {
+        URL: CrawledPageValidators(etag='"a"', links=[]),
+        f"{URL}page": CrawledPageValidators(etag='"b"'),
+    }
+    spider = CrawlSpider(url=URL, known_pages=known_pages)
+
+    assert list(spider.known_pages) == [URL]
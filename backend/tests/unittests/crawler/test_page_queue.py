@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+import pytest
+
+from intric.crawler.parse_html import CrawledPage
+from intric.crawler.pipelines import PageQueue
+
+
+def _page(i: int):
+    return CrawledPage(url=f"https://www.example.com/{i}", title=str(i), content="")
+
+
+async def test_pages_are_consumed_while_produced():
+    page_queue = PageQueue(maxsize=1)
+
+    def produce():
+        for i in range(3):
+            page_queue.put(_page(i))
+        page_queue.finish()
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+
+    pages = []
+    while (page := await page_queue.get(timeout=5)) is not None:
+        pages.append(page)
+
+    thread.join()
+    assert [page.title for page in pages] == ["0", "1", "2"]
+
+
+async def test_get_times_out():
+    page_queue = PageQueue(maxsize=1)
+
+    with pytest.raises(TimeoutError):
+        await page_queue.get(timeout=0.1)
+
+
+async def test_closing_unblocks_producers():
+    page_queue = PageQueue(maxsize=1)
+    page_queue.put(_page(0))
+
+    put = asyncio.create_task(asyncio.to_thread(page_queue.put, _page(1)))
+    page_queue.close()
+
+    assert await asyncio.wait_for(put, timeout=5) is False
@@ -0,0 +1,73 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.data_retention.infrastructure.data_retention_service import DataRetentionService
+
+CREATED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _rows(num_rows: int, offset: int = 0):
+    return [(CREATED_AT + timedelta(seconds=offset + i), uuid4()) for i in range(num_rows)]
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.transactions = 0
+
+    @asynccontextmanager
+    async def begin():
+        session.transactions += 1
+        yield
+
+    session.begin = begin
+
+    return session
+
+
+def _returning(session, batches: list[list[tuple]]):
+    results = iter(batches)
+    statements = []
+
+    async def execute(stmt):
+        statements.append(stmt)
+        result = MagicMock()
+        result.all.return_value = next(results)
+        return result
+
+    session.execute = execute
+
+    return statements
+
+
+async def test_deletes_in_batches_until_a_batch_is_not_full(session):
+    batches = [_rows(3), _rows(3, offset=3), _rows(1, offset=6)]
+    statements = _returning(session, batches)
+    service = DataRetentionService(session, batch_size=3, batch_pause=0)
+
+    report = await service.delete_old_questions()
+
+    assert report.rows == 7
+    assert report.batches == 3
+    assert report.completed
+    # Every batch is committed in a transaction of its own
+    assert session.transactions == 3
+    # Every batch continues from the last row deleted by the one before
+    last_row = statements[2].compile().params
+    assert batches[1][-1][0] in last_row.values()
+    assert batches[1][-1][1] in last_row.values()
+
+
+async def test_stops_after_max_run_seconds_and_reports_the_lag(session):
+    _returning(session, [_rows(3), _rows(3, offset=3)])
+    service = DataRetentionService(session, batch_size=3, batch_pause=0, max_run_seconds=0)
+
+    report = await service.delete_old_app_runs()
+
+    assert report.rows == 3
+    assert not report.completed
+    assert report.lag > datetime.now(timezone.utc) - CREATED_AT - timedelta(minutes=1)
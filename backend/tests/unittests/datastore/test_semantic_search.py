@@ -33,3 +33,36 @@ async def test_semantic_search(datastore: Datastore):
             embedding_model=TEST_COLLECTION.embedding_model,
         )
         autocut_mock.assert_called_once()
+
+
+async def test_semantic_search_uses_hybrid_search_when_enabled(datastore: Datastore):
+    with patch(
+        "intric.embedding_models.infrastructure.datastore.get_settings"
+    ) as get_settings_mock:
+        get_settings_mock.return_value.using_hybrid_search = True
+
+        await datastore.semantic_search(
+            search_string="giraffe",
+            collections=[TEST_COLLECTION],
+            embedding_model=TEST_COLLECTION.embedding_model,
+        )
+
+    datastore.chunk_repo.hybrid_search.assert_awaited_once()
+    assert datastore.chunk_repo.hybrid_search.await_args.args[1] == "giraffe"
+    datastore.chunk_repo.semantic_search.assert_not_called()
+
+
+async def test_semantic_search_uses_vector_search_by_default(datastore: Datastore):
+    with patch(
+        "intric.embedding_models.infrastructure.datastore.get_settings"
+    ) as get_settings_mock:
+        get_settings_mock.return_value.using_hybrid_search = False
+
+        await datastore.semantic_search(
+            search_string="giraffe",
+            collections=[TEST_COLLECTION],
+            embedding_model=TEST_COLLECTION.embedding_model,
+        )
+
+    datastore.chunk_repo.semantic_search.assert_awaited_once()
+    datastore.chunk_repo.hybrid_search.assert_not_called()
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import wave
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+import soundfile
+
+from intric.files import audio
+
+SAMPLERATE = 8000
+
+
+def _write_wav(path, parts: list[tuple[float, bool]]):
+    """Write a recording of tones and silences, given as (seconds, is_tone)."""
+    samples = []
+    for seconds, is_tone in parts:
+        t = np.arange(int(seconds * SAMPLERATE)) / SAMPLERATE
+        amplitude = 0.5 if is_tone else 0.0
+        samples.append(amplitude * np.sin(2 * np.pi * 440 * t))
+
+    data = (np.concatenate(samples) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLERATE)
+        f.writeframes(data.tobytes())
+
+
+async def _split(path, seconds: int, search_seconds: int):
+    segments = []
+    async for segment in audio.split_on_silence(
+        path, seconds=seconds, search_seconds=search_seconds
+    ):
+        segments.append(segment)
+
+    return segments
+
+
+async def test_split_on_silence_splits_at_the_silence(tmp_path):
+    path = tmp_path / "recording.wav"
+    # Silences at 9-10 s and 19-20 s, segments of about 10 s
+    _write_wav(path, [(9, True), (1, False), (9, True), (1, False), (5, True)])
+
+    segments = await _split(path, seconds=10, search_seconds=2)
+
+    try:
+        assert len(segments) == 3
+        assert 9 <= segments[0].end <= 10
+        assert 19 <= segments[1].end <= 20
+    finally:
+        for segment in segments:
+            segment.close()
+
+
+async def test_split_on_silence_covers_the_whole_recording(tmp_path):
+    path = tmp_path / "recording.wav"
+    _write_wav(path, [(23, True)])
+
+    segments = await _split(path, seconds=5, search_seconds=1)
+
+    try:
+        assert segments[0].start == 0
+        for previous, segment in zip(segments, segments[1:]):
+            assert segment.start == previous.end
+        assert segments[-1].end == pytest.approx(23)
+
+        for segment in segments:
+            info = soundfile.info(segment.path)
+            assert info.channels == 1
+            assert info.samplerate == SAMPLERATE
+    finally:
+        for segment in segments:
+            segment.close()
+
+
+async def test_decoder_is_closed_when_the_caller_is_cancelled_while_decoding(monkeypatch):
+    decoding = threading.Event()
+    decoded = threading.Event()
+    closed = threading.Event()
+    segment = audio.AudioSegment(file=MagicMock(), start=0, end=10)
+
+    def split_on_silence(filepath, seconds, search_seconds):
+        try:
+            decoding.set()
+            decoded.wait()
+            yield segment
+        finally:
+            closed.set()
+
+    monkeypatch.setattr(audio, "_split_on_silence", split_on_silence)
+
+    task = asyncio.create_task(_split("recording.mp3", seconds=10, search_seconds=2))
+    await asyncio.to_thread(decoding.wait)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The decoder is closed once the segment being decoded is done
+    assert not closed.is_set()
+    decoded.set()
+    assert await asyncio.to_thread(closed.wait, 1)
+    segment.file.close.assert_called_once()
@@ -1,7 +1,17 @@
+import numpy as np
 import pytest
 
 from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from intric.info_blobs.info_blob import InfoBlobChunk
 from intric.main.exceptions import ChunkEmbeddingMisMatchException
+from tests.fixtures import TEST_UUID
+
+
+def _chunks(n: int, start: int = 0):
+    return [
+        InfoBlobChunk(text=str(i), chunk_no=i, info_blob_id=TEST_UUID, tenant_id=TEST_UUID)
+        for i in range(start, start + n)
+    ]
 
 
 def test_add_one_at_a_time():
@@ -41,3 +51,39 @@ def test_fails_when_the_lengths_dont_match():
 
     with pytest.raises(ChunkEmbeddingMisMatchException):
         chunk_embedding_list.add([1, 2], [[1]])
+
+
+def test_embeddings_are_kept_in_order_when_growing():
+    chunk_embedding_list = ChunkEmbeddingList()
+
+    for start in range(0, 200, 50):
+        chunk_embedding_list.add(
+            _chunks(50, start), [[float(i), float(-i)] for i in range(start, start + 50)]
+        )
+
+    assert len(chunk_embedding_list) == 200
+    assert chunk_embedding_list.embeddings.dtype == np.float32
+    assert chunk_embedding_list.embeddings.shape == (200, 2)
+    assert all(
+        chunk.chunk_no == embedding[0] == -embedding[1]
+        for chunk, embedding in chunk_embedding_list
+    )
+
+
+def test_large_embeddings_are_memory_mapped():
+    chunk_embedding_list = ChunkEmbeddingList(max_in_memory_bytes=1024)
+
+    chunk_embedding_list.add(_chunks(10), np.ones((10, 4)))
+    chunk_embedding_list.add(_chunks(100, 10), np.zeros((100, 4)))
+
+    assert isinstance(chunk_embedding_list.embeddings, np.memmap)
+    assert chunk_embedding_list.embeddings[:10].sum() == 40
+    assert chunk_embedding_list.embeddings[10:].sum() == 0
+
+
+def test_dimensions_must_match():
+    chunk_embedding_list = ChunkEmbeddingList()
+    chunk_embedding_list.add(_chunks(1), [[1.0, 2.0]])
+
+    with pytest.raises(ChunkEmbeddingMisMatchException):
+        chunk_embedding_list.add(_chunks(1), [[1.0]])
@@ -0,0 +1,131 @@
+import struct
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from intric.files.chunk_embedding_list import ChunkEmbeddingList
+from intric.info_blobs.info_blob import InfoBlobChunk, get_content_hash
+from intric.info_blobs.info_blob_chunk_repo import InfoBlobChunkRepo, VectorSearchStrategy
+from tests.fixtures import TEST_UUID
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=[])
+    session.scalar = AsyncMock()
+
+    return session
+
+
+@pytest.fixture
+def repo(session):
+    return InfoBlobChunkRepo(session=session)
+
+
+def _compile(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.parametrize(
+    ["num_chunks", "strategy"],
+    [
+        (0, VectorSearchStrategy.EXACT),
+        (10, VectorSearchStrategy.EXACT),
+        (11, VectorSearchStrategy.INDEX),
+    ],
+)
+async def test_vector_search_strategy_depends_on_source_size(
+    repo: InfoBlobChunkRepo, session, num_chunks: int, strategy: VectorSearchStrategy
+):
+    session.scalar.return_value = num_chunks
+
+    with patch(
+        "intric.info_blobs.info_blob_chunk_repo.vector_search_settings.exact_search_max_chunks",
+        10,
+    ):
+        assert await repo._get_vector_search_strategy([uuid4()]) == strategy
+
+
+async def test_small_sources_are_searched_exactly(repo: InfoBlobChunkRepo, session):
+    session.scalar.return_value = 5
+
+    await repo.semantic_search([0.1, 0.2], group_ids=[uuid4()], limit=5)
+
+    assert session.execute.await_count == 1
+    query = _compile(session.execute.await_args.args[0])
+    assert "MATERIALIZED" in query
+    assert "enable_seqscan" not in query
+
+
+async def test_large_sources_tune_index_search(repo: InfoBlobChunkRepo, session):
+    session.scalar.return_value = 1_000_000
+
+    await repo.semantic_search([0.1, 0.2], website_ids=[uuid4()], limit=100)
+
+    assert session.execute.await_count == 2
+    parameters = session.execute.await_args_list[0].args[0].compile().params
+    assert "200" in parameters.values()
+    assert "MATERIALIZED" not in _compile(session.execute.await_args.args[0])
+
+
+def test_copy_rows_are_encoded_in_binary_copy_format():
+    chunk_id = uuid4()
+    chunk = InfoBlobChunk(
+        text="hej",
+        chunk_no=2,
+        info_blob_id=TEST_UUID,
+        tenant_id=TEST_UUID,
+        source_id=None,
+    )
+
+    row = InfoBlobChunkRepo._encode_copy_rows(
+        [chunk], np.array([[1.0, -0.5]], dtype=np.float32), [chunk_id]
+    )
+
+    vector = struct.pack("!ihh", 12, 2, 0) + struct.pack("!ff", 1.0, -0.5)
+    content_hash = get_content_hash("hej").encode()
+    assert row == b"".join(
+        [
+            struct.pack("!h", 9),
+            struct.pack("!i", 3) + b"hej",
+            struct.pack("!ii", 4, 2),
+            struct.pack("!i", 16) + TEST_UUID.bytes,
+            struct.pack("!i", 16) + TEST_UUID.bytes,
+            struct.pack("!i", -1),
+            vector,
+            struct.pack("!ii", 4, 3 + 2 * 4),
+            struct.pack("!i", len(content_hash)) + content_hash,
+            struct.pack("!i", 16) + chunk_id.bytes,
+        ]
+    )
+
+
+async def test_add_chunk_embeddings_returns_ids_in_order(repo: InfoBlobChunkRepo):
+    copy_to_table = AsyncMock()
+    raw_connection = MagicMock()
+    raw_connection.driver_connection.copy_to_table = copy_to_table
+    connection = MagicMock()
+    connection.get_raw_connection = AsyncMock(return_value=raw_connection)
+    repo.session.connection = AsyncMock(return_value=connection)
+    repo.session.begin_nested = MagicMock()
+    repo.session.begin_nested.return_value.__aenter__ = AsyncMock()
+    repo.session.begin_nested.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    chunk_embedding_list = ChunkEmbeddingList()
+    chunk_embedding_list.add(
+        [
+            InfoBlobChunk(text=str(i), chunk_no=i, info_blob_id=TEST_UUID, tenant_id=TEST_UUID)
+            for i in range(3)
+        ],
+        [[0.1, 0.2]] * 3,
+    )
+
+    ids = await repo.add_chunk_embeddings(chunk_embedding_list, returning=True, batch_size=2)
+
+    assert len(ids) == 3
+    assert copy_to_table.call_args.kwargs["columns"][-1] == "id"
+    assert copy_to_table.call_args.kwargs["format"] == "binary"
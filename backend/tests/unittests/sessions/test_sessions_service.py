@@ -4,7 +4,9 @@ from uuid import uuid4
 import pytest
 
 from intric.assistants.api.assistant_models import AssistantSparse
+from intric.completion_models.infrastructure import context_builder
 from intric.main.exceptions import NotFoundException, UnauthorizedException
+from intric.questions.question import Question
 from intric.sessions.session import SessionInDB, SessionUpdate
 from intric.sessions.session_service import SessionService
 from tests.fixtures import TEST_USER, TEST_UUID
@@ -115,3 +117,65 @@ async def test_delete_error_when_user_not_owner_of_session(service: SessionServi
 
     with pytest.raises(UnauthorizedException, match="belongs to other user"):
         await service.delete(1)
+
+
+def _questions_newest_first(num_questions: int):
+    return [
+        Question(
+            id=uuid4(),
+            question=f"question {i}",
+            answer="answer",
+            num_tokens_question=0,
+            num_tokens_answer=0,
+            tenant_id=TEST_UUID,
+            session_id=TEST_UUID,
+        )
+        for i in reversed(range(num_questions))
+    ]
+
+
+async def test_history_window_keeps_the_latest_questions_that_fit(
+    service: SessionService, monkeypatch
+):
+    # Every message counts as 100 tokens
+    monkeypatch.setattr(context_builder, "count_tokens", lambda text, encoding_name: 50)
+    questions = _questions_newest_first(20)
+    read = []
+
+    async def iterate_history(session_id):
+        for question in questions:
+            read.append(question)
+            yield question
+
+    service.session_repo.get_without_questions.return_value = SessionInDB(
+        user_id=TEST_USER.id, name="test_session", id=TEST_UUID
+    )
+    service.session_repo.iterate_history = iterate_history
+    max_tokens = context_builder.CONTEXT_SIZE_BUFFER + 5250  # About 1050 tokens of messages
+
+    session = await service.get_session_with_history_window(TEST_UUID, max_tokens=max_tokens)
+
+    assert [question.question for question in session.questions] == [
+        f"question {i}" for i in range(10, 20)
+    ]
+    # The history is not read further than the first question that does not fit
+    assert len(read) == 11
+
+
+async def test_history_window_keeps_a_minimum_of_questions(
+    service: SessionService, monkeypatch
+):
+    monkeypatch.setattr(context_builder, "count_tokens", lambda text, encoding_name: 1000)
+
+    async def iterate_history(session_id):
+        for question in _questions_newest_first(10):
+            yield question
+
+    service.session_repo.get_without_questions.return_value = SessionInDB(
+        user_id=TEST_USER.id, name="test_session", id=TEST_UUID
+    )
+    service.session_repo.iterate_history = iterate_history
+
+    session = await service.get_session_with_history_window(TEST_UUID, max_tokens=2000)
+
+    assert len(session.questions) == context_builder.MIN_MESSAGES + 1
@@ -0,0 +1,132 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from intric.collections.domain.collection import Collection
+from intric.group_chat.domain.entities.group_chat import GroupChat, GroupChatAssistant
+from intric.spaces.api.space_models import SpaceMember, SpaceRoleValue
+from intric.spaces.space import Space
+
+
+def _collection(name: str):
+    return Collection(
+        id=uuid4(),
+        created_at=MagicMock(),
+        updated_at=None,
+        space_id=uuid4(),
+        user_id=uuid4(),
+        tenant_id=uuid4(),
+        name=name,
+        size=0,
+        num_info_blobs=0,
+        embedding_model=MagicMock(id=uuid4()),
+    )
+
+
+def _member(role: SpaceRoleValue = SpaceRoleValue.EDITOR):
+    return SpaceMember(id=uuid4(), username="member", email="member@example.com", role=role)
+
+
+@pytest.fixture
+def space():
+    assistant = MagicMock(id=uuid4())
+    members = [_member(), _member()]
+    space = Space(
+        id=uuid4(),
+        tenant_id=uuid4(),
+        user_id=None,
+        name="space",
+        description=None,
+        embedding_models=[],
+        completion_models=[],
+        transcription_models=[],
+        default_assistant=None,
+        assistants=[],
+        apps=[],
+        services=[],
+        websites=[],
+        collections=[_collection("first"), _collection("second")],
+        integration_knowledge_list=[],
+        members={member.id: member for member in members},
+        group_chats=[
+            GroupChat(
+                id=uuid4(),
+                created_at=MagicMock(),
+                updated_at=None,
+                user_id=uuid4(),
+                space_id=uuid4(),
+                name="group chat",
+                assistants=[GroupChatAssistant(assistant=assistant, user_description="old")],
+                allow_mentions=False,
+                show_response_label=False,
+                published=False,
+            )
+        ],
+    )
+    space.mark_persisted()
+
+    return space
+
+
+def test_no_changes_after_loading(space: Space):
+    assert not space.get_changes()
+
+
+def test_changes_are_unknown_if_the_space_was_not_loaded(space: Space):
+    space._persisted_state = None
+
+    assert space.get_changes() is None
+
+
+def test_only_the_changed_collection_is_dirty(space: Space):
+    space.collections[1].name = "renamed"
+
+    changes = space.get_changes()
+
+    assert changes.collections.changed == [space.collections[1]]
+    assert not changes.collections.new
+    assert not changes.collections.removed
+    assert not changes.group_chats
+    assert not changes.attributes
+
+
+def test_new_and_removed_collections(space: Space):
+    removed = space.collections.pop(0)
+    new = _collection("new")
+    new.created_at = None
+    space.collections.append(new)
+
+    changes = space.get_changes()
+
+    assert changes.collections.new == [new]
+    assert changes.collections.removed == [removed.id]
+    assert changes.has_new
+
+
+def test_changes_within_a_child_are_found(space: Space):
+    space.group_chats[0].assistants[0].update(user_description="new")
+
+    changes = space.get_changes()
+
+    assert changes.group_chats.changed == [space.group_chats[0]]
+
+
+def test_changed_and_removed_members(space: Space):
+    changed, removed = space.members.values()
+    space.change_member_role(changed.id, SpaceRoleValue.ADMIN)
+    space.remove_member(removed.id)
+
+    changes = space.get_changes()
+
+    assert changes.members.changed == [changed]
+    assert changes.members.removed == [removed.id]
+
+
+def test_no_changes_after_being_saved(space: Space):
+    space.name = "renamed"
+    assert space.get_changes().attributes
+
+    space.mark_persisted()
+
+    assert not space.get_changes()
@@ -22,3 +22,24 @@ def test_create_space_from_request():
     assert created_space.completion_models == []
     assert created_space.tenant_id is not None
     assert created_space.members == {}
+
+
+def test_create_partial_space_from_db_uses_given_members(factory: SpaceFactory):
+    space_in_db = MagicMock(user_id=uuid4(), members=[MagicMock()])
+    member = MagicMock(user_id=uuid4(), role="admin")
+    member.user.deleted_at = None
+    member.user.to_dict.return_value = dict(
+        id=member.user_id, email="test@example.com", username="test"
+    )
+
+    space = factory.create_space_from_db(
+        space_in_db,
+        user=MagicMock(),
+        members_in_db=[member],
+        integration_knowledge_in_db=[],
+        partial=True,
+    )
+
+    assert space.partial
+    assert list(space.members) == [member.user_id]
+    assert space.integration_knowledge_list == []
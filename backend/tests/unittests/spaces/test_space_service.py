@@ -137,3 +137,13 @@ async def test_get_spaces_and_personal_space_returns_personal_space_first(
     spaces = await service.get_spaces(include_personal=True)
 
     assert spaces == [personal_space] + other_spaces
+
+
+async def test_get_spaces_loads_summaries_of_the_applications_of_all_spaces(
+    service: SpaceService,
+):
+    await service.get_spaces(include_applications=True, summary=True)
+
+    service.repo.get_spaces_for_member.assert_awaited_once_with(
+        service.user.id, include_applications=True, summary=True
+    )
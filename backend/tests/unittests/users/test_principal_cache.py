@@ -0,0 +1,195 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from intric.authentication.auth_models import ApiKeyInDB
+from intric.authentication.principal_cache import (
+    PrincipalCache,
+    _forget_invalidations,
+    _invalidate_on_commit,
+)
+from intric.users.user_service import UserService
+from tests.fixtures import TEST_USER
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        for name, args, kwargs in self.commands:
+            await getattr(self.redis, name)(*args, **kwargs)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+    async def expire(self, key, seconds):
+        pass
+
+    async def smembers(self, key):
+        return self.data.get(key, set())
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def cache(redis: FakeRedis):
+    return PrincipalCache(redis=redis, max_size=2, ttl=60, local_ttl=60)
+
+
+async def test_user_round_trips_through_redis(cache: PrincipalCache, redis: FakeRedis):
+    key = PrincipalCache.token_key(TEST_USER.username)
+    await cache.set(key, TEST_USER)
+
+    other_process = PrincipalCache(redis=redis)
+    user = await other_process.get(key)
+
+    assert user.id == TEST_USER.id
+    assert user.tenant == TEST_USER.tenant
+    assert user.permissions == TEST_USER.permissions
+
+
+async def test_credentials_are_not_cached(cache: PrincipalCache, redis: FakeRedis):
+    key = PrincipalCache.token_key(TEST_USER.username)
+    api_key = ApiKeyInDB(
+        key="hashed_key", truncated_key="trunc", user_id=TEST_USER.id, assistant_id=None
+    )
+    await cache.set(key, TEST_USER.model_copy(update={"api_key": api_key, "used_tokens": 10}))
+
+    value = redis.data[key].decode()
+    for secret in [TEST_USER.password, TEST_USER.salt, "hashed_key", "used_tokens"]:
+        assert secret not in value
+
+    user = await PrincipalCache(redis=redis).get(key)
+    assert user.password is None
+    assert user.api_key.truncated_key == "trunc"
+
+
+async def test_invalidate_user_drops_all_keys_of_the_user(cache: PrincipalCache, redis):
+    token_key = PrincipalCache.token_key(TEST_USER.username)
+    api_key_key = PrincipalCache.api_key_key("hashed")
+    await cache.set(token_key, TEST_USER)
+    await cache.set(api_key_key, TEST_USER)
+
+    await cache.invalidate_user(TEST_USER.id)
+
+    assert await cache.get(token_key) is None
+    assert await cache.get(api_key_key) is None
+    assert token_key not in redis.data
+    assert api_key_key not in redis.data
+
+
+async def test_invalidate_tenant_drops_the_users_of_the_tenant(cache: PrincipalCache):
+    key = PrincipalCache.token_key(TEST_USER.username)
+    await cache.set(key, TEST_USER)
+
+    await cache.invalidate_tenant(TEST_USER.tenant_id)
+
+    assert await cache.get(key) is None
+
+
+async def test_invalidation_is_repeated_when_the_session_commits(cache: PrincipalCache):
+    key = PrincipalCache.token_key(TEST_USER.username)
+    session = MagicMock(info={})
+
+    await cache.invalidate_user(TEST_USER.id, session=session)
+    # Another request reads the row before the change is committed
+    await cache.set(key, TEST_USER)
+
+    _invalidate_on_commit(session)
+    await asyncio.gather(*cache._tasks)
+
+    assert await cache.get(key) is None
+    assert session.info == {}
+
+
+async def test_invalidation_is_not_repeated_after_a_rollback(cache: PrincipalCache):
+    key = PrincipalCache.token_key(TEST_USER.username)
+    session = MagicMock(info={})
+
+    await cache.invalidate_tenant(TEST_USER.tenant_id, session=session)
+    await cache.set(key, TEST_USER)
+
+    _forget_invalidations(session)
+    _invalidate_on_commit(session)
+
+    assert await cache.get(key) is not None
+
+
+@pytest.fixture
+def service(cache: PrincipalCache):
+    auth_service = AsyncMock()
+    auth_service.get_username_from_token = MagicMock(return_value=TEST_USER.username)
+    auth_service.hash_api_key = MagicMock(return_value="hashed")
+
+    return UserService(
+        user_repo=AsyncMock(session=MagicMock(info={})),
+        auth_service=auth_service,
+        settings_repo=AsyncMock(),
+        tenant_repo=AsyncMock(),
+        info_blob_repo=AsyncMock(),
+        principal_cache=cache,
+    )
+
+
+async def test_authenticate_with_token_loads_the_user_once(service: UserService):
+    service.repo.get_user_by_username.return_value = TEST_USER
+
+    for _ in range(3):
+        assert (await service.authenticate(token="token")).id == TEST_USER.id
+
+    service.repo.get_user_by_username.assert_awaited_once_with(TEST_USER.username)
+
+
+async def test_authenticate_with_api_key_looks_up_the_key_once(service: UserService):
+    service.auth_service.get_api_key.return_value = MagicMock(user_id=TEST_USER.id)
+    service.repo.get_user_by_id.return_value = TEST_USER
+
+    for _ in range(3):
+        assert (await service.authenticate(api_key="inp_key")).id == TEST_USER.id
+
+    service.auth_service.get_api_key.assert_awaited_once_with("hashed", hash_key=False)
+    service.repo.get_user_by_id.assert_awaited_once()
+
+
+async def test_updating_user_invalidates_the_cached_user(service: UserService):
+    service.repo.get_user_by_username.return_value = TEST_USER
+    service.repo.get_user_by_email.return_value = None
+    await service.authenticate(token="token")
+
+    await service.generate_api_key(TEST_USER.id)
+    await service.authenticate(token="token")
+
+    assert service.repo.get_user_by_username.await_count == 2
@@ -0,0 +1,156 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from intric.main.models import Channel, ChannelType
+from intric.server.websockets.websocket_manager import WebSocketManager
+from intric.server.websockets.websocket_models import (
+    OutGoingMessageType,
+    WsOutgoingWebSocketMessage,
+)
+
+MESSAGE = WsOutgoingWebSocketMessage(type=OutGoingMessageType.PONG)
+
+
+@pytest.fixture
+def pubsub():
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.unsubscribe = AsyncMock()
+    pubsub.aclose = AsyncMock()
+
+    async def get_message(**kwargs):
+        await asyncio.Event().wait()
+
+    pubsub.get_message = get_message
+
+    return pubsub
+
+
+@pytest.fixture
+async def manager(pubsub):
+    redis = MagicMock()
+    redis.pubsub.return_value = pubsub
+    manager = WebSocketManager(redis=redis, send_timeout=0.1, max_queued_messages=2)
+
+    yield manager
+
+    await manager.shutdown()
+
+
+def _websocket(send_text=None):
+    websocket = MagicMock()
+    websocket.send_text = send_text or AsyncMock()
+    return websocket
+
+
+def _channel(user_id):
+    return Channel(type=ChannelType.APP_RUN_UPDATES, user_id=user_id).channel_string
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_all_channels_share_one_subscriber(manager: WebSocketManager, pubsub):
+    user_ids = [uuid4() for _ in range(3)]
+    for user_id in user_ids:
+        manager.subscribe(_websocket(), ChannelType.APP_RUN_UPDATES, user_id)
+    await _settle()
+
+    assert manager.redis.pubsub.call_count == 1
+    assert len(manager._tasks) == 2
+    subscribed = {channel for call in pubsub.subscribe.await_args_list for channel in call.args}
+    assert subscribed == {_channel(user_id) for user_id in user_ids}
+
+
+async def test_last_websocket_leaving_unsubscribes_channel(manager: WebSocketManager, pubsub):
+    user_id = uuid4()
+    first, second = _websocket(), _websocket()
+    manager.subscribe(first, ChannelType.APP_RUN_UPDATES, user_id)
+    manager.subscribe(second, ChannelType.APP_RUN_UPDATES, user_id)
+    await _settle()
+
+    manager.unsubscribe_from_all_channels(first)
+    await _settle()
+    pubsub.unsubscribe.assert_not_awaited()
+
+    manager.unsubscribe(second, ChannelType.APP_RUN_UPDATES, user_id)
+    await _settle()
+    pubsub.unsubscribe.assert_awaited_once_with(_channel(user_id))
+    assert manager.num_channels == 0
+    assert manager.num_websockets == 0
+
+
+async def test_slow_websocket_does_not_hold_up_others(manager: WebSocketManager):
+    user_id = uuid4()
+
+    async def never_sends(text):
+        await asyncio.Event().wait()
+
+    slow, fast = _websocket(never_sends), _websocket()
+    manager.subscribe(slow, ChannelType.APP_RUN_UPDATES, user_id)
+    manager.subscribe(fast, ChannelType.APP_RUN_UPDATES, user_id)
+
+    await manager.publish(_channel(user_id), MESSAGE)
+    await _settle()
+
+    fast.send_text.assert_awaited_once()
+    assert manager.num_websockets == 2
+
+    # The slow websocket is dropped once it times out
+    await asyncio.sleep(0.2)
+    assert manager.num_websockets == 1
+    assert manager.channels[_channel(user_id)] == {fast}
+    assert manager.stats().dropped_websockets == 1
+
+
+async def test_oldest_messages_are_dropped_when_the_queue_is_full(
+    manager: WebSocketManager,
+):
+    user_id = uuid4()
+    release = asyncio.Event()
+    sent = []
+
+    async def send_text(text):
+        await release.wait()
+        sent.append(text)
+
+    websocket = _websocket(send_text)
+    manager.subscribe(websocket, ChannelType.APP_RUN_UPDATES, user_id)
+
+    messages = [
+        WsOutgoingWebSocketMessage(type=OutGoingMessageType.PONG),
+        WsOutgoingWebSocketMessage(type=OutGoingMessageType.APP_RUN_UPDATES),
+    ]
+    await manager.publish(_channel(user_id), messages[0])
+    await _settle()
+
+    # The first message is being sent, queue up three more
+    for _ in range(3):
+        await manager.publish(_channel(user_id), messages[1])
+    assert manager.num_queued_messages == 2
+
+    release.set()
+    await asyncio.sleep(0.05)
+
+    assert len(sent) == 3
+    assert manager.stats().dropped_messages == 1
+
+
+async def test_stats_are_logged_periodically(pubsub):
+    redis = MagicMock()
+    redis.pubsub.return_value = pubsub
+    manager = WebSocketManager(redis=redis, stats_log_interval=0.01)
+
+    with patch("intric.server.websockets.websocket_manager.logger") as logger:
+        manager.subscribe(_websocket(), ChannelType.APP_RUN_UPDATES, uuid4())
+        await asyncio.sleep(0.05)
+        await manager.shutdown()
+
+    messages = [call.args[0] for call in logger.info.call_args_list]
+    assert len(messages) > 1
+    assert "websockets=1, channels=1, queued_messages=0" in messages[0]